@@ -2,7 +2,6 @@
 from uuid import uuid4
 
 from django.conf import settings
-from django.db.models import Q
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
@@ -36,7 +35,7 @@ from marsha.bbb.utils.tokens import create_classroom_stable_invite_jwt
 from marsha.core import defaults, permissions as core_permissions
 from marsha.core.api import APIViewMixin, BulkDestroyModelMixin, ObjectPkMixin
 from marsha.core.defaults import VOD_CONVERT
-from marsha.core.models import ADMINISTRATOR, INSTRUCTOR, Video
+from marsha.core.models import ADMINISTRATOR, INSTRUCTOR, Video, has_playlist_role
 from marsha.core.utils.convert_lambda_utils import invoke_lambda_convert
 from marsha.core.utils.s3_utils import create_presigned_post
 from marsha.core.utils.time_utils import to_timestamp
@@ -207,16 +206,8 @@ class ClassroomViewSet(
             super()
             .get_queryset()
             .filter(
-                Q(
-                    playlist__organization__user_accesses__user_id=self.request.user.id,
-                    playlist__organization__user_accesses__role=ADMINISTRATOR,
-                )
-                | Q(
-                    playlist__user_accesses__user_id=self.request.user.id,
-                    playlist__user_accesses__role__in=[ADMINISTRATOR, INSTRUCTOR],
-                )
+                has_playlist_role(self.request.user.id, [ADMINISTRATOR, INSTRUCTOR])
             )
-            .distinct()
         )
 
         return queryset
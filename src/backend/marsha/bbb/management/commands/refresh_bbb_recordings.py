@@ -1,13 +1,19 @@
 """Test update recording management command."""
-from datetime import timezone
+from datetime import timedelta
 import logging
 
+from django.core.cache import cache
 from django.core.management.base import BaseCommand
-
-from dateutil.parser import parse
+from django.db.models import Q
+from django.utils import timezone
 
 from marsha.bbb.models import Classroom, ClassroomRecording
-from marsha.bbb.utils.bbb_utils import get_recordings, process_recordings
+from marsha.bbb.utils.bbb_utils import (
+    get_recordings,
+    process_recordings,
+    synchronize_recordings,
+)
+from marsha.core.defaults import CLASSROOM_RECORDINGS_REFRESHED_AT_KEY_CACHE
 
 
 logger = logging.getLogger(__name__)
@@ -32,6 +38,30 @@ class Command(BaseCommand):
         parser.add_argument(
             "-a", "--after", type=str, help="Update recordings after this date."
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20,
+            help="Number of classrooms whose recordings are requested in one call.",
+        )
+        parser.add_argument(
+            "-i",
+            "--incremental",
+            action="store_true",
+            help=(
+                "Only update classrooms with a session running or ended since the "
+                "last complete update, minus the lookback period."
+            ),
+        )
+        parser.add_argument(
+            "--lookback",
+            type=int,
+            default=24,
+            help=(
+                "Hours BBB may take to publish a recording, incremental updates look "
+                "for sessions ended this long before the last update."
+            ),
+        )
 
     def handle(self, *args, **options):
         """Execute management command."""
@@ -56,39 +86,34 @@ class Command(BaseCommand):
             )
             return
 
-        classrooms = Classroom.objects.all()
+        started_at = timezone.now()
+        classrooms = Classroom.objects.order_by("pk")
         if classroom_id:
             classrooms = classrooms.filter(id=classroom_id)
 
+        refreshed_at = cache.get(CLASSROOM_RECORDINGS_REFRESHED_AT_KEY_CACHE)
+        if options["incremental"] and refreshed_at:
+            classrooms = classrooms.filter(
+                Q(sessions__ended_at__isnull=True)
+                | Q(
+                    sessions__ended_at__gte=refreshed_at
+                    - timedelta(hours=options["lookback"])
+                ),
+                sessions__isnull=False,
+            ).distinct()
+
+        classrooms = list(classrooms)
         if not classrooms:
             logger.info("No classroom found.")
-            return
-
-        for classroom in classrooms:
-            logger.info("Classroom %s found.", classroom.id)
-            # cleanup existing recordings
-            classroom_recordings = classroom.recordings.all()
-            if before:
-                classroom_recordings = classroom_recordings.filter(
-                    started_at__lt=parse(before).replace(tzinfo=timezone.utc)
-                )
-            if after:
-                classroom_recordings = classroom_recordings.filter(
-                    started_at__gt=parse(after).replace(tzinfo=timezone.utc)
-                )
-            known_recording_ids = classroom_recordings.values_list(
-                "record_id", flat=True
-            )
-            for recording_id in known_recording_ids:
-                api_response = get_recordings(classroom.meeting_id, recording_id)
-                process_recordings(classroom, api_response, recording_id)
 
-            # get new recordings
-            api_response = get_recordings(classroom.meeting_id)
-            process_recordings(
-                classroom,
-                api_response,
-                record_ids_to_skip=known_recording_ids,
+        batch_size = options["batch_size"]
+        for start in range(0, len(classrooms), batch_size):
+            synchronize_recordings(
+                classrooms[start : start + batch_size],  # noqa: E203
                 before=before,
                 after=after,
             )
+
+        if not (classroom_id or before or after):
+            # All the classrooms that may have new recordings are up to date
+            cache.set(CLASSROOM_RECORDINGS_REFRESHED_AT_KEY_CACHE, started_at, None)
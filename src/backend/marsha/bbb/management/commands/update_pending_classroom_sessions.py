@@ -1,6 +1,11 @@
 """For each pending classroom, get their meeting infos:
  update learning analytics, and end it if needed."""
+from concurrent.futures import ThreadPoolExecutor
+import queue
+from time import perf_counter
+
 from django.core.management import BaseCommand
+from django.db import connections
 
 from marsha.bbb.models import Classroom
 from marsha.bbb.utils.bbb_utils import get_meeting_infos
@@ -11,19 +16,92 @@ class Command(BaseCommand):
 
     help = __doc__
 
+    def add_arguments(self, parser):
+        """Add arguments to the command."""
+        parser.add_argument(
+            "-c",
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Number of classrooms updated at the same time.",
+        )
+
     def handle(self, *args, **options):
         """Execute management command."""
-        classrooms = Classroom.objects.filter(started=True, ended=False)
+        classrooms = list(Classroom.objects.filter(started=True, ended=False))
         if not classrooms:
             self.stdout.write("No pending classroom found.")
             return
-        for classroom in classrooms:
-            try:
-                self.stdout.write(f"Updating session for classroom {classroom.title}")
-                get_meeting_infos(classroom)
-                self.stdout.write(f"Session for classroom {classroom.title} updated.")
-            except Exception as exception:
+
+        start = perf_counter()
+        if options["concurrency"] > 1:
+            results = self.update_classrooms_concurrently(
+                classrooms, options["concurrency"]
+            )
+        else:
+            results = [self.update_classroom(classroom) for classroom in classrooms]
+        duration = perf_counter() - start
+
+        failures = 0
+        for classroom, (error, classroom_duration) in zip(classrooms, results):
+            self.stdout.write(f"Updating session for classroom {classroom.title}")
+            if error:
+                failures += 1
                 self.stdout.write(
-                    f"Failed to update pending classroom {classroom.title}: {exception}"
+                    f"Failed to update pending classroom {classroom.title}: {error}"
                 )
-                continue
+            else:
+                self.stdout.write(f"Session for classroom {classroom.title} updated.")
+            if options["verbosity"] > 1:
+                self.stdout.write(f"  took {classroom_duration:.3f}s")
+
+        self.stdout.write(
+            f"{len(classrooms) - failures} classrooms updated, {failures} failed, "
+            f"in {duration:.3f}s ({len(classrooms) / duration:.1f} classrooms/s)."
+        )
+
+    @staticmethod
+    def update_classroom(classroom):
+        """Get the meeting infos of a classroom.
+
+        Returns
+        -------
+        Tuple[Exception, float]
+            The error raised if the classroom could not be updated, and the time it took.
+        """
+        start = perf_counter()
+        try:
+            get_meeting_infos(classroom)
+        except Exception as exception:  # pylint: disable=broad-except
+            return exception, perf_counter() - start
+        return None, perf_counter() - start
+
+    def update_classrooms_concurrently(self, classrooms, concurrency):
+        """Update classrooms from `concurrency` worker threads.
+
+        Returns
+        -------
+        List[Tuple[Exception, float]]
+            The result of `update_classroom` for each classroom, in order.
+        """
+        pending = queue.SimpleQueue()
+        for index, classroom in enumerate(classrooms):
+            pending.put((index, classroom))
+        results = [None] * len(classrooms)
+
+        def work():
+            try:
+                while True:
+                    try:
+                        index, classroom = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    results[index] = self.update_classroom(classroom)
+            finally:
+                # Each thread opened its own database connection
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for worker in [executor.submit(work) for _ in range(concurrency)]:
+                worker.result()
+        return results
@@ -3,7 +3,8 @@
 from rest_framework import permissions
 
 from marsha.bbb.models import Classroom
-from marsha.core import models, permissions as core_permissions
+from marsha.core import permissions as core_permissions
+from marsha.core.permissions.roles import get_request_roles
 
 
 class IsTokenResourceRouteObjectRelatedClassroom(permissions.BasePermission):
@@ -96,11 +97,9 @@ class IsParamsClassroomAdminOrInstructorThroughPlaylist(
         this classroom belongs.
         """
         classroom_id = view.get_related_classroom_id()
-        return models.PlaylistAccess.objects.filter(
-            **self.role_filter,
-            playlist__classrooms__id=classroom_id,
-            user__id=request.user.id,
-        ).exists()
+        return get_request_roles(request).has_playlist_role(
+            self.roles, classroom_id, lookup="classrooms__id"
+        )
 
 
 class IsParamsClassroomAdminThroughOrganization(
@@ -124,8 +123,6 @@ class IsParamsClassroomAdminThroughOrganization(
         this classroom's playlist belongs.
         """
         classroom_id = view.get_related_classroom_id()
-        return models.OrganizationAccess.objects.filter(
-            **self.role_filter,
-            organization__playlists__classrooms__id=classroom_id,
-            user__id=request.user.id,
-        ).exists()
+        return get_request_roles(request).has_playlist_organization_role(
+            self.roles, classroom_id, lookup="classrooms__id"
+        )
@@ -1,14 +1,14 @@
 """Structure of BBB related models API responses with Django Rest Framework serializers."""
+from collections import defaultdict
 from datetime import datetime
 import mimetypes
 from os.path import splitext
 from urllib.parse import quote_plus
-from uuid import uuid4
 
 from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import models, transaction
 from django.urls import reverse
 from django.utils import timezone
 
@@ -20,7 +20,12 @@ from marsha.bbb.models import (
     ClassroomRecording,
     ClassroomSession,
 )
-from marsha.bbb.utils.bbb_utils import get_recording_url, get_url as get_document_url
+from marsha.bbb.utils.bbb_utils import (
+    get_recording_url,
+    get_recording_urls,
+    get_url as get_document_url,
+)
+from marsha.core.cache import make_namespaced_key, make_namespaced_keys
 from marsha.core.defaults import CLASSROOM_RECORDINGS_KEY_CACHE, VOD_CONVERT
 from marsha.core.serializers import (
     BaseInitiateUploadSerializer,
@@ -31,11 +36,24 @@ from marsha.core.serializers import (
 )
 
 
+class ClassroomRecordingListSerializer(serializers.ListSerializer):
+    """Serialize recordings, retrieving the video urls missing from the cache at once."""
+
+    def to_representation(self, data):
+        """Prefetch the video urls of the recordings before serializing them."""
+        recordings = list(
+            data.all() if isinstance(data, models.manager.BaseManager) else data
+        )
+        self.child.prefetch_video_file_urls(recordings)
+        return super().to_representation(recordings)
+
+
 class ClassroomRecordingSerializer(ReadOnlyModelSerializer):
     """A serializer to display a ClassroomRecording resource."""
 
     class Meta:  # noqa
         model = ClassroomRecording
+        list_serializer_class = ClassroomRecordingListSerializer
         fields = (
             "id",
             "classroom_id",
@@ -60,26 +78,68 @@ class ClassroomRecordingSerializer(ReadOnlyModelSerializer):
     vod = VideoFromRecordingSerializer(read_only=True)
     video_file_url = serializers.SerializerMethodField()
 
-    def _get_recording_cache_key(self, obj):
-        """Compute the cache key for the current context."""
-        request = self.context.get("request")
-        if request:
-            if request.resource:
-                # LTI context
-                payload = request.resource.token.payload
-                user_id = payload.get("user", {}).get("id", str(uuid4()))
-            else:
-                user_id = request.user.id
+    def __init__(self, *args, **kwargs):
+        """Start without prefetched video urls."""
+        super().__init__(*args, **kwargs)
+        self._video_file_urls = {}
+
+    @staticmethod
+    def _get_recording_cache_key(obj):
+        """Compute the cache key of the video url of a recording.
+
+        The url is the same for all users, it is shared by all of them.
+        """
+        return make_namespaced_key(
+            f"{CLASSROOM_RECORDINGS_KEY_CACHE}{obj.record_id}",
+            ("classroom", obj.classroom_id),
+        )
 
-            return f"{CLASSROOM_RECORDINGS_KEY_CACHE}{obj.record_id}:{user_id}"
+    def prefetch_video_file_urls(self, recordings):
+        """Retrieve the video urls of several recordings.
 
-        return f"{CLASSROOM_RECORDINGS_KEY_CACHE}{str(uuid4())}"
+        The urls missing from the cache are retrieved from BBB with a single call and
+        cached.
+        """
+        recordings_by_classroom = defaultdict(list)
+        for recording in recordings:
+            recordings_by_classroom[recording.classroom_id].append(recording)
+
+        cache_keys = {}
+        for classroom_id, classroom_recordings in recordings_by_classroom.items():
+            keys = make_namespaced_keys(
+                [
+                    f"{CLASSROOM_RECORDINGS_KEY_CACHE}{recording.record_id}"
+                    for recording in classroom_recordings
+                ],
+                ("classroom", classroom_id),
+            )
+            for recording, key in zip(classroom_recordings, keys):
+                cache_keys[recording.record_id] = key
+
+        cached_urls = cache.get_many(cache_keys.values())
+        self._video_file_urls = {
+            record_id: cached_urls.get(key) for record_id, key in cache_keys.items()
+        }
+
+        missing_record_ids = [
+            record_id for record_id, url in self._video_file_urls.items() if url is None
+        ]
+        if missing_record_ids:
+            # The url timeout has expired.
+            # We must retrieve them from BBB and cache them again.
+            urls = get_recording_urls(missing_record_ids)
+            self._video_file_urls.update(urls)
+            cache.set_many(
+                {cache_keys[record_id]: url for record_id, url in urls.items()},
+                settings.RECORDINGS_URL_CACHE_TIMEOUT,
+            )
 
     def get_video_file_url(self, obj):
         """Method for video_file_url field."""
-        video_file_url = None
-        cache_key = self._get_recording_cache_key(obj)
+        if obj.record_id in self._video_file_urls:
+            return self._video_file_urls[obj.record_id]
 
+        cache_key = self._get_recording_cache_key(obj)
         video_file_url = cache.get(cache_key)
 
         if video_file_url is None:
@@ -1,10 +1,12 @@
 """Defines the django app config for the ``page`` app."""
 
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from marsha.bbb.models import ClassroomRecording
+from marsha.bbb.models import Classroom, ClassroomRecording
 from marsha.bbb.utils import bbb_utils
 from marsha.core.api import signal_object_uploaded
+from marsha.core.cache import invalidate_namespace
 from marsha.core.models import Video
 
 
@@ -20,3 +22,21 @@ def object_uploaded_callback(**kwargs):
         recording = ClassroomRecording.objects.filter(vod__id=instance.id).first()
         if recording:
             bbb_utils.delete_recording([recording])
+
+
+@receiver([post_save, post_delete], sender=Classroom)
+def classroom_changed_callback(instance, **kwargs):
+    """
+    Callback answering the save and delete of a classroom.
+    Cached data derived from the classroom (app data, recording urls) is invalidated.
+    """
+    invalidate_namespace(("classroom", instance.pk))
+
+
+@receiver([post_save, post_delete], sender=ClassroomRecording)
+def classroom_recording_changed_callback(instance, **kwargs):
+    """
+    Callback answering the save and delete of a classroom recording.
+    Recording urls cached for its classroom are invalidated.
+    """
+    invalidate_namespace(("classroom", instance.classroom_id))
@@ -15,6 +15,7 @@ from marsha.bbb.factories import (
     ClassroomSessionFactory,
 )
 from marsha.bbb.utils.tokens import create_classroom_stable_invite_jwt
+from marsha.core.cache import make_namespaced_key
 from marsha.core.defaults import CLASSROOM_RECORDINGS_KEY_CACHE
 from marsha.core.factories import (
     OrganizationAccessFactory,
@@ -506,8 +507,9 @@ class ClassroomRetrieveAPITest(TestCase):
             match=[
                 responses.matchers.query_param_matcher(
                     {
-                        "recordID": "67df5782-c17b-46d8-9dcb-a404e0b31251",
-                        "checksum": "5b9680a8fcca9e43f41f494b0503a41c14a86be9",
+                        "recordID": "35c165e6-75fd-4bb4-8352-a74057689e40,"
+                        "67df5782-c17b-46d8-9dcb-a404e0b31251",
+                        "checksum": "3abe45c02b452eba5e629ae3a6fd1f37d94999d9",
                     }
                 )
             ],
@@ -516,7 +518,7 @@ class ClassroomRetrieveAPITest(TestCase):
                 <returncode>SUCCESS</returncode>
                 <recordings>
                     <recording>
-                        <recordID>c62c9c205d37815befe1b75ae6ef5878d8da5bb6-1673282694493</recordID>
+                        <recordID>35c165e6-75fd-4bb4-8352-a74057689e40</recordID>
                         <meetingID>7e1c8b28-cd7a-4abe-93b2-3121366cb049</meetingID>
                         <internalMeetingID>c62c9c205d37815befe1b75ae6ef5878d8da5bb6-1673282694493</internalMeetingID>
                         <name>test ncl</name>
@@ -546,29 +548,8 @@ class ClassroomRetrieveAPITest(TestCase):
                             </format>
                         </playback>
                     </recording>
-                </recordings>
-            </response>
-            """,
-            status=200,
-        )
-
-        responses.add(
-            responses.GET,
-            "https://10.7.7.1/bigbluebutton/api/getRecordings",
-            match=[
-                responses.matchers.query_param_matcher(
-                    {
-                        "recordID": "35c165e6-75fd-4bb4-8352-a74057689e40",
-                        "checksum": "3ccf4770fcc739a037f6a8156b99467c6d8c95c5",
-                    }
-                )
-            ],
-            body="""
-            <response>
-                <returncode>SUCCESS</returncode>
-                <recordings>
                     <recording>
-                        <recordID>c62c9c205d37815befe1b75ae6ef5878d8da5bb6-1673282694493</recordID>
+                        <recordID>67df5782-c17b-46d8-9dcb-a404e0b31251</recordID>
                         <meetingID>7e1c8b28-cd7a-4abe-93b2-3121366cb049</meetingID>
                         <internalMeetingID>c62c9c205d37815befe1b75ae6ef5878d8da5bb6-1673282694493</internalMeetingID>
                         <name>test ncl</name>
@@ -696,8 +677,9 @@ class ClassroomRetrieveAPITest(TestCase):
             match=[
                 responses.matchers.query_param_matcher(
                     {
-                        "recordID": "67df5782-c17b-46d8-9dcb-a404e0b31251",
-                        "checksum": "5b9680a8fcca9e43f41f494b0503a41c14a86be9",
+                        "recordID": "35c165e6-75fd-4bb4-8352-a74057689e40,"
+                        "67df5782-c17b-46d8-9dcb-a404e0b31251",
+                        "checksum": "3abe45c02b452eba5e629ae3a6fd1f37d94999d9",
                     }
                 )
             ],
@@ -706,7 +688,7 @@ class ClassroomRetrieveAPITest(TestCase):
                 <returncode>SUCCESS</returncode>
                 <recordings>
                     <recording>
-                        <recordID>c62c9c205d37815befe1b75ae6ef5878d8da5bb6-1673282694493</recordID>
+                        <recordID>35c165e6-75fd-4bb4-8352-a74057689e40</recordID>
                         <meetingID>7e1c8b28-cd7a-4abe-93b2-3121366cb049</meetingID>
                         <internalMeetingID>c62c9c205d37815befe1b75ae6ef5878d8da5bb6-1673282694493</internalMeetingID>
                         <name>test ncl</name>
@@ -736,29 +718,8 @@ class ClassroomRetrieveAPITest(TestCase):
                             </format>
                         </playback>
                     </recording>
-                </recordings>
-            </response>
-            """,
-            status=200,
-        )
-
-        responses.add(
-            responses.GET,
-            "https://10.7.7.1/bigbluebutton/api/getRecordings",
-            match=[
-                responses.matchers.query_param_matcher(
-                    {
-                        "recordID": "35c165e6-75fd-4bb4-8352-a74057689e40",
-                        "checksum": "3ccf4770fcc739a037f6a8156b99467c6d8c95c5",
-                    }
-                )
-            ],
-            body="""
-            <response>
-                <returncode>SUCCESS</returncode>
-                <recordings>
                     <recording>
-                        <recordID>c62c9c205d37815befe1b75ae6ef5878d8da5bb6-1673282694493</recordID>
+                        <recordID>67df5782-c17b-46d8-9dcb-a404e0b31251</recordID>
                         <meetingID>7e1c8b28-cd7a-4abe-93b2-3121366cb049</meetingID>
                         <internalMeetingID>c62c9c205d37815befe1b75ae6ef5878d8da5bb6-1673282694493</internalMeetingID>
                         <name>test ncl</name>
@@ -860,9 +821,9 @@ class ClassroomRetrieveAPITest(TestCase):
 
         self.assertEqual(
             cache.get(
-                (
-                    f"{CLASSROOM_RECORDINGS_KEY_CACHE}{classroom_recording_1.record_id}:"
-                    "8809baa8-8578-4b1b-bc01-60d313a205f7"
+                make_namespaced_key(
+                    f"{CLASSROOM_RECORDINGS_KEY_CACHE}{classroom_recording_1.record_id}",
+                    ("classroom", classroom_recording_1.classroom_id),
                 )
             ),
             (
@@ -896,8 +857,9 @@ class ClassroomRetrieveAPITest(TestCase):
             match=[
                 responses.matchers.query_param_matcher(
                     {
-                        "recordID": "67df5782-c17b-46d8-9dcb-a404e0b31251",
-                        "checksum": "5b9680a8fcca9e43f41f494b0503a41c14a86be9",
+                        "recordID": "35c165e6-75fd-4bb4-8352-a74057689e40,"
+                        "67df5782-c17b-46d8-9dcb-a404e0b31251",
+                        "checksum": "3abe45c02b452eba5e629ae3a6fd1f37d94999d9",
                     }
                 )
             ],
@@ -906,7 +868,7 @@ class ClassroomRetrieveAPITest(TestCase):
                 <returncode>SUCCESS</returncode>
                 <recordings>
                     <recording>
-                        <recordID>c62c9c205d37815befe1b75ae6ef5878d8da5bb6-1673282694493</recordID>
+                        <recordID>35c165e6-75fd-4bb4-8352-a74057689e40</recordID>
                         <meetingID>7e1c8b28-cd7a-4abe-93b2-3121366cb049</meetingID>
                         <internalMeetingID>c62c9c205d37815befe1b75ae6ef5878d8da5bb6-1673282694493</internalMeetingID>
                         <name>test ncl</name>
@@ -936,29 +898,8 @@ class ClassroomRetrieveAPITest(TestCase):
                             </format>
                         </playback>
                     </recording>
-                </recordings>
-            </response>
-            """,
-            status=200,
-        )
-
-        responses.add(
-            responses.GET,
-            "https://10.7.7.1/bigbluebutton/api/getRecordings",
-            match=[
-                responses.matchers.query_param_matcher(
-                    {
-                        "recordID": "35c165e6-75fd-4bb4-8352-a74057689e40",
-                        "checksum": "3ccf4770fcc739a037f6a8156b99467c6d8c95c5",
-                    }
-                )
-            ],
-            body="""
-            <response>
-                <returncode>SUCCESS</returncode>
-                <recordings>
                     <recording>
-                        <recordID>c62c9c205d37815befe1b75ae6ef5878d8da5bb6-1673282694493</recordID>
+                        <recordID>67df5782-c17b-46d8-9dcb-a404e0b31251</recordID>
                         <meetingID>7e1c8b28-cd7a-4abe-93b2-3121366cb049</meetingID>
                         <internalMeetingID>c62c9c205d37815befe1b75ae6ef5878d8da5bb6-1673282694493</internalMeetingID>
                         <name>test ncl</name>
@@ -1060,9 +1001,9 @@ class ClassroomRetrieveAPITest(TestCase):
 
         self.assertEqual(
             cache.get(
-                (
-                    f"{CLASSROOM_RECORDINGS_KEY_CACHE}{classroom_recording_1.record_id}:"
-                    f"{playlist_access.user.id}"
+                make_namespaced_key(
+                    f"{CLASSROOM_RECORDINGS_KEY_CACHE}{classroom_recording_1.record_id}",
+                    ("classroom", classroom_recording_1.classroom_id),
                 )
             ),
             (
@@ -1072,9 +1013,9 @@ class ClassroomRetrieveAPITest(TestCase):
         )
         self.assertEqual(
             cache.get(
-                (
-                    f"{CLASSROOM_RECORDINGS_KEY_CACHE}{classroom_recording_2.record_id}:"
-                    f"{playlist_access.user.id}"
+                make_namespaced_key(
+                    f"{CLASSROOM_RECORDINGS_KEY_CACHE}{classroom_recording_2.record_id}",
+                    ("classroom", classroom_recording_2.classroom_id),
                 )
             ),
             (
@@ -350,12 +350,14 @@ class ClassroomUpdateAPITest(TestCase):
         jwt_token = UserAccessTokenFactory(user=organization_access.user)
         data = {"title": "new title", "welcome_text": "Hello"}
 
-        response = self.client.patch(
-            f"/api/classrooms/{classroom.id!s}/",
-            data,
-            HTTP_AUTHORIZATION=f"Bearer {jwt_token}",
-            content_type="application/json",
-        )
+        # The playlist and organization roles are checked by a single query
+        with self.assertNumQueries(9):
+            response = self.client.patch(
+                f"/api/classrooms/{classroom.id!s}/",
+                data,
+                HTTP_AUTHORIZATION=f"Bearer {jwt_token}",
+                content_type="application/json",
+            )
         self.assertEqual(response.status_code, 200)
 
         classroom.refresh_from_db()
@@ -0,0 +1,63 @@
+"""Tests for the BBB client in the ``bbb`` app of the Marsha project."""
+from django.test import TestCase, override_settings
+
+import responses
+
+from marsha.bbb.factories import ClassroomFactory
+from marsha.bbb.tests.fake_bbb_server import BBBServerStandIn
+from marsha.bbb.utils import bbb_utils
+
+
+@override_settings(BBB_API_SECRET="SuperSecret")
+class ClassroomServiceBBBClientTestCase(TestCase):
+    """Test our intentions about the BBB client shared by API calls."""
+
+    def setUp(self):
+        """Start with no client."""
+        super().setUp()
+        bbb_utils._clients.clear()  # pylint: disable=protected-access
+
+    def test_get_client_per_server(self):
+        """Calls to a server share a client, other servers have their own."""
+        client = bbb_utils.get_client("https://10.7.7.1/bigbluebutton/api/create")
+
+        self.assertIs(
+            bbb_utils.get_client(
+                "https://10.7.7.1/bigbluebutton/api/learningDashboard"
+            ),
+            client,
+        )
+        self.assertIsNot(
+            bbb_utils.get_client("https://10.7.7.2/bigbluebutton/api/create"), client
+        )
+
+    @responses.activate
+    def test_client_does_not_keep_cookies(self):
+        """Cookies set by a response are not sent with the next calls."""
+        client = bbb_utils.get_client("https://10.7.7.1")
+        responses.add(
+            responses.GET,
+            "https://10.7.7.1/first",
+            headers={"Set-Cookie": "session=first"},
+        )
+        responses.add(responses.GET, "https://10.7.7.1/second")
+
+        client.request("get", "https://10.7.7.1/first", cookies={"foo": "bar"})
+        client.request("get", "https://10.7.7.1/second")
+
+        self.assertEqual(responses.calls[0].request.headers["Cookie"], "foo=bar")
+        self.assertNotIn("Cookie", responses.calls[1].request.headers)
+
+    def test_client_keeps_connection_alive(self):
+        """Successive API calls reuse the connection to the BBB server."""
+        server = BBBServerStandIn()
+        server.start()
+        self.addCleanup(server.stop)
+        classroom = ClassroomFactory(started=True)
+
+        with override_settings(BBB_API_ENDPOINT=server.api_endpoint):
+            for _ in range(3):
+                bbb_utils.get_meeting_infos(classroom)
+
+        self.assertEqual(server.requests, 3)
+        self.assertEqual(server.connections, 1)
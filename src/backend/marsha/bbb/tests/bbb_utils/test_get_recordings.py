@@ -5,7 +5,11 @@ from django.test import TestCase, override_settings
 import responses
 
 from marsha.bbb.factories import ClassroomFactory, ClassroomRecordingFactory
-from marsha.bbb.utils.bbb_utils import get_recordings
+from marsha.bbb.utils.bbb_utils import (
+    ApiMeetingException,
+    get_recordings,
+    iter_recordings,
+)
 from marsha.core.tests.testing_utils import reload_urlconf
 
 
@@ -395,3 +399,32 @@ class ClassroomServiceTestCase(TestCase):
             },
             api_response,
         )
+
+    @responses.activate
+    def test_iter_recordings_error(self):
+        """A failed multi-meeting call raises an ApiMeetingException."""
+        responses.add(
+            responses.GET,
+            "https://10.7.7.1/bigbluebutton/api/getRecordings",
+            match=[
+                responses.matchers.query_param_matcher(
+                    {"meetingID": "meeting-1,meeting-2"}, strict_match=False
+                )
+            ],
+            body="""
+            <response>
+                <returncode>FAILED</returncode>
+                <messageKey>checksumError</messageKey>
+                <message>You did not pass the checksum security check</message>
+            </response>
+            """,
+            status=200,
+        )
+
+        with self.assertRaises(ApiMeetingException) as context:
+            list(iter_recordings(["meeting-1", "meeting-2"]))
+
+        self.assertEqual(
+            str(context.exception), "You did not pass the checksum security check"
+        )
+        self.assertEqual(context.exception.api_response["messageKey"], "checksumError")
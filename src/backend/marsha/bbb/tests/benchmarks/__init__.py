@@ -0,0 +1 @@
+"""Benchmarks for the ``bbb`` app of the Marsha project."""
@@ -0,0 +1,72 @@
+"""Benchmark the refresh of the pending classroom sessions.
+
+Run it with
+``bin/pytest marsha/bbb/tests/benchmarks/bench_update_pending_classroom_sessions.py -s``.
+"""
+from io import StringIO
+from time import perf_counter
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+
+from marsha.bbb.factories import ClassroomSessionFactory
+from marsha.bbb.tests.fake_bbb_server import BBBServerStandIn
+from marsha.bbb.utils import bbb_utils
+
+
+CLASSROOMS = 100
+LATENCY = 0.01
+
+
+class UpdatePendingClassroomSessionsBenchmark(TransactionTestCase):
+    """Compare classrooms refreshed per second, serially and concurrently."""
+
+    def setUp(self):
+        """Start a stand-in BBB server answering after some latency."""
+        super().setUp()
+        self.server = BBBServerStandIn(latency=LATENCY)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        settings_override = override_settings(
+            BBB_API_ENDPOINT=self.server.api_endpoint,
+            BBB_API_SECRET="SuperSecret",
+            BBB_ENABLED=True,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _run(self, label, concurrency=1):
+        """Run the command and print the benchmark results."""
+        # pylint: disable=protected-access
+        bbb_utils._clients.clear()
+        connections = self.server.connections
+        start = perf_counter()
+        call_command(
+            "update_pending_classroom_sessions",
+            concurrency=concurrency,
+            stdout=StringIO(),
+        )
+        elapsed = perf_counter() - start
+        print(
+            f"\n{label}: {CLASSROOMS / elapsed:.0f} classrooms per second, "
+            f"{self.server.connections - connections} connections opened"
+        )
+
+    def test_bench_update_pending_classroom_sessions(self):
+        """Classrooms refreshed per second with and without pooled connections."""
+        ClassroomSessionFactory.create_batch(
+            CLASSROOMS,
+            classroom__started=True,
+            bbb_learning_analytics_url=self.server.learning_analytics_url,
+        )
+
+        with mock.patch.object(
+            bbb_utils, "get_client", lambda url: bbb_utils.BBBClient(1)
+        ):
+            # a new connection for each call, as before
+            self._run("serial, connection per call")
+        self._run("serial, pooled connections")
+        for concurrency in (4, 10):
+            with override_settings(BBB_API_POOL_SIZE=concurrency):
+                self._run(f"{concurrency} threads, pooled connections", concurrency)
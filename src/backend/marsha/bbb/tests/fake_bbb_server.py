@@ -0,0 +1,109 @@
+"""A local server standing in for a BBB server in tests and benchmarks.
+
+It answers the ``getMeetingInfo`` API call of a running meeting and the learning
+dashboard of its sessions, after an optional latency, and counts the connections opened
+by its clients.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+
+API_PATH = "/bigbluebutton/api"
+MEETING_INFO = """<response>
+    <returncode>SUCCESS</returncode>
+    <meetingID>{meeting_id}</meetingID>
+    <running>true</running>
+    <participantCount>0</participantCount>
+</response>"""
+
+
+class _BBBHandler(BaseHTTPRequestHandler):
+    """Answer the requests of one connection, kept alive."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, don't delay the body on kept-alive
+    # connections
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        """Count the new connection."""
+        super().setup()
+        with self.server.stand_in.lock:
+            self.server.stand_in.connections += 1
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Keep the test output quiet."""
+
+    def _respond(self, status, content_type, body):
+        body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Answer a BBB API call or a learning dashboard request."""
+        stand_in = self.server.stand_in
+        with stand_in.lock:
+            stand_in.requests += 1
+        time.sleep(stand_in.latency)
+
+        url = urlsplit(self.path)
+        if url.path == f"{API_PATH}/getMeetingInfo":
+            meeting_id = parse_qs(url.query)["meetingID"][0]
+            self._respond(
+                200, "application/xml", MEETING_INFO.format(meeting_id=meeting_id)
+            )
+        elif url.path == f"{API_PATH}/learningDashboard":
+            self._respond(
+                200,
+                "application/json",
+                json.dumps({"response": {"data": json.dumps({"users": {}})}}),
+            )
+        else:
+            self._respond(404, "text/plain", "Not found")
+
+
+class BBBServerStandIn:
+    """Run the stand-in BBB server in a thread, on a free local port.
+
+    Parameters
+    ----------
+    latency : float
+        The time in seconds the server waits before answering each request.
+    """
+
+    def __init__(self, latency=0):
+        """Start listening."""
+        self.latency = latency
+        self.connections = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _BBBHandler)
+        self._server.daemon_threads = True
+        self._server.stand_in = self
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def api_endpoint(self):
+        """The url of the BBB API."""
+        return f"{self.url}{API_PATH}"
+
+    @property
+    def learning_analytics_url(self):
+        """The url of the learning dashboard of a meeting."""
+        return f"{self.api_endpoint}/learningDashboard"
+
+    def start(self):
+        """Serve the clients in a thread."""
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
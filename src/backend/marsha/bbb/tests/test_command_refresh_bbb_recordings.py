@@ -1,15 +1,22 @@
 """Test the development ``refresh_bbb_recordings` management command."""
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from logging import Logger
 from unittest import mock
 
+from django.core.cache import cache
 from django.core.management import call_command
 from django.test import TransactionTestCase, override_settings
 
 import responses
 
-from marsha.bbb.factories import ClassroomFactory, ClassroomRecordingFactory
+from marsha.bbb.factories import (
+    ClassroomFactory,
+    ClassroomRecordingFactory,
+    ClassroomSessionFactory,
+)
 from marsha.bbb.models import ClassroomRecording
+from marsha.core.cache import make_namespaced_key
+from marsha.core.defaults import CLASSROOM_RECORDINGS_REFRESHED_AT_KEY_CACHE
 from marsha.core.factories import VideoFactory
 
 
@@ -837,3 +844,151 @@ class RefreshBBBRecordingsTestCase(TransactionTestCase):
 
         self.assertEqual(ClassroomRecording.objects.count(), 1)
         self.assertEqual(classroom.recordings.count(), 1)
+
+    @staticmethod
+    def _recording_xml(meeting_id, record_id):
+        """Return the XML of a published recording with a video."""
+        return f"""
+            <recording>
+                <recordID>{record_id}</recordID>
+                <meetingID>{meeting_id}</meetingID>
+                <published>true</published>
+                <startTime>1673282694493</startTime>
+                <playback>
+                    <format>
+                        <type>video</type>
+                        <url>https://10.7.7.1/presentation/{record_id}/meeting.mp4</url>
+                    </format>
+                    <format>
+                        <type>presentation</type>
+                        <url>https://10.7.7.1/playback/presentation/2.3/{record_id}</url>
+                    </format>
+                </playback>
+            </recording>
+        """
+
+    def _add_recordings_response(self, meeting_ids, recordings):
+        """Mock the getRecordings call for several meetings."""
+        responses.add(
+            responses.GET,
+            "https://10.7.7.1/bigbluebutton/api/getRecordings",
+            match=[
+                responses.matchers.query_param_matcher(
+                    {"meetingID": ",".join(meeting_ids)}, strict_match=False
+                )
+            ],
+            body=f"""
+            <response>
+                <returncode>SUCCESS</returncode>
+                <recordings>
+                    {"".join(self._recording_xml(*recording) for recording in recordings)}
+                </recordings>
+            </response>
+            """,
+            status=200,
+        )
+
+    @responses.activate
+    def test_update_recordings_batches(self):
+        """Recordings of several classrooms are requested and saved in batches."""
+        classrooms = sorted(ClassroomFactory.create_batch(3), key=lambda c: c.pk)
+        meeting_ids = [str(classroom.meeting_id) for classroom in classrooms]
+        ClassroomRecordingFactory(classroom=classrooms[0], record_id="known")
+        deleted_recording = ClassroomRecordingFactory(
+            classroom=classrooms[1], record_id="deleted"
+        )
+        self._add_recordings_response(
+            meeting_ids[:2],
+            [(meeting_ids[0], "known"), (meeting_ids[1], "new-1")],
+        )
+        self._add_recordings_response(meeting_ids[2:], [(meeting_ids[2], "new-2")])
+
+        # per batch, one query to get the known recordings, one to create and one to
+        # update recordings, and the soft deletion of the recordings not available
+        with self.assertNumQueries(16):
+            call_command("refresh_bbb_recordings", batch_size=2)
+
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(
+            {
+                (recording.classroom_id, recording.record_id)
+                for recording in ClassroomRecording.objects.all()
+            },
+            {
+                (classrooms[0].id, "known"),
+                (classrooms[1].id, "new-1"),
+                (classrooms[2].id, "new-2"),
+            },
+        )
+        self.assertEqual(
+            ClassroomRecording.objects.get(record_id="new-2").started_at,
+            datetime(2023, 1, 9, 16, 44, 54, tzinfo=timezone.utc),
+        )
+        deleted_recording.refresh_from_db()
+        self.assertIsNotNone(deleted_recording.deleted)
+
+    @responses.activate
+    def test_update_recordings_invalidate_cache(self):
+        """The data cached for the classrooms whose recordings changed is invalidated."""
+        classrooms = sorted(ClassroomFactory.create_batch(2), key=lambda c: c.pk)
+        meeting_ids = [str(classroom.meeting_id) for classroom in classrooms]
+        ClassroomRecordingFactory(classroom=classrooms[0], record_id="known")
+        self._add_recordings_response(meeting_ids, [(meeting_ids[0], "known")])
+        keys = [
+            make_namespaced_key("key", ("classroom", classroom.id))
+            for classroom in classrooms
+        ]
+
+        call_command("refresh_bbb_recordings")
+
+        # the recording was updated in bulk, without sending the post_save signal
+        self.assertNotEqual(
+            make_namespaced_key("key", ("classroom", classrooms[0].id)), keys[0]
+        )
+        self.assertEqual(
+            make_namespaced_key("key", ("classroom", classrooms[1].id)), keys[1]
+        )
+
+    @responses.activate
+    def test_update_recordings_incremental(self):
+        """Incremental updates only request classrooms with a recent session."""
+        refreshed_at = datetime(2023, 1, 10, tzinfo=timezone.utc)
+        cache.set(CLASSROOM_RECORDINGS_REFRESHED_AT_KEY_CACHE, refreshed_at)
+        self.addCleanup(cache.delete, CLASSROOM_RECORDINGS_REFRESHED_AT_KEY_CACHE)
+        running = ClassroomSessionFactory(ended_at=None).classroom
+        recently_ended = ClassroomSessionFactory(
+            ended_at=refreshed_at - timedelta(hours=1)
+        ).classroom
+        # ended before the last update and the lookback period
+        ClassroomSessionFactory(ended_at=refreshed_at - timedelta(days=2))
+        # never started
+        ClassroomFactory()
+        meeting_ids = sorted(
+            [running, recently_ended], key=lambda classroom: classroom.pk
+        )
+        self._add_recordings_response(
+            [str(classroom.meeting_id) for classroom in meeting_ids], []
+        )
+
+        call_command("refresh_bbb_recordings", incremental=True)
+
+        self.assertEqual(len(responses.calls), 1)
+        self.assertGreater(
+            cache.get(CLASSROOM_RECORDINGS_REFRESHED_AT_KEY_CACHE), refreshed_at
+        )
+
+    @responses.activate
+    def test_update_recordings_partial_keeps_refreshed_at(self):
+        """Updating recordings of a classroom does not move the last update date."""
+        refreshed_at = datetime(2023, 1, 10, tzinfo=timezone.utc)
+        cache.set(CLASSROOM_RECORDINGS_REFRESHED_AT_KEY_CACHE, refreshed_at)
+        self.addCleanup(cache.delete, CLASSROOM_RECORDINGS_REFRESHED_AT_KEY_CACHE)
+        classroom = ClassroomFactory()
+        self._add_recordings_response([str(classroom.meeting_id)], [])
+
+        call_command("refresh_bbb_recordings", classroom_id=str(classroom.id))
+
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(
+            cache.get(CLASSROOM_RECORDINGS_REFRESHED_AT_KEY_CACHE), refreshed_at
+        )
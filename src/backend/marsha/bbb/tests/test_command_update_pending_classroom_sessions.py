@@ -10,6 +10,8 @@ from django.test import TransactionTestCase, override_settings
 import responses
 
 from marsha.bbb.factories import ClassroomSessionFactory
+from marsha.bbb.tests.fake_bbb_server import BBBServerStandIn
+from marsha.bbb.utils import bbb_utils
 
 
 @override_settings(BBB_API_ENDPOINT="https://10.7.7.1/bigbluebutton/api")
@@ -684,3 +686,37 @@ class UpdatePendingClassroomSessionsTestCase(TransactionTestCase):
             },
         )
         self.assertIsNone(classroom_session.classroom.infos)
+
+    def test_update_pending_sessions_concurrently(self):
+        """Classrooms are updated from several threads sharing pooled connections."""
+        server = BBBServerStandIn()
+        server.start()
+        self.addCleanup(server.stop)
+        bbb_utils._clients.clear()  # pylint: disable=protected-access
+        classroom_sessions = ClassroomSessionFactory.create_batch(
+            6,
+            classroom__started=True,
+            bbb_learning_analytics_url=server.learning_analytics_url,
+        )
+
+        out = StringIO()
+        with override_settings(
+            BBB_API_ENDPOINT=server.api_endpoint, BBB_API_POOL_SIZE=2
+        ):
+            call_command("update_pending_classroom_sessions", concurrency=2, stdout=out)
+
+        for classroom_session in classroom_sessions:
+            self.assertIn(
+                f"Session for classroom {classroom_session.classroom.title} updated.",
+                out.getvalue(),
+            )
+            classroom_session.refresh_from_db()
+            self.assertEqual(classroom_session.learning_analytics, '{"users": {}}')
+            self.assertEqual(
+                classroom_session.classroom.infos["meetingID"],
+                str(classroom_session.classroom.meeting_id),
+            )
+        self.assertIn("6 classrooms updated, 0 failed", out.getvalue())
+        # each thread kept its connection alive for all its calls
+        self.assertEqual(server.requests, 12)
+        self.assertLessEqual(server.connections, 2)
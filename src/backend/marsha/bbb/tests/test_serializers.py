@@ -0,0 +1,120 @@
+"""Tests for the serializers of the ``bbb`` app of the Marsha project."""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+import responses
+
+from marsha.bbb.factories import ClassroomFactory, ClassroomRecordingFactory
+from marsha.bbb.serializers import ClassroomRecordingSerializer
+
+
+RECORDINGS_URL = "https://10.7.7.1/bigbluebutton/api/getRecordings"
+
+
+@override_settings(BBB_API_ENDPOINT="https://10.7.7.1/bigbluebutton/api")
+@override_settings(BBB_API_SECRET="SuperSecret")
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+        "memory_cache": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+)
+class ClassroomRecordingSerializerTestCase(TestCase):
+    """Test the video urls of the classroom recording serializer."""
+
+    def setUp(self):
+        """Start with an empty cache."""
+        super().setUp()
+        cache.clear()
+
+    @staticmethod
+    def _add_recordings_response(record_ids):
+        """Mock the getRecordings call of several recordings."""
+        recordings = "".join(
+            f"""
+            <recording>
+                <recordID>{record_id}</recordID>
+                <published>true</published>
+                <playback>
+                    <format>
+                        <type>video</type>
+                        <url>https://10.7.7.1/presentation/{record_id}/meeting.mp4</url>
+                    </format>
+                </playback>
+            </recording>
+            """
+            for record_id in record_ids
+        )
+        responses.add(
+            responses.GET,
+            RECORDINGS_URL,
+            match=[
+                responses.matchers.query_param_matcher(
+                    {"recordID": ",".join(record_ids)}, strict_match=False
+                )
+            ],
+            body=f"""
+            <response>
+                <returncode>SUCCESS</returncode>
+                <recordings>{recordings}</recordings>
+            </response>
+            """,
+            status=200,
+        )
+
+    @responses.activate
+    def test_serializer_list_recordings_batched(self):
+        """The video urls of a list of recordings are retrieved with a single call."""
+        classroom = ClassroomFactory()
+        ClassroomRecordingFactory.create_batch(40, classroom=classroom)
+        recordings = list(classroom.recordings.all())
+        record_ids = [recording.record_id for recording in recordings]
+        self._add_recordings_response(record_ids)
+
+        with self.assertNumQueries(0):
+            data = ClassroomRecordingSerializer(recordings, many=True).data
+
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(
+            [recording["video_file_url"] for recording in data],
+            [
+                f"https://10.7.7.1/presentation/{record_id}/meeting.mp4"
+                for record_id in record_ids
+            ],
+        )
+
+        # The urls are cached for all users
+        with self.assertNumQueries(0):
+            data = ClassroomRecordingSerializer(
+                recordings, many=True, context={"is_admin": True}
+            ).data
+        self.assertEqual(len(data), 40)
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_serializer_list_recordings_partially_cached(self):
+        """Only the video urls missing from the cache are retrieved."""
+        classroom = ClassroomFactory()
+        cached_recording, recording = ClassroomRecordingFactory.create_batch(
+            2, classroom=classroom
+        )
+        self._add_recordings_response([cached_recording.record_id])
+        self._add_recordings_response([recording.record_id])
+        # Serializing a single recording caches its url
+        self.assertEqual(
+            ClassroomRecordingSerializer(cached_recording).data["video_file_url"],
+            f"https://10.7.7.1/presentation/{cached_recording.record_id}/meeting.mp4",
+        )
+        self.assertEqual(len(responses.calls), 1)
+
+        data = ClassroomRecordingSerializer(
+            [cached_recording, recording], many=True
+        ).data
+
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(
+            data[1]["video_file_url"],
+            f"https://10.7.7.1/presentation/{recording.record_id}/meeting.mp4",
+        )
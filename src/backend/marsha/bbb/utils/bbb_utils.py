@@ -1,20 +1,31 @@
-"""Utils for requesting BBB API"""
+"""Utils for requesting BBB API
+
+Calls to a BBB server go through a `BBBClient`, one per server, keeping its connections
+alive between calls and shared by the threads of a process.
+"""
 from datetime import timezone
 import hashlib
+from http.cookiejar import DefaultCookiePolicy
 import json
 from json import JSONDecodeError
 import logging
 from os.path import splitext
+import threading
+from time import perf_counter
+from urllib.parse import urlsplit
+from xml.etree import ElementTree  # nosec
 
 from django.conf import settings
 from django.utils.timezone import now
 
 from dateutil.parser import parse
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import MissingSchema
 import xmltodict
 
 from marsha.bbb.models import Classroom, ClassroomRecording, ClassroomSession
+from marsha.core.cache import invalidate_namespace
 from marsha.core.utils import time_utils
 
 
@@ -44,6 +55,48 @@ class GuestPolicyEnum:
     ASK_MODERATOR = "ASK_MODERATOR"
 
 
+class BBBClient:
+    """HTTP client keeping its connections to a BBB server alive between calls.
+
+    Cookies are only sent when given to a call: the cookies of a classroom session must
+    not leak to the calls made for other classrooms.
+    """
+
+    def __init__(self, pool_size):
+        """Open a session keeping up to `pool_size` connections alive."""
+        self.session = requests.Session()
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method, url, **kwargs):
+        """Send a request with the session and log how long it took."""
+        start = perf_counter()
+        try:
+            return self.session.request(method, url, **kwargs)
+        finally:
+            logger.debug(
+                "BBB %s %s took %.3fs",
+                method.upper(),
+                urlsplit(url).path,
+                perf_counter() - start,
+            )
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(url):
+    """Return the client shared by all the calls to the BBB server of `url`."""
+    origin = urlsplit(url or "")[:2]
+    with _clients_lock:
+        if origin not in _clients:
+            _clients[origin] = BBBClient(settings.BBB_API_POOL_SIZE)
+        return _clients[origin]
+
+
 def sign_parameters(action, parameters):
     """Add a checksum to parameters."""
     request = requests.Request(
@@ -72,7 +125,7 @@ def request_api(action, parameters, prepare=False, data=None):
         ).prepare()
         return {"url": request.url}
 
-    request = requests.request(
+    request = get_client(url).request(
         "post" if data else "get",
         url,
         params=signed_parameters,
@@ -249,7 +302,10 @@ def get_learning_analytics(classroom_session: ClassroomSession):
         logger.debug(
             "Learning analytics url: %s", classroom_session.bbb_learning_analytics_url
         )
-        learning_analytics_response = requests.get(
+        learning_analytics_response = get_client(
+            classroom_session.bbb_learning_analytics_url
+        ).request(
+            "get",
             classroom_session.bbb_learning_analytics_url,
             cookies=json.loads(classroom_session.cookie),
             timeout=settings.BBB_API_TIMEOUT,
@@ -339,17 +395,33 @@ def get_recordings(meeting_id: str = None, record_id: str = None):
     return api_response
 
 
+def get_recording_urls(record_ids, batch_size=50):
+    """Look for the video url of several recordings, with one call per batch.
+
+    Returns
+    -------
+    dict
+        The video url of each recording published with a video, by record id.
+    """
+    record_ids = list(record_ids)
+    urls = {}
+    for start in range(0, len(record_ids), batch_size):
+        for recording in iter_recordings(
+            record_ids=record_ids[start : start + batch_size]  # noqa: E203
+        ):
+            if video_url := _get_video_url(recording):
+                urls[recording.get("recordID")] = video_url
+    return urls
+
+
 def get_recording_url(meeting_id: str = None, record_id: str = None):
     """Look for the video url in the get_recordings response"""
     recordings = get_recordings(meeting_id=meeting_id, record_id=record_id).get(
         "recordings"
     )
 
-    if recordings is not None and recordings[0].get("published"):
-        recording = recordings[0]
-        for recording_format in recording.get("playback").get("format"):
-            if recording_format.get("type") == "video":
-                return recording_format.get("url")
+    if recordings is not None:
+        return _get_video_url(recordings[0])
 
     return None
 
@@ -413,6 +485,180 @@ def process_recordings(  # pylint: disable=too-many-arguments
         process_recording(classroom, recording)
 
 
+def iter_recordings(meeting_ids=(), record_ids=()):
+    """Call BBB API to retrieve the recordings of several meetings or records.
+
+    The response is parsed while it is received, without loading it whole.
+
+    Parameters
+    ----------
+    meeting_ids : Iterable[str]
+        The meeting ids of the classrooms, requested in a single call.
+    record_ids : Iterable[str]
+        The ids of the recordings, requested in a single call.
+
+    Yields
+    ------
+    dict
+        Each recording, as in the ``recordings`` list returned by `get_recordings`.
+
+    Raises
+    ------
+    ApiMeetingException
+        If the BBB API call failed.
+    """
+    action = "getRecordings"
+    url = f"{settings.BBB_API_ENDPOINT}/{action}"
+    parameters = {}
+    if meeting_ids:
+        parameters["meetingID"] = ",".join(
+            str(meeting_id) for meeting_id in meeting_ids
+        )
+    if record_ids:
+        parameters["recordID"] = ",".join(record_ids)
+    parameters = sign_parameters(action, parameters)
+    with get_client(url).request(
+        "get",
+        url,
+        params=parameters,
+        stream=True,
+        verify=not settings.DEBUG,
+        timeout=settings.BBB_API_TIMEOUT,
+    ) as response:
+        response.raw.decode_content = True
+        api_response = {}
+        # The BBB server is trusted, the API response is parsed like in `request_api`
+        for _event, element in ElementTree.iterparse(response.raw):  # nosec
+            if element.tag == "recording":
+                yield xmltodict.parse(ElementTree.tostring(element))["recording"]
+                element.clear()
+            elif element.tag in ("returncode", "messageKey", "message"):
+                api_response[element.tag] = element.text
+
+    if api_response.get("returncode") != "SUCCESS":
+        raise ApiMeetingException(api_response)
+
+
+def _get_video_url(recording_data):
+    """Return the url of the video of a published recording, None otherwise."""
+    if recording_data.get("published"):
+        recording_formats = recording_data.get("playback").get("format")
+        if isinstance(recording_formats, dict):
+            # a single format is not wrapped in a list
+            recording_formats = [recording_formats]
+        for recording_format in recording_formats:
+            if recording_format.get("type") == "video":
+                return recording_format.get("url")
+    return None
+
+
+# pylint: disable=too-many-locals,too-many-branches,too-many-statements
+def synchronize_recordings(classrooms, before=None, after=None):
+    """Reconcile the recordings of several classrooms with BBB, in a single API call.
+
+    Published recordings are created or updated with one `bulk_create` and one
+    `bulk_update`. Known recordings not available anymore on BBB are deleted, unless
+    they were converted to a VOD. The data cached for the classrooms whose recordings
+    changed is invalidated.
+
+    Parameters
+    ----------
+    classrooms : List[Classroom]
+        The classrooms whose recordings are synchronized.
+    before : str, optional
+        Only synchronize recordings started before this date.
+    after : str, optional
+        Only synchronize recordings started after this date.
+    """
+    before = parse(before).replace(tzinfo=timezone.utc) if before else None
+    after = parse(after).replace(tzinfo=timezone.utc) if after else None
+    classrooms_by_meeting_id = {
+        str(classroom.meeting_id): classroom for classroom in classrooms
+    }
+
+    recordings_by_classroom = {classroom.id: [] for classroom in classrooms}
+    for recording in iter_recordings(meeting_ids=classrooms_by_meeting_id):
+        classroom = classrooms_by_meeting_id.get(recording.get("meetingID"))
+        if classroom is not None:
+            recordings_by_classroom[classroom.id].append(recording)
+
+    known_recordings = {classroom.id: {} for classroom in classrooms}
+    for classroom_recording in ClassroomRecording.objects.filter(
+        classroom__in=classrooms
+    ):
+        known_recordings[classroom_recording.classroom_id][
+            classroom_recording.record_id
+        ] = classroom_recording
+
+    def in_range(started_at):
+        if started_at is None:
+            return not (before or after)
+        return not (before and started_at > before) and not (
+            after and started_at < after
+        )
+
+    updated_on = now()
+    to_create, to_update, to_delete = [], [], []
+    changed_classroom_ids = set()
+    for classroom in classrooms:
+        logger.info("Classroom %s found.", classroom.id)
+        found_record_ids = set()
+        if not recordings_by_classroom[classroom.id]:
+            logger.info("No recording found.")
+
+        for recording in recordings_by_classroom[classroom.id]:
+            record_id = recording.get("recordID")
+            found_record_ids.add(record_id)
+            started_at = time_utils.to_datetime(int(recording.get("startTime")) / 1000)
+            if not in_range(started_at):
+                continue
+
+            logger.info("Recording %s found.", record_id)
+            video_url = _get_video_url(recording)
+            if video_url is None:
+                continue
+
+            created = record_id not in known_recordings[classroom.id]
+            if created:
+                classroom_recording = ClassroomRecording(
+                    classroom=classroom, record_id=record_id
+                )
+                to_create.append(classroom_recording)
+            else:
+                classroom_recording = known_recordings[classroom.id][record_id]
+                classroom_recording.updated_on = updated_on
+                to_update.append(classroom_recording)
+            classroom_recording.started_at = started_at
+            changed_classroom_ids.add(classroom.id)
+            logger.info(
+                "%s recording started at %s with url %s",
+                "Created" if created else "Updated",
+                started_at.isoformat(),
+                video_url,
+            )
+
+        for record_id, classroom_recording in known_recordings[classroom.id].items():
+            if record_id in found_record_ids or not in_range(
+                classroom_recording.started_at
+            ):
+                continue
+            logger.info("Recording %s not anymore available.", record_id)
+            if classroom_recording.vod_id is None:
+                logger.info("Deleting recording %s.", record_id)
+                to_delete.append(classroom_recording.pk)
+                changed_classroom_ids.add(classroom.id)
+            else:
+                logger.info("Recording %s converted to VOD.", record_id)
+
+    ClassroomRecording.objects.bulk_create(to_create)
+    ClassroomRecording.objects.bulk_update(to_update, ["started_at", "updated_on"])
+    if to_delete:
+        ClassroomRecording.objects.filter(pk__in=to_delete).delete()
+    # Bulk writes do not send the signals invalidating the data cached for a classroom
+    for classroom_id in changed_classroom_ids:
+        invalidate_namespace(("classroom", classroom_id))
+
+
 def delete_recording(
     classroom_recordings: list[ClassroomRecording],
 ):
@@ -27,6 +27,7 @@ from marsha.core.models import (
     TimedTextTrack,
     User,
     Video,
+    XAPIDeadLetter,
 )
 
 
@@ -511,6 +512,23 @@ class PortabilityRequestAdmin(admin.ModelAdmin):
     ]
 
 
+@admin.register(XAPIDeadLetter)
+class XAPIDeadLetterAdmin(admin.ModelAdmin):
+    """Admin class for the xAPI statements that could not be delivered."""
+
+    list_display = ("id", "consumer_site", "lrs_url", "attempts", "created_on")
+    list_filter = ("lrs_url",)
+    fields = (
+        "consumer_site",
+        "lrs_url",
+        "statements",
+        "attempts",
+        "error",
+        "created_on",
+    )
+    readonly_fields = fields
+
+
 class SiteConfigInline(admin.StackedInline):
     """Inline for sites with config fields."""
 
@@ -46,6 +46,13 @@ class ObjectRelatedMixin:
         queryset = self.filter_queryset(self.get_queryset())
         return queryset.get(pk=self.get_object_pk())
 
+    def get_related_object_value(self, field):
+        """Get a field of the current object, e.g. "video__playlist_id", in one query."""
+        queryset = self.filter_queryset(self.get_queryset())
+        return (
+            queryset.filter(pk=self.get_object_pk()).values_list(field, flat=True).get()
+        )
+
 
 class ResourceDoesNotMatchParametersException(APIException):
     """Exception raised when resource token id does not match parameters."""
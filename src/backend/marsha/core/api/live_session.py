@@ -1,6 +1,7 @@
 """Declare API endpoints for live session with Django RestFramework viewsets."""
 from logging import getLogger
 import smtplib
+import uuid
 
 from django.conf import settings
 from django.core.cache import cache
@@ -27,14 +28,18 @@ from marsha.core.api.base import (
     ObjectRelatedMixin,
     ObjectVideoRelatedMixin,
 )
+from marsha.core.cache import make_namespaced_key
 from marsha.core.defaults import VIDEO_ATTENDANCE_KEY_CACHE
 from marsha.core.models import ConsumerSite, LiveSession, Video
+from marsha.core.services import live_attendance
+from marsha.core.services.live_attendance_timeline import get_attendance_timelines
 from marsha.core.services.live_session import (
     get_livesession_from_anonymous_id,
     get_livesession_from_lti,
     get_livesession_from_user_id,
     is_lti_token,
 )
+from marsha.core.tasks.live_session import schedule_live_attendances_flush
 
 
 logger = getLogger(__name__)
@@ -279,14 +284,76 @@ class LiveSessionViewSet(
 
         return Response(serializer.data)
 
+    def _get_attendance_snapshot_key(self, video_id):
+        """Return the cache key of the live session of the requesting viewer.
+
+        The key is computed from the information identifying the viewer (token or
+        anonymous_id) so the live session can be answered without any database query.
+        None is returned when the viewer can not be identified or when the write-behind
+        ingestion is disabled.
+        """
+        if not settings.ATTENDANCE_WRITE_BEHIND_ENABLED:
+            return None
+
+        if self.request.resource and is_lti_token(self.request.resource.token):
+            token = self.request.resource.token
+            return live_attendance.get_snapshot_key(
+                video_id,
+                consumer_site=token.payload["consumer_site"],
+                lti_id=token.payload["context_id"],
+                lti_user_id=token.payload["user"]["id"],
+            )
+
+        if self.request.resource:
+            try:
+                anonymous_id = uuid.UUID(self.request.query_params.get("anonymous_id"))
+            except (TypeError, ValueError):
+                return None
+            return live_attendance.get_snapshot_key(video_id, anonymous_id=anonymous_id)
+
+        return live_attendance.get_snapshot_key(video_id, user=self.request.user.id)
+
+    def _push_attendance_write_behind(self, snapshot_key, snapshot, data):
+        """Answer an attendance beat from the cache and buffer it for a later write."""
+        fields = {"language": data.get("language")}
+        if self.request.resource and is_lti_token(self.request.resource.token):
+            fields["username"] = self.request.resource.user.get("username")
+            fields["email"] = self.request.resource.user.get("email")
+
+        snapshot["live_attendance"] = (
+            (data["live_attendance"] | snapshot["live_attendance"])
+            if snapshot["live_attendance"]
+            else data["live_attendance"]
+        )
+        snapshot.update({name: value for name, value in fields.items() if value})
+
+        live_attendance.push_beat(
+            snapshot["video"], snapshot["id"], data["live_attendance"], **fields
+        )
+        schedule_live_attendances_flush(snapshot["video"])
+        live_attendance.set_snapshot(snapshot_key, snapshot)
+        return Response(snapshot, status.HTTP_200_OK)
+
     @action(detail=False, methods=["post"])
     # pylint: disable=unused-argument
     def push_attendance(self, request, video_id=None):
-        """View handling pushing new attendance"""
+        """View handling pushing new attendance.
+
+        When the write-behind ingestion is enabled, beats from a viewer whose live session
+        is already known are answered from the cache and folded later into the database
+        by a celery task.
+        """
         serializer = serializers.LiveAttendanceSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         video_id = self.get_related_video_id()
+
+        snapshot_key = self._get_attendance_snapshot_key(video_id)
+        if snapshot := live_attendance.get_snapshot(snapshot_key):
+            return self._push_attendance_write_behind(
+                snapshot_key, snapshot, serializer.data
+            )
+
         video = get_object_or_404(Video, pk=video_id)
 
         try:
@@ -327,8 +394,11 @@ class LiveSessionViewSet(
             if serializer.data.get("language"):
                 livesession.language = serializer.data["language"]
 
-            livesession.save()
-            return Response(self.get_serializer(livesession).data, status.HTTP_200_OK)
+            # The attendance was validated by the serializer
+            livesession.save(validate=False)
+            data = self.get_serializer(livesession).data
+            live_attendance.set_snapshot(snapshot_key, data)
+            return Response(data, status.HTTP_200_OK)
         except (Video.DoesNotExist, ConsumerSite.DoesNotExist) as exception:
             raise Http404("No resource matches the given query.") from exception
         except IntegrityError as error:
@@ -419,21 +489,46 @@ class LiveSessionViewSet(
         """
         video_id = self.get_related_video_id()
 
-        prefix_key = f"{VIDEO_ATTENDANCE_KEY_CACHE}{video_id}"
-        cache_key = (
-            f"{prefix_key}offset:{self.request.query_params.get('offset')}"
-            f"limit:{self.request.query_params.get('limit')}"
+        # keys are dropped at once when the video changes, see `invalidate_namespace`
+        cache_key = make_namespaced_key(
+            f"{VIDEO_ATTENDANCE_KEY_CACHE}{video_id}"
+            f"offset:{self.request.query_params.get('offset')}"
+            f"limit:{self.request.query_params.get('limit')}",
+            ("video", video_id),
         )
         if (cached_data := cache.get(cache_key, None)) is not None:
             return Response(cached_data)
 
         video = get_object_or_404(Video, pk=video_id)
 
-        data = self.list(request, video_id=video_id).data
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        livesessions = page if page is not None else list(queryset)
+
+        # the timeline of the video is the same for all live sessions, timelines are
+        # computed once for the page and reused from the cache for unchanged sessions
+        video_timestamps = video.get_list_timestamps_attendances()
+        serializer = self.get_serializer(
+            livesessions,
+            many=True,
+            context=self.get_serializer_context()
+            | {
+                "attendance_timelines": get_attendance_timelines(
+                    video.pk, video_timestamps, livesessions
+                ),
+                "video_timestamps": video_timestamps,
+            },
+        )
+        data = (
+            self.get_paginated_response(serializer.data).data
+            if page is not None
+            else serializer.data
+        )
 
-        # if the video is stopped, there is no need to limit the cache timeout
+        # if the video is stopped, attendances do not change anymore and are cached
+        # longer, but never without expiration: stale namespaced keys are not deleted
         cache_timeout = (
-            None
+            settings.VIDEO_ATTENDANCES_STOPPED_CACHE_DURATION
             if video.live_info and video.live_info.get("stopped_at")
             else settings.VIDEO_ATTENDANCES_CACHE_DURATION
         )
@@ -444,10 +539,4 @@ class LiveSessionViewSet(
             timeout=cache_timeout,
         )
 
-        # save the key generated with no timeout in case it needs to be reinitialized
-        if not cache_timeout:
-            list_keys_timeout = cache.get(prefix_key, [])
-            list_keys_timeout.append(cache_key)
-            cache.set(prefix_key, list_keys_timeout)
-
         return Response(data)
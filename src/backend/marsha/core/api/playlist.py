@@ -1,6 +1,5 @@
 """Declare API endpoints for playlist with Django RestFramework viewsets."""
 from django.conf import settings
-from django.db.models import Q
 from django.db.models.deletion import ProtectedError
 
 import django_filters
@@ -121,18 +120,9 @@ class PlaylistViewSet(APIViewMixin, ObjectPkMixin, viewsets.ModelViewSet):
         queryset = (
             super()
             .get_queryset()
-            .filter(
-                Q(
-                    organization__user_accesses__user_id=self.request.user.id,
-                    organization__user_accesses__role=ADMINISTRATOR,
-                )
-                | Q(
-                    user_accesses__user_id=self.request.user.id,
-                    user_accesses__role__in=[ADMINISTRATOR, INSTRUCTOR],
-                )
-            )
-            .annotate_can_edit(self.request.user.id)
-            .distinct()
+            .visible_to(self.request.user.id)
+            # The user can edit all the playlists visible to them
+            .annotate_can_edit(self.request.user.id, force_value=True)
         )
 
         return queryset
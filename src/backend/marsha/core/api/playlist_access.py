@@ -1,12 +1,16 @@
 """Declare API endpoints for playlist access with Django RestFramework viewsets."""
-from django.db.models import Q
 
 import django_filters
 from rest_framework import filters, viewsets
 
 from marsha.core import permissions, serializers
 from marsha.core.api.base import APIViewMixin, ObjectPkMixin
-from marsha.core.models import ADMINISTRATOR, INSTRUCTOR, PlaylistAccess
+from marsha.core.models import (
+    ADMINISTRATOR,
+    INSTRUCTOR,
+    PlaylistAccess,
+    has_playlist_role,
+)
 
 
 class PlaylistAccessFilter(django_filters.FilterSet):
@@ -69,16 +73,8 @@ class PlaylistAccessViewSet(APIViewMixin, ObjectPkMixin, viewsets.ModelViewSet):
             super()
             .get_queryset()
             .filter(
-                Q(
-                    playlist__organization__user_accesses__user_id=self.request.user.id,
-                    playlist__organization__user_accesses__role=ADMINISTRATOR,
-                )
-                | Q(
-                    playlist__user_accesses__user_id=self.request.user.id,
-                    playlist__user_accesses__role__in=[ADMINISTRATOR, INSTRUCTOR],
-                )
+                has_playlist_role(self.request.user.id, [ADMINISTRATOR, INSTRUCTOR])
             )
-            .distinct()
         )
 
         return queryset
@@ -4,7 +4,6 @@ from copy import deepcopy
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import OperationalError, transaction
 from django.db.models import F, Func, Q, Value
@@ -24,14 +23,7 @@ from marsha.core import defaults, forms, permissions, serializers, storage
 from marsha.core.api.base import APIViewMixin, BulkDestroyModelMixin, ObjectPkMixin
 from marsha.core.defaults import ENDED, JITSI
 from marsha.core.metadata import VideoMetadata
-from marsha.core.models import (
-    ADMINISTRATOR,
-    INSTRUCTOR,
-    LivePairing,
-    LiveSession,
-    SharedLiveMedia,
-    Video,
-)
+from marsha.core.models import LivePairing, LiveSession, SharedLiveMedia, Video
 from marsha.core.services.video_participants import (
     VideoParticipantsException,
     add_participant_asking_to_join,
@@ -222,64 +214,17 @@ class VideoViewSet(
         return [permission() for permission in permission_classes]
 
     def _get_list_queryset(self):
-        """Build the queryset used on the list action."""
-        user_id = self.request.user.id
-
-        queryset = (
-            super()
-            .get_queryset()
-            .filter(
-                Q(
-                    playlist__user_accesses__user__id=user_id,
-                    playlist__user_accesses__role__in=[
-                        ADMINISTRATOR,
-                        INSTRUCTOR,
-                    ],
-                )
-                | Q(
-                    playlist__organization__user_accesses__user__id=user_id,
-                    playlist__organization__user_accesses__role=ADMINISTRATOR,
-                )
-            )
-        )
-
-        return queryset.distinct()
-
-    def _get_bulk_destroy_queryset(self):
-        """Build the queryset used on the bulk_destroy action."""
-        user_id = self.request.user.id
-
-        queryset = (
-            super()
-            .get_queryset()
-            .filter(
-                (
-                    Q(
-                        playlist__user_accesses__user__id=user_id,
-                        playlist__user_accesses__role__in=[ADMINISTRATOR, INSTRUCTOR],
-                    )
-                )
-                | (
-                    Q(
-                        playlist__organization__user_accesses__user__id=user_id,
-                        playlist__organization__user_accesses__role=ADMINISTRATOR,
-                    )
-                )
-            )
-        )
-
-        return queryset.distinct()
+        """Build the queryset used on the list and bulk_destroy actions."""
+        return super().get_queryset().visible_to(self.request.user.id)
 
     def get_queryset(self):
         """Redefine the queryset to use based on the current action."""
         queryset = super().get_queryset()
 
-        if self.action in ["list"]:
+        is_list = self.action in ["list", "bulk_destroy"]
+        if is_list:
             queryset = self._get_list_queryset()
 
-        if self.action in ["bulk_destroy"]:
-            queryset = self._get_bulk_destroy_queryset()
-
         if self.request.resource is not None:
             # If the request comes from an LTI resource, we force the annotation
             # of the can_edit field depending on the user role.
@@ -288,7 +233,10 @@ class VideoViewSet(
             )
 
         if self.request.user.id is not None:
-            return queryset.annotate_can_edit(str(self.request.user.id))
+            # The user can edit all the videos visible to them
+            return queryset.annotate_can_edit(
+                str(self.request.user.id), force_value=True if is_list else None
+            )
 
         return queryset
 
@@ -676,7 +624,7 @@ class VideoViewSet(
         # dispatch earlier in the websocket that the live is harvesting without saving it
         tmp_video = deepcopy(video)
         tmp_video.live_state = defaults.HARVESTING
-        channel_layers_utils.dispatch_video_to_groups(tmp_video)
+        channel_layers_utils.dispatch_video_to_groups(tmp_video, coalesce=False)
         del tmp_video
 
         if video.is_recording:
@@ -792,7 +740,7 @@ class VideoViewSet(
 
             request_ids.append(serializer.validated_data["requestId"])
             video.live_info["medialive"].update({"request_ids": request_ids})
-            video.save()
+            video.save(update_fields=["live_info", "updated_on"], validate=False)
 
         live_info = video.live_info
         live_info.update(
@@ -804,12 +752,6 @@ class VideoViewSet(
             live_info.pop("stopped_at", None)
             update_id3_tags(video)
 
-            # if keys with no timeout were cached for this video, it needs to be reinitialized
-            key_cache_video = f"{defaults.VIDEO_ATTENDANCE_KEY_CACHE}{video.id}"
-            if list_keys := cache.get(key_cache_video, None):
-                cache.delete_many(list_keys)
-                cache.delete(key_cache_video)
-
         if serializer.validated_data["state"] == defaults.STOPPED:
             video.live_state = defaults.STOPPED
             live_info.update({"stopped_at": stamp})
@@ -831,7 +773,8 @@ class VideoViewSet(
             send_vod_ready_notification(video)
 
         video.live_info = live_info
-        video.save()
+        # The new state was validated by the serializer
+        video.save(validate=False)
 
         channel_layers_utils.dispatch_video_to_groups(video)
 
@@ -16,6 +16,8 @@ from rest_framework.views import APIView
 from marsha.core import permissions, serializers
 from marsha.core.api.base import APIViewMixin
 from marsha.core.defaults import XAPI_STATEMENT_ID_CACHE
+from marsha.core.services import xapi_delivery
+from marsha.core.tasks.xapi import schedule_xapi_delivery
 from marsha.core.xapi import XAPI, get_xapi_statement
 
 
@@ -80,7 +82,16 @@ class XAPIStatementView(APIViewMixin, APIView):
 
         return xapi_statement
 
-    # pylint: disable=too-many-return-statements
+    @staticmethod
+    def _remember_statement(statement):
+        """Remember the statement was sent to not send it twice."""
+        cache.set(
+            f"{XAPI_STATEMENT_ID_CACHE}{statement['id']}",
+            statement["id"],
+            settings.XAPI_STATEMENT_ID_CACHE_TIMEOUT,
+        )
+
+    # pylint: disable=too-many-locals,too-many-return-statements
     def post(self, request, resource_kind, resource_id):
         """Send a xAPI statement to a defined LRS.
 
@@ -136,6 +147,16 @@ class XAPIStatementView(APIViewMixin, APIView):
             logger.info("XAPI statement %s already sent.", statement["id"])
             return Response(status=200)
 
+        if settings.XAPI_ASYNC_DELIVERY_ENABLED:
+            # The credentials of the LRS are looked up when delivering the statement
+            destination = xapi_delivery.get_destination(
+                object_instance.playlist.consumer_site_id if request.resource else None
+            )
+            xapi_delivery.enqueue(destination, statement)
+            schedule_xapi_delivery(destination)
+            self._remember_statement(statement)
+            return Response(status=202)
+
         xapi = XAPI(
             lrs_url,
             lrs_auth_token,
@@ -153,10 +174,6 @@ class XAPIStatementView(APIViewMixin, APIView):
             )
             return Response({"status": message}, status=500)
 
-        cache.set(
-            f"{XAPI_STATEMENT_ID_CACHE}{statement['id']}",
-            statement["id"],
-            settings.XAPI_STATEMENT_ID_CACHE_TIMEOUT,
-        )
+        self._remember_statement(statement)
 
         return Response(status=204)
@@ -4,16 +4,20 @@
 
     Credits:
     - https://github.com/Kub-AT/django-cache-fallback/
+
+    Cache namespaces to invalidate at once all the keys derived from an object
 """
 
 import logging
+import time
 
 from django.conf import settings
-from django.core.cache import caches
+from django.core.cache import cache, caches
 from django.core.cache.backends.base import BaseCache
 
 from django_redis.cache import RedisCache
 
+from marsha.core.defaults import CACHE_NAMESPACE_VERSION_KEY_CACHE
 from marsha.core.utils.throttle import throttle
 
 
@@ -183,3 +187,97 @@ class RedisCacheWithFallback(BaseCache):
         Pass decr_version cache method to _call_with_fallback
         """
         return self._call_with_fallback("decr_version", *args, **kwargs)
+
+
+def _get_namespace_version_key(namespace):
+    """Cache key of the version counter of a namespace."""
+    return f"{CACHE_NAMESPACE_VERSION_KEY_CACHE}{':'.join(str(part) for part in namespace)}"
+
+
+def _new_namespace_version():
+    """Initial version of a namespace.
+
+    Versions start from the current time so that a namespace whose counter was evicted
+    never gets back to a version still used by stale keys.
+    """
+    return time.time_ns()
+
+
+def get_namespace_versions(*namespaces):
+    """Return the current version of each namespace, creating the missing ones.
+
+    Parameters
+    ----------
+    namespaces : List[tuple]
+        The namespaces, e.g. ``("video", video.pk)``.
+
+    Returns
+    -------
+    List[int]
+        The versions, in the same order as the namespaces.
+    """
+    keys = [_get_namespace_version_key(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _new_namespace_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def make_namespaced_key(key, *namespaces):
+    """Fold the current version of namespaces into a cache key.
+
+    Invalidating any of the namespaces with `invalidate_namespace` makes the
+    returned key unreachable, the stale value then expires with its timeout.
+
+    Parameters
+    ----------
+    key : str
+        The cache key to namespace.
+    namespaces : List[tuple]
+        The namespaces the cached value depends on, e.g. ``("video", video.pk)``.
+
+    Returns
+    -------
+    str
+        The cache key to use.
+    """
+    return make_namespaced_keys([key], *namespaces)[0]
+
+
+def make_namespaced_keys(keys, *namespaces):
+    """Fold the current version of namespaces into several cache keys at once.
+
+    Parameters
+    ----------
+    keys : List[str]
+        The cache keys to namespace.
+    namespaces : List[tuple]
+        The namespaces the cached values depend on, e.g. ``("video", video.pk)``.
+
+    Returns
+    -------
+    List[str]
+        The cache keys to use, in the same order as `keys`.
+    """
+    versions = ".".join(str(version) for version in get_namespace_versions(*namespaces))
+    return [f"{key}|v:{versions}" for key in keys]
+
+
+def invalidate_namespace(namespace):
+    """Invalidate all the keys derived from a namespace by bumping its version.
+
+    Parameters
+    ----------
+    namespace : tuple
+        The namespace to invalidate, e.g. ``("video", video.pk)``.
+    """
+    key = _get_namespace_version_key(namespace)
+    if cache.add(key, _new_namespace_version(), timeout=None):
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The counter expired or was evicted between `add` and `incr`
+        cache.set(key, _new_namespace_version(), timeout=None)
@@ -99,10 +99,25 @@ APP_DATA_STATE_ERROR = "error"
 APP_DATA_STATE_PORTABILITY = "portability"
 APP_DATA_STATE_SUCCESS = "success"
 
+CACHE_NAMESPACE_VERSION_KEY_CACHE = "namespaces:version:"
 VIDEO_ATTENDANCE_KEY_CACHE = "attendances:video:"
+LIVE_ATTENDANCE_BUFFER_KEY_CACHE = "attendances:buffer:"
+LIVE_ATTENDANCE_SNAPSHOT_KEY_CACHE = "attendances:snapshot:"
+LIVE_ATTENDANCE_TIMELINE_KEY_CACHE = "attendances:timeline:"
+TRANSCODE_PIPELINE_COUNTER_KEY_CACHE = "videos:transcode_pipeline:"
 XAPI_STATEMENT_ID_CACHE = "xapi:statements:"
+XAPI_DELIVERY_KEY_CACHE = "xapi:delivery:"
 CLASSROOM_RECORDINGS_KEY_CACHE = "classrooms:recordings:"
+CLASSROOM_RECORDINGS_REFRESHED_AT_KEY_CACHE = "classrooms:recordings_refreshed_at"
+SHARED_LIVE_MEDIA_CONVERSION_KEY_CACHE = "shared_live_media:conversion:"
+S3_MOVE_CHECKPOINT_KEY_CACHE = "s3:move:"
+LIVE_STATE_CHECKPOINT_KEY_CACHE = "live_state:checkpoint:"
+TIMED_TEXT_CONVERSION_KEY_CACHE = "timed_text_tracks:conversion:"
+
+XAPI_DELIVERY_QUEUE_NAME = "xapi_delivery_{destination:s}"
 LTI_REPLAY_PROTECTION_CACHE = "lti:replay_protection"
+LTI_PASSPORT_KEY_CACHE = "lti:passports:"
+LTI_RESOURCE_ID_KEY_CACHE = "lti:resource_id"
 
 # Licenses
 
@@ -8,13 +8,13 @@ from django.http.request import validate_host
 from django.utils.datastructures import MultiValueDictKeyError
 
 from marsha.core.lti.common import LTIException, verify_request_common
+from marsha.core.lti.passport import get_enabled_passport
 from marsha.core.models.account import (
     ADMINISTRATOR,
     INSTRUCTOR,
     LTI_ROLES,
     STUDENT,
     ConsumerSite,
-    LTIPassport,
 )
 
 
@@ -96,7 +96,7 @@ class LTI:
             )
             return True
 
-        passport = self.get_passport()
+        consumer_site = self.get_passport_consumer_site()
 
         # The LTI signature is computed using the url of the LTI launch request. But when Marsha
         # is behind a TLS termination proxy, the url as seen by Django is changed and starts with
@@ -119,8 +119,6 @@ class LTI:
         ):
             raise LTIException("LTI verification failed.")
 
-        consumer_site = passport.consumer_site or passport.playlist.consumer_site
-
         # Make sure we only accept requests from domains in which the "top parts" match
         # the URL for the consumer_site associated with the passport.
         # eg. sub.example.com & example.com for an example.com consumer site.
@@ -187,22 +185,32 @@ class LTI:
         except MultiValueDictKeyError as err:
             raise AttributeError(name) from err
 
-    def get_passport(self):
-        """Find and return the passport targeted by the LTI request or raise an LTIException."""
+    def get_passport_consumer_site(self):
+        """Find the passport targeted by the LTI request and return its consumer site.
+
+        Raises
+        ------
+        LTIException
+            Raised if there is no enabled passport for the oauth consumer key.
+
+        Returns
+        -------
+        consumer_site: Type[models.ConsumerSite]
+            The consumer site of the passport, or of its playlist.
+
+        """
         consumer_key = self.request.POST.get("oauth_consumer_key", None)
 
         if not consumer_key:
             raise LTIException("An oauth consumer key is required.")
 
         # find a passport related to the oauth consumer key
-        try:
-            return LTIPassport.objects.get(
-                oauth_consumer_key=consumer_key, is_enabled=True
-            )
-        except LTIPassport.DoesNotExist as err:
+        passport = get_enabled_passport(consumer_key)
+        if passport is None:
             raise LTIException(
                 f"Could not find a valid passport for this oauth consumer key: {consumer_key}."
-            ) from err
+            )
+        return passport[1]
 
     def get_course_info(self):
         """Retrieve course info in the LTI request.
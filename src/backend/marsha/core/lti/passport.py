@@ -0,0 +1,59 @@
+"""Resolve the passport of LTI launch requests, cached between requests."""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from marsha.core.cache import make_namespaced_key
+from marsha.core.defaults import LTI_PASSPORT_KEY_CACHE
+from marsha.core.models.account import LTIPassport
+
+
+# All the cached passports are invalidated at once when a passport or a consumer site
+# is saved or deleted, see `marsha.core.signals`.
+LTI_PASSPORTS_NAMESPACE = ("ltipassports",)
+
+
+def get_enabled_passport(consumer_key):
+    """Return the shared secret and the consumer site of an enabled passport.
+
+    The passport is cached for `LTI_PASSPORT_CACHE_DURATION` seconds. Unknown and
+    disabled consumer keys are cached as well, for `LTI_PASSPORT_NEGATIVE_CACHE_DURATION`
+    seconds: they are answered as fast as the registered ones, which keeps the dummy
+    secret of the validator safe against timing attacks. The consumer key is sent by
+    the client, it is hashed to build the cache key.
+
+    Parameters
+    ----------
+    consumer_key : string
+        The oauth consumer key of the LTI request.
+
+    Returns
+    -------
+    tuple(string, Type[models.ConsumerSite]) or None
+        The shared secret of the passport and the consumer site it is related to,
+        directly or through its playlist. None if there is no enabled passport for
+        this consumer key.
+    """
+    cache_key = make_namespaced_key(
+        f"{LTI_PASSPORT_KEY_CACHE}"
+        f"{hashlib.sha256(consumer_key.encode('utf-8')).hexdigest()}",
+        LTI_PASSPORTS_NAMESPACE,
+    )
+    passport = cache.get(cache_key)
+    if passport is None:
+        try:
+            instance = LTIPassport.objects.select_related(
+                "consumer_site", "playlist__consumer_site"
+            ).get(oauth_consumer_key=consumer_key, is_enabled=True)
+        except LTIPassport.DoesNotExist:
+            passport = ()
+            timeout = settings.LTI_PASSPORT_NEGATIVE_CACHE_DURATION
+        else:
+            passport = (
+                instance.shared_secret,
+                instance.consumer_site or instance.playlist.consumer_site,
+            )
+            timeout = settings.LTI_PASSPORT_CACHE_DURATION
+        cache.set(cache_key, passport, timeout)
+    return passport or None
@@ -8,7 +8,7 @@ from django.core.cache import cache
 from oauthlib.oauth1 import RequestValidator
 
 from marsha.core.defaults import LTI_REPLAY_PROTECTION_CACHE
-from marsha.core.models import LTIPassport
+from marsha.core.lti.passport import get_enabled_passport
 
 
 logger = logging.getLogger(__name__)
@@ -59,14 +59,10 @@ class LTIRequestValidator(RequestValidator):
             client_key: The client/consumer key.
             request: The calling request.
         """
-
-        try:
-            passport = LTIPassport.objects.get(
-                oauth_consumer_key=client_key, is_enabled=True
-            )
-            return passport.shared_secret
-        except LTIPassport.DoesNotExist:
+        passport = get_enabled_passport(client_key)
+        if passport is None:
             return "dummy_client_sec_123456"
+        return passport[0]
 
     def check_client_key(self, client_key):
         if settings.DEBUG:
@@ -85,9 +81,7 @@ class LTIRequestValidator(RequestValidator):
         Returns:
             bool: True if the client key is registered and valid
         """
-        return LTIPassport.objects.filter(
-            oauth_consumer_key=client_key, is_enabled=True
-        ).exists()
+        return get_enabled_passport(client_key) is not None
 
     # pylint: disable=too-many-arguments
     def validate_timestamp_and_nonce(
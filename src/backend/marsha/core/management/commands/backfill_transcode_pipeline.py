@@ -0,0 +1,41 @@
+"""Save the transcode pipeline of videos uploaded before it was recorded."""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from marsha.core.services import transcode_pipeline
+
+
+class Command(BaseCommand):
+    """Save the transcode pipeline of videos uploaded before it was recorded."""
+
+    help = (
+        "Recover in bulk the transcode pipeline of uploaded videos not having one, "
+        "listing the scw/ prefix of the videos storage once."
+    )
+
+    def add_arguments(self, parser):
+        """Add arguments to the command."""
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.TRANSCODE_PIPELINE_BACKFILL_BATCH_SIZE,
+            help="Number of videos updated per query.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the pipelines that would be saved without saving them.",
+        )
+
+    def handle(self, *args, **options):
+        """Backfill the transcode pipelines and report the counters."""
+        recovered = transcode_pipeline.backfill_transcode_pipelines(
+            batch_size=options["batch_size"], dry_run=options["dry_run"]
+        )
+        for pipeline, count in recovered.items():
+            self.stdout.write(f"{count} videos recovered to {pipeline}")
+
+        counters = transcode_pipeline.get_counters()
+        self.stdout.write(
+            ", ".join(f"{counter}: {value}" for counter, value in counters.items())
+        )
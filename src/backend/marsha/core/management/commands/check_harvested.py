@@ -6,20 +6,9 @@ from django.core.management.base import BaseCommand
 from django.db.models import Q
 from django.utils import timezone
 
-import boto3
-
 from marsha.core.defaults import DELETED, HARVESTED, PENDING
 from marsha.core.models import Video
-
-
-aws_credentials = {
-    "aws_access_key_id": settings.AWS_ACCESS_KEY_ID,
-    "aws_secret_access_key": settings.AWS_SECRET_ACCESS_KEY,
-    "region_name": settings.AWS_S3_REGION_NAME,
-}
-
-# Configure medialive client
-s3_client = boto3.client("s3", **aws_credentials)
+from marsha.core.utils.s3_utils import get_aws_s3_client
 
 
 def generate_expired_date():
@@ -67,7 +56,7 @@ class Command(BaseCommand):
         if continuation_token:
             params["ContinuationToken"] = continuation_token
 
-        data = s3_client.list_objects_v2(**params)
+        data = get_aws_s3_client().list_objects_v2(**params)
 
         if data.get("KeyCount") == 0:
             return
@@ -76,7 +65,7 @@ class Command(BaseCommand):
         for s3_object in data.get("Contents"):
             s3_objects.append({"Key": s3_object.get("Key")})
 
-        s3_client.delete_objects(
+        get_aws_s3_client().delete_objects(
             Bucket=settings.AWS_DESTINATION_BUCKET_NAME,
             Delete={"Objects": s3_objects},
         )
@@ -1,30 +1,39 @@
 """Check live state management command."""
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 import json
 import re
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.management.base import BaseCommand
 
-import boto3
+from botocore.exceptions import BotoCoreError, ClientError
 from dateutil.parser import isoparse
 
-from marsha.core.defaults import RUNNING, STOPPING
+from marsha.core.defaults import LIVE_STATE_CHECKPOINT_KEY_CACHE, RUNNING, STOPPING
 from marsha.core.models import Video
+from marsha.core.utils.aws_client_utils import get_aws_client
 from marsha.core.utils.medialive_utils import stop_live_channel
 
 
-aws_credentials = {
-    "aws_access_key_id": settings.AWS_ACCESS_KEY_ID,
-    "aws_secret_access_key": settings.AWS_SECRET_ACCESS_KEY,
-    "region_name": settings.AWS_S3_REGION_NAME,
-}
+# Time (in seconds) the alerts read for a live are remembered between two checks
+CHECKPOINT_TIMEOUT = 86400  # 1 day
+# Time (in seconds) before the last event read from which events are read again, for
+# the events ingested late by cloudwatch
+CHECKPOINT_LOOKBACK = 300  # 5 minutes
 
-# Configure medialive client
-medialive_client = boto3.client("medialive", **aws_credentials)
+EXTRACT_MESSAGE_REGEX = re.compile(
+    r"^(?P<ingestion_time>.*)\t"
+    r"(?P<request_id>.*)\t"
+    r"(?P<level>.*)\t"
+    r"Received event:(?P<message>.*)$"
+)
 
-# Configure cloudwatch logs client
-logs_client = boto3.client("logs", **aws_credentials)
+
+def get_logs_client():
+    """Return the cloudwatch logs client."""
+    return get_aws_client("logs")
 
 
 def parse_iso_date(iso_date):
@@ -37,7 +46,99 @@ def generate_expired_date():
     return datetime.now(tz=timezone.utc) - timedelta(minutes=25)
 
 
-# pylint: disable=too-many-locals
+def iter_log_events(**params):
+    """Yield the cloudwatch log events matching `params`, following every page."""
+    while True:
+        response = get_logs_client().filter_log_events(**params)
+        yield from response["events"]
+        next_token = response.get("nextToken")
+        if not next_token:
+            return
+        params = {**params, "nextToken": next_token}
+
+
+def get_checkpoint_key(live_info):
+    """Cache key of the alerts read for a live, reset each time the live is started."""
+    channel_id = live_info["medialive"]["channel"]["id"]
+    return f"{LIVE_STATE_CHECKPOINT_KEY_CACHE}{channel_id}:{live_info['started_at']}"
+
+
+def scan_live_alerts(live_info, checkpoint=None):
+    """Read the alerts logged for a live since the checkpoint.
+
+    All events must be parsed to extract the JSON message. When an alert is added,
+    the `alarm_state` property value is `SET` and when the alert is removed,
+    the `alarm_state` property value is `CLEARED`.
+    Alarm state act like a list with all the event history. It means a `CLEARED`
+    event is related to a `SET` one. So we put in a list the time of all `SET` events
+    of each pipeline and remove it if a `CLEARED` event is here.
+
+    Parameters
+    ----------
+    live_info : dict
+        The live info of the video, with its cloudwatch log group and medialive channel.
+    checkpoint : dict, optional
+        The checkpoint returned by the previous scan of this live, to only read the
+        events logged since.
+
+    Returns
+    -------
+    dict
+        The checkpoint: the time of the `SET` alerts pending on each pipeline, the
+        timestamp of the last event read and the ids and timestamps of the events read
+        during the `CHECKPOINT_LOOKBACK` seconds before it. The next scan reads this
+        period again, skipping the events already read, not to miss the events
+        ingested late.
+    """
+    started_at = int(int(live_info["started_at"]) * 1000)
+    checkpoint = checkpoint or {
+        "timestamp": started_at,
+        "events": {},
+        "pipelines": {"0": [], "1": []},
+    }
+    pipelines = {
+        pipeline: list(alerts) for pipeline, alerts in checkpoint["pipelines"].items()
+    }
+    timestamp, events = checkpoint["timestamp"], dict(checkpoint["events"])
+
+    for event in iter_log_events(
+        logGroupName=live_info["cloudwatch"]["logGroupName"],
+        startTime=max(started_at, timestamp - CHECKPOINT_LOOKBACK * 1000),
+        filterPattern=(
+            "{"
+            '($.detail-type = "MediaLive Channel Alert") && '
+            f"($.resources[0] = \"{live_info['medialive']['channel']['arn']}\") &&"
+            '($.detail.alert_type = "RTMP Has No Audio/Video")'
+            "}"
+        ),
+    ):
+        event_id = event.get("eventId")
+        if event_id in events:
+            continue
+
+        log = EXTRACT_MESSAGE_REGEX.match(event["message"])
+        message = json.loads(log.group("message"))
+        alerts = pipelines.setdefault(message["detail"]["pipeline"], [])
+        if message["detail"]["alarm_state"] == "SET":
+            alerts.append(message["time"])
+        elif alerts:
+            alerts.pop()
+
+        event_timestamp = event.get("timestamp", timestamp)
+        timestamp = max(timestamp, event_timestamp)
+        if event_id:
+            events[event_id] = event_timestamp
+
+    # The events read before the period read again by the next scan can be forgotten
+    lookback_start = timestamp - CHECKPOINT_LOOKBACK * 1000
+    events = {
+        event_id: event_timestamp
+        for event_id, event_timestamp in events.items()
+        if event_timestamp >= lookback_start
+    }
+    return {"timestamp": timestamp, "events": events, "pipelines": pipelines}
+
+
 class Command(BaseCommand):
     """Check every live streaming running state on AWS."""
 
@@ -48,73 +149,64 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         """Execute management command."""
-        extract_message_pattern = (
-            r"^(?P<ingestion_time>.*)\t"
-            r"(?P<request_id>.*)\t"
-            r"(?P<level>.*)\t"
-            r"Received event:(?P<message>.*)$"
+        # For each running live video, we query cloudwatch on the current live
+        # to search messages having detail.alert_type set to `RTMP Has No Audio/Video`.
+        # This alert tell us there is no stream and the live can be stopped if the message is
+        # older than 25 minutes. Lives are scanned concurrently, each one from where the
+        # previous run stopped reading its logs.
+        videos = list(Video.objects.filter(live_state=RUNNING))
+        checkpoints = cache.get_many(
+            [get_checkpoint_key(video.live_info) for video in videos]
         )
-        extract_message_regex = re.compile(extract_message_pattern)
-
-        videos = Video.objects.filter(live_state=RUNNING)
-        for video in videos:
-            # For each running live video, we query cloudwatch on the current live
-            # to search messages having detail.alert_type set to `RTMP Has No Audio/Video`.
-            # This alert tell us there is no stream and the live can be stopped if the message is
-            # older than 25 minutes.
-            self.stdout.write(f"Checking video {video.id}")
+
+        with ThreadPoolExecutor(
+            max_workers=settings.CHECK_LIVE_STATE_CONCURRENCY
+        ) as executor:
+            scans = [
+                executor.submit(
+                    scan_live_alerts,
+                    video.live_info,
+                    checkpoints.get(get_checkpoint_key(video.live_info)),
+                )
+                for video in videos
+            ]
+
+            new_checkpoints = {}
+            for video, scan in zip(videos, scans):
+                self.stdout.write(f"Checking video {video.id}")
+                try:
+                    checkpoint = scan.result()
+                except (BotoCoreError, ClientError) as error:
+                    # The next run reads again the logs of this live
+                    self.stderr.write(f"Error checking video {video.id}: {error}")
+                    continue
+                new_checkpoints[get_checkpoint_key(video.live_info)] = checkpoint
+                self.check_live_activity(video, checkpoint["pipelines"])
+
+        cache.set_many(new_checkpoints, CHECKPOINT_TIMEOUT)
+
+    def check_live_activity(self, video, pipelines):
+        """Stop the channel of a live whose 2 pipelines receive no stream for too long.
+
+        The live is over when the 2 pipelines have a `SET` alert pending. We have to check
+        the time of the last `SET` alerts and if it is older than 25 minutes we stop the
+        channel.
+        """
+        if len(pipelines.get("0", [])) != 1 or len(pipelines.get("1", [])) != 1:
+            return
+
+        datetime_pipeline0 = parse_iso_date(pipelines["0"][0])
+        datetime_pipeline1 = parse_iso_date(pipelines["1"][0])
+        expired_date = generate_expired_date()
+
+        if datetime_pipeline0 < expired_date or datetime_pipeline1 < expired_date:
+            # Stop this channel
             live_info = video.live_info
-            logs = logs_client.filter_log_events(
-                logGroupName=live_info["cloudwatch"]["logGroupName"],
-                startTime=int(int(video.live_info.get("started_at")) * 1000),
-                filterPattern=(
-                    "{"
-                    '($.detail-type = "MediaLive Channel Alert") && '
-                    f"($.resources[0] = \"{live_info['medialive']['channel']['arn']}\") &&"
-                    '($.detail.alert_type = "RTMP Has No Audio/Video")'
-                    "}"
-                ),
+            self.stdout.write(
+                f"Stopping channel with id {live_info['medialive']['channel']['id']}"
             )
+            stop_live_channel(live_info["medialive"]["channel"]["id"])
 
-            pipelines_queue = {"0": [], "1": []}
-
-            for event in logs["events"]:
-                # All events must be parsed to extract the JSON message. When an alert is added,
-                # the `alarm_state` property value is `SET` and when the alert is removed,
-                # the `alarm_state` property value is `CLEARED`.
-                # We have 2 pipelines, a live is over when the 2 pipeline have `SET` value
-                # in `alarm_state`.
-                # Alarm state act like a list with all the event history. It means a `CLEARED`
-                # event is related to a `SET` one. So we have to look over all events, put in
-                # a list all `SET` events and remove it if a `CLEARED` event is here. At the
-                # end if we have 2 `SET` events, the live has no activity and we have to check
-                # the time of the last `SET` event. If this time is older than 25 minutes we
-                # stop the channel.
-                log = extract_message_regex.match(event["message"])
-                message = json.loads(log.group("message"))
-
-                if message["detail"]["alarm_state"] == "SET":
-                    pipelines_queue[message["detail"]["pipeline"]].append(message)
-                else:
-                    pipelines_queue[message["detail"]["pipeline"]].pop()
-
-            if len(pipelines_queue["0"]) == 1 and len(pipelines_queue["1"]) == 1:
-                # Both pipelines receive no stream, we have to check the more recent one
-                # and if the time is older than 25 minutes we stop the channel.
-                datetime_pipeline0 = parse_iso_date(pipelines_queue["0"][0]["time"])
-                datetime_pipeline1 = parse_iso_date(pipelines_queue["1"][0]["time"])
-                expired_date = generate_expired_date()
-
-                if (
-                    datetime_pipeline0 < expired_date
-                    or datetime_pipeline1 < expired_date
-                ):
-                    # Stop this channel
-                    self.stdout.write(
-                        f"Stopping channel with id {live_info['medialive']['channel']['id']}"
-                    )
-                    stop_live_channel(live_info["medialive"]["channel"]["id"])
-
-                    video.live_state = STOPPING
-                    video.save()
-                    self.stdout.write("Channel stopped")
+            video.live_state = STOPPING
+            video.save()
+            self.stdout.write("Channel stopped")
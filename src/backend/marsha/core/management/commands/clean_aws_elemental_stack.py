@@ -1,15 +1,17 @@
 """Check every existing medialive channel and check if the related video is still usable."""
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 
 from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
 
 from marsha.core.defaults import DELETED, ENDED
-from marsha.core.models import Video
 from marsha.core.utils.medialive_utils import (
     delete_medialive_stack,
-    list_medialive_channels,
+    iter_medialive_channels,
+    iter_medialive_channels_videos,
 )
 from marsha.core.utils.time_utils import to_datetime
 
@@ -36,59 +38,90 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         """Execute management command."""
         expired_date = generate_expired_date()
-        for medialive_channel in list_medialive_channels():
-            # Don't work with stack not belonging to the current environment
-            if (
-                medialive_channel.get("Tags", {}).get("environment")
-                != settings.AWS_BASE_NAME
-            ):
-                continue
+        # Deleting a stack waits for AWS to stop the channel and detach its inputs,
+        # stacks are deleted concurrently.
+        with ThreadPoolExecutor(
+            max_workers=settings.AWS_MEDIALIVE_DELETE_CONCURRENCY
+        ) as executor:
+            for batch in iter_medialive_channels_videos(iter_medialive_channels()):
+                deletions = [
+                    (
+                        live,
+                        medialive_channel,
+                        executor.submit(
+                            delete_medialive_stack, medialive_channel, self.stdout
+                        ),
+                    )
+                    for medialive_channel, live in self._get_stacks_to_delete(
+                        batch, expired_date
+                    )
+                ]
+
+                lives_to_save = []
+                for live, medialive_channel, deletion in deletions:
+                    try:
+                        deletion.result()
+                    except Exception as error:  # pylint: disable=broad-except
+                        # The stack is deleted again by the next run
+                        self.stderr.write(
+                            f"Error deleting stack {medialive_channel['Name']}: {error}"
+                        )
+                        continue
+                    if live:
+                        lives_to_save.append(live)
+
+                # The lives of a batch are saved in a single transaction
+                with transaction.atomic():
+                    for live in lives_to_save:
+                        self._delete_live(live)
 
+    def _get_stacks_to_delete(self, batch, expired_date):
+        """
+        Yield the medialive channels of a batch to delete, each one with the live
+        to set as deleted once it is, None if the live is kept.
+        """
+        for medialive_channel, live_pk, live in batch:
             # If the live is not idle, skip it
             if medialive_channel.get("State") != "IDLE":
                 continue
-            # the channel name contains the environment, the primary key and the created_at
-            # stamp. Here we want to use the primary key
-            _environment, live_pk, _stamp = medialive_channel["Name"].split("_")
-            try:
-                live = Video.objects.get(pk=live_pk)
-                self.stdout.write(f"Checking video {live.id}")
-
-                if live.get_medialive_channel().get("id") != medialive_channel["Id"]:
-                    # Live is attached to another channel, delete this channel.
-                    self.stdout.write(
-                        f"The video {live.id} is not attached to the "
-                        f"channel {medialive_channel['Name']}"
-                    )
-                    delete_medialive_stack(medialive_channel, self.stdout)
-                    continue
-
-                if live.starting_at:
-                    # Live was scheduled, we can use this schedule date.
-                    if live.starting_at < expired_date:
-                        self._delete_live(live, medialive_channel)
-                elif started_at := live.live_info.get("started_at"):
-                    # Live has started_at info, we can use it.
-                    started_at = to_datetime(started_at)
-                    if started_at < expired_date:
-                        self._delete_live(live, medialive_channel)
-            except Video.DoesNotExist:
+
+            if live is None:
                 # Channel exists in AWS but no live in our DB. Delete it.
                 self.stdout.write(
                     f"""Channel {medialive_channel["Name"]} is """
                     f"""attached to a video {live_pk} that does not exist"""
                 )
-                delete_medialive_stack(medialive_channel, self.stdout)
+                yield medialive_channel, None
+                continue
 
-    def _delete_live(self, live, medialive_channel):
-        """
-        Set the live_state to ENDED, the upload_state to DELETED and delete
-        all AWS resources
-        """
-        self.stdout.write(f"deleting AWS resources for video {live.id}")
+            self.stdout.write(f"Checking video {live.id}")
 
-        delete_medialive_stack(medialive_channel, self.stdout)
+            if live.get_medialive_channel().get("id") != medialive_channel["Id"]:
+                # Live is attached to another channel, delete this channel.
+                self.stdout.write(
+                    f"The video {live.id} is not attached to the "
+                    f"channel {medialive_channel['Name']}"
+                )
+                yield medialive_channel, None
+                continue
+
+            if live.starting_at:
+                # Live was scheduled, we can use this schedule date.
+                if live.starting_at < expired_date:
+                    self.stdout.write(f"deleting AWS resources for video {live.id}")
+                    yield medialive_channel, live
+            elif started_at := live.live_info.get("started_at"):
+                # Live has started_at info, we can use it.
+                started_at = to_datetime(started_at)
+                if started_at < expired_date:
+                    self.stdout.write(f"deleting AWS resources for video {live.id}")
+                    yield medialive_channel, live
 
+    def _delete_live(self, live):
+        """
+        Set the live_state to ENDED, the upload_state to DELETED once all its AWS
+        resources are deleted
+        """
         self.stdout.write(f"Set video state to deleted for video {live.id}")
         live.live_state = ENDED
         live.upload_state = DELETED
@@ -101,5 +134,6 @@ class Command(BaseCommand):
                 "live_state",
                 "upload_state",
                 "live_info",
-            )
+            ),
+            validate=False,
         )
@@ -1,13 +1,13 @@
 """Check every existing medialive channel and check if the related video is still usable."""
-from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
 
 from marsha.core.defaults import IDLE, RUNNING, STOPPED
-from marsha.core.models import Video
 from marsha.core.utils.medialive_utils import (
     delete_medialive_stack,
-    list_medialive_channels,
+    iter_medialive_channels,
+    iter_medialive_channels_videos,
     update_id3_tags,
 )
 from marsha.core.utils.time_utils import to_timestamp
@@ -56,7 +56,7 @@ class Command(BaseCommand):
         return False
 
     def update_video_state(self, live, channel_state):
-        """Update video states depending on the channel states"""
+        """Update video states depending on the channel states, without saving them"""
         now = timezone.now()
         stamp = to_timestamp(now)
 
@@ -74,23 +74,21 @@ class Command(BaseCommand):
             live_info.update({"stopped_at": stamp})
 
         live.live_info = live_info
-        live.save(update_fields=["live_info", "live_state"])
 
     def handle(self, *args, **options):
         """Execute management command."""
-        for medialive_channel in list_medialive_channels():
-            # Don't work with stack not belonging to the current environment
-            if (
-                medialive_channel.get("Tags", {}).get("environment")
-                != settings.AWS_BASE_NAME
-            ):
-                continue
-
-            # the channel name contains the environment, the primary key and the created_at
-            # stamp. Here we want to use the primary key
-            _environment, live_pk, _stamp = medialive_channel["Name"].split("_")
-            try:
-                live = Video.objects.get(pk=live_pk)
+        for batch in iter_medialive_channels_videos(iter_medialive_channels()):
+            lives_to_save = []
+            for medialive_channel, live_pk, live in batch:
+                if live is None:
+                    # live exists in AWS but not in our DB
+                    self.stdout.write(
+                        f"""Channel {medialive_channel["Name"]} is """
+                        f"""attached to a video {live_pk} that does not exist"""
+                    )
+                    delete_medialive_stack(medialive_channel, self.stdout)
+                    continue
+
                 self.stdout.write(f"Checking video {live.id}")
                 channel_state = medialive_channel.get("State").casefold()
 
@@ -103,10 +101,9 @@ class Command(BaseCommand):
                         f"""{live_state} != {channel_state} (medialive)"""
                     )
                     self.update_video_state(live, channel_state)
-            except Video.DoesNotExist:
-                # live exists in AWS but not in our DB
-                self.stdout.write(
-                    f"""Channel {medialive_channel["Name"]} is """
-                    f"""attached to a video {live_pk} that does not exist"""
-                )
-                delete_medialive_stack(medialive_channel, self.stdout)
+                    lives_to_save.append(live)
+
+            # The lives of a batch are saved in a single transaction
+            with transaction.atomic():
+                for live in lives_to_save:
+                    live.save(update_fields=["live_info", "live_state"], validate=False)
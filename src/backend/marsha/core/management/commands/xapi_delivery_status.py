@@ -0,0 +1,30 @@
+"""Report the metrics of the asynchronous delivery of xAPI statements."""
+from django.core.management.base import BaseCommand
+
+from marsha.core.services import xapi_delivery
+
+
+class Command(BaseCommand):
+    """Report the metrics of the asynchronous delivery of xAPI statements."""
+
+    help = (
+        "Report the number of xAPI statements enqueued, delivered, dead-lettered and "
+        "still queued, and their average delivery latency."
+    )
+
+    def add_arguments(self, parser):
+        """Add arguments to the command."""
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the metrics after reporting them.",
+        )
+
+    def handle(self, *args, **options):
+        """Report the delivery metrics."""
+        metrics = xapi_delivery.get_metrics()
+        self.stdout.write(
+            ", ".join(f"{metric}: {value}" for metric, value in metrics.items())
+        )
+        if options["reset"]:
+            xapi_delivery.reset_metrics()
@@ -0,0 +1,107 @@
+# Generated by Django 4.2.30 on 2026-10-17 09:04
+
+import uuid
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0079_timedtexttrack_process_pipeline"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="XAPIDeadLetter",
+            fields=[
+                (
+                    "deleted",
+                    models.DateTimeField(db_index=True, editable=False, null=True),
+                ),
+                (
+                    "deleted_by_cascade",
+                    models.BooleanField(default=False, editable=False),
+                ),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="primary key for the record as UUID",
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="id",
+                    ),
+                ),
+                (
+                    "created_on",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        editable=False,
+                        help_text="date and time at which a record was created",
+                        verbose_name="created on",
+                    ),
+                ),
+                (
+                    "updated_on",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="date and time at which a record was last updated",
+                        verbose_name="updated on",
+                    ),
+                ),
+                (
+                    "lrs_url",
+                    models.CharField(
+                        help_text="LRS url the statements were sent to",
+                        max_length=150,
+                        verbose_name="LRS url",
+                    ),
+                ),
+                (
+                    "lrs_auth_token",
+                    models.TextField(
+                        help_text="LRS authentication token used to send the statements",
+                        verbose_name="LRS authentication token",
+                    ),
+                ),
+                (
+                    "lrs_xapi_version",
+                    models.CharField(
+                        help_text="xAPI version used by the remote LRS server",
+                        max_length=10,
+                        verbose_name="xAPI version",
+                    ),
+                ),
+                (
+                    "statements",
+                    models.JSONField(
+                        help_text="xAPI statements that could not be delivered",
+                        verbose_name="statements",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveSmallIntegerField(
+                        help_text="number of times the delivery was attempted",
+                        verbose_name="attempts",
+                    ),
+                ),
+                (
+                    "error",
+                    models.TextField(
+                        blank=True,
+                        help_text="error returned by the last attempt",
+                        verbose_name="error",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "xAPI dead letter",
+                "verbose_name_plural": "xAPI dead letters",
+                "db_table": "xapi_dead_letter",
+                "ordering": ["-created_on"],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-17 15:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0080_xapideadletter"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="xapideadletter",
+            name="lrs_auth_token",
+        ),
+        migrations.RemoveField(
+            model_name="xapideadletter",
+            name="lrs_xapi_version",
+        ),
+        migrations.AddField(
+            model_name="xapideadletter",
+            name="consumer_site",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="consumer site whose LRS the statements were sent to, the LRS of the settings if empty",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="xapi_dead_letters",
+                to="core.consumersite",
+                verbose_name="consumer site",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="xapideadletter",
+            name="lrs_url",
+            field=models.CharField(
+                blank=True,
+                help_text="LRS url the statements were sent to",
+                max_length=150,
+                verbose_name="LRS url",
+            ),
+        ),
+    ]
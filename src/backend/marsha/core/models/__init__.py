@@ -6,3 +6,4 @@ from .playlist import *  # noqa isort:skip
 from .portability_request import *  # noqa isort:skip
 from .site import *  # noqa isort:skip
 from .video import *  # noqa isort:skip
+from .xapi import *  # noqa isort:skip
@@ -101,12 +101,48 @@ class BaseModel(SafeDeleteModel):
 
         abstract = True
 
-    # pylint: disable=signature-differs
-    def save(self, *args, **kwargs):
-        """Enforce validation each time an instance is saved."""
-        self.full_clean(validate_constraints=False)
+    # pylint: disable=arguments-differ
+    def save(self, *args, validate=True, **kwargs):
+        """Enforce validation each time an instance is saved.
+
+        Parameters
+        ----------
+        validate : boolean
+            Set to False on hot paths saving values that were already validated, by a
+            serializer for example. Only the fields being saved are then cleaned, without
+            the queries checking the uniqueness of the instance and the existence of its
+            related objects, which are enforced by the database anyway.
+        args : list
+            Passed onto parent's `save` method
+        kwargs: dict
+            Passed onto parent's `save` method
+
+        """
+        if validate:
+            self.full_clean(validate_constraints=False)
+        else:
+            self.clean_fields(
+                exclude=self._get_fast_save_exclude(kwargs.get("update_fields"))
+            )
         super().save(*args, **kwargs)
 
+    def _get_fast_save_exclude(self, update_fields=None):
+        """Return the fields not cleaned when saving without validation.
+
+        Relations are not cleaned because it would query their existence, neither are
+        fields left untouched when `update_fields` is set.
+        """
+        return [
+            field.name
+            for field in self._meta.concrete_fields
+            if field.is_relation
+            or (
+                update_fields is not None
+                and field.name not in update_fields
+                and field.attname not in update_fields
+            )
+        ]
+
     @classmethod
     def _check_table_name(cls):
         """Check that the table name is defined.
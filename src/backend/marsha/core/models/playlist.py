@@ -2,8 +2,9 @@
 from datetime import timedelta
 import logging
 
+from django.contrib.postgres.expressions import ArraySubquery
 from django.db import models
-from django.db.models import Q
+from django.db.models import Exists, ExpressionWrapper, F, Lookup, OuterRef, Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -11,7 +12,12 @@ from safedelete import HARD_DELETE
 from safedelete.managers import SafeDeleteManager
 from safedelete.queryset import SafeDeleteQueryset
 
-from marsha.core.models.account import ADMINISTRATOR, INSTRUCTOR, ROLE_CHOICES
+from marsha.core.models.account import (
+    ADMINISTRATOR,
+    INSTRUCTOR,
+    ROLE_CHOICES,
+    OrganizationAccess,
+)
 from marsha.core.models.base import BaseModel
 from marsha.core.tasks.s3 import delete_s3_video
 
@@ -19,10 +25,118 @@ from marsha.core.tasks.s3 import delete_s3_video
 logger = logging.getLogger(__name__)
 
 
+class _InArray(Lookup):
+    """`lhs = ANY(rhs)`, true when the value is an item of the array."""
+
+    lookup_name = "in_array"
+    prepare_rhs = False
+
+    def as_sql(self, compiler, connection):
+        """Compare the value to the items of the array."""
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} = ANY({rhs})", (*lhs_params, *rhs_params)
+
+
+def has_playlist_role(user_id, roles, playlist="playlist"):
+    """
+    Build a condition, true when a user has a role on the playlist of a resource
+    or is an administrator of the organization of this playlist.
+
+    The playlists the user can reach are collected in two arrays by subqueries
+    independent of the queried rows, which Postgres runs once. Comparing the
+    playlist of the rows to the items of these arrays is driven by the index on the
+    playlist: only the rows of these playlists are read, where IN subqueries ORed
+    together are checked on every row of the table. Unlike joins on the accesses,
+    filtering on the condition never duplicates rows and needs no DISTINCT.
+    `bench_visibility_filters.py` measured it faster than the joins and than the IN
+    subqueries, for both the organization administrators and the instructors.
+    Use `annotate_has_playlist_role` to check the accesses on the rows of a page or
+    on a single object instead.
+
+    Parameters
+    ----------
+    user_id : str
+        The user ID to who is concerned by the permission.
+        We use the user ID here because it can be provided from UserToken
+    roles : List[str]
+        The roles on the playlist granting the permission.
+    playlist : str, optional
+        The path from the queried model to its playlist, None to query playlists.
+
+    Returns
+    -------
+    Q
+        The condition, to filter a queryset with.
+    """
+    playlist_id = F(f"{playlist}__pk" if playlist else "pk")
+    return Q(
+        _InArray(
+            playlist_id,
+            ArraySubquery(
+                PlaylistAccess.objects.filter(user_id=user_id, role__in=roles).values(
+                    "playlist_id"
+                )
+            ),
+        )
+    ) | Q(
+        _InArray(
+            playlist_id,
+            ArraySubquery(
+                Playlist.objects.filter(
+                    organization_id__in=OrganizationAccess.objects.filter(
+                        user_id=user_id, role=ADMINISTRATOR
+                    ).values("organization_id")
+                ).values("pk")
+            ),
+        )
+    )
+
+
+def annotate_has_playlist_role(queryset, user_id, roles, playlist="playlist"):
+    """
+    Annotate `queryset` with `can_edit`, true when a user has a role on the playlist
+    of a resource or is an administrator of the organization of this playlist.
+
+    The accesses are checked by correlated EXISTS subqueries: each annotated row
+    looks its own playlist and organization up in the indexes of the accesses,
+    instead of hashing all the accesses of the user as `has_playlist_role` does.
+    The cost follows the number of rows annotated, a page or a single object, not
+    the number of playlists the user can reach.
+
+    The parameters are the ones of `has_playlist_role`.
+    """
+    prefix = f"{playlist}__" if playlist else ""
+    return queryset.annotate(
+        can_edit=ExpressionWrapper(
+            Exists(
+                PlaylistAccess.objects.filter(
+                    playlist_id=OuterRef(f"{prefix}pk"), user_id=user_id, role__in=roles
+                )
+            )
+            | Exists(
+                OrganizationAccess.objects.filter(
+                    organization_id=OuterRef(f"{prefix}organization_id"),
+                    user_id=user_id,
+                    role=ADMINISTRATOR,
+                )
+            ),
+            output_field=models.BooleanField(),
+        )
+    )
+
+
 class PlaylistQueryset(SafeDeleteQueryset):
     """A queryset to provide helper for querying playlist."""
 
-    def annotate_can_edit(self, user_id):
+    def visible_to(self, user_id, roles=(ADMINISTRATOR, INSTRUCTOR)):
+        """
+        Filter the playlists on which the user has one of `roles`, or whose
+        organization they administrate.
+        """
+        return self.filter(has_playlist_role(user_id, roles, playlist=None))
+
+    def annotate_can_edit(self, user_id, force_value=None):
         """
         Annotate the queryset with a boolean indicating if the user can act
         on the playlist.
@@ -33,27 +147,23 @@ class PlaylistQueryset(SafeDeleteQueryset):
             The user ID to who is concerned by the permission.
             We use the user ID here because it can be provided from UserToken
 
+        force_value : optional[bool]
+            If set, force the value of the annotation to `force_value`.
+            Useful to avoid evaluating the accesses again on playlists already
+            filtered with `visible_to`.
+
         Returns
         -------
         QuerySet
             The annotated queryset.
         """
-        return self.annotate(
-            can_edit=models.Case(
-                models.When(
-                    Q(
-                        user_accesses__user_id=user_id,
-                        user_accesses__role__in=[ADMINISTRATOR, INSTRUCTOR],
-                    )
-                    | Q(
-                        organization__user_accesses__user_id=user_id,
-                        organization__user_accesses__role=ADMINISTRATOR,
-                    ),
-                    then=models.Value(True),
-                ),
-                default=models.Value(False),
-                output_field=models.BooleanField(),
+        if force_value is not None:
+            return self.annotate(
+                can_edit=models.Value(force_value, output_field=models.BooleanField()),
             )
+
+        return annotate_has_playlist_role(
+            self, user_id, [ADMINISTRATOR, INSTRUCTOR], None
         )
 
 
@@ -5,7 +5,6 @@ from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
 from django.contrib.sites.models import Site
 from django.db import models
-from django.db.models import OuterRef
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.crypto import get_random_string
@@ -37,10 +36,14 @@ from marsha.core.defaults import (
     VIDEOS_STORAGE_BASE_DIRECTORY,
     VOD_VIDEOS_STORAGE_BASE_DIRECTORY,
 )
-from marsha.core.models.account import ADMINISTRATOR, INSTRUCTOR, OrganizationAccess
+from marsha.core.models.account import ADMINISTRATOR, INSTRUCTOR
 from marsha.core.models.base import BaseModel
 from marsha.core.models.file import AbstractImage, BaseFile, UploadableFileMixin
-from marsha.core.models.playlist import PlaylistAccess, RetentionDateObjectMixin
+from marsha.core.models.playlist import (
+    RetentionDateObjectMixin,
+    annotate_has_playlist_role,
+    has_playlist_role,
+)
 from marsha.core.utils.api_utils import generate_salted_hmac
 from marsha.core.utils.time_utils import to_timestamp
 
@@ -51,6 +54,13 @@ from marsha.core.utils.time_utils import to_timestamp
 class VideoQueryset(SafeDeleteQueryset):
     """A queryset to provide helper for querying videos."""
 
+    def visible_to(self, user_id, roles=(ADMINISTRATOR, INSTRUCTOR)):
+        """
+        Filter the videos of the playlists on which the user has one of `roles`,
+        or whose organization they administrate.
+        """
+        return self.filter(has_playlist_role(user_id, roles))
+
     def annotate_can_edit(self, user_id, force_value=None):
         """
         Annotate the queryset with a boolean indicating if the user can act
@@ -65,7 +75,8 @@ class VideoQueryset(SafeDeleteQueryset):
 
         force_value : optional[bool]
             If set, force the value of the annotation to `force_value`.
-            Useful to avoid heavy request when we already know the answer.
+            Useful to avoid heavy request when we already know the answer,
+            e.g. on videos already filtered with `visible_to`.
 
         Returns
         -------
@@ -77,37 +88,7 @@ class VideoQueryset(SafeDeleteQueryset):
                 can_edit=models.Value(force_value, output_field=models.BooleanField()),
             )
 
-        organization_subquery = OrganizationAccess.objects.filter(
-            role=ADMINISTRATOR,
-            organization__playlists__videos__id=OuterRef("pk"),
-            user_id=user_id,
-        )
-
-        playlist_subquery = PlaylistAccess.objects.filter(
-            role__in=[
-                ADMINISTRATOR,
-                INSTRUCTOR,
-            ],
-            playlist__videos__id=OuterRef("pk"),
-            user_id=user_id,
-        )
-
-        return self.annotate(
-            can_edit=models.Case(
-                models.When(
-                    # Has admin or instructor role on playlist
-                    models.Exists(playlist_subquery),
-                    then=models.Value(True),
-                ),
-                models.When(
-                    # Has admin role on organization
-                    models.Exists(organization_subquery),
-                    then=models.Value(True),
-                ),
-                default=models.Value(False),
-                output_field=models.BooleanField(),
-            ),
-        )
+        return annotate_has_playlist_role(self, user_id, [ADMINISTRATOR, INSTRUCTOR])
 
 
 class Video(BaseFile, RetentionDateObjectMixin):
@@ -1066,6 +1047,16 @@ class LiveSession(BaseModel):
 
         verbose_name = _("live session")
 
+    def save(self, *args, **kwargs):
+        """Forget the live session served by the write-behind attendance ingestion."""
+        super().save(*args, **kwargs)
+        if settings.ATTENDANCE_WRITE_BEHIND_ENABLED:
+            # This function is imported using import_string to avoid circular import error.
+            forget_snapshot = import_string(
+                "marsha.core.services.live_attendance.forget_snapshot"
+            )
+            forget_snapshot(self)
+
     def update_reminders(self, step):
         """Update reminders field, append or init field."""
         if self.reminders:
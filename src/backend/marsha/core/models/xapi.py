@@ -0,0 +1,54 @@
+"""This module holds the models related to xAPI statements."""
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from marsha.core.models.base import BaseModel
+
+
+class XAPIDeadLetter(BaseModel):
+    """xAPI statements that could not be delivered to their LRS."""
+
+    consumer_site = models.ForeignKey(
+        to="ConsumerSite",
+        related_name="xapi_dead_letters",
+        verbose_name=_("consumer site"),
+        help_text=_(
+            "consumer site whose LRS the statements were sent to, "
+            "the LRS of the settings if empty"
+        ),
+        # dead letters are (soft-)deleted with their consumer site
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    lrs_url = models.CharField(
+        max_length=150,
+        verbose_name=_("LRS url"),
+        help_text=_("LRS url the statements were sent to"),
+        blank=True,
+    )
+    statements = models.JSONField(
+        verbose_name=_("statements"),
+        help_text=_("xAPI statements that could not be delivered"),
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name=_("attempts"),
+        help_text=_("number of times the delivery was attempted"),
+    )
+    error = models.TextField(
+        verbose_name=_("error"),
+        help_text=_("error returned by the last attempt"),
+        blank=True,
+    )
+
+    class Meta:
+        """Options for the ``XAPIDeadLetter`` model."""
+
+        db_table = "xapi_dead_letter"
+        verbose_name = _("xAPI dead letter")
+        verbose_name_plural = _("xAPI dead letters")
+        ordering = ["-created_on"]
+
+    def __str__(self):
+        """Get the string representation of an instance."""
+        return f"{len(self.statements)} statements for {self.lrs_url}"
@@ -47,7 +47,7 @@ class HasAdminRoleMixIn:
     To be combined with one of the Base...Role classes below.
     """
 
-    role_filter = {"role": ADMINISTRATOR}
+    roles = [ADMINISTRATOR]
 
 
 class HasInstructorRoleMixIn:
@@ -57,7 +57,7 @@ class HasInstructorRoleMixIn:
     To be combined with one of the Base...Role classes below.
     """
 
-    role_filter = {"role": INSTRUCTOR}
+    roles = [INSTRUCTOR]
 
 
 class HasAdminOrInstructorRoleMixIn:
@@ -67,7 +67,7 @@ class HasAdminOrInstructorRoleMixIn:
     To be combined with one of the Base...Role classes below.
     """
 
-    role_filter = {"role__in": [ADMINISTRATOR, INSTRUCTOR]}
+    roles = [ADMINISTRATOR, INSTRUCTOR]
 
 
 class BaseObjectPermission(permissions.BasePermission):
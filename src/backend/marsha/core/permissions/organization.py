@@ -11,12 +11,13 @@ from marsha.core.permissions.base import (
     HasAdminRoleMixIn,
     HasInstructorRoleMixIn,
 )
+from marsha.core.permissions.roles import get_request_roles
 
 
 class BaseIsOrganizationRole(permissions.BasePermission):
     """Base permission class for organization roles."""
 
-    role_filter = {}
+    roles = []
 
     def get_organization_id(self, request, view):
         """Get the organization id."""
@@ -30,16 +31,14 @@ class BaseIsOrganizationRole(permissions.BasePermission):
         Only if the organization exists and the current logged-in user
         has the proper role.
         """
-        if not self.role_filter:
+        if not self.roles:
             raise ImproperlyConfigured(
-                f"{self.__class__.__name__} must define a `role_filter`."
+                f"{self.__class__.__name__} must define `roles`."
             )
 
-        return models.OrganizationAccess.objects.filter(
-            **self.role_filter,
-            organization_id=self.get_organization_id(request, view),
-            user_id=request.user.id,
-        ).exists()
+        return get_request_roles(request).has_organization_role(
+            self.roles, self.get_organization_id(request, view)
+        )
 
 
 class IsOrganizationAdmin(HasAdminRoleMixIn, BaseIsOrganizationRole):
@@ -51,20 +50,20 @@ class BaseIsUserOrganizationRole(permissions.BasePermission):
     Base permission class to check for organization roles against
     a specific user's organization (a user may belong to several organizations)."""
 
-    role_filter = {}
+    roles = []
 
     def has_object_permission(self, request, view, obj):
         """
         Allow the request if the requesting user as a specific
         role in one of the `obj` user organization.
         """
-        if not self.role_filter:
+        if not self.roles:
             raise ImproperlyConfigured(
-                f"{self.__class__.__name__} must define a `role_filter`."
+                f"{self.__class__.__name__} must define `roles`."
             )
 
         return models.OrganizationAccess.objects.filter(
-            **self.role_filter,
+            role__in=self.roles,
             organization_id__in=obj.organization_accesses.values_list(
                 "organization_id",
                 flat=True,
@@ -123,11 +122,9 @@ class IsParamsPlaylistAdminThroughOrganization(permissions.BasePermission):
         playlist_id = request.data.get("playlist") or request.query_params.get(
             "playlist"
         )
-        return models.OrganizationAccess.objects.filter(
-            role=models.ADMINISTRATOR,
-            organization__playlists__id=playlist_id,
-            user__id=request.user.id,
-        ).exists()
+        return get_request_roles(request).has_playlist_organization_role(
+            [models.ADMINISTRATOR], playlist_id
+        )
 
 
 class CanClaimPlaylist(HasAdminOrInstructorRoleMixIn, permissions.BasePermission):
@@ -151,7 +148,7 @@ class CanClaimPlaylist(HasAdminOrInstructorRoleMixIn, permissions.BasePermission
             return False
 
         return models.OrganizationAccess.objects.filter(
-            **self.role_filter,
+            role__in=self.roles,
             user__id=request.user.id,
         ).exists()
 
@@ -173,11 +170,9 @@ class IsParamsVideoAdminThroughOrganization(permissions.BasePermission):
         this video's playlist belongs.
         """
         video_id = view.get_related_video_id()
-        return models.OrganizationAccess.objects.filter(
-            role=models.ADMINISTRATOR,
-            organization__playlists__videos__id=video_id,
-            user__id=request.user.id,
-        ).exists()
+        return get_request_roles(request).has_playlist_organization_role(
+            [models.ADMINISTRATOR], video_id, lookup="videos__id"
+        )
 
 
 def playlist_organization_role_exists(playlist_id, user_id, roles=None):
@@ -195,7 +190,7 @@ def playlist_organization_role_exists(playlist_id, user_id, roles=None):
 class BaseIsPlaylistOrganizationRole(permissions.BasePermission):
     """Base permission class for playlist's organization roles."""
 
-    role_filter = {}
+    roles = []
 
     def get_playlist_id(self, request, view, obj):  # pylint: disable=unused-argument
         """Get the playlist id."""
@@ -208,15 +203,13 @@ class BaseIsPlaylistOrganizationRole(permissions.BasePermission):
         Only if the organization exists and the current logged-in user
         has the proper role.
         """
-        if not self.role_filter:
+        if not self.roles:
             raise ImproperlyConfigured(
-                f"{self.__class__.__name__} must define a `role_filter`."
+                f"{self.__class__.__name__} must define `roles`."
             )
 
-        return playlist_organization_role_exists(
-            playlist_id=self.get_playlist_id(request, view, obj),
-            user_id=request.user.id,
-            roles=self.role_filter,
+        return get_request_roles(request).has_playlist_organization_role(
+            self.roles, self.get_playlist_id(request, view, obj)
         )
 
 
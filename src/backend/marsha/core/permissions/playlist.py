@@ -11,6 +11,7 @@ from marsha.core.permissions.base import (
     HasAdminRoleMixIn,
     HasInstructorRoleMixIn,
 )
+from marsha.core.permissions.roles import get_request_roles
 
 
 class IsTokenPlaylistRouteObjectRelatedPlaylist(permissions.BasePermission):
@@ -40,7 +41,7 @@ class IsTokenPlaylistRouteObjectRelatedPlaylist(permissions.BasePermission):
         return (
             request.playlist
             and request.playlist.id == view.get_object_pk()
-            and models.Playlist.objects.filter(pk=request.playlist.id).exists()
+            and get_request_roles(request).playlist_exists(request.playlist.id)
         )
 
 
@@ -69,9 +70,8 @@ class IsTokenPlaylistRouteObjectRelatedVideo(permissions.BasePermission):
             True if the request is authorized, False otherwise
         """
         try:
-            return (
-                request.playlist
-                and str(view.get_related_object().video.playlist.id)
+            return request.playlist and (
+                str(view.get_related_object_value("video__playlist_id"))
                 == request.playlist.id
             )
         except ObjectDoesNotExist:
@@ -84,7 +84,8 @@ class BaseIsParamsPlaylistRole(permissions.BasePermission):
     playlist, and has access to this playlist with a specific role.
     """
 
-    role_filter = {}
+    # Any role on the playlist when None
+    roles = None
 
     def has_permission(self, request, view):
         """
@@ -99,11 +100,7 @@ class BaseIsParamsPlaylistRole(permissions.BasePermission):
         playlist_id = request.data.get("playlist") or request.query_params.get(
             "playlist"
         )
-        return models.PlaylistAccess.objects.filter(
-            **self.role_filter,
-            playlist__id=playlist_id,
-            user__id=request.user.id,
-        ).exists()
+        return get_request_roles(request).has_playlist_role(self.roles, playlist_id)
 
 
 class IsParamsPlaylistAdmin(HasAdminRoleMixIn, BaseIsParamsPlaylistRole):
@@ -144,11 +141,9 @@ class IsParamsPlaylistAdminThroughOrganization(permissions.BasePermission):
         playlist_id = request.data.get("playlist") or request.query_params.get(
             "playlist"
         )
-        return models.OrganizationAccess.objects.filter(
-            role=models.ADMINISTRATOR,
-            organization__playlists__id=playlist_id,
-            user__id=request.user.id,
-        ).exists()
+        return get_request_roles(request).has_playlist_organization_role(
+            [models.ADMINISTRATOR], playlist_id
+        )
 
 
 class IsParamsVideoAdminThroughOrganization(permissions.BasePermission):
@@ -168,11 +163,9 @@ class IsParamsVideoAdminThroughOrganization(permissions.BasePermission):
         this video's playlist belongs.
         """
         video_id = view.get_related_video_id()
-        return models.OrganizationAccess.objects.filter(
-            role=models.ADMINISTRATOR,
-            organization__playlists__videos__id=video_id,
-            user__id=request.user.id,
-        ).exists()
+        return get_request_roles(request).has_playlist_organization_role(
+            [models.ADMINISTRATOR], video_id, lookup="videos__id"
+        )
 
 
 class BaseIsParamsVideoRoleThroughPlaylist(permissions.BasePermission):
@@ -181,7 +174,8 @@ class BaseIsParamsVideoRoleThroughPlaylist(permissions.BasePermission):
     video, and has access to this video's parent playlist with a specific role.
     """
 
-    role_filter = {}
+    # Any role on the playlist when None
+    roles = None
 
     def has_permission(self, request, view):
         """
@@ -190,11 +184,9 @@ class BaseIsParamsVideoRoleThroughPlaylist(permissions.BasePermission):
         this video belongs.
         """
         video_id = view.get_related_video_id()
-        return models.PlaylistAccess.objects.filter(
-            **self.role_filter,
-            playlist__videos__id=video_id,
-            user__id=request.user.id,
-        ).exists()
+        return get_request_roles(request).has_playlist_role(
+            self.roles, video_id, lookup="videos__id"
+        )
 
 
 class IsParamsVideoAdminThroughPlaylist(
@@ -229,7 +221,7 @@ def playlist_role_exists(playlist_id, user_id, roles=None):
 class BaseIsPlaylistRole(permissions.BasePermission):
     """Base permission class for playlist roles."""
 
-    role_filter = {}
+    roles = []
 
     def get_playlist_id(self, request, view, obj):  # pylint: disable=unused-argument
         """Get the playlist id."""
@@ -242,15 +234,13 @@ class BaseIsPlaylistRole(permissions.BasePermission):
         Only if the organization exists and the current logged-in user
         has the proper role.
         """
-        if not self.role_filter:
+        if not self.roles:
             raise ImproperlyConfigured(
-                f"{self.__class__.__name__} must define a `role_filter`."
+                f"{self.__class__.__name__} must define `roles`."
             )
 
-        return playlist_role_exists(
-            playlist_id=self.get_playlist_id(request, view, obj),
-            user_id=request.user.id,
-            roles=self.role_filter,
+        return get_request_roles(request).has_playlist_role(
+            self.roles, self.get_playlist_id(request, view, obj)
         )
 
 
@@ -0,0 +1,145 @@
+"""Resolve the roles of the user of a request, once per request."""
+import uuid
+
+from django.db.models import OuterRef, Subquery
+
+from marsha.core import models
+
+
+def _has_role(role, roles):
+    """Return True if `role` is one of `roles`, or is any role when `roles` is None."""
+    return role is not None and (roles is None or role in roles)
+
+
+class RequestRoles:
+    """
+    Roles of the user of a request on playlists and on their organization.
+
+    The permission classes composed on a view often check the accesses of the same
+    user to the same playlist. The role of the user on a playlist and on its
+    organization are loaded with a single query the first time a permission class
+    needs them, then remembered until the end of the request.
+
+    Parameters
+    ----------
+    user_id : str
+        The ID of the user of the request. Anonymous requests and the LTI users of
+        playlist tokens, whose ID is not a UUID, have no role.
+    """
+
+    def __init__(self, user_id):
+        """Start with no role loaded."""
+        try:
+            uuid.UUID(str(user_id))
+        except ValueError:
+            user_id = None
+        self.user_id = user_id
+        # (lookup, value) -> (playlist_id, organization_id, playlist_role,
+        # organization_role, playlist deleted) or None when there is no playlist
+        self._playlists = {}
+        # organization_id -> role of the user or None
+        self._organizations = {}
+
+    def _resolve_playlist(self, lookup, value):
+        """Load the playlist matching `lookup` and the roles of the user on it."""
+        key = (lookup, str(value))
+        if key in self._playlists:
+            return self._playlists[key]
+
+        playlist = None
+        if value is not None:
+            playlist = (
+                models.Playlist.all_objects.filter(**{lookup: value})
+                .annotate(
+                    playlist_role=Subquery(
+                        models.PlaylistAccess.objects.filter(
+                            playlist_id=OuterRef("pk"), user_id=self.user_id
+                        ).values("role")[:1]
+                    ),
+                    organization_role=Subquery(
+                        models.OrganizationAccess.objects.filter(
+                            organization_id=OuterRef("organization_id"),
+                            user_id=self.user_id,
+                        ).values("role")[:1]
+                    ),
+                )
+                .values_list(
+                    "pk",
+                    "organization_id",
+                    "playlist_role",
+                    "organization_role",
+                    "deleted",
+                )
+                .first()
+            )
+
+        self._playlists[key] = playlist
+        if playlist is not None:
+            self._playlists[("pk", str(playlist[0]))] = playlist
+            if playlist[1] is not None:
+                self._organizations[str(playlist[1])] = playlist[3]
+        return playlist
+
+    def playlist_exists(self, playlist_id):
+        """Return True if the playlist exists and is not deleted."""
+        playlist = self._resolve_playlist("pk", playlist_id)
+        return playlist is not None and playlist[4] is None
+
+    def has_playlist_role(self, roles, value, lookup="pk"):
+        """
+        Return True if the user has one of `roles` on a playlist.
+
+        Parameters
+        ----------
+        roles : List[str]
+            The roles granting the permission, None to grant it to any role.
+        value : str
+            The value identifying the playlist with `lookup`.
+        lookup : str
+            The lookup identifying the playlist, e.g. "videos__id" to check the
+            role of the user on the playlist of a video.
+
+        Returns
+        -------
+        boolean
+            True if the user has one of the roles on the playlist.
+        """
+        if self.user_id is None:
+            return False
+        playlist = self._resolve_playlist(lookup, value)
+        return playlist is not None and _has_role(playlist[2], roles)
+
+    def has_playlist_organization_role(self, roles, value, lookup="pk"):
+        """
+        Return True if the user has one of `roles` on the organization of a playlist.
+
+        The parameters are the ones of `has_playlist_role`.
+        """
+        if self.user_id is None:
+            return False
+        playlist = self._resolve_playlist(lookup, value)
+        return playlist is not None and _has_role(playlist[3], roles)
+
+    def has_organization_role(self, roles, organization_id):
+        """Return True if the user has one of `roles` on an organization."""
+        if self.user_id is None or organization_id is None:
+            return False
+        key = str(organization_id)
+        if key not in self._organizations:
+            self._organizations[key] = (
+                models.OrganizationAccess.objects.filter(
+                    organization_id=organization_id, user_id=self.user_id
+                )
+                .values_list("role", flat=True)
+                .first()
+            )
+        return _has_role(self._organizations[key], roles)
+
+
+def get_request_roles(request):
+    """Return the roles of the user of the request, created on first use."""
+    request_roles = getattr(request, "request_roles", None)
+    if request_roles is None:
+        request_roles = RequestRoles(request.user.id)
+        request.request_roles = request_roles
+    return request_roles
@@ -4,6 +4,7 @@ from django.core.exceptions import FieldError, ObjectDoesNotExist
 from rest_framework import permissions
 
 from marsha.core import models
+from marsha.core.permissions.roles import get_request_roles
 
 
 class BaseTokenRolePermission(permissions.BasePermission):
@@ -117,7 +118,7 @@ class IsTokenPlaylistRouteObjectRelatedPlaylist(permissions.BasePermission):
         return (
             request.resource
             and request.resource.id == view.get_object_pk()
-            and models.Playlist.objects.filter(id=request.resource.id).exists()
+            and get_request_roles(request).playlist_exists(request.resource.id)
         )
 
 
@@ -146,9 +147,8 @@ class IsTokenPlaylistRouteObjectRelatedVideo(permissions.BasePermission):
             True if the request is authorized, False otherwise
         """
         try:
-            return (
-                request.resource
-                and str(view.get_related_object().video.playlist.id)
+            return request.resource and (
+                str(view.get_related_object_value("video__playlist_id"))
                 == request.resource.id
             )
         except ObjectDoesNotExist:
@@ -170,7 +170,7 @@ class IsPlaylistTokenMatchingRouteObject(permissions.BasePermission):
         """
         if request.resource:
             playlist_id = request.resource.id
-            playlist_exists = models.Playlist.objects.filter(id=playlist_id).exists()
+            playlist_exists = get_request_roles(request).playlist_exists(playlist_id)
             try:
                 return (
                     playlist_exists
@@ -201,8 +201,7 @@ class IsPlaylistToken(permissions.BasePermission):
         Only if the playlist exists.
         """
         if request.resource:
-            playlist_id = request.resource.id
-            return models.Playlist.objects.filter(id=playlist_id).exists()
+            return get_request_roles(request).playlist_exists(request.resource.id)
         return False
 
 
@@ -220,6 +219,7 @@ class PortToPlaylistExists(permissions.BasePermission):
         Only if the playlist exists.
         """
         if request.resource:
-            playlist_id = request.resource.port_to_playlist_id
-            return models.Playlist.objects.filter(id=playlist_id).exists()
+            return get_request_roles(request).playlist_exists(
+                request.resource.port_to_playlist_id
+            )
         return False
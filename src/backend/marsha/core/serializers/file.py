@@ -9,7 +9,6 @@ from django.core.exceptions import ImproperlyConfigured
 from django.urls import reverse
 from django.utils import timezone
 
-from botocore.signers import CloudFrontSigner
 from rest_framework import serializers
 
 from marsha.core.models import Document
@@ -120,10 +119,7 @@ class DocumentSerializer(
             date_less_than = timezone.now() + timedelta(
                 seconds=settings.CLOUDFRONT_SIGNED_URLS_VALIDITY
             )
-            cloudfront_signer = CloudFrontSigner(
-                settings.CLOUDFRONT_SIGNED_PUBLIC_KEY_ID, cloudfront_utils.rsa_signer
-            )
-            url = cloudfront_signer.generate_presigned_url(
+            url = cloudfront_utils.get_cloudfront_signer().generate_presigned_url(
                 url, date_less_than=date_less_than
             )
 
@@ -1,8 +1,6 @@
 """Structure of liveSession related models API responses with DRF serializers."""
-import collections
 from datetime import datetime
 
-from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
@@ -14,6 +12,7 @@ from marsha.core.permissions import (
     IsTokenInstructor,
     playlist_role_exists,
 )
+from marsha.core.services.live_attendance_timeline import get_attendance_timeline
 from marsha.core.services.live_session import is_lti_token, is_public_token
 
 
@@ -300,72 +299,19 @@ class LiveAttendanceGraphSerializer(serializers.ModelSerializer):
         for each of them, if the user was active or not at this current time.
         Parsing the live_attendance from the live session of the user, we identify if the user
         was or not active.
+        Timelines precomputed for a whole page of live sessions can be passed in the
+        serializer context.
         """
-        video_timestamps = obj.video.get_list_timestamps_attendances()
-
-        # if there is no list of timestamps
-        if video_timestamps == {}:
-            return {}
-
-        # if user has no live_attendance we return the list of timestamps
-        if not obj.live_attendance:
-            return video_timestamps
-
-        list_attendances = {}
-        # merge keys from the video depending on the length and live_attendance of the
-        # session of the user
-        list_attendances_merged = video_timestamps | obj.live_attendance
-
-        # in case we exactly have the same key generated, we don't need to do any treatment
-        if len(list_attendances_merged) == len(video_timestamps):
-            return list_attendances_merged
-
-        last_user_key = 0
-        last_system_key = 0
-        temp = {}
-        between_info = {}
-        # sort array so keys are ordered by timestamp
+        timelines = self.context.get("attendance_timelines", {})
+        if obj.pk in timelines:
+            return timelines[obj.pk]
+
+        video_timestamps = self.context.get("video_timestamps")
+        if video_timestamps is None:
+            video_timestamps = obj.video.get_list_timestamps_attendances()
         try:
-            list_attendances_ordered = collections.OrderedDict(
-                sorted({int(k): v for k, v in list_attendances_merged.items()}.items())
-            )
+            return get_attendance_timeline(video_timestamps, obj.live_attendance)
         except ValueError as error:
             raise serializers.ValidationError(
                 {"live_attendance": "keys in fields should be timestamps"}
             ) from error
-
-        live_attendance_keys = obj.live_attendance.keys()
-        for key, value in list_attendances_ordered.items():
-            key = str(key)
-
-            # key belongs to the livesession of the user
-            if key in live_attendance_keys:
-                temp = value
-                last_user_key = int(key)
-                between_info = {
-                    "connectedInBetween": True,
-                    "lastConnected": last_user_key,
-                }
-
-            # this is a key generated by the video to build the timeline
-            if key in video_timestamps.keys():
-                # this key is over the expected record from the user
-                # based on known frequency and last data received
-                expected_next_user_key = last_user_key + settings.ATTENDANCE_PUSH_DELAY
-                if int(key) > expected_next_user_key:
-                    temp = {}
-
-                # we keep the key system and save it with empty or last info of user
-                list_attendances[key] = temp
-
-                # we add an extra information, was user connected between
-                # the two last keys system, to tell that this user was still around
-                # some how, and maybe detect he has connection issues
-                if not temp:
-                    if last_user_key > last_system_key:
-                        list_attendances[key] = list_attendances[key] | between_info
-                    between_info = {}
-
-                last_system_key = int(key)
-
-        return list_attendances
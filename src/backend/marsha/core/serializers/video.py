@@ -33,7 +33,9 @@ from marsha.core.serializers.shared_live_media import (
 )
 from marsha.core.serializers.thumbnail import ThumbnailSerializer
 from marsha.core.serializers.timed_text_track import TimedTextTrackSerializer
+from marsha.core.services import transcode_pipeline
 from marsha.core.storage.storage_class import video_storage
+from marsha.core.tasks.video import schedule_transcode_pipeline_backfill
 from marsha.core.utils import cloudfront_utils, jitsi_utils, time_utils, xmpp_utils
 from marsha.core.utils.time_utils import to_datetime
 
@@ -212,8 +214,14 @@ class VideoBaseSerializer(serializers.ModelSerializer):
         filename = f"{slugify(obj.playlist.title)}_{stamp}.mp4"
         content_disposition = quote_plus(f"attachment; filename={filename}")
 
-        # Trying to recover the transcoding pipeline
-        if obj.transcode_pipeline is None:
+        pipeline = obj.transcode_pipeline
+        # Trying to recover the transcoding pipeline, the storage can only be skipped
+        # once the pipelines of all the videos were backfilled
+        if pipeline is None and (
+            settings.TRANSCODE_PIPELINE_STORAGE_LOOKUP
+            or not transcode_pipeline.is_backfill_completed()
+        ):
+            transcode_pipeline.increment_counter(transcode_pipeline.STORAGE_LOOKUPS)
             if video_storage.exists(f"scw/{obj.pk}/video/{stamp}/thumbnail.jpg"):
                 obj.transcode_pipeline = PEERTUBE_PIPELINE
             else:  # Fallback to AWS_PIPELINE
@@ -223,8 +231,15 @@ class VideoBaseSerializer(serializers.ModelSerializer):
                 f"VOD {obj.pk} had no transcode_pipeline and "
                 f"was recovered to {obj.transcode_pipeline}",
             )
-
-        if obj.transcode_pipeline == AWS_PIPELINE:
+            pipeline = obj.transcode_pipeline
+        elif pipeline is None:
+            # Never hit the storage while serializing, fallback to AWS_PIPELINE
+            # until the pipeline is recovered in the background
+            transcode_pipeline.increment_counter(transcode_pipeline.DEFERRED)
+            schedule_transcode_pipeline_backfill(obj.pk)
+            pipeline = AWS_PIPELINE
+
+        if pipeline == AWS_PIPELINE:
             for resolution in obj.resolutions:
                 # MP4
                 mp4_url = (
@@ -252,7 +267,7 @@ class VideoBaseSerializer(serializers.ModelSerializer):
 
                 # Previews
                 urls["previews"] = f"{base}/previews/{stamp}_100.jpg"
-        elif obj.transcode_pipeline == PEERTUBE_PIPELINE:
+        elif pipeline == PEERTUBE_PIPELINE:
             base = obj.get_videos_storage_prefix(stamp=stamp)
             for resolution in obj.resolutions:
                 # MP4
@@ -363,6 +378,70 @@ class VideoSerializer(VideoBaseSerializer):
         )
         return rep
 
+    def derive_admin_representation(self, instance, representation):
+        """Derive the representation of a video for its administrators.
+
+        Only the fields depending on the role of the user are computed again from the
+        representation of the video for other users, the serializer context must
+        contain `is_admin`.
+
+        Parameters
+        ----------
+        instance : Type[models.Video]
+            The video that we want to serialize
+        representation : dict
+            The representation of the video for users not able to edit it
+
+        Returns
+        -------
+        dict
+            The representation of the video for its administrators
+        """
+        admin_representation = dict(representation)
+        admin_representation["can_edit"] = self.get_can_edit(instance)
+        admin_representation["live_info"] = self.get_live_info(instance)
+        admin_representation["xmpp"] = self.get_xmpp(instance)
+
+        # Urls are hidden to other users only once the live is harvested
+        if instance.live_state == HARVESTED:
+            self.thumbnail_instance = next(iter(instance.thumbnail.all()), None)
+            admin_representation["urls"] = self.get_urls(instance)
+
+        # Shared live medias can be downloaded by other users only if allowed
+        hidden_shared_live_medias = [
+            shared_live_media
+            for shared_live_media in instance.shared_live_medias.all()
+            if not shared_live_media.show_download
+        ]
+        active_shared_live_media = instance.active_shared_live_media
+        if (
+            active_shared_live_media
+            and not active_shared_live_media.show_download
+            and active_shared_live_media not in hidden_shared_live_medias
+        ):
+            hidden_shared_live_medias.append(active_shared_live_media)
+
+        if hidden_shared_live_medias:
+            admin_shared_live_medias = {
+                shared_live_media["id"]: shared_live_media
+                for shared_live_media in SharedLiveMediaSerializer(
+                    hidden_shared_live_medias, many=True, context=self.context
+                ).data
+            }
+            admin_representation["shared_live_medias"] = [
+                admin_shared_live_medias.get(shared_live_media["id"], shared_live_media)
+                for shared_live_media in representation["shared_live_medias"]
+            ]
+            if active_shared_live_media:
+                admin_representation[
+                    "active_shared_live_media"
+                ] = admin_shared_live_medias.get(
+                    str(active_shared_live_media.pk),
+                    representation["active_shared_live_media"],
+                )
+
+        return admin_representation
+
     def get_shared_live_medias(self, instance):
         """Get shared live media for a video sorted by reverse uploaded_on."""
         # Sort shared live media by reverse uploaded_on on python side
@@ -0,0 +1,238 @@
+"""Write-behind ingestion of live attendance beats.
+
+When ``ATTENDANCE_WRITE_BEHIND_ENABLED`` is set, the ``push_attendance`` endpoint does
+not rewrite the ``live_session`` row on every beat. Beats are appended to a per-video
+log stored in the cache (Redis in production) and a celery task periodically folds
+them into ``LiveSession.live_attendance`` with a single ``bulk_update``.
+
+The log is built on atomic cache primitives (``add``/``incr``) so that it works with
+any cache backend, including ``RedisCacheWithFallback``:
+
+- each video has a ``generation`` counter. Writers append their beats to the log of the
+  current generation, using a per-generation ``head`` counter to allocate a slot.
+- the flush task bumps the generation and folds the generation before the one it just
+  closed. A writer that read a generation right before it was closed has therefore a
+  full flush period to finish writing its slot before that generation is folded.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from marsha.core.defaults import (
+    LIVE_ATTENDANCE_BUFFER_KEY_CACHE,
+    LIVE_ATTENDANCE_SNAPSHOT_KEY_CACHE,
+)
+from marsha.core.models import LiveSession
+
+
+def _incr(key):
+    """Atomically increment a counter stored in the cache, creating it if needed."""
+    cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # The key expired or was evicted between `add` and `incr`
+        cache.add(key, 0, timeout=None)
+        return cache.incr(key)
+
+
+def _generation_key(video_id):
+    """Cache key of the current generation of a video attendance log."""
+    return f"{LIVE_ATTENDANCE_BUFFER_KEY_CACHE}{video_id}:generation"
+
+
+def _head_key(video_id, generation):
+    """Cache key of the number of beats appended to a generation of the log."""
+    return f"{LIVE_ATTENDANCE_BUFFER_KEY_CACHE}{video_id}:{generation}:head"
+
+
+def _entry_key(video_id, generation, position):
+    """Cache key of one beat appended to a generation of the log."""
+    return f"{LIVE_ATTENDANCE_BUFFER_KEY_CACHE}{video_id}:{generation}:{position}"
+
+
+def _scheduled_key(video_id):
+    """Cache key flagging that a flush is already scheduled for a video."""
+    return f"{LIVE_ATTENDANCE_BUFFER_KEY_CACHE}{video_id}:scheduled"
+
+
+def get_snapshot_key(video_id, **identity):
+    """Cache key of the serialized live session of a viewer.
+
+    The identity is the set of fields identifying a live session for a video:
+    ``consumer_site``, ``lti_id`` and ``lti_user_id`` in an LTI context,
+    ``anonymous_id`` for public lives and ``user`` on the standalone site.
+    """
+    parts = ":".join(
+        f"{name}={identity[name]}" for name in sorted(identity) if identity[name]
+    )
+    digest = hashlib.sha256(parts.encode("utf-8")).hexdigest()
+    return f"{LIVE_ATTENDANCE_SNAPSHOT_KEY_CACHE}{video_id}:{digest}"
+
+
+def get_livesession_snapshot_key(livesession):
+    """Cache key of the serialized representation of an existing live session."""
+    if livesession.consumer_site_id and livesession.lti_id and livesession.lti_user_id:
+        return get_snapshot_key(
+            livesession.video_id,
+            consumer_site=livesession.consumer_site_id,
+            lti_id=livesession.lti_id,
+            lti_user_id=livesession.lti_user_id,
+        )
+    if livesession.user_id:
+        return get_snapshot_key(livesession.video_id, user=livesession.user_id)
+    return get_snapshot_key(livesession.video_id, anonymous_id=livesession.anonymous_id)
+
+
+def get_snapshot(snapshot_key):
+    """Return the serialized live session stored by a previous beat, if any."""
+    if snapshot_key is None:
+        return None
+    return cache.get(snapshot_key)
+
+
+def set_snapshot(snapshot_key, data):
+    """Store the serialized live session answered to a viewer."""
+    if snapshot_key is None:
+        return
+    cache.set(
+        snapshot_key, data, timeout=settings.ATTENDANCE_WRITE_BEHIND_SNAPSHOT_DURATION
+    )
+
+
+def forget_snapshot(livesession):
+    """Drop the serialized live session, it will be rebuilt on the next beat."""
+    cache.delete(get_livesession_snapshot_key(livesession))
+
+
+def claim_flush(video_id):
+    """Return True if no flush is scheduled yet for the video, the caller must do it."""
+    return cache.add(
+        _scheduled_key(video_id),
+        True,
+        timeout=settings.ATTENDANCE_WRITE_BEHIND_FLUSH_DELAY,
+    )
+
+
+def release_flush(video_id):
+    """Allow the next call to `claim_flush` to schedule a flush for the video."""
+    cache.delete(_scheduled_key(video_id))
+
+
+def has_pending_beats(video_id):
+    """Return True if beats received for the video are waiting to be folded."""
+    generation = cache.get(_generation_key(video_id), 0)
+    return any(
+        cache.get(_head_key(video_id, previous), 0)
+        for previous in (generation - 1, generation)
+        if previous >= 0
+    )
+
+
+def push_beat(video_id, livesession_id, live_attendance, **fields):
+    """Append an attendance beat to the log of a video.
+
+    Parameters
+    ----------
+    video_id : Type[UUID|str]
+        The video the beat belongs to.
+    livesession_id : Type[UUID|str]
+        The live session the beat must be folded into.
+    live_attendance : dict
+        The attendance points sent by the viewer.
+    fields : dict
+        Other live session fields to update when folding the beat, like ``language``.
+    """
+    generation = cache.get(_generation_key(video_id), 0)
+    position = _incr(_head_key(video_id, generation))
+    cache.set(
+        _entry_key(video_id, generation, position),
+        {
+            "livesession": str(livesession_id),
+            "live_attendance": live_attendance,
+            "fields": {name: value for name, value in fields.items() if value},
+        },
+        timeout=None,
+    )
+
+
+def _pop_generation(video_id, generation):
+    """Return and remove all the beats appended to a generation, in order."""
+    head_key = _head_key(video_id, generation)
+    head = cache.get(head_key, 0)
+    if not head:
+        return []
+
+    keys = [
+        _entry_key(video_id, generation, position) for position in range(1, head + 1)
+    ]
+    entries = cache.get_many(keys)
+    cache.delete_many(keys + [head_key])
+    return [entries[key] for key in keys if key in entries]
+
+
+def fold_beats(livesessions, beats):
+    """Merge beats into live sessions, as the synchronous endpoint would have done.
+
+    Parameters
+    ----------
+    livesessions : Dict[str, LiveSession]
+        The live sessions to update, indexed by their primary key as string.
+    beats : List[dict]
+        The beats to fold, in the order they were received.
+
+    Returns
+    -------
+    List[LiveSession]
+        The live sessions that were modified.
+    """
+    updated = {}
+    now = timezone.now()
+    for beat in beats:
+        livesession = livesessions.get(beat["livesession"])
+        if livesession is None:
+            continue
+
+        livesession.live_attendance = (
+            (beat["live_attendance"] | livesession.live_attendance)
+            if livesession.live_attendance
+            else beat["live_attendance"]
+        )
+        for name, value in beat["fields"].items():
+            setattr(livesession, name, value)
+        livesession.updated_on = now
+        updated[beat["livesession"]] = livesession
+
+    return list(updated.values())
+
+
+def flush(video_id):
+    """Fold the pending attendance beats of a video into its live sessions.
+
+    Returns
+    -------
+    int
+        The number of live session rows written.
+    """
+    generation = _incr(_generation_key(video_id))
+    beats = []
+    if generation >= 2:
+        beats = _pop_generation(video_id, generation - 2)
+
+    if not beats:
+        return 0
+
+    livesessions = LiveSession.objects.filter(
+        pk__in={beat["livesession"] for beat in beats}
+    ).in_bulk()
+    updated = fold_beats(
+        {str(pk): livesession for pk, livesession in livesessions.items()}, beats
+    )
+    LiveSession.objects.bulk_update(
+        updated,
+        ["live_attendance", "language", "username", "email", "updated_on"],
+        batch_size=settings.ATTENDANCE_WRITE_BEHIND_BATCH_SIZE,
+    )
+    return len(updated)
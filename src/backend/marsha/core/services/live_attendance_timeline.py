@@ -0,0 +1,197 @@
+"""Attendance timeline of the live sessions of a video.
+
+The attendance timeline of a live session tells, for each of the ``ATTENDANCE_POINTS``
+timestamps of its video, whether the viewer was active at this time and what they
+reported.
+
+The timeline of a live session is precomputed as a compact row of integers, two per
+video timestamp: the attendance beat applying at this timestamp and, when no beat
+applies, the last beat received since the previous timestamp. Rows are stored in the
+cache under a key made of the video timestamps and of a fingerprint of the live session
+so that, when listing attendances, only the live sessions that received new beats since
+the last listing (or all of them if the timeline of the video moved, while the live is
+still running) are recomputed.
+"""
+from array import array
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from marsha.core.defaults import LIVE_ATTENDANCE_TIMELINE_KEY_CACHE
+
+
+NO_BEAT = -1
+
+
+def compute_attendance_row(video_timestamps, live_attendance):
+    """Compute the attendance row of a live session for the timestamps of its video.
+
+    Parameters
+    ----------
+    video_timestamps : dict
+        The timestamps of the video, as returned by
+        `Video.get_list_timestamps_attendances`.
+    live_attendance : dict
+        The attendance beats of the live session, indexed by timestamp.
+
+    Returns
+    -------
+    array
+        Two integers per video timestamp: the beat applying at this timestamp and
+        the last beat received since the previous timestamp if no beat applies,
+        `NO_BEAT` otherwise.
+
+    Raises
+    ------
+    ValueError
+        If a key of the live attendance is not a timestamp.
+    """
+    row = array("q", [NO_BEAT]) * (2 * len(video_timestamps))
+    if not live_attendance:
+        return row
+
+    # in case all the beats match a video timestamp, no treatment is needed
+    if all(key in video_timestamps for key in live_attendance):
+        for index, key in enumerate(video_timestamps):
+            if key in live_attendance:
+                row[2 * index] = int(key)
+        return row
+
+    system_indexes = {int(key): index for index, key in enumerate(video_timestamps)}
+    user_keys = {
+        int(key) for key in live_attendance if str(int(key)) in live_attendance
+    }
+
+    last_user_key = 0
+    last_system_key = 0
+    beat = NO_BEAT
+    # sort keys so they are ordered by timestamp
+    for key in sorted(user_keys | system_indexes.keys()):
+        # key belongs to the live session of the user
+        if key in user_keys:
+            beat = key
+            last_user_key = key
+
+        # this is a key generated by the video to build the timeline
+        if (index := system_indexes.get(key)) is not None:
+            # this key is over the expected record from the user
+            # based on known frequency and last data received
+            if key > last_user_key + settings.ATTENDANCE_PUSH_DELAY:
+                beat = NO_BEAT
+            row[2 * index] = beat
+
+            # keep track of the user being connected between the two last system keys
+            if (beat == NO_BEAT or not live_attendance[str(beat)]) and (
+                last_user_key > last_system_key
+            ):
+                row[2 * index + 1] = last_user_key
+
+            last_system_key = key
+
+    return row
+
+
+def render_attendance_row(video_timestamps, row, live_attendance):
+    """Build the attendance timeline of a live session from its attendance row."""
+    timeline = {}
+    for index, key in enumerate(video_timestamps):
+        beat = row[2 * index]
+        timeline[key] = live_attendance[str(beat)] if beat != NO_BEAT else {}
+        if (last_connected := row[2 * index + 1]) != NO_BEAT:
+            timeline[key] = timeline[key] | {
+                "connectedInBetween": True,
+                "lastConnected": last_connected,
+            }
+    return timeline
+
+
+def get_attendance_timeline(video_timestamps, live_attendance):
+    """Compute the attendance timeline of a live session for the timestamps of its video.
+
+    Raises
+    ------
+    ValueError
+        If a key of the live attendance is not a timestamp.
+    """
+    if not video_timestamps:
+        return {}
+
+    if not live_attendance:
+        return video_timestamps
+
+    return render_attendance_row(
+        video_timestamps,
+        compute_attendance_row(video_timestamps, live_attendance),
+        live_attendance,
+    )
+
+
+def _get_row_key(video_id, timeline_signature, livesession):
+    """Cache key of the attendance row of a live session."""
+    return (
+        f"{LIVE_ATTENDANCE_TIMELINE_KEY_CACHE}{video_id}:{timeline_signature}:"
+        f"{livesession.pk}:{livesession.updated_on.timestamp()}:"
+        f"{len(livesession.live_attendance)}"
+    )
+
+
+def get_attendance_timelines(video_id, video_timestamps, livesessions):
+    """Return the attendance timelines of live sessions of a video.
+
+    Parameters
+    ----------
+    video_id : Type[UUID|str]
+        The video the live sessions belong to.
+    video_timestamps : dict
+        The timestamps of the video, as returned by
+        `Video.get_list_timestamps_attendances`.
+    livesessions : List[LiveSession]
+        The live sessions for which timelines are needed.
+
+    Returns
+    -------
+    dict
+        The timelines indexed by live session primary key. Live sessions with
+        attendance keys that are not timestamps are left out.
+    """
+    if not video_timestamps:
+        return {livesession.pk: {} for livesession in livesessions}
+
+    timeline_signature = hashlib.sha256(
+        ",".join(video_timestamps).encode("utf-8")
+    ).hexdigest()[:16]
+    keys = {
+        livesession.pk: _get_row_key(video_id, timeline_signature, livesession)
+        for livesession in livesessions
+        if livesession.live_attendance
+    }
+    rows = cache.get_many(keys.values())
+
+    timelines = {}
+    missing_rows = {}
+    for livesession in livesessions:
+        if not livesession.live_attendance:
+            timelines[livesession.pk] = video_timestamps
+            continue
+
+        key = keys[livesession.pk]
+        if (row := rows.get(key)) is None:
+            try:
+                row = compute_attendance_row(
+                    video_timestamps, livesession.live_attendance
+                )
+            except ValueError:
+                continue
+            missing_rows[key] = row
+
+        timelines[livesession.pk] = render_attendance_row(
+            video_timestamps, row, livesession.live_attendance
+        )
+
+    if missing_rows:
+        cache.set_many(
+            missing_rows, timeout=settings.VIDEO_ATTENDANCE_TIMELINE_CACHE_DURATION
+        )
+
+    return timelines
@@ -0,0 +1,212 @@
+"""Recovery of the transcode pipeline of videos uploaded before it was recorded.
+
+Videos transcoded by the peertube runners have their thumbnail stored under the
+``scw/`` prefix of the videos storage, others were transcoded by AWS. Instead of asking
+the storage whether this thumbnail exists each time such a video is serialized, the
+``scw/`` prefix is listed once, page by page, and the pipeline of all the videos missing
+it is saved in bulk. When only a few videos are backfilled, their thumbnail is looked up
+directly instead.
+
+Serializing a video without looking its pipeline up in the storage is only safe once the
+backfill has run over all the videos: the videos transcoded by the peertube runners
+would be served with AWS urls otherwise. A complete backfill records it in the cache,
+until then, or if the cache loses it, the pipeline is looked up while serializing.
+
+Counters kept in the cache tell how many storage lookups were made while serializing,
+how many videos were served with a deferred recovery and how many were backfilled.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import LazyObject, empty
+
+from storages.backends.s3boto3 import S3Boto3Storage
+
+from marsha.core.defaults import (
+    AWS_PIPELINE,
+    PEERTUBE_PIPELINE,
+    TRANSCODE_PIPELINE_COUNTER_KEY_CACHE,
+)
+from marsha.core.models import Video
+from marsha.core.storage.storage_class import video_storage
+from marsha.core.utils import time_utils
+
+
+SCW_PREFIX = "scw"
+THUMBNAIL_NAME = "thumbnail.jpg"
+
+STORAGE_LOOKUPS = "storage_lookups"
+DEFERRED = "deferred"
+BACKFILLED = "backfilled"
+COUNTERS = (STORAGE_LOOKUPS, DEFERRED, BACKFILLED)
+BACKFILL_COMPLETED_KEY = f"{TRANSCODE_PIPELINE_COUNTER_KEY_CACHE}backfill_completed"
+
+
+def increment_counter(counter, delta=1):
+    """Increment one of the transcode pipeline recovery counters."""
+    key = f"{TRANSCODE_PIPELINE_COUNTER_KEY_CACHE}{counter}"
+    if not cache.add(key, delta, timeout=None):
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            # the counter expired between add and incr
+            cache.set(key, delta, timeout=None)
+
+
+def get_counters():
+    """Return the transcode pipeline recovery counters."""
+    values = cache.get_many(
+        [f"{TRANSCODE_PIPELINE_COUNTER_KEY_CACHE}{counter}" for counter in COUNTERS]
+    )
+    return {
+        counter: values.get(f"{TRANSCODE_PIPELINE_COUNTER_KEY_CACHE}{counter}", 0)
+        for counter in COUNTERS
+    }
+
+
+def reset_counters():
+    """Reset the transcode pipeline recovery counters."""
+    cache.delete_many(
+        [f"{TRANSCODE_PIPELINE_COUNTER_KEY_CACHE}{counter}" for counter in COUNTERS]
+    )
+
+
+def is_backfill_completed():
+    """Return True once the transcode pipeline of all the videos was backfilled."""
+    return cache.get(BACKFILL_COMPLETED_KEY, False)
+
+
+def _parse_thumbnail_key(key):
+    """Return the (video id, stamp) of a ``scw/<id>/video/<stamp>/thumbnail.jpg`` key."""
+    parts = key.split("/")
+    if (
+        len(parts) == 5
+        and parts[0] == SCW_PREFIX
+        and parts[2] == "video"
+        and parts[4] == THUMBNAIL_NAME
+    ):
+        return parts[1], parts[3]
+    return None
+
+
+def _list_s3_thumbnail_keys(storage):
+    """Yield the keys under the ``scw/`` prefix of an S3 storage, 1000 keys per request."""
+    paginator = storage.connection.meta.client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=storage.bucket_name, Prefix=f"{SCW_PREFIX}/"):
+        for content in page.get("Contents", []):
+            yield content["Key"]
+
+
+def _list_filesystem_thumbnail_keys(storage):
+    """Yield the thumbnail keys under the ``scw/`` prefix of another storage."""
+    if not storage.exists(SCW_PREFIX):
+        return
+    video_ids, _files = storage.listdir(SCW_PREFIX)
+    for video_id in video_ids:
+        prefix = f"{SCW_PREFIX}/{video_id}/video"
+        if not storage.exists(prefix):
+            continue
+        stamps, _files = storage.listdir(prefix)
+        for stamp in stamps:
+            _directories, files = storage.listdir(f"{prefix}/{stamp}")
+            if THUMBNAIL_NAME in files:
+                yield f"{prefix}/{stamp}/{THUMBNAIL_NAME}"
+
+
+def _resolve_storage(storage):
+    """Return the storage wrapped by a lazy storage, setting it up if needed."""
+    if isinstance(storage, LazyObject):
+        # pylint: disable=protected-access
+        if storage._wrapped is empty:
+            storage._setup()
+        return storage._wrapped
+    return storage
+
+
+def _get_thumbnail_key(video_id, stamp):
+    """Return the key of the thumbnail of a video transcoded by the peertube runners."""
+    return f"{SCW_PREFIX}/{video_id}/video/{stamp}/{THUMBNAIL_NAME}"
+
+
+def list_peertube_transcoded_videos(storage=None):
+    """Return the (video id, stamp) pairs having a thumbnail under the ``scw/`` prefix."""
+    storage = _resolve_storage(video_storage if storage is None else storage)
+    if isinstance(storage, S3Boto3Storage):
+        keys = _list_s3_thumbnail_keys(storage)
+    else:
+        keys = _list_filesystem_thumbnail_keys(storage)
+    return {stamped for key in keys if (stamped := _parse_thumbnail_key(key))}
+
+
+def backfill_transcode_pipelines(video_ids=None, batch_size=None, dry_run=False):
+    """Save the transcode pipeline of uploaded videos not having one yet.
+
+    Parameters
+    ----------
+    video_ids : List[Type[UUID|str]], optional
+        Restrict the backfill to these videos, all videos are considered otherwise.
+    batch_size : int, optional
+        Number of videos updated per query, defaults to
+        `TRANSCODE_PIPELINE_BACKFILL_BATCH_SIZE`.
+    dry_run : bool
+        Compute the pipelines without saving them.
+
+    Returns
+    -------
+    dict
+        The number of videos recovered to each pipeline.
+    """
+    batch_size = batch_size or settings.TRANSCODE_PIPELINE_BACKFILL_BATCH_SIZE
+    videos = Video.objects.filter(
+        transcode_pipeline__isnull=True, uploaded_on__isnull=False
+    ).only("id", "uploaded_on", "transcode_pipeline")
+    if video_ids is not None:
+        videos = videos.filter(pk__in=video_ids)
+
+    recovered = {PEERTUBE_PIPELINE: 0, AWS_PIPELINE: 0}
+    if not videos.exists():
+        _complete_backfill(video_ids, dry_run)
+        return recovered
+
+    # Listing the whole prefix is only worth it for the videos of the whole table, the
+    # thumbnail of a few videos is looked up directly
+    peertube_videos = list_peertube_transcoded_videos() if video_ids is None else None
+    batch = []
+    for video in videos.iterator(chunk_size=batch_size):
+        stamp = str(time_utils.to_timestamp(video.uploaded_on))
+        if peertube_videos is None:
+            is_peertube = video_storage.exists(_get_thumbnail_key(video.pk, stamp))
+        else:
+            is_peertube = (str(video.pk), stamp) in peertube_videos
+        video.transcode_pipeline = PEERTUBE_PIPELINE if is_peertube else AWS_PIPELINE
+        recovered[video.transcode_pipeline] += 1
+        batch.append(video)
+        if len(batch) >= batch_size:
+            _save_batch(batch, dry_run)
+            batch = []
+    _save_batch(batch, dry_run)
+    _complete_backfill(video_ids, dry_run)
+
+    return recovered
+
+
+def _save_batch(videos, dry_run):
+    """Save the transcode pipeline of a batch of videos."""
+    if not videos or dry_run:
+        return
+    Video.objects.bulk_update(videos, ["transcode_pipeline"])
+    increment_counter(BACKFILLED, len(videos))
+
+
+def _complete_backfill(video_ids, dry_run):
+    """Record that a backfill of all the videos has run."""
+    if video_ids is None and not dry_run:
+        cache.set(BACKFILL_COMPLETED_KEY, True, timeout=None)
+
+
+def claim_backfill(video_id):
+    """Return True if no backfill is scheduled yet for the video, the caller must do it."""
+    return cache.add(
+        f"{TRANSCODE_PIPELINE_COUNTER_KEY_CACHE}scheduled:{video_id}",
+        True,
+        timeout=settings.TRANSCODE_PIPELINE_BACKFILL_DELAY,
+    )
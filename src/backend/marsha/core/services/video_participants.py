@@ -18,7 +18,9 @@ def add_participant_asking_to_join(video, participant):
         raise VideoParticipantsException("Participant already joined.")
 
     video.participants_asking_to_join.append(participant)
-    video.save()
+    video.save(
+        update_fields=["participants_asking_to_join", "updated_on"], validate=False
+    )
 
 
 def remove_participant_asking_to_join(video, participant):
@@ -27,7 +29,9 @@ def remove_participant_asking_to_join(video, participant):
         raise VideoParticipantsException("Participant did not asked to join.")
 
     video.participants_asking_to_join.remove(participant)
-    video.save()
+    video.save(
+        update_fields=["participants_asking_to_join", "updated_on"], validate=False
+    )
 
 
 def move_participant_to_discussion(video, participant):
@@ -40,7 +44,14 @@ def move_participant_to_discussion(video, participant):
 
     video.participants_asking_to_join.remove(participant)
     video.participants_in_discussion.append(participant)
-    video.save()
+    video.save(
+        update_fields=[
+            "participants_asking_to_join",
+            "participants_in_discussion",
+            "updated_on",
+        ],
+        validate=False,
+    )
 
 
 def remove_participant_from_discussion(video, participant):
@@ -49,4 +60,6 @@ def remove_participant_from_discussion(video, participant):
         raise VideoParticipantsException("Participant not in discussion.")
 
     video.participants_in_discussion.remove(participant)
-    video.save()
+    video.save(
+        update_fields=["participants_in_discussion", "updated_on"], validate=False
+    )
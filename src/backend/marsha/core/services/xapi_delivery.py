@@ -0,0 +1,241 @@
+"""Asynchronous, batched delivery of xAPI statements to the LRS.
+
+When ``XAPI_ASYNC_DELIVERY_ENABLED`` is set, the xAPI endpoint does not wait for the LRS
+to acknowledge each statement. Statements are published as persistent messages of the
+celery broker (Redis in production), in one queue per destination: the consumer site
+whose LRS receives the statements of LTI resources, or the LRS of the settings for the
+statements of the website. A celery task periodically consumes the queue of a
+destination and posts its statements as arrays of ``XAPI_DELIVERY_BATCH_SIZE``
+statements, over a connection kept alive between deliveries. The credentials of the LRS
+are looked up when sending the statements: they never travel through the broker nor are
+saved with the dead letters.
+
+The messages of a batch are only acknowledged once the batch was delivered, handed to
+a retry task or dead-lettered: the broker delivers again the statements of a worker
+stopped in the middle of a delivery.
+
+A batch that could not reach the LRS, or that the LRS failed to process (5xx and 429
+status codes), is retried with an exponential backoff and saved as a ``XAPIDeadLetter``
+once ``XAPI_DELIVERY_MAX_RETRIES`` retries failed. A batch rejected as invalid (400) is
+split to deliver its valid statements, the invalid ones are dead-lettered right away like
+the batches rejected with another client error.
+
+Metrics are kept in the cache: the number of statements enqueued, delivered and
+dead-lettered, from which the queue depth is deduced, and the total time statements
+spent waiting to be delivered. Losing them, or the flag telling a delivery is already
+scheduled, never loses statements.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from kombu import Queue
+
+from marsha.celery_app import app
+from marsha.core.defaults import XAPI_DELIVERY_KEY_CACHE, XAPI_DELIVERY_QUEUE_NAME
+from marsha.core.models import ConsumerSite, XAPIDeadLetter
+from marsha.core.xapi import XAPI
+
+
+ENQUEUED = "enqueued"
+DELIVERED = "delivered"
+DEAD_LETTERED = "dead_lettered"
+LATENCY = "latency_ms"
+METRICS = (ENQUEUED, DELIVERED, DEAD_LETTERED, LATENCY)
+
+
+def _incr(key, delta=1):
+    """Atomically increment a counter stored in the cache, creating it if needed."""
+    cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # The key expired or was evicted between `add` and `incr`
+        cache.add(key, 0, timeout=None)
+        return cache.incr(key, delta)
+
+
+SITE_DESTINATION = "site"
+
+
+def get_destination(consumer_site_id=None):
+    """Return the identifier of the LRS statements are delivered to.
+
+    Parameters
+    ----------
+    consumer_site_id : Type[UUID|str], optional
+        The consumer site whose LRS receives the statements, None for the LRS of the
+        settings.
+    """
+    return str(consumer_site_id) if consumer_site_id else SITE_DESTINATION
+
+
+def get_lrs(destination):
+    """Return the (url, auth token, xAPI version) of the LRS of a destination.
+
+    Returns
+    -------
+    tuple(str, str, str) or None
+        The configuration of the LRS, None if it is not configured anymore.
+    """
+    if destination == SITE_DESTINATION:
+        lrs = (settings.LRS_URL, settings.LRS_AUTH_TOKEN, settings.LRS_XAPI_VERSION)
+    else:
+        lrs = (
+            ConsumerSite.objects.filter(pk=destination)
+            .values_list("lrs_url", "lrs_auth_token", "lrs_xapi_version")
+            .first()
+        )
+    if lrs is None or not lrs[0] or not lrs[1]:
+        return None
+    return lrs
+
+
+def _get_queue(destination):
+    """Return the broker queue the statements of a destination are published to."""
+    name = XAPI_DELIVERY_QUEUE_NAME.format(destination=destination)
+    return Queue(name, routing_key=name)
+
+
+def _scheduled_key(destination):
+    """Cache key flagging that a delivery is already scheduled for a destination."""
+    return f"{XAPI_DELIVERY_KEY_CACHE}{destination}:scheduled"
+
+
+def _metric_key(metric):
+    """Cache key of a delivery metric."""
+    return f"{XAPI_DELIVERY_KEY_CACHE}metrics:{metric}"
+
+
+def claim_delivery(destination):
+    """Return True if no delivery is scheduled yet for the destination."""
+    return cache.add(
+        _scheduled_key(destination), True, timeout=settings.XAPI_DELIVERY_DELAY
+    )
+
+
+def release_delivery(destination):
+    """Allow the next call to `claim_delivery` to schedule a delivery."""
+    cache.delete(_scheduled_key(destination))
+
+
+def has_pending_statements(destination):
+    """Return True if statements enqueued for the destination are waiting."""
+    with app.connection_for_read() as connection:
+        with connection.SimpleQueue(_get_queue(destination)) as queue:
+            return queue.qsize() > 0
+
+
+def enqueue(destination, statement):
+    """Publish a statement to the queue of a destination.
+
+    Parameters
+    ----------
+    destination : str
+        The destination returned by `get_destination`.
+    statement : dict
+        The complete xAPI statement to deliver.
+    """
+    queue = _get_queue(destination)
+    with app.producer_or_acquire() as producer:
+        producer.publish(
+            {"statement": statement, "enqueued_at": time.time()},
+            exchange="",
+            routing_key=queue.routing_key,
+            declare=[queue],
+            serializer="json",
+            delivery_mode="persistent",
+            retry=True,
+        )
+    _incr(_metric_key(ENQUEUED))
+
+
+def consume_batches(destination, batch_size):
+    """Yield the entries enqueued for a destination, in batches.
+
+    Only the entries enqueued when the consumption starts are consumed. The messages of
+    a batch are acknowledged when the next batch is requested: the entries of a batch
+    whose delivery was interrupted are delivered again.
+
+    Yields
+    ------
+    List[dict]
+        The entries to deliver, each one holding the ``statement`` and the time it was
+        ``enqueued_at``.
+    """
+    with app.connection_for_read() as connection:
+        with connection.SimpleQueue(_get_queue(destination)) as queue:
+            remaining = queue.qsize()
+            while remaining > 0:
+                messages = []
+                while len(messages) < min(batch_size, remaining):
+                    try:
+                        messages.append(queue.get(block=False))
+                    except queue.Empty:
+                        remaining = 0
+                        break
+                if not messages:
+                    return
+                remaining -= len(messages)
+                yield [message.payload for message in messages]
+                for message in messages:
+                    message.ack()
+
+
+def deliver(lrs_url, lrs_auth_token, lrs_xapi_version, entries):
+    """Post the statements of queued entries to their LRS in a single request.
+
+    Raises
+    ------
+    requests.exceptions.RequestException
+        If the LRS could not be reached or rejected the statements.
+    """
+    XAPI(lrs_url, lrs_auth_token, lrs_xapi_version).send_many(
+        [entry["statement"] for entry in entries]
+    )
+    now = time.time()
+    _incr(_metric_key(DELIVERED), len(entries))
+    _incr(
+        _metric_key(LATENCY),
+        sum(round((now - entry["enqueued_at"]) * 1000) for entry in entries),
+    )
+
+
+def dead_letter(destination, lrs_url, entries, attempts, error):
+    """Keep the statements of queued entries that could not be delivered."""
+    XAPIDeadLetter.objects.create(
+        consumer_site_id=None if destination == SITE_DESTINATION else destination,
+        lrs_url=lrs_url or "",
+        statements=[entry["statement"] for entry in entries],
+        attempts=attempts,
+        error=error,
+    )
+    _incr(_metric_key(DEAD_LETTERED), len(entries))
+
+
+def get_metrics():
+    """Return the delivery metrics.
+
+    Returns
+    -------
+    dict
+        The number of statements enqueued, delivered, dead-lettered and still queued,
+        and the average time in milliseconds a statement waited to be delivered.
+    """
+    keys = {metric: _metric_key(metric) for metric in METRICS}
+    values = cache.get_many(keys.values())
+    metrics = {metric: values.get(key, 0) for metric, key in keys.items()}
+    latency = metrics.pop(LATENCY)
+    metrics["queue_depth"] = max(
+        metrics[ENQUEUED] - metrics[DELIVERED] - metrics[DEAD_LETTERED], 0
+    )
+    metrics["average_latency_ms"] = (
+        round(latency / metrics[DELIVERED]) if metrics[DELIVERED] else 0
+    )
+    return metrics
+
+
+def reset_metrics():
+    """Reset the delivery metrics."""
+    cache.delete_many([_metric_key(metric) for metric in METRICS])
@@ -1,6 +1,37 @@
 """Defines the django signals for ```core`` app."""
 
+from django.db.models.signals import post_delete, post_save
 import django.dispatch
+from django.dispatch import receiver
+
+from marsha.core.cache import invalidate_namespace
+from marsha.core.lti.passport import LTI_PASSPORTS_NAMESPACE
+from marsha.core.models import ConsumerSite, Document, LTIPassport, Playlist, Video
 
 
 signal_object_uploaded = django.dispatch.Signal()
+
+
+@receiver([post_save, post_delete], sender=ConsumerSite)
+@receiver([post_save, post_delete], sender=Document)
+@receiver([post_save, post_delete], sender=Playlist)
+@receiver([post_save, post_delete], sender=Video)
+def resource_changed_callback(sender, instance, **kwargs):
+    """
+    Callback answering the save and delete of a resource, a playlist or a consumer site.
+    Cached data derived from the object (app data, attendances, resources targeted by
+    LTI links...) is invalidated.
+    """
+    # pylint: disable=protected-access
+    invalidate_namespace((sender._meta.model_name, instance.pk))
+
+
+@receiver([post_save, post_delete], sender=ConsumerSite)
+@receiver([post_save, post_delete], sender=LTIPassport)
+# pylint: disable=unused-argument
+def lti_passport_changed_callback(sender, instance, **kwargs):
+    """
+    Callback answering the save and delete of a passport or a consumer site.
+    Passports cached for LTI launch requests are all invalidated.
+    """
+    invalidate_namespace(LTI_PASSPORTS_NAMESPACE)
@@ -0,0 +1,33 @@
+"""Celery live session tasks for the core app."""
+from django.conf import settings
+
+from marsha.celery_app import app
+from marsha.core.services import live_attendance
+
+
+def schedule_live_attendances_flush(video_pk):
+    """Schedule a flush of the attendance beats of a video, unless one is pending.
+
+    Args:
+        video_pk (UUID): The video for which attendance beats must be flushed.
+    """
+    if live_attendance.claim_flush(video_pk):
+        flush_live_attendances.apply_async(
+            args=[str(video_pk)], countdown=settings.ATTENDANCE_WRITE_BEHIND_FLUSH_DELAY
+        )
+
+
+@app.task
+def flush_live_attendances(video_pk: str):
+    """Fold the attendance beats buffered for a video into its live sessions.
+
+    Args:
+        video_pk (UUID): The video for which attendance beats must be flushed.
+    """
+    # Beats received from now on must schedule a new flush
+    live_attendance.release_flush(video_pk)
+    live_attendance.flush(video_pk)
+
+    if live_attendance.has_pending_beats(video_pk):
+        # Make sure the remaining beats get folded even if no other beat is received
+        schedule_live_attendances_flush(video_pk)
@@ -1,5 +1,5 @@
 """Celery s3 tasks for the core app."""
-
+from botocore.exceptions import BotoCoreError, ClientError
 
 from marsha import settings
 from marsha.celery_app import app
@@ -7,32 +7,48 @@ from marsha.core.defaults import (
     DELETED_VIDEOS_STORAGE_BASE_DIRECTORY,
     VOD_VIDEOS_STORAGE_BASE_DIRECTORY,
 )
-from marsha.core.utils.s3_utils import move_s3_directory
+from marsha.core.utils.s3_utils import S3MoveError, move_s3_directory
 
 
-@app.task
-def delete_s3_video(video_pk: str):
+@app.task(
+    autoretry_for=(BotoCoreError, ClientError, S3MoveError),
+    retry_backoff=True,
+    max_retries=5,
+)
+def delete_s3_video(video_pk: str, dry_run: bool = False):
     """Deleting a video from S3 will first move it to the "to_delete" folder.
     This folder has a lifecycle policy that will expire the content after a certain period of time.
     A video can be stored on AWS S3 or on Videos S3.
     Doing so gives us some times to recover a video that was deleted.
+    An interrupted move is retried, resuming after the last objects moved.
 
     Args:
         video_pk (str): The video to delete on S3.
+        dry_run (bool): Only count the objects to move, without moving them.
+
+    Returns:
+        dict: The number of `objects` and `bytes` moved, or to move if `dry_run`.
     """
 
     # Video on AWS_DESTINATION_BUCKET_NAME has {video_pk}/ as prefix
-    move_s3_directory(
+    aws_moved = move_s3_directory(
         video_pk,
         DELETED_VIDEOS_STORAGE_BASE_DIRECTORY,
         "AWS",
         settings.AWS_DESTINATION_BUCKET_NAME,
+        dry_run=dry_run,
     )
 
     # Video on VIDEOS_STORAGE_S3 has {VOD_VIDEOS_STORAGE_BASE_DIRECTORY}/{video_pk}/ as prefix
-    move_s3_directory(
+    videos_s3_moved = move_s3_directory(
         f"{VOD_VIDEOS_STORAGE_BASE_DIRECTORY}/{video_pk}",
         DELETED_VIDEOS_STORAGE_BASE_DIRECTORY,
         "VIDEOS_S3",
         settings.VIDEOS_STORAGE_S3_BUCKET_NAME,
+        dry_run=dry_run,
     )
+
+    return {
+        "objects": aws_moved["objects"] + videos_s3_moved["objects"],
+        "bytes": aws_moved["bytes"] + videos_s3_moved["bytes"],
+    }
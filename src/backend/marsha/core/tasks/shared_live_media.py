@@ -1,6 +1,29 @@
-"""Celery shared live media tasks for the core app."""
-from django.core.files.base import ContentFile
+"""Celery shared live media tasks for the core app.
 
+A shared live media is converted to one SVG per page of its PDF. Pages are converted
+by chunks of ``SHARED_LIVE_MEDIA_CONVERSION_CHUNK_SIZE`` pages: the first chunk by the
+task receiving the upload, the other ones by tasks running on any worker. The pages
+converted without gap from the first one are published to the instructor as soon as
+their chunk is converted, so they can start sharing before the whole media is. Once a
+chunk failed to be converted, no page of the upload is published anymore.
+
+The chunks converted and failed are remembered in the cache, which must be shared by
+all the workers: with the per-process memory fallback of ``RedisCacheWithFallback``, a
+worker does not know the chunks converted by the other ones, and the pages after its
+chunks are not published.
+"""
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from io import BytesIO
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile, File
+
+from PIL import Image
 import fitz  # PyMuPDF
 from sentry_sdk import capture_exception
 
@@ -9,11 +32,146 @@ from marsha.core.defaults import (
     CELERY_PIPELINE,
     ERROR,
     READY,
+    SHARED_LIVE_MEDIA_CONVERSION_KEY_CACHE,
     TMP_VIDEOS_STORAGE_BASE_DIRECTORY,
 )
 from marsha.core.models import SharedLiveMedia
 from marsha.core.storage.storage_class import video_storage
 from marsha.core.utils.time_utils import to_datetime
+from marsha.websocket.utils import channel_layers_utils
+
+
+# Time (in seconds) the converted chunks of a shared live media are remembered
+CONVERSION_TIMEOUT = 86400  # 1 day
+
+
+def _chunk_key(shared_live_media_pk, stamp, first):
+    """Cache key flagging that the chunk starting at page `first` is converted."""
+    return f"{SHARED_LIVE_MEDIA_CONVERSION_KEY_CACHE}{shared_live_media_pk}:{stamp}:{first}"
+
+
+def _failed_key(shared_live_media_pk, stamp):
+    """Cache key flagging that a chunk of the upload failed to be converted."""
+    return (
+        f"{SHARED_LIVE_MEDIA_CONVERSION_KEY_CACHE}{shared_live_media_pk}:{stamp}:failed"
+    )
+
+
+def get_chunks(nb_pages, chunk_size):
+    """Return the first and last page numbers, starting at 1, of each chunk."""
+    return [
+        (first, min(first + chunk_size - 1, nb_pages))
+        for first in range(1, nb_pages + 1, chunk_size)
+    ]
+
+
+@contextmanager
+def open_local_copy(path):
+    """Copy a PDF of the videos storage to a temporary file, for PyMuPDF to load
+    its pages from the disk instead of holding the whole file in memory."""
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as local_file:
+        with video_storage.open(path, "rb") as storage_file:
+            shutil.copyfileobj(storage_file, local_file)
+        local_file.flush()
+        local_file.seek(0)
+        yield local_file
+
+
+def render_page(page):
+    """Render a PDF page to SVG.
+
+    Pages whose SVG is larger than SHARED_LIVE_MEDIA_RASTER_THRESHOLD are rasterized to
+    a WebP image embedded in the SVG, lighter for browsers to download and draw.
+    """
+    svg = page.get_svg_image().encode("utf-8")
+    threshold = settings.SHARED_LIVE_MEDIA_RASTER_THRESHOLD
+    if not threshold or len(svg) <= threshold:
+        return svg
+
+    pixmap = page.get_pixmap(dpi=settings.SHARED_LIVE_MEDIA_RASTER_DPI)
+    image = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+    with BytesIO() as buffer:
+        image.save(buffer, "WEBP")
+        data = base64.b64encode(buffer.getvalue()).decode("ascii")
+    width, height = page.rect.width, page.rect.height
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:g}" height="{height:g}" '
+        f'viewBox="0 0 {width:g} {height:g}"><image width="{width:g}" '
+        f'height="{height:g}" href="data:image/webp;base64,{data}"/></svg>'
+    ).encode("utf-8")
+
+
+def convert_pages(pdf, prefix_destination, stamp, first, last):
+    """Render the pages `first` to `last` included and upload them concurrently."""
+    with ThreadPoolExecutor(
+        max_workers=settings.SHARED_LIVE_MEDIA_UPLOAD_CONCURRENCY
+    ) as executor:
+        uploads = [
+            executor.submit(
+                video_storage.save,
+                f"{prefix_destination}/{stamp}_{page_number}.svg",
+                ContentFile(render_page(pdf[page_number - 1])),
+            )
+            for page_number in range(first, last + 1)
+        ]
+        for upload in uploads:
+            upload.result()
+
+
+def fail_conversion(shared_live_media, stamp):
+    """Record that a chunk of an upload failed to be converted and set the shared live
+    media in error, unless a more recent upload was published."""
+    cache.set(_failed_key(shared_live_media.pk, stamp), True, CONVERSION_TIMEOUT)
+    SharedLiveMedia.objects.filter(pk=shared_live_media.pk).exclude(
+        uploaded_on__gt=to_datetime(stamp)
+    ).update(upload_state=ERROR)
+
+
+def publish_pages(shared_live_media, stamp, chunks, first):
+    """Record that the chunk starting at page `first` is converted and publish the
+    pages converted without gap from the first one.
+
+    The number of pages published only grows, whatever the order chunks are converted
+    in, a conversion never overrides the pages of a more recent upload and the pages of
+    an upload are not published anymore once one of its chunks failed.
+    """
+    failed_key = _failed_key(shared_live_media.pk, stamp)
+    cache.set(_chunk_key(shared_live_media.pk, stamp, first), True, CONVERSION_TIMEOUT)
+    converted = cache.get_many(
+        [_chunk_key(shared_live_media.pk, stamp, chunk[0]) for chunk in chunks]
+        + [failed_key]
+    )
+    if failed_key in converted:
+        return
+
+    nb_pages = 0
+    for chunk_first, chunk_last in chunks:
+        if _chunk_key(shared_live_media.pk, stamp, chunk_first) not in converted:
+            break
+        nb_pages = chunk_last
+
+    uploaded_on = to_datetime(stamp)
+    updated = (
+        SharedLiveMedia.objects.filter(pk=shared_live_media.pk)
+        .exclude(uploaded_on__gt=uploaded_on)
+        .exclude(uploaded_on=uploaded_on, nb_pages__gte=nb_pages)
+        .exclude(uploaded_on=uploaded_on, upload_state=ERROR)
+        .update(
+            upload_state=READY,
+            uploaded_on=uploaded_on,
+            nb_pages=nb_pages,
+            extension="pdf",
+            process_pipeline=CELERY_PIPELINE,
+        )
+    )
+    if updated and cache.get(failed_key):
+        # A chunk failed while these pages were published
+        fail_conversion(shared_live_media, stamp)
+        return
+    if updated:
+        shared_live_media.refresh_from_db()
+        channel_layers_utils.dispatch_shared_live_media(shared_live_media)
+        channel_layers_utils.dispatch_video(shared_live_media.video, to_admin=True)
 
 
 @app.task
@@ -32,28 +190,52 @@ def convert_shared_live_media(shared_live_media_pk, stamp: str):
             stamp, TMP_VIDEOS_STORAGE_BASE_DIRECTORY
         )
         prefix_destination = shared_live_media.get_videos_storage_prefix(stamp)
+        chunk_size = settings.SHARED_LIVE_MEDIA_CONVERSION_CHUNK_SIZE
 
-        with video_storage.open(source, "rb") as pdf_file:
-            pdf_bytes = pdf_file.read()
-            pdf = fitz.open(stream=pdf_bytes, filetype="pdf")
+        with open_local_copy(source) as pdf_file, fitz.open(pdf_file.name) as pdf:
+            # The other chunks are converted from this copy
+            video_storage.save(f"{prefix_destination}/{stamp}.pdf", File(pdf_file))
             nb_pages = len(pdf)
+            chunks = get_chunks(nb_pages, chunk_size)
+            for first, _last in chunks[1:]:
+                convert_shared_live_media_pages.delay(
+                    shared_live_media_pk, stamp, nb_pages, chunk_size, first
+                )
+            if chunks:
+                convert_pages(pdf, prefix_destination, stamp, *chunks[0])
 
-            for page in range(nb_pages):
-                svg_string = pdf[page].get_svg_image()
-                svg_bytes = svg_string.encode("utf-8")
-                content_file = ContentFile(svg_bytes)
+        # A PDF without pages is published with no page to share
+        publish_pages(shared_live_media, stamp, chunks, 1)
+    except Exception as exception:  # pylint: disable=broad-except+
+        capture_exception(exception)
+        fail_conversion(shared_live_media, stamp)
 
-                video_storage.save(
-                    f"{prefix_destination}/{stamp}_{page+1}.svg", content_file
-                )
 
-            video_storage.save(f"{prefix_destination}/{stamp}.pdf", pdf_file)
+@app.task
+def convert_shared_live_media_pages(
+    shared_live_media_pk, stamp: str, nb_pages: int, chunk_size: int, first: int
+):
+    """Convert a chunk of the pages of a shared live media.
 
-        shared_live_media.process_pipeline = CELERY_PIPELINE
-        shared_live_media.save(update_fields=["process_pipeline"])
-        shared_live_media.update_upload_state(
-            READY, to_datetime(stamp), **{"nbPages": nb_pages, "extension": "pdf"}
-        )
+    Args:
+        shared_live_media_pk (UUID): The shared live media to convert.
+        stamp (str): The stamp at which the shared live media was uploaded.
+        nb_pages (int): The number of pages of the shared live media.
+        chunk_size (int): The number of pages of each chunk.
+        first (int): The first page of the chunk to convert, starting at 1.
+    """
+    shared_live_media = SharedLiveMedia.objects.get(pk=shared_live_media_pk)
+    try:
+        prefix_destination = shared_live_media.get_videos_storage_prefix(stamp)
+        chunks = get_chunks(nb_pages, chunk_size)
+        last = min(first + chunk_size - 1, nb_pages)
+
+        with open_local_copy(
+            f"{prefix_destination}/{stamp}.pdf"
+        ) as pdf_file, fitz.open(pdf_file.name) as pdf:
+            convert_pages(pdf, prefix_destination, stamp, first, last)
+
+        publish_pages(shared_live_media, stamp, chunks, first)
     except Exception as exception:  # pylint: disable=broad-except+
         capture_exception(exception)
-        shared_live_media.update_upload_state(ERROR, None)
+        fail_conversion(shared_live_media, stamp)
@@ -1,9 +1,12 @@
 """Celery thumbnail tasks for the core app."""
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
+import logging
 
+from django.conf import settings
 from django.core.files.base import ContentFile
 
-from PIL import Image
+from PIL import Image, features
 from sentry_sdk import capture_exception
 
 from marsha.celery_app import app
@@ -18,6 +21,67 @@ from marsha.core.storage.storage_class import video_storage
 from marsha.core.utils.time_utils import to_datetime
 
 
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZES = [1080, 720, 480, 240, 144]
+
+# Pillow format and file extension of the formats a thumbnail can be saved in
+THUMBNAIL_FORMATS = {"jpeg": ("JPEG", "jpg"), "webp": ("WEBP", "webp")}
+
+
+def get_thumbnail_formats():
+    """Return the formats thumbnails are saved in, JPEG first.
+
+    Extra formats listed in the THUMBNAIL_EXTRA_FORMATS setting are skipped if the
+    installed Pillow can not encode them.
+    """
+    formats = [THUMBNAIL_FORMATS["jpeg"]]
+    for name in settings.THUMBNAIL_EXTRA_FORMATS:
+        name = name.lower()
+        if name in THUMBNAIL_FORMATS and features.check(name):
+            formats.append(THUMBNAIL_FORMATS[name])
+        else:
+            logger.warning("Thumbnails can not be saved in %s format.", name)
+    return formats
+
+
+def generate_thumbnails(image, sizes):
+    """Resize an image to each size, from the largest to the smallest.
+
+    The image is decoded once: JPEG sources are decoded straight at the scale of the
+    largest size, and each size is derived from the previous, larger, one instead of
+    the source.
+
+    Parameters
+    ----------
+    image : PIL.Image.Image
+        The opened source image, not loaded yet.
+    sizes : List[int]
+        The maximum width and height of each thumbnail.
+
+    Yields
+    ------
+    Tuple[int, PIL.Image.Image]
+        Each size and the RGB image resized to fit in it.
+    """
+    sizes = sorted(sizes, reverse=True)
+    # Let the JPEG decoder downscale by a power of 2 if the source is large enough
+    image.draft("RGB", (sizes[0], sizes[0]))
+    # Remove transparency to be saved as JPEG
+    thumbnail = image.convert("RGB")
+    for size in sizes:
+        thumbnail = thumbnail.copy()
+        thumbnail.thumbnail((size, size))
+        yield size, thumbnail
+
+
+def save_thumbnail(thumbnail, path, image_format):
+    """Encode a thumbnail and save it to the videos storage."""
+    with BytesIO() as buffer:
+        thumbnail.save(buffer, image_format)
+        video_storage.save(path, ContentFile(buffer.getvalue()))
+
+
 @app.task
 def resize_thumbnails(thumbnail_pk, stamp: str):
     """Resize a thumbnail using video_storage.
@@ -33,24 +97,26 @@ def resize_thumbnails(thumbnail_pk, stamp: str):
             stamp, TMP_VIDEOS_STORAGE_BASE_DIRECTORY
         )
         prefix_destination = thumbnail.get_videos_storage_prefix(stamp)
-        sizes = [1080, 720, 480, 240, 144]
-
-        with video_storage.open(source, "rb") as img_file:
-            for size in sizes:
-                with Image.open(img_file) as img:
-                    # Remove transparency to be save as JPEG
-                    img = img.convert("RGB")
-
-                    # Resize the image
-                    img.thumbnail((size, size))
-
-                    # Save the resized image back to storage
-                    with BytesIO() as buffer:
-                        img.save(buffer, "JPEG")
-                        content_file = ContentFile(buffer.getvalue())
-                        video_storage.save(
-                            f"{prefix_destination}/{size}.jpg", content_file
-                        )
+        formats = get_thumbnail_formats()
+
+        with video_storage.open(source, "rb") as img_file, Image.open(
+            img_file
+        ) as img, ThreadPoolExecutor(
+            max_workers=settings.THUMBNAIL_UPLOAD_CONCURRENCY
+        ) as executor:
+            # Encode and upload each size while the next one is resized
+            uploads = [
+                executor.submit(
+                    save_thumbnail,
+                    resized,
+                    f"{prefix_destination}/{size}.{extension}",
+                    image_format,
+                )
+                for size, resized in generate_thumbnails(img, THUMBNAIL_SIZES)
+                for image_format, extension in formats
+            ]
+            for upload in uploads:
+                upload.result()
 
         thumbnail.process_pipeline = CELERY_PIPELINE
         thumbnail.save(update_fields=["process_pipeline"])
@@ -1,10 +1,26 @@
-"""Celery timed text track tasks for the core app."""
+"""Celery timed text track tasks for the core app.
+
+The source of a timed text track is copied once from the videos storage to a temporary
+file, hashing its content. Its format is sniffed from its beginning and formats made of
+independent cues (SRT, WebVTT) are converted by chunks of cues, so that large files are
+never parsed at once. Sources already converted, identified by the hash of their
+content, are not converted again.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import hashlib
 from html import escape, unescape
+import re
+import shutil
+import tempfile
 
-from django.core.files.base import ContentFile
+from django.core.cache import cache
+from django.core.files.base import ContentFile, File
 
 from pycaption import (
     CaptionNode,
+    CaptionReadError,
+    CaptionReadNoCaptions,
     DFXPReader,
     MicroDVDReader,
     SAMIReader,
@@ -12,7 +28,6 @@ from pycaption import (
     SRTReader,
     WebVTTReader,
     WebVTTWriter,
-    detect_format,
 )
 from sentry_sdk import capture_exception
 
@@ -21,6 +36,7 @@ from marsha.core.defaults import (
     CELERY_PIPELINE,
     ERROR,
     READY,
+    TIMED_TEXT_CONVERSION_KEY_CACHE,
     TMP_VIDEOS_STORAGE_BASE_DIRECTORY,
 )
 from marsha.core.models import TimedTextTrack
@@ -28,6 +44,17 @@ from marsha.core.storage.storage_class import video_storage
 from marsha.core.utils.time_utils import to_datetime
 
 
+# Number of characters read at the beginning of a source to detect its format
+SNIFF_SIZE = 4096
+# Number of cues converted at once for formats made of independent cues
+CONVERSION_CHUNK_SIZE = 1000
+# Time (in seconds) the conversion of a source is remembered, by the hash of its content
+CONVERSION_TIMEOUT = 7 * 86400  # 7 days
+
+# The root element of a DFXP document, pycaption looks for its closing tag instead
+DFXP_ROOT_REGEX = re.compile(r"<(\w+:)?tt[\s>]", re.IGNORECASE)
+
+
 class ReaderNotImplementedError(NotImplementedError):
     """Reader not implemented error."""
 
@@ -37,17 +64,22 @@ def _convert_timed_text_track_file(reader, timed_text_track_file):
     return WebVTTWriter().write(reader().read(timed_text_track_file))
 
 
-def _convert_transcript(reader, timed_text_reader):
-    """Transcript are directly injected in HTML, so we want to sanitize them
-    to avoid injecting unwanted HTML and then convert them into vtt."""
-
-    captions = reader().read(timed_text_reader)
+def _sanitize_captions(captions):
+    """Escape the HTML of the text of captions."""
     languages = captions.get_languages()
     for language in languages:
         for caption in captions.get_captions(language):
             for node in caption.nodes:
                 if node.type_ == CaptionNode.TEXT:
                     node.content = escape(unescape(node.content))
+
+
+def _convert_transcript(reader, timed_text_reader):
+    """Transcript are directly injected in HTML, so we want to sanitize them
+    to avoid injecting unwanted HTML and then convert them into vtt."""
+
+    captions = reader().read(timed_text_reader)
+    _sanitize_captions(captions)
     return WebVTTWriter().write(captions)
 
 
@@ -69,37 +101,176 @@ def _get_extension_from_reader(reader):
     raise ReaderNotImplementedError(f"Reader {reader} not supported")
 
 
+def sniff_format(prefix):
+    """Detect the format of a timed text track from the beginning of its content.
+
+    The readers are tried in the order of `pycaption.detect_format`, which expects
+    the whole content.
+    """
+    if DFXP_ROOT_REGEX.search(prefix):
+        return DFXPReader
+    for reader in (MicroDVDReader, WebVTTReader, SAMIReader, SRTReader, SCCReader):
+        try:
+            if reader().detect(prefix):
+                return reader
+        except IndexError:
+            # The content has less lines than the reader looks at
+            continue
+    return None
+
+
+def iter_cue_chunks(lines, chunk_size=CONVERSION_CHUNK_SIZE):
+    """Group the lines of a file made of cues separated by blank lines by chunks
+    of `chunk_size` cues. Chunks start at the first line of a cue."""
+    chunk, nb_cues = [], 0
+    for line in lines:
+        if line.strip():
+            chunk.append(line)
+        elif chunk and chunk[-1].strip():
+            # End of a cue, the blank lines following it are dropped
+            chunk.append(line)
+            nb_cues += 1
+            if nb_cues == chunk_size:
+                yield "".join(chunk)
+                chunk, nb_cues = [], 0
+    if chunk:
+        yield "".join(chunk)
+
+
+def convert_by_chunks(reader, chunks, transcript=False):
+    """Convert the chunks of a timed text track into a single vtt.
+
+    Each chunk is read and written on its own, which gives the same vtt as the
+    whole file for formats whose cues don't depend on each other.
+    """
+    header_length = len(WebVTTWriter.HEADER)
+    converted, last_start = [], 0
+    for chunk in chunks:
+        try:
+            captions = reader().read(chunk)
+        except CaptionReadNoCaptions:
+            continue
+
+        if reader is WebVTTReader:
+            # WebVTTReader checks cues are sorted inside a chunk, not across chunks
+            cues = captions.get_captions(captions.get_languages()[0])
+            if cues[0].start < last_start:
+                raise CaptionReadError(
+                    "Start timestamp is not greater than or equal"
+                    "to start timestamp of previous cue."
+                )
+            last_start = cues[-1].start
+
+        if transcript:
+            _sanitize_captions(captions)
+        converted.append(WebVTTWriter().write(captions)[header_length:])
+
+    if not converted:
+        raise CaptionReadNoCaptions("empty caption file")
+    return WebVTTWriter.HEADER + "\n".join(converted)
+
+
+@contextmanager
+def open_local_copy(path):
+    """Copy a timed text track of the videos storage to a temporary file.
+
+    Yields
+    ------
+    Tuple[file, str]
+        The temporary file, opened in binary mode, and the sha256 of its content.
+    """
+    sha256 = hashlib.sha256()
+    with tempfile.NamedTemporaryFile() as local_file:
+        with video_storage.open(path, "rb") as storage_file:
+            while block := storage_file.read(shutil.COPY_BUFSIZE):
+                sha256.update(block)
+                local_file.write(block)
+        local_file.flush()
+        local_file.seek(0)
+        yield local_file, sha256.hexdigest()
+
+
+def sniff_local_copy(local_file):
+    """Detect the format of the local copy of a timed text track from its beginning."""
+    prefix = local_file.read(SNIFF_SIZE).decode("utf-8-sig", errors="ignore")
+    local_file.seek(0)
+    reader = sniff_format(prefix)
+    if not reader:
+        raise ReaderNotImplementedError(f"Reader {reader} not supported")
+    return reader
+
+
+def convert(reader, local_file, transcript=False):
+    """Convert the local copy of a timed text track into a vtt."""
+    with open(local_file.name, encoding="utf-8-sig") as text_file:
+        if reader in (SRTReader, WebVTTReader):
+            return convert_by_chunks(reader, iter_cue_chunks(text_file), transcript)
+
+        # Other formats are documents, or cues depending on the previous ones
+        timed_text = text_file.read()
+        if transcript:
+            return _convert_transcript(reader, timed_text)
+        return _convert_timed_text_track_file(reader, timed_text)
+
+
+def save_vtt(reader, local_file, vtt_path, converted=None, transcript=False):
+    """Save the vtt of the local copy of a timed text track.
+
+    The vtt of a previous conversion of the same content, `converted`, is copied
+    instead of converting the timed text track again, as long as it exists.
+    """
+    if converted not in (None, vtt_path) and video_storage.exists(converted):
+        with video_storage.open(converted, "rb") as vtt_file:
+            video_storage.save(vtt_path, File(vtt_file))
+        return
+
+    video_storage.save(
+        vtt_path, ContentFile(convert(reader, local_file, transcript=transcript))
+    )
+
+
 @app.task
 def convert_timed_text_track(timed_text_track_pk, stamp):
-    """Convert a timed text track into a vtt using video_storage."""
+    """Convert a timed text track into a vtt using video_storage.
+
+    The source is uploaded while it is converted. A source whose content was already
+    converted in the same mode is not converted again, its vtt is copied.
+    """
     timed_text_track = TimedTextTrack.objects.get(pk=timed_text_track_pk)
     try:
         mode = timed_text_track.mode
-        source = timed_text_track.get_videos_storage_prefix(
-            stamp, TMP_VIDEOS_STORAGE_BASE_DIRECTORY
-        )
         prefix_destination = timed_text_track.get_videos_storage_prefix(stamp)
+        vtt_path = f"{prefix_destination}/{stamp}.vtt"
 
-        with video_storage.open(source, "rt") as timed_text_file:
-            timed_text = timed_text_file.read()
-            reader = detect_format(timed_text)
-            if not reader:
-                raise ReaderNotImplementedError(f"Reader {reader} not supported")
+        with open_local_copy(
+            timed_text_track.get_videos_storage_prefix(
+                stamp, TMP_VIDEOS_STORAGE_BASE_DIRECTORY
+            )
+        ) as (local_file, sha256):
+            reader = sniff_local_copy(local_file)
             extension = _get_extension_from_reader(reader)
+            cache_key = f"{TIMED_TEXT_CONVERSION_KEY_CACHE}{sha256}:{mode}"
 
-            if mode in ("st", "cc"):
-                vtt_timed_text = _convert_timed_text_track_file(reader, timed_text)
-            else:
-                vtt_timed_text = _convert_transcript(reader, timed_text)
-
-            video_storage.save(
-                f"{prefix_destination}/{stamp}.vtt",
-                ContentFile(vtt_timed_text),
-            )
-            video_storage.save(
-                f"{prefix_destination}/source.{extension}", timed_text_file
-            )
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                uploads = [
+                    executor.submit(
+                        video_storage.save,
+                        f"{prefix_destination}/source.{extension}",
+                        File(local_file),
+                    ),
+                    executor.submit(
+                        save_vtt,
+                        reader,
+                        local_file,
+                        vtt_path,
+                        converted=cache.get(cache_key),
+                        transcript=mode not in ("st", "cc"),
+                    ),
+                ]
+                for upload in uploads:
+                    upload.result()
 
+        cache.set(cache_key, vtt_path, CONVERSION_TIMEOUT)
         timed_text_track.process_pipeline = CELERY_PIPELINE
         timed_text_track.save(update_fields=["process_pipeline"])
         timed_text_track.update_upload_state(
@@ -1,12 +1,15 @@
 """Celery videos tasks for the core app."""
 
 
+from django.conf import settings
+
 from django_peertube_runner_connector.transcode import transcode_video
 from sentry_sdk import capture_exception
 
 from marsha.celery_app import app
 from marsha.core.defaults import ERROR, TMP_VIDEOS_STORAGE_BASE_DIRECTORY
 from marsha.core.models.video import Video
+from marsha.core.services import transcode_pipeline
 
 
 @app.task
@@ -32,3 +35,27 @@ def launch_video_transcoding(video_pk: str, stamp: str, domain: str):
     except Exception as exception:  # pylint: disable=broad-except+
         capture_exception(exception)
         video.update_upload_state(ERROR, None)
+
+
+def schedule_transcode_pipeline_backfill(video_pk):
+    """Schedule the recovery of the transcode pipeline of a video, unless one is pending.
+
+    Args:
+        video_pk (UUID): The video missing its transcode pipeline.
+    """
+    if transcode_pipeline.claim_backfill(video_pk):
+        backfill_transcode_pipelines.apply_async(
+            args=[[str(video_pk)]],
+            countdown=settings.TRANSCODE_PIPELINE_BACKFILL_DELAY,
+        )
+
+
+@app.task
+def backfill_transcode_pipelines(video_pks=None):
+    """Save the transcode pipeline of videos uploaded before it was recorded.
+
+    Args:
+        video_pks (list): The videos to recover, all the videos missing their
+        transcode pipeline if not set.
+    """
+    transcode_pipeline.backfill_transcode_pipelines(video_ids=video_pks)
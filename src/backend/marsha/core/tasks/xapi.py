@@ -0,0 +1,116 @@
+"""Celery xAPI tasks for the core app."""
+import logging
+
+from django.conf import settings
+
+import requests
+
+from marsha.celery_app import app
+from marsha.core.services import xapi_delivery
+
+
+logger = logging.getLogger(__name__)
+
+
+def schedule_xapi_delivery(destination):
+    """Schedule the delivery of the statements enqueued for a LRS, unless one is pending.
+
+    Args:
+        destination (str): The destination returned by `xapi_delivery.get_destination`.
+    """
+    if xapi_delivery.claim_delivery(destination):
+        deliver_xapi_statements.apply_async(
+            args=[destination], countdown=settings.XAPI_DELIVERY_DELAY
+        )
+
+
+@app.task
+def deliver_xapi_statements(destination):
+    """Post the statements enqueued for a LRS, in batches.
+
+    Args:
+        destination (str): The destination returned by `xapi_delivery.get_destination`.
+    """
+    # Statements received from now on must schedule a new delivery
+    xapi_delivery.release_delivery(destination)
+
+    for entries in xapi_delivery.consume_batches(
+        destination, settings.XAPI_DELIVERY_BATCH_SIZE
+    ):
+        # Delivered, scheduled for a retry or dead-lettered, the batch is acknowledged
+        send_xapi_statements(destination, entries)
+
+    if xapi_delivery.has_pending_statements(destination):
+        # Make sure the remaining statements get delivered even if no other is received
+        schedule_xapi_delivery(destination)
+
+
+def _is_transient(error):
+    """Return True if the LRS may accept statements it failed to receive or process."""
+    if isinstance(
+        error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    ):
+        return True
+    return error.response is not None and (
+        error.response.status_code >= 500 or error.response.status_code == 429
+    )
+
+
+@app.task
+def send_xapi_statements(destination, entries, attempt=1):
+    """Post a batch of statements to a LRS, retrying with an exponential backoff.
+
+    Only the batches that could not reach the LRS or that it failed to process are
+    retried. A batch rejected as invalid is split in two halves sent right away, until
+    the invalid statements are isolated and dead-lettered.
+
+    Args:
+        destination (str): The destination returned by `xapi_delivery.get_destination`.
+        entries (list): The queued entries holding the statements to send.
+        attempt (int): The number of this attempt, starting at 1.
+    """
+    lrs = xapi_delivery.get_lrs(destination)
+    if lrs is None:
+        logger.critical(
+            "Impossible to send %d xAPI statements, the LRS of %s is not configured.",
+            len(entries),
+            destination,
+        )
+        xapi_delivery.dead_letter(
+            destination, None, entries, attempts=attempt, error="LRS not configured"
+        )
+        return
+
+    try:
+        xapi_delivery.deliver(*lrs, entries)
+    except requests.exceptions.RequestException as error:
+        if (
+            error.response is not None
+            and error.response.status_code == 400
+            and len(entries) > 1
+        ):
+            middle = len(entries) // 2
+            send_xapi_statements(destination, entries[:middle], attempt)
+            send_xapi_statements(destination, entries[middle:], attempt)
+            return
+
+        if _is_transient(error) and attempt <= settings.XAPI_DELIVERY_MAX_RETRIES:
+            send_xapi_statements.apply_async(
+                args=[destination, entries, attempt + 1],
+                countdown=settings.XAPI_DELIVERY_RETRY_BACKOFF * 2 ** (attempt - 1),
+            )
+            return
+
+        logger.critical(
+            "Impossible to send %d xAPI statements to LRS %s.",
+            len(entries),
+            lrs[0],
+            extra={"attempts": attempt},
+        )
+        xapi_delivery.dead_letter(
+            destination,
+            lrs[0],
+            entries,
+            attempts=attempt,
+            error=error.response.text if error.response is not None else str(error),
+        )
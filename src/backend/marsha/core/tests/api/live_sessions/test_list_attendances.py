@@ -6,7 +6,6 @@ from unittest import mock
 import uuid
 
 from django.conf import settings
-from django.core.cache import cache
 from django.test import override_settings
 from django.utils import timezone
 
@@ -981,7 +980,7 @@ class LiveSessionListAttendancesApiTest(LiveSessionApiTestCase):
     def test_api_livesession_reset_cache(
         self,
     ):
-        """If a video stopped goes running again, keys with no timeout must be dropped"""
+        """If a video stopped goes running again, keys with a longer timeout must be dropped"""
         # set the start at current time minus 30 seconds
         started = int(to_timestamp(timezone.now())) - 30
 
@@ -1041,7 +1040,6 @@ class LiveSessionListAttendancesApiTest(LiveSessionApiTestCase):
         )
         livesession.refresh_from_db()
         livesession_public.refresh_from_db()
-        prefix_key = f"attendances:video:{video.id}"
 
         with self.assertNumQueries(3):
             response = self.client.get(
@@ -1049,27 +1047,23 @@ class LiveSessionListAttendancesApiTest(LiveSessionApiTestCase):
                 HTTP_AUTHORIZATION=f"Bearer {jwt_token}",
             )
             response_json = response.json()
-            cache_key = f"{prefix_key}offset:Nonelimit:99"
             self.assertEqual(response.status_code, 200)
-            self.assertEqual(cache.get(prefix_key), [cache_key])
 
-        # two queries are cached with no timeout
+        # two queries are cached with a longer timeout
         # results are identical as it is cached, no queries are executed
         with self.assertNumQueries(3):
             response = self.client.get(
                 f"{self._get_url(video)}?limit=1&offset=1",
                 HTTP_AUTHORIZATION=f"Bearer {jwt_token}",
             )
-            cache_key_offset = f"{prefix_key}offset:1limit:1"
 
             response_offset_1 = response.json()
             self.assertEqual(response.status_code, 200)
             self.assertNotEqual(response_json, response_offset_1)
-            self.assertEqual(cache.get(prefix_key), [cache_key, cache_key_offset])
 
         # go over the cache limit, the two queries are cached
         new_time = timezone.now() + timedelta(
-            settings.VIDEO_ATTENDANCES_CACHE_DURATION + 1
+            seconds=settings.VIDEO_ATTENDANCES_CACHE_DURATION + 1
         )
         with mock.patch.object(
             timezone, "now", return_value=new_time
@@ -1124,8 +1118,6 @@ class LiveSessionListAttendancesApiTest(LiveSessionApiTestCase):
             )
 
         self.assertEqual(response.status_code, 200)
-        # listing of key are deleted
-        self.assertEqual(cache.get(prefix_key, []), [])
 
     @override_settings(ATTENDANCE_POINTS=3)
     @override_settings(VIDEO_ATTENDANCES_CACHE_DURATION=2)
@@ -1234,11 +1226,12 @@ class LiveSessionListAttendancesApiTest(LiveSessionApiTestCase):
     )
     @override_settings(ATTENDANCE_POINTS=3)
     @override_settings(VIDEO_ATTENDANCES_CACHE_DURATION=1)
-    def test_api_livesession_video_ended_cache_no_timeout(
+    @override_settings(VIDEO_ATTENDANCES_STOPPED_CACHE_DURATION=10)
+    def test_api_livesession_video_ended_cache_longer_timeout(
         self,
     ):
-        """If the video has ended, we control that the results are cached and
-        there is no timeout for the cache.
+        """If the video has ended, we control that the results are cached
+        longer, until VIDEO_ATTENDANCES_STOPPED_CACHE_DURATION.
         """
         started = int(to_timestamp(timezone.now())) - 1000
 
@@ -1292,12 +1285,12 @@ class LiveSessionListAttendancesApiTest(LiveSessionApiTestCase):
 
         # go over the cache limit
         new_time = timezone.now() + timedelta(
-            settings.VIDEO_ATTENDANCES_CACHE_DURATION + 1
+            seconds=settings.VIDEO_ATTENDANCES_CACHE_DURATION + 1
         )
         with mock.patch.object(
             timezone, "now", return_value=new_time
         ), mock.patch.object(time, "time", return_value=int(to_timestamp(new_time))):
-            # cache has no timeout
+            # cache has a longer timeout
             with self.assertNumQueries(0):
                 response = self.client.get(
                     self._get_url(video),
@@ -1307,6 +1300,21 @@ class LiveSessionListAttendancesApiTest(LiveSessionApiTestCase):
                 self.assertEqual(response.status_code, 200)
                 self.assertEqual(response.json(), response_json)
 
+        # go over the cache limit of stopped videos
+        new_time = timezone.now() + timedelta(
+            seconds=settings.VIDEO_ATTENDANCES_STOPPED_CACHE_DURATION + 1
+        )
+        with mock.patch.object(
+            timezone, "now", return_value=new_time
+        ), mock.patch.object(time, "time", return_value=int(to_timestamp(new_time))):
+            with self.assertNumQueries(3):
+                response = self.client.get(
+                    self._get_url(video),
+                    HTTP_AUTHORIZATION=f"Bearer {jwt_token}",
+                )
+
+                self.assertEqual(response.status_code, 200)
+
     @override_settings(ATTENDANCE_POINTS=3)
     def test_api_livesession_read_attendances_same_keys(
         self,
@@ -0,0 +1,247 @@
+"""Tests for the livesession push_attendance API with the write-behind ingestion."""
+from unittest import mock
+import uuid
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from marsha.core.factories import (
+    AnonymousLiveSessionFactory,
+    LiveSessionFactory,
+    UserFactory,
+    VideoFactory,
+)
+from marsha.core.models import LiveSession
+from marsha.core.services import live_attendance
+from marsha.core.simple_jwt.factories import (
+    LTIPlaylistAccessTokenFactory,
+    PlaylistAccessTokenFactory,
+    UserAccessTokenFactory,
+)
+from marsha.core.tests.api.live_sessions.base import LiveSessionApiTestCase
+
+
+@override_settings(ATTENDANCE_WRITE_BEHIND_ENABLED=True)
+@mock.patch("marsha.core.tasks.live_session.flush_live_attendances.apply_async")
+class LiveSessionPushAttendanceWriteBehindApiTest(LiveSessionApiTestCase):
+    """Test the push_attendance API of the liveSession object with write-behind."""
+
+    def _post_url(self, video, anonymous_id=None):
+        """Return the url to use in tests."""
+        url = f"/api/videos/{video.pk}/livesessions/push_attendance/"
+        if anonymous_id:
+            url = f"{url}?anonymous_id={anonymous_id}"
+        return url
+
+    def _push(self, url, jwt_token, attendance, language="fr"):
+        """Push an attendance beat."""
+        return self.client.post(
+            url,
+            {"live_attendance": attendance, "language": language},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {jwt_token}",
+        )
+
+    def test_push_attendance_write_behind_token_lti(self, mock_apply_async):
+        """The first beat is written, the next ones are buffered and flushed later."""
+        video = VideoFactory()
+        livesession = LiveSessionFactory(
+            consumer_site=video.playlist.consumer_site,
+            email=None,
+            live_attendance={"1": {"sound": "OFF"}},
+            lti_user_id="56255f3807599c377bf0e5bf072359fd",
+            lti_id="Maths",
+            video=video,
+        )
+        jwt_token = LTIPlaylistAccessTokenFactory(
+            playlist=video.playlist,
+            context_id=livesession.lti_id,
+            consumer_site=str(video.playlist.consumer_site.id),
+            user__email="sarah@test-fun-mooc.fr",
+            user__id=livesession.lti_user_id,
+            user__username="Sarah",
+        )
+
+        response = self._push(self._post_url(video), jwt_token, {"2": {"sound": "ON"}})
+        self.assertEqual(response.status_code, 200)
+        livesession.refresh_from_db()
+        self.assertEqual(
+            livesession.live_attendance,
+            {"1": {"sound": "OFF"}, "2": {"sound": "ON"}},
+        )
+        mock_apply_async.assert_not_called()
+
+        with self.assertNumQueries(0):
+            response = self._push(
+                self._post_url(video), jwt_token, {"3": {"sound": "ON"}}, "en"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                "anonymous_id": None,
+                "consumer_site": str(video.playlist.consumer_site_id),
+                "display_name": None,
+                "email": "sarah@test-fun-mooc.fr",
+                "id": str(livesession.id),
+                "is_registered": False,
+                "language": "en",
+                "live_attendance": {
+                    "1": {"sound": "OFF"},
+                    "2": {"sound": "ON"},
+                    "3": {"sound": "ON"},
+                },
+                "lti_id": "Maths",
+                "lti_user_id": "56255f3807599c377bf0e5bf072359fd",
+                "should_send_reminders": True,
+                "username": "Sarah",
+                "video": str(video.id),
+            },
+        )
+        mock_apply_async.assert_called_once_with(args=[str(video.id)], countdown=60)
+
+        # Nothing has been written yet
+        livesession.refresh_from_db()
+        self.assertEqual(livesession.language, "fr")
+        self.assertNotIn("3", livesession.live_attendance)
+
+        # The first flush closes the generation, the second one folds it
+        self.assertEqual(live_attendance.flush(video.id), 0)
+        self.assertEqual(live_attendance.flush(video.id), 1)
+
+        livesession.refresh_from_db()
+        self.assertEqual(livesession.language, "en")
+        self.assertEqual(
+            livesession.live_attendance,
+            {"1": {"sound": "OFF"}, "2": {"sound": "ON"}, "3": {"sound": "ON"}},
+        )
+
+    def test_push_attendance_write_behind_token_public(self, mock_apply_async):
+        """Anonymous viewers are identified by their anonymous_id."""
+        livesession = AnonymousLiveSessionFactory(email=None, is_registered=False)
+        video = livesession.video
+        jwt_token = PlaylistAccessTokenFactory(playlist=video.playlist)
+        url = self._post_url(video, livesession.anonymous_id)
+
+        self._push(url, jwt_token, {"1": {"sound": "ON"}})
+        with self.assertNumQueries(0):
+            response = self._push(url, jwt_token, {"2": {"sound": "ON"}})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["id"], str(livesession.id))
+        mock_apply_async.assert_called_once()
+
+        live_attendance.flush(video.id)
+        live_attendance.flush(video.id)
+        livesession.refresh_from_db()
+        self.assertEqual(
+            livesession.live_attendance,
+            {"1": {"sound": "ON"}, "2": {"sound": "ON"}},
+        )
+
+    def test_push_attendance_write_behind_token_public_unknown_anonymous_id(
+        self, mock_apply_async
+    ):
+        """A beat from a new anonymous viewer creates its live session."""
+        video = VideoFactory()
+        jwt_token = PlaylistAccessTokenFactory(playlist=video.playlist)
+
+        response = self._push(
+            self._post_url(video, uuid.uuid4()), jwt_token, {"1": {"sound": "ON"}}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(LiveSession.objects.count(), 1)
+        mock_apply_async.assert_not_called()
+
+    def test_push_attendance_write_behind_token_public_missing_anonymous_id(
+        self, mock_apply_async
+    ):
+        """The anonymous_id is still mandatory for public tokens."""
+        video = VideoFactory()
+        jwt_token = PlaylistAccessTokenFactory(playlist=video.playlist)
+
+        response = self._push(self._post_url(video), jwt_token, {"1": {}})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"detail": "anonymous_id is missing"})
+        mock_apply_async.assert_not_called()
+
+    def test_push_attendance_write_behind_token_user(self, mock_apply_async):
+        """Standalone users are identified by their user id."""
+        user = UserFactory()
+        video = VideoFactory()
+        livesession = LiveSessionFactory(
+            user=user, video=video, consumer_site=None, lti_id=None, lti_user_id=None
+        )
+        jwt_token = UserAccessTokenFactory(user=user)
+
+        with mock.patch(
+            "marsha.core.permissions.PlaylistIsAuthenticated.has_permission",
+            return_value=True,
+        ):
+            self._push(self._post_url(video), jwt_token, {"1": {"sound": "ON"}})
+            response = self._push(
+                self._post_url(video), jwt_token, {"2": {"sound": "ON"}}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["id"], str(livesession.id))
+        self.assertEqual(
+            response.json()["live_attendance"],
+            {"1": {"sound": "ON"}, "2": {"sound": "ON"}},
+        )
+        mock_apply_async.assert_called_once()
+
+    def test_push_attendance_write_behind_snapshot_forgotten_on_save(
+        self, mock_apply_async
+    ):
+        """Saving the live session elsewhere forces the next beat to read the database."""
+        livesession = AnonymousLiveSessionFactory(email=None, is_registered=False)
+        video = livesession.video
+        jwt_token = PlaylistAccessTokenFactory(playlist=video.playlist)
+        url = self._post_url(video, livesession.anonymous_id)
+
+        self._push(url, jwt_token, {"1": {"sound": "ON"}})
+        livesession.refresh_from_db()
+        livesession.display_name = "Samia"
+        livesession.save()
+
+        response = self._push(url, jwt_token, {"2": {"sound": "ON"}})
+
+        self.assertEqual(response.json()["display_name"], "Samia")
+        mock_apply_async.assert_not_called()
+
+    def test_push_attendance_write_behind_rows_written(self, mock_apply_async):
+        """Each live session row is written once per flush instead of once per beat."""
+        video = VideoFactory()
+        jwt_token = PlaylistAccessTokenFactory(playlist=video.playlist)
+        anonymous_ids = [uuid.uuid4() for _ in range(5)]
+
+        with CaptureQueriesContext(connection) as queries:
+            for beat in range(4):
+                for anonymous_id in anonymous_ids:
+                    self._push(
+                        self._post_url(video, anonymous_id),
+                        jwt_token,
+                        {str(beat): {"sound": "ON"}},
+                    )
+            live_attendance.flush(video.id)
+            live_attendance.flush(video.id)
+
+        writes = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith(('INSERT INTO "live_session"', "UPDATE"))
+        ]
+        # The first beat of each viewer creates and saves its live session, the 15
+        # following ones are folded by a single batched UPDATE.
+        self.assertEqual(len(writes), 11)
+        mock_apply_async.assert_called_once()
+        for livesession in LiveSession.objects.all():
+            self.assertEqual(
+                livesession.live_attendance,
+                {str(beat): {"sound": "ON"} for beat in range(4)},
+            )
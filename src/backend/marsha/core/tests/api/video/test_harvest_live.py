@@ -91,7 +91,7 @@ class VideoHarvestLiveAPITest(TestCase):
             mock_delete_aws_element_stack.assert_called_once()
             mock_create_mediapackage_harvest_job.assert_called_once()
             mock_dispatch_video_to_groups.assert_has_calls(
-                [mock.call(video), mock.call(video)]
+                [mock.call(video, coalesce=False), mock.call(video)]
             )
 
         self.assertEqual(response.status_code, 200)
@@ -307,7 +307,7 @@ class VideoHarvestLiveAPITest(TestCase):
             mock_create_mediapackage_harvest_job.assert_called_once()
             mock_close_room.assert_called_once_with(video.id)
             mock_dispatch_video_to_groups.assert_has_calls(
-                [mock.call(video), mock.call(video)]
+                [mock.call(video, coalesce=False), mock.call(video)]
             )
 
         self.assertEqual(response.status_code, 200)
@@ -522,7 +522,7 @@ class VideoHarvestLiveAPITest(TestCase):
             mock_create_mediapackage_harvest_job.assert_called_once()
             mock_delete_mediapackage_channel.assert_called_once()
             mock_dispatch_video_to_groups.assert_has_calls(
-                [mock.call(video), mock.call(video)]
+                [mock.call(video, coalesce=False), mock.call(video)]
             )
 
         self.assertEqual(response.status_code, 200)
@@ -0,0 +1 @@
+"""Benchmarks for the ``core`` app of the Marsha project."""
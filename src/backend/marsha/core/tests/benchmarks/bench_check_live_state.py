@@ -0,0 +1,80 @@
+"""Benchmark the check of the running lives.
+
+Run it with ``bin/pytest marsha/core/tests/benchmarks/bench_check_live_state.py -s``.
+"""
+from io import StringIO
+from time import perf_counter
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from marsha.core.defaults import RAW, RUNNING
+from marsha.core.factories import VideoFactory
+from marsha.core.management.commands import check_live_state
+from marsha.core.tests.utils.logs_client import LogsClientStandIn
+
+
+NB_LIVES = 40
+NB_EVENTS = 150
+# Time taken by cloudwatch to return a page of events
+LATENCY = 0.05
+
+
+class CheckLiveStateBenchmark(TestCase):
+    """Compare the lives checked per second, one at a time or concurrently."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create running lives, each one with alerts logged on 3 pages."""
+        cls.log_groups = {}
+        for index in range(NB_LIVES):
+            log_group_name = f"/aws/lambda/live-{index}"
+            VideoFactory(
+                live_state=RUNNING,
+                live_info={
+                    "cloudwatch": {"logGroupName": log_group_name},
+                    "medialive": {
+                        "channel": {"arn": "medialive:channel:arn", "id": index}
+                    },
+                    "started_at": "1598313600",
+                },
+                live_type=RAW,
+            )
+            cls.log_groups[log_group_name] = [
+                {
+                    "eventId": str(event),
+                    "timestamp": 1598313600000 + event,
+                    "message": (
+                        "2020-08-24T12:19:38.401Z\tid\tINFO\tReceived event: "
+                        '{"time":"2020-08-25T12:00:00Z","detail":'
+                        f'{{"alarm_state":"{"SET" if event % 2 else "CLEARED"}",'
+                        f'"pipeline":"{event % 4 // 2}"}}}}'
+                    ),
+                }
+                for event in range(1, NB_EVENTS + 1)
+            ]
+
+    def _run(self, label):
+        """Check the lives and print the lives checked per second."""
+        logs_client = LogsClientStandIn(self.log_groups, page_size=50, latency=LATENCY)
+        with mock.patch.object(
+            check_live_state, "get_logs_client", return_value=logs_client
+        ):
+            start = perf_counter()
+            call_command("check_live_state", stdout=StringIO())
+            elapsed = perf_counter() - start
+        print(
+            f"\n{label}: {NB_LIVES / elapsed:.1f} lives per second, "
+            f"{len(logs_client.calls)} pages read"
+        )
+
+    def test_bench_check_live_state(self):
+        """Lives checked per second one at a time, concurrently, then incrementally."""
+        cache.clear()
+        with self.settings(CHECK_LIVE_STATE_CONCURRENCY=1):
+            self._run("one at a time")
+        cache.clear()
+        self._run("concurrently")
+        self._run("concurrently, reading new events only")
@@ -0,0 +1,75 @@
+"""Benchmark the signature of CloudFront urls.
+
+Run it with ``bin/pytest marsha/core/tests/benchmarks/bench_cloudfront_signer.py -s``.
+"""
+from datetime import timedelta
+import os
+import tempfile
+from time import perf_counter
+
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from marsha.core.utils import cloudfront_utils
+
+
+SIGNATURES = 200
+
+
+class CloudfrontSignerBenchmark(SimpleTestCase):
+    """Compare signatures per second with and without the cached signer."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Write a 2048 bits private key, the size used with CloudFront."""
+        super().setUpClass()
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        with tempfile.NamedTemporaryFile(delete=False) as key_file:
+            key_file.write(
+                private_key.private_bytes(
+                    serialization.Encoding.PEM,
+                    serialization.PrivateFormat.TraditionalOpenSSL,
+                    serialization.NoEncryption(),
+                )
+            )
+        cls.key_path = key_file.name
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the private key."""
+        os.remove(cls.key_path)
+        super().tearDownClass()
+
+    def _report(self, label, elapsed):
+        """Print the benchmark results."""
+        print(f"\n{label}: {SIGNATURES / elapsed:.0f} signatures per second")
+
+    def test_bench_cloudfront_signer(self):
+        """Signatures per second reloading the key each time and with the cached signer."""
+        urls = [
+            f"https://abc.cloudfront.net/{index}.svg" for index in range(SIGNATURES)
+        ]
+        date_less_than = timezone.now() + timedelta(hours=2)
+
+        with override_settings(
+            CLOUDFRONT_PRIVATE_KEY_PATH=self.key_path,
+            CLOUDFRONT_SIGNED_PUBLIC_KEY_ID="key-id",
+        ):
+            start = perf_counter()
+            for url in urls:
+                # reading and parsing the key for every signature, as before
+                cloudfront_utils._signers.clear()  # pylint: disable=protected-access
+                cloudfront_utils.get_cloudfront_signer().generate_presigned_url(
+                    url, date_less_than=date_less_than
+                )
+            self._report("key loaded per signature", perf_counter() - start)
+
+            start = perf_counter()
+            for url in urls:
+                cloudfront_utils.get_cloudfront_signer().generate_presigned_url(
+                    url, date_less_than=date_less_than
+                )
+            self._report("cached signer", perf_counter() - start)
@@ -0,0 +1,149 @@
+"""Benchmark the conversion of timed text tracks.
+
+Run it with ``bin/pytest marsha/core/tests/benchmarks/bench_convert_timed_text_tracks.py -s``.
+"""
+import time
+from time import perf_counter
+import tracemalloc
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import TestCase
+
+from pycaption import DFXPWriter, SCCWriter, SRTReader, WebVTTWriter, detect_format
+
+from marsha.core.defaults import TMP_VIDEOS_STORAGE_BASE_DIRECTORY
+from marsha.core.factories import TimedTextTrackFactory
+from marsha.core.storage.storage_class import video_storage
+from marsha.core.tasks import timed_text_track as timed_text_track_tasks
+
+
+STAMP = "1640995200"
+# Number of cues of a 3 hours lecture
+NB_CUES = 5000
+# Time taken by the videos storage to save a file, as an object storage would
+UPLOAD_LATENCY = 0.02
+
+
+def _srt(nb_cues):
+    """Return an SRT with a cue every 2 seconds."""
+    return "".join(
+        f"{index}\n"
+        f"{index * 2 // 3600:02}:{index * 2 // 60 % 60:02}:{index * 2 % 60:02},000 --> "
+        f"{index * 2 // 3600:02}:{index * 2 // 60 % 60:02}:{index * 2 % 60:02},900\n"
+        f"This is the cue number {index} of the lecture,\n"
+        "spoken by the teacher.\n\n"
+        for index in range(1, nb_cues + 1)
+    )
+
+
+# pylint: disable=protected-access
+def _legacy_convert_timed_text_track(timed_text_track_pk, stamp):
+    """Read the whole source, detect its format over the whole text, convert it,
+    then upload the vtt and the source one after the other."""
+    timed_text_track = timed_text_track_tasks.TimedTextTrack.objects.get(
+        pk=timed_text_track_pk
+    )
+    source = timed_text_track.get_videos_storage_prefix(
+        stamp, TMP_VIDEOS_STORAGE_BASE_DIRECTORY
+    )
+    prefix_destination = timed_text_track.get_videos_storage_prefix(stamp)
+    with video_storage.open(source, "rt") as timed_text_file:
+        timed_text = timed_text_file.read()
+        reader = detect_format(timed_text)
+        extension = timed_text_track_tasks._get_extension_from_reader(reader)
+        vtt_timed_text = timed_text_track_tasks._convert_timed_text_track_file(
+            reader, timed_text
+        )
+        video_storage.save(
+            f"{prefix_destination}/{stamp}.vtt", ContentFile(vtt_timed_text)
+        )
+        video_storage.save(f"{prefix_destination}/source.{extension}", timed_text_file)
+
+
+class ConvertTimedTextTracksBenchmark(TestCase):
+    """Compare the throughput and memory of the conversion of large timed text tracks."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Upload a large timed text track in each format."""
+        srt = _srt(NB_CUES)
+        captions = SRTReader().read(srt)
+        cls.samples = {
+            "SRT": srt,
+            "WebVTT": WebVTTWriter().write(captions),
+            "DFXP": DFXPWriter().write(captions),
+            "SCC": SCCWriter().write(SRTReader().read(_srt(NB_CUES // 5))),
+        }
+        cls.tracks = {}
+        for label, content in cls.samples.items():
+            timed_text_track = TimedTextTrackFactory(mode="st")
+            video_storage.save(
+                timed_text_track.get_videos_storage_prefix(
+                    STAMP, TMP_VIDEOS_STORAGE_BASE_DIRECTORY
+                ),
+                ContentFile(content.encode("utf-8")),
+            )
+            cls.tracks[label] = timed_text_track
+
+    def _run(self, label, convert, timed_text_track, size):
+        """Convert a timed text track and print the throughput and the memory peak."""
+        original_save = video_storage.save
+
+        def slow_save(*args, **kwargs):
+            time.sleep(UPLOAD_LATENCY)
+            return original_save(*args, **kwargs)
+
+        with mock.patch.object(video_storage, "save", side_effect=slow_save):
+            start = perf_counter()
+            convert(str(timed_text_track.pk), STAMP)
+            elapsed = perf_counter() - start
+
+            cache.clear()
+            tracemalloc.start()
+            convert(str(timed_text_track.pk), STAMP)
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        print(
+            f"\n{label}: {size / 2**20 / elapsed:.2f} MB per second, "
+            f"{peak / 2**20:.0f} MB peak memory"
+        )
+
+    def test_bench_convert_timed_text_tracks(self):
+        """Throughput and memory peak, converting the whole text or by chunks."""
+        for label, timed_text_track in self.tracks.items():
+            size = len(self.samples[label].encode("utf-8"))
+            cache.clear()
+            self._run(
+                f"{label} ({size / 2**20:.1f} MB), whole text",
+                _legacy_convert_timed_text_track,
+                timed_text_track,
+                size,
+            )
+            cache.clear()
+            self._run(
+                f"{label} ({size / 2**20:.1f} MB), sniffed and by chunks",
+                timed_text_track_tasks.convert_timed_text_track,
+                timed_text_track,
+                size,
+            )
+
+        # The same content uploaded again is not converted again
+        timed_text_track = self.tracks["SRT"]
+        size = len(self.samples["SRT"].encode("utf-8"))
+        video_storage.save(
+            timed_text_track.get_videos_storage_prefix(
+                "1640995201", TMP_VIDEOS_STORAGE_BASE_DIRECTORY
+            ),
+            ContentFile(self.samples["SRT"].encode("utf-8")),
+        )
+        timed_text_track_tasks.convert_timed_text_track(str(timed_text_track.pk), STAMP)
+        start = perf_counter()
+        timed_text_track_tasks.convert_timed_text_track(
+            str(timed_text_track.pk), "1640995201"
+        )
+        print(
+            f"\nSRT already converted: "
+            f"{size / 2**20 / (perf_counter() - start):.2f} MB per second"
+        )
@@ -0,0 +1,89 @@
+"""Benchmark the computation of attendance timelines when listing attendances.
+
+Run it with ``bin/pytest marsha/core/tests/benchmarks/bench_list_attendances.py -s``.
+"""
+from time import perf_counter
+import uuid
+
+from django.test import TestCase, override_settings
+
+from marsha.core.defaults import JITSI, STOPPED
+from marsha.core.factories import VideoFactory
+from marsha.core.models import LiveSession
+from marsha.core.serializers import LiveAttendanceGraphSerializer
+from marsha.core.services.live_attendance_timeline import get_attendance_timelines
+
+
+SESSIONS = 10000
+STARTED = 1620800000
+# The default local memory cache culls its entries above 300 keys, Redis does not
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 100000},
+    },
+}
+
+
+@override_settings(CACHES=CACHES)
+class ListAttendancesBenchmark(TestCase):
+    """Compare the serialization of attendances with and without precomputed rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a one hour webinar with SESSIONS viewers sending a beat per minute."""
+        super().setUpTestData()
+        cls.video = VideoFactory(
+            live_state=STOPPED,
+            live_info={"started_at": str(STARTED), "stopped_at": str(STARTED + 3600)},
+            live_type=JITSI,
+        )
+        LiveSession.objects.bulk_create(
+            [
+                LiveSession(
+                    anonymous_id=uuid.uuid4(),
+                    email=f"user{index}@fun-mooc.fr",
+                    is_registered=True,
+                    live_attendance={
+                        str(STARTED + minute * 60 + index % 60): {"muted": False}
+                        for minute in range(index % 60)
+                    },
+                    video=cls.video,
+                )
+                for index in range(SESSIONS)
+            ],
+            batch_size=1000,
+        )
+
+    def _serialize(self, precomputed):
+        """Serialize all the live sessions of the video, return the elapsed time."""
+        livesessions = list(
+            LiveSession.objects.select_related("video").filter(video=self.video)
+        )
+        start = perf_counter()
+        context = {}
+        if precomputed:
+            video_timestamps = self.video.get_list_timestamps_attendances()
+            context = {
+                "attendance_timelines": get_attendance_timelines(
+                    self.video.pk, video_timestamps, livesessions
+                ),
+                "video_timestamps": video_timestamps,
+            }
+        data = LiveAttendanceGraphSerializer(
+            livesessions, many=True, context=context
+        ).data
+        elapsed = perf_counter() - start
+        self.assertEqual(len(data), SESSIONS)
+        return elapsed
+
+    def test_bench_list_attendances(self):
+        """Serialization time with per-row, cold and warm precomputed timelines."""
+        per_row = self._serialize(False)
+        cold = self._serialize(True)
+        warm = self._serialize(True)
+        print(
+            f"\n{SESSIONS} sessions: per-row {per_row * 1000:.0f} ms, "
+            f"precomputed cold {cold * 1000:.0f} ms, "
+            f"precomputed warm {warm * 1000:.0f} ms"
+        )
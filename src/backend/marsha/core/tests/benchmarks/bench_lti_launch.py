@@ -0,0 +1,111 @@
+"""Benchmark the LTI launches of the students of a course opening a video at once.
+
+Run it with ``bin/pytest marsha/core/tests/benchmarks/bench_lti_launch.py -s``.
+"""
+from time import perf_counter
+from urllib.parse import unquote
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from oauthlib import oauth1
+from waffle.testutils import override_switch
+
+from marsha.core.defaults import AWS_PIPELINE, READY, SENTRY
+from marsha.core.factories import ConsumerSiteLTIPassportFactory, VideoFactory
+
+
+STUDENTS = 500
+URL = "http://testserver/lti/videos/"
+# The default local memory cache culls its entries above 300 keys, Redis does not
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 100000},
+    },
+}
+
+
+def sign(passport, lti_parameters):
+    """Sign the parameters of an LTI launch request with the passport."""
+    client = oauth1.Client(
+        client_key=passport.oauth_consumer_key, client_secret=passport.shared_secret
+    )
+    _uri, headers, _body = client.sign(
+        URL,
+        http_method="POST",
+        body=lti_parameters,
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    oauth_dict = dict(
+        param.strip().replace('"', "").split("=")
+        for param in headers["Authorization"].split(",")
+    )
+    oauth_dict["oauth_signature"] = unquote(oauth_dict["oauth_signature"])
+    oauth_dict["oauth_nonce"] = oauth_dict.pop("OAuth oauth_nonce")
+    return {**lti_parameters, **oauth_dict}
+
+
+@override_settings(CACHES=CACHES)
+@override_switch(SENTRY, active=False)
+class LTILaunchBenchmark(TestCase):
+    """Compare the LTI launches with and without the passport and resource id cached."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a video in a course of a consumer site and its passport."""
+        super().setUpTestData()
+        cls.passport = ConsumerSiteLTIPassportFactory(
+            consumer_site__domain="testserver"
+        )
+        cls.video = VideoFactory(
+            playlist__consumer_site=cls.passport.consumer_site,
+            upload_state=READY,
+            uploaded_on="2019-09-24 07:24:40+00",
+            resolutions=[144, 240],
+            transcode_pipeline=AWS_PIPELINE,
+        )
+
+    def _launch(self, students):
+        """Launch the video for some students, return the elapsed time and queries."""
+        launches = [
+            sign(
+                self.passport,
+                {
+                    "resource_link_id": self.video.lti_id,
+                    "context_id": self.video.playlist.lti_id,
+                    "roles": "Student",
+                    "user_id": f"student{index}",
+                    "lis_person_sourcedid": f"student{index}",
+                },
+            )
+            for index in range(students)
+        ]
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            start = perf_counter()
+            for lti_parameters in launches:
+                response = self.client.post(
+                    URL, lti_parameters, HTTP_REFERER="http://testserver/course"
+                )
+                self.assertEqual(response.status_code, 200)
+            elapsed = perf_counter() - start
+        self.assertContains(response, str(self.video.pk))
+        return elapsed, len(queries)
+
+    def test_bench_lti_launch(self):
+        """Launches per second and queries per launch."""
+        # Warm up the views and the templates
+        self._launch(1)
+        for label, duration in (("not cached", 0), ("cached", 300)):
+            with override_settings(
+                LTI_PASSPORT_CACHE_DURATION=duration,
+                LTI_RESOURCE_ID_CACHE_DURATION=duration,
+            ):
+                elapsed, queries = self._launch(STUDENTS)
+            print(
+                f"\npassport and resource id {label}: {STUDENTS / elapsed:.0f} "
+                f"launches per second, {queries / STUDENTS:.1f} queries per launch"
+            )
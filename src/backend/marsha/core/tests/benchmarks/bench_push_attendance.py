@@ -0,0 +1,96 @@
+"""Benchmark the live session writes of the push_attendance endpoint.
+
+Run it with ``bin/pytest marsha/core/tests/benchmarks/bench_push_attendance.py -s``.
+"""
+from time import perf_counter
+from unittest import mock
+import uuid
+
+from django.db import connection
+from django.test import override_settings
+
+from marsha.core.factories import VideoFactory
+from marsha.core.services import live_attendance
+from marsha.core.simple_jwt.factories import PlaylistAccessTokenFactory
+from marsha.core.tests.api.live_sessions.base import LiveSessionApiTestCase
+
+
+VIEWERS = 200
+MINUTES = 5
+# The default local memory cache culls its entries above 300 keys, Redis does not
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 100000},
+    },
+}
+
+
+class LiveSessionWritesCounter:
+    """Database execute wrapper counting the statements writing live session rows.
+
+    The rows are counted as well: a `bulk_update` is one statement writing all of them.
+    """
+
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+
+    # pylint: disable=too-many-arguments
+    def __call__(self, execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        if sql.startswith(('INSERT INTO "live_session"', 'UPDATE "live_session"')):
+            self.statements += 1
+            self.rows += context["cursor"].rowcount
+        return result
+
+
+@override_settings(CACHES=CACHES)
+@mock.patch("marsha.core.tasks.live_session.flush_live_attendances.apply_async")
+class PushAttendanceBenchmark(LiveSessionApiTestCase):
+    """Compare live session writes per minute with and without write-behind."""
+
+    def _run(self):
+        """Simulate VIEWERS viewers pushing one beat per minute during MINUTES minutes."""
+        video = VideoFactory()
+        anonymous_ids = [uuid.uuid4() for _ in range(VIEWERS)]
+        counter = LiveSessionWritesCounter()
+
+        with connection.execute_wrapper(counter):
+            start = perf_counter()
+            for minute in range(MINUTES):
+                for anonymous_id in anonymous_ids:
+                    # tokens of the test environment are short-lived
+                    jwt_token = PlaylistAccessTokenFactory(playlist=video.playlist)
+                    response = self.client.post(
+                        f"/api/videos/{video.id}/livesessions/push_attendance/"
+                        f"?anonymous_id={anonymous_id}",
+                        {"live_attendance": {str(minute): {"muted": False}}},
+                        content_type="application/json",
+                        HTTP_AUTHORIZATION=f"Bearer {jwt_token}",
+                    )
+                    self.assertEqual(response.status_code, 200)
+                # the flush task runs once per minute
+                live_attendance.flush(video.id)
+            live_attendance.flush(video.id)
+            elapsed = perf_counter() - start
+
+        return counter, elapsed
+
+    def _report(self, label, counter, elapsed):
+        """Print the benchmark results."""
+        beats = VIEWERS * MINUTES
+        print(
+            f"\n{label}: {counter.rows / MINUTES:.0f} rows written per minute in "
+            f"{counter.statements / MINUTES:.0f} statements, "
+            f"{elapsed / beats * 1000:.2f} ms per beat ({VIEWERS} viewers)"
+        )
+
+    def test_bench_push_attendance(self, _mock_apply_async):
+        """Writes per minute with the synchronous ingestion."""
+        self._report("synchronous", *self._run())
+
+    @override_settings(ATTENDANCE_WRITE_BEHIND_ENABLED=True)
+    def test_bench_push_attendance_write_behind(self, _mock_apply_async):
+        """Writes per minute with the write-behind ingestion."""
+        self._report("write-behind", *self._run())
@@ -0,0 +1,99 @@
+"""Benchmark the resizing of uploaded thumbnails.
+
+Run it with ``bin/pytest marsha/core/tests/benchmarks/bench_resize_thumbnails.py -s``.
+"""
+from io import BytesIO
+import time
+from time import perf_counter
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import TestCase
+
+from PIL import Image
+
+from marsha.core.defaults import TMP_VIDEOS_STORAGE_BASE_DIRECTORY
+from marsha.core.factories import ThumbnailFactory
+from marsha.core.storage.storage_class import video_storage
+from marsha.core.tasks import thumbnail as thumbnail_tasks
+
+
+STAMP = "1640995200"
+# Time taken by the videos storage to save a file, as an object storage would
+UPLOAD_LATENCY = 0.02
+
+
+def _image(size):
+    """Return an RGBA image of the given size, with noise to be costly to compress."""
+    noise = Image.effect_noise(size, 64)
+    return Image.merge("RGBA", (noise, noise.rotate(90), noise.rotate(180), noise))
+
+
+def _legacy_resize_thumbnails(thumbnail_pk, stamp):
+    """Decode the source for each size and upload sizes one after the other."""
+    thumbnail = thumbnail_tasks.Thumbnail.objects.get(pk=thumbnail_pk)
+    source = thumbnail.get_videos_storage_prefix(
+        stamp, TMP_VIDEOS_STORAGE_BASE_DIRECTORY
+    )
+    prefix_destination = thumbnail.get_videos_storage_prefix(stamp)
+    with video_storage.open(source, "rb") as img_file:
+        for size in thumbnail_tasks.THUMBNAIL_SIZES:
+            with Image.open(img_file) as img:
+                img = img.convert("RGB")
+                img.thumbnail((size, size))
+                with BytesIO() as buffer:
+                    img.save(buffer, "JPEG")
+                    video_storage.save(
+                        f"{prefix_destination}/{size}.jpg",
+                        ContentFile(buffer.getvalue()),
+                    )
+
+
+class ResizeThumbnailsBenchmark(TestCase):
+    """Compare thumbnails resized per second decoding the source once or per size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Upload a corpus of large PNG and JPEG sources."""
+        cls.thumbnails = []
+        for image_format, size in [
+            ("PNG", (4000, 3000)),
+            ("PNG", (3000, 3000)),
+            ("JPEG", (6000, 4000)),
+            ("JPEG", (4000, 3000)),
+        ]:
+            thumbnail = ThumbnailFactory()
+            with BytesIO() as buffer:
+                image = _image(size)
+                if image_format == "JPEG":
+                    image = image.convert("RGB")
+                image.save(buffer, image_format)
+                video_storage.save(
+                    thumbnail.get_videos_storage_prefix(
+                        STAMP, TMP_VIDEOS_STORAGE_BASE_DIRECTORY
+                    ),
+                    ContentFile(buffer.getvalue()),
+                )
+            cls.thumbnails.append(thumbnail)
+
+    def _run(self, label, resize):
+        """Resize the corpus and print the thumbnails resized per second."""
+        original_save = video_storage.save
+
+        def slow_save(*args, **kwargs):
+            time.sleep(UPLOAD_LATENCY)
+            return original_save(*args, **kwargs)
+
+        with mock.patch.object(video_storage, "save", side_effect=slow_save):
+            start = perf_counter()
+            for thumbnail in self.thumbnails:
+                resize(str(thumbnail.pk), STAMP)
+            elapsed = perf_counter() - start
+        print(f"\n{label}: {len(self.thumbnails) / elapsed:.2f} thumbnails per second")
+
+    def test_bench_resize_thumbnails(self):
+        """Thumbnails resized per second decoding once or per size, and with WebP."""
+        self._run("decoded per size", _legacy_resize_thumbnails)
+        self._run("decoded once", thumbnail_tasks.resize_thumbnails)
+        with self.settings(THUMBNAIL_EXTRA_FORMATS=["webp"]):
+            self._run("decoded once, with WebP", thumbnail_tasks.resize_thumbnails)
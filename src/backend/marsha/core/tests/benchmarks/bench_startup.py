@@ -0,0 +1,88 @@
+"""Benchmark the startup of the processes running the backend.
+
+Run it with ``bin/pytest marsha/core/tests/benchmarks/bench_startup.py -s``.
+"""
+import os
+from pathlib import Path
+import statistics
+import subprocess  # nosec
+import sys
+from time import perf_counter
+
+from django.test import SimpleTestCase
+
+
+RUNS = 5
+BACKEND_DIR = Path(__file__).resolve().parents[4]
+STARTUPS = {
+    "manage.py check": ["manage.py", "check"],
+    # The ASGI application imports the urls to route http requests
+    "ASGI application": [
+        "-c",
+        "from django.urls import get_resolver; import marsha.asgi; "
+        "get_resolver().url_patterns",
+    ],
+}
+
+
+def _run(args):
+    """Run a python process, return its duration, maximum RSS and import times.
+
+    Returns
+    -------
+    Tuple[float, int, Dict[str, int]]
+        The duration in seconds, the maximum RSS in kilobytes, and the time spent
+        importing each module, in microseconds, without its own imports.
+    """
+    start = perf_counter()
+    # pylint: disable=consider-using-with
+    process = subprocess.Popen(  # nosec
+        [sys.executable, "-X", "importtime", *args],
+        cwd=BACKEND_DIR,
+        env=os.environ,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    stderr = process.stderr.read()
+    _pid, status, rusage = os.wait4(process.pid, 0)
+    duration = perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode:
+        raise AssertionError(stderr)
+
+    import_times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_time, _cumulative, module = line.split("|")
+        import_times[module.strip()] = int(self_time.split(":")[1])
+    return duration, rusage.ru_maxrss, import_times
+
+
+class StartupBenchmark(SimpleTestCase):
+    """Report the startup time, memory and import time of the backend processes."""
+
+    def test_bench_startup(self):
+        """Duration, maximum RSS and time spent importing modules of each process."""
+        for label, args in STARTUPS.items():
+            durations, rss, import_times, boto_import_times = [], [], [], []
+            for _ in range(RUNS):
+                duration, max_rss, times = _run(args)
+                durations.append(duration)
+                rss.append(max_rss)
+                import_times.append(sum(times.values()))
+                boto_import_times.append(
+                    sum(
+                        time
+                        for module, time in times.items()
+                        if module.split(".")[0] in ("boto3", "botocore", "s3transfer")
+                    )
+                )
+            print(
+                f"\n{label}: {statistics.median(durations):.2f}s, "
+                f"{statistics.median(rss) / 1024:.0f} MB RSS, "
+                f"{statistics.median(import_times) / 1000:.0f}ms importing modules, "
+                f"{statistics.median(boto_import_times) / 1000:.0f}ms of them "
+                "importing boto3 and botocore"
+            )
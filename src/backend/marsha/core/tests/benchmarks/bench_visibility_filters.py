@@ -0,0 +1,152 @@
+"""Benchmark the filters listing the videos visible to a user.
+
+Run it with ``bin/pytest marsha/core/tests/benchmarks/bench_visibility_filters.py -s``.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase
+
+from marsha.core.factories import OrganizationFactory, UserFactory
+from marsha.core.models import (
+    ADMINISTRATOR,
+    INSTRUCTOR,
+    OrganizationAccess,
+    Playlist,
+    PlaylistAccess,
+    Video,
+)
+
+
+VIDEOS = 100000
+ORGANIZATIONS = 10
+PLAYLISTS_PER_ORGANIZATION = 100
+PAGE_SIZE = 20
+EXECUTION_TIME_REGEX = re.compile(r"Execution Time: ([\d.]+) ms")
+
+
+def joined_visibility_filter(user_id):
+    """The filter of the video list before `visible_to`, joining the accesses."""
+    return (
+        Video.objects.filter(
+            Q(
+                playlist__user_accesses__user__id=user_id,
+                playlist__user_accesses__role__in=[ADMINISTRATOR, INSTRUCTOR],
+            )
+            | Q(
+                playlist__organization__user_accesses__user__id=user_id,
+                playlist__organization__user_accesses__role=ADMINISTRATOR,
+            )
+        )
+        .distinct()
+        .annotate_can_edit(user_id)
+    )
+
+
+def subquery_visibility_filter(user_id):
+    """The filter of the video list with `visible_to` and its subqueries."""
+    return (
+        Video.objects.all()
+        .visible_to(user_id)
+        .annotate_can_edit(user_id, force_value=True)
+    )
+
+
+class VisibilityFiltersBenchmark(TestCase):
+    """Compare the plans and the execution time of the video list filters."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create VIDEOS videos in the playlists of ORGANIZATIONS organizations.
+
+        The organization administrator is also an administrator of all the playlists
+        of their organization, the instructor has access to a playlist of each
+        organization.
+        """
+        super().setUpTestData()
+        organizations = OrganizationFactory.create_batch(ORGANIZATIONS)
+        playlists = Playlist.objects.bulk_create(
+            Playlist(
+                title=f"playlist {index}",
+                organization=organizations[index % ORGANIZATIONS],
+            )
+            for index in range(ORGANIZATIONS * PLAYLISTS_PER_ORGANIZATION)
+        )
+        Video.objects.bulk_create(
+            (
+                Video(
+                    title=f"video {index}", playlist=playlists[index % len(playlists)]
+                )
+                for index in range(VIDEOS)
+            ),
+            batch_size=5000,
+        )
+
+        cls.administrator, cls.instructor, other_user = UserFactory.create_batch(3)
+        OrganizationAccess.objects.bulk_create(
+            [
+                OrganizationAccess(
+                    user=cls.administrator,
+                    organization=organizations[0],
+                    role=ADMINISTRATOR,
+                ),
+                *(
+                    OrganizationAccess(user=other_user, organization=organization)
+                    for organization in organizations
+                ),
+            ]
+        )
+        PlaylistAccess.objects.bulk_create(
+            [
+                *(
+                    PlaylistAccess(
+                        user=cls.administrator, playlist=playlist, role=ADMINISTRATOR
+                    )
+                    for playlist in playlists
+                    if playlist.organization_id == organizations[0].pk
+                ),
+                *(
+                    PlaylistAccess(
+                        user=cls.instructor, playlist=playlist, role=INSTRUCTOR
+                    )
+                    for playlist in playlists[:ORGANIZATIONS]
+                ),
+                *(
+                    PlaylistAccess(user=other_user, playlist=playlist)
+                    for playlist in playlists
+                ),
+            ]
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def _explain(self, queryset):
+        """Return the plan of the query and its execution time in milliseconds."""
+        plan = queryset.explain(analyze=True)
+        return plan, float(EXECUTION_TIME_REGEX.search(plan).group(1))
+
+    def test_bench_visibility_filters(self):
+        """Execution time of the first page and the count of the video list."""
+        for label, user in (
+            ("organization administrator", self.administrator),
+            ("instructor", self.instructor),
+        ):
+            for name, visibility_filter in (
+                ("joins and DISTINCT", joined_visibility_filter),
+                ("subqueries", subquery_visibility_filter),
+            ):
+                queryset = visibility_filter(user.id)
+                page_plan, page_time = self._explain(
+                    queryset.order_by("title")[:PAGE_SIZE]
+                )
+                count_plan, count_time = self._explain(queryset.order_by().values("pk"))
+                if name == "subqueries":
+                    self.assertNotIn("Unique", page_plan + count_plan)
+                    self.assertNotIn("DISTINCT", str(queryset.query))
+                    # Only the videos of the visible playlists are read
+                    self.assertNotIn("Seq Scan on video", page_plan + count_plan)
+                print(
+                    f"\n{label}, {name}: {queryset.count()} videos, first page in "
+                    f"{page_time:.1f} ms, all the videos in {count_time:.1f} ms"
+                )
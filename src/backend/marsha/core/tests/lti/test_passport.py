@@ -0,0 +1,118 @@
+"""Test the resolution of the passport of LTI requests."""
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from marsha.core.factories import (
+    ConsumerSiteLTIPassportFactory,
+    PlaylistLTIPassportFactory,
+)
+from marsha.core.lti.passport import get_enabled_passport
+from marsha.core.lti.validator import LTIRequestValidator
+
+
+class LTIPassportTestCase(TestCase):
+    """Test the cached resolution of LTI passports."""
+
+    def setUp(self):
+        """Start each test with an empty cache."""
+        super().setUp()
+        cache.clear()
+
+    def test_lti_passport_consumer_site(self):
+        """A passport is resolved to its secret and consumer site, then cached."""
+        passport = ConsumerSiteLTIPassportFactory()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                get_enabled_passport(passport.oauth_consumer_key),
+                (passport.shared_secret, passport.consumer_site),
+            )
+        with self.assertNumQueries(0):
+            shared_secret, consumer_site = get_enabled_passport(
+                passport.oauth_consumer_key
+            )
+        self.assertEqual(shared_secret, passport.shared_secret)
+        self.assertEqual(consumer_site.domain, passport.consumer_site.domain)
+
+    def test_lti_passport_playlist(self):
+        """A playlist passport is resolved to the consumer site of its playlist."""
+        passport = PlaylistLTIPassportFactory()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                get_enabled_passport(passport.oauth_consumer_key),
+                (passport.shared_secret, passport.playlist.consumer_site),
+            )
+
+    def test_lti_passport_unknown(self):
+        """Unknown consumer keys are cached as well, with the dummy secret."""
+        validator = LTIRequestValidator()
+
+        with self.assertNumQueries(1):
+            self.assertFalse(validator.validate_client_key("unknown", None))
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_enabled_passport("unknown"))
+            self.assertEqual(
+                validator.get_client_secret("unknown", None), "dummy_client_sec_123456"
+            )
+
+        # The passport is found once it is created
+        passport = ConsumerSiteLTIPassportFactory(oauth_consumer_key="unknown")
+        self.assertTrue(validator.validate_client_key("unknown", None))
+        self.assertEqual(
+            validator.get_client_secret("unknown", None), passport.shared_secret
+        )
+
+    @override_settings(
+        LTI_PASSPORT_CACHE_DURATION=300, LTI_PASSPORT_NEGATIVE_CACHE_DURATION=30
+    )
+    def test_lti_passport_cache_key(self):
+        """Consumer keys are hashed in the cache key, unknown ones cached shorter."""
+        passport = ConsumerSiteLTIPassportFactory()
+        consumer_key = "unknown\n" + "x" * 300
+
+        with mock.patch.object(cache, "set", wraps=cache.set) as mock_set:
+            get_enabled_passport(passport.oauth_consumer_key)
+            self.assertIsNone(get_enabled_passport(consumer_key))
+
+        [
+            (key, _passport, timeout),
+            (unknown_key, unknown_passport, unknown_timeout),
+        ] = [call.args for call in mock_set.call_args_list]
+        self.assertNotIn(passport.oauth_consumer_key, key)
+        self.assertEqual(timeout, 300)
+        self.assertNotIn("unknown", unknown_key)
+        self.assertLess(len(unknown_key), 200)
+        self.assertEqual(unknown_passport, ())
+        self.assertEqual(unknown_timeout, 30)
+
+    def test_lti_passport_disabled(self):
+        """A passport is not resolved anymore once it is disabled or deleted."""
+        passport = ConsumerSiteLTIPassportFactory()
+        self.assertIsNotNone(get_enabled_passport(passport.oauth_consumer_key))
+
+        passport.is_enabled = False
+        passport.save()
+        self.assertIsNone(get_enabled_passport(passport.oauth_consumer_key))
+
+        passport.is_enabled = True
+        passport.save()
+        self.assertIsNotNone(get_enabled_passport(passport.oauth_consumer_key))
+
+        passport.delete()
+        self.assertIsNone(get_enabled_passport(passport.oauth_consumer_key))
+
+    def test_lti_passport_consumer_site_updated(self):
+        """The cached passports are invalidated when a consumer site is saved."""
+        passport = ConsumerSiteLTIPassportFactory(consumer_site__domain="example.com")
+        self.assertEqual(
+            get_enabled_passport(passport.oauth_consumer_key)[1].domain, "example.com"
+        )
+
+        passport.consumer_site.domain = "example.org"
+        passport.consumer_site.save()
+        self.assertEqual(
+            get_enabled_passport(passport.oauth_consumer_key)[1].domain, "example.org"
+        )
@@ -2,6 +2,7 @@
 from unittest import mock
 import uuid
 
+from django.core.cache import cache
 from django.test import RequestFactory, TestCase, override_settings
 
 from marsha.core import lti as lti_module
@@ -26,6 +27,7 @@ class LTITestCase(TestCase):
         """Override the setUp method to instantiate and serve a request factory."""
         super().setUp()
         self.factory = RequestFactory()
+        cache.clear()
 
     def test_lti_request_body(self):
         """Simulate an LTI launch request with oauth in the body.
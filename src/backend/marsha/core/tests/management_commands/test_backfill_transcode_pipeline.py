@@ -0,0 +1,34 @@
+"""Test backfill_transcode_pipeline command."""
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from marsha.core.defaults import AWS_PIPELINE, PEERTUBE_PIPELINE
+
+
+class BackfillTranscodePipelineTestCase(TestCase):
+    """Test case for the backfill_transcode_pipeline command."""
+
+    def test_backfill_transcode_pipeline(self):
+        """The command backfills the pipelines and reports the counters."""
+        out = StringIO()
+        with mock.patch(
+            "marsha.core.management.commands.backfill_transcode_pipeline."
+            "transcode_pipeline.backfill_transcode_pipelines",
+            return_value={PEERTUBE_PIPELINE: 1, AWS_PIPELINE: 2},
+        ) as mock_backfill, mock.patch(
+            "marsha.core.management.commands.backfill_transcode_pipeline."
+            "transcode_pipeline.get_counters",
+            return_value={"storage_lookups": 0, "deferred": 4, "backfilled": 3},
+        ):
+            call_command("backfill_transcode_pipeline", "--batch-size=10", stdout=out)
+
+        mock_backfill.assert_called_once_with(batch_size=10, dry_run=False)
+        self.assertEqual(
+            out.getvalue(),
+            "1 videos recovered to peertube\n"
+            "2 videos recovered to AWS\n"
+            "storage_lookups: 0, deferred: 4, backfilled: 3\n",
+        )
@@ -20,7 +20,7 @@ class CheckWaitingLiveToVodTest(TestCase):
     def test_check_harvested_no_video_to_process(self):
         """Command should do nothing when there is no video to process."""
         out = StringIO()
-        with Stubber(check_harvested.s3_client) as s3_client_stubber:
+        with Stubber(check_harvested.get_aws_s3_client()) as s3_client_stubber:
             call_command("check_harvested", stdout=out)
             s3_client_stubber.assert_no_pending_responses()
 
@@ -39,7 +39,9 @@ class CheckWaitingLiveToVodTest(TestCase):
         )
 
         out = StringIO()
-        with Stubber(check_harvested.s3_client) as s3_client_stubber, mock.patch(
+        with Stubber(
+            check_harvested.get_aws_s3_client()
+        ) as s3_client_stubber, mock.patch(
             "marsha.core.management.commands.check_harvested.generate_expired_date"
         ) as generate_expired_date_mock:
             s3_client_stubber.add_response(
@@ -97,7 +99,9 @@ class CheckWaitingLiveToVodTest(TestCase):
             starting_at=now,
         )
         out = StringIO()
-        with Stubber(check_harvested.s3_client) as s3_client_stubber, mock.patch(
+        with Stubber(
+            check_harvested.get_aws_s3_client()
+        ) as s3_client_stubber, mock.patch(
             "marsha.core.management.commands.check_harvested.generate_expired_date"
         ) as generate_expired_date_mock:
             generate_expired_date_mock.return_value = now - timedelta(days=1)
@@ -119,7 +123,9 @@ class CheckWaitingLiveToVodTest(TestCase):
             uploaded_on=now - timedelta(days=3),
         )
         out = StringIO()
-        with Stubber(check_harvested.s3_client) as s3_client_stubber, mock.patch(
+        with Stubber(
+            check_harvested.get_aws_s3_client()
+        ) as s3_client_stubber, mock.patch(
             "marsha.core.management.commands.check_harvested.generate_expired_date"
         ) as generate_expired_date_mock:
             generate_expired_date_mock.return_value = now + timedelta(days=1)
@@ -3,25 +3,65 @@ from datetime import datetime, timezone
 from io import StringIO
 from unittest import mock
 
+from django.core.cache import cache
 from django.core.management import call_command
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from botocore.stub import Stubber
 
-from marsha.core.defaults import RAW, RUNNING
+from marsha.core.defaults import RAW, RUNNING, STOPPING
 from marsha.core.factories import VideoFactory
 from marsha.core.management.commands import check_live_state
+from marsha.core.tests.utils.logs_client import LogsClientStandIn
+from marsha.core.utils.medialive_utils import get_medialive_client
+
+
+def _alert_event(event_id, timestamp, pipeline, alarm_state, time):
+    """Return a cloudwatch event logging a MediaLive alert."""
+    return {
+        "eventId": event_id,
+        "timestamp": timestamp,
+        "message": (
+            "2020-08-24T12:19:38.401Z\t445f36d3-4210-4e14-840f-596d671f0db6\t"
+            "INFO\tReceived event: "
+            '{"detail-type":"MediaLive Channel Alert","source":"aws.medialive",'
+            f'"time":"{time}","resources":["medialive:channel:arn"],'
+            f'"detail":{{"alarm_state":"{alarm_state}",'
+            '"alert_type":"RTMP Has No Audio/Video",'
+            f'"pipeline":"{pipeline}","message":"Waiting for RTMP input"}}}}\n'
+        ),
+    }
+
+
+def _running_live(log_group_name="/aws/lambda/dev-test-marsha-medialive", **kwargs):
+    """Create a running live logging its alerts in a log group."""
+    return VideoFactory(
+        live_state=RUNNING,
+        live_info={
+            "cloudwatch": {"logGroupName": log_group_name},
+            "medialive": {
+                "channel": {"arn": "medialive:channel:arn", "id": log_group_name}
+            },
+            "started_at": "1598313600",  # 25 aug 2020 00:00:00 UTC
+        },
+        live_type=RAW,
+        **kwargs,
+    )
 
 
 class CheckLiveStateTest(TestCase):
     """Test check_live_state command."""
 
+    def setUp(self):
+        """Start each test without checkpoint."""
+        cache.clear()
+
     def test_check_live_state_command_no_running_live(self):
         """Command should do nothing when there is no running live."""
         out = StringIO()
-        with Stubber(check_live_state.logs_client) as logs_client_stubber, Stubber(
-            check_live_state.medialive_client
-        ) as medialive_stubber:
+        with Stubber(
+            check_live_state.get_logs_client()
+        ) as logs_client_stubber, Stubber(get_medialive_client()) as medialive_stubber:
             call_command("check_live_state", stdout=out)
             logs_client_stubber.assert_no_pending_responses()
             medialive_stubber.assert_no_pending_responses()
@@ -45,9 +85,9 @@ class CheckLiveStateTest(TestCase):
             live_type=RAW,
         )
         out = StringIO()
-        with Stubber(check_live_state.logs_client) as logs_client_stubber, Stubber(
-            check_live_state.medialive_client
-        ) as medialive_stubber:
+        with Stubber(
+            check_live_state.get_logs_client()
+        ) as logs_client_stubber, Stubber(get_medialive_client()) as medialive_stubber:
             logs_client_stubber.add_response(
                 "filter_log_events",
                 expected_params={
@@ -141,8 +181,10 @@ class CheckLiveStateTest(TestCase):
             live_type=RAW,
         )
         out = StringIO()
-        with Stubber(check_live_state.logs_client) as logs_client_stubber, Stubber(
-            check_live_state.medialive_client
+        with Stubber(
+            check_live_state.get_logs_client()
+        ) as logs_client_stubber, Stubber(
+            get_medialive_client()
         ) as medialive_stubber, mock.patch(
             "marsha.core.management.commands.check_live_state.generate_expired_date"
         ) as generate_expired_date_mock:
@@ -226,7 +268,9 @@ class CheckLiveStateTest(TestCase):
             live_type=RAW,
         )
         out = StringIO()
-        with Stubber(check_live_state.logs_client) as logs_client_stubber, mock.patch(
+        with Stubber(
+            check_live_state.get_logs_client()
+        ) as logs_client_stubber, mock.patch(
             "marsha.core.management.commands.check_live_state.stop_live_channel"
         ) as mock_stop_live_channel, mock.patch(
             "marsha.core.management.commands.check_live_state.generate_expired_date"
@@ -295,3 +339,243 @@ class CheckLiveStateTest(TestCase):
         self.assertIn("Stopping channel with id 123456", out.getvalue())
         self.assertIn("Channel stopped", out.getvalue())
         out.close()
+
+    @mock.patch.object(check_live_state, "stop_live_channel")
+    @mock.patch.object(
+        check_live_state,
+        "generate_expired_date",
+        return_value=datetime(2020, 8, 25, 12, 30, 0, tzinfo=timezone.utc),
+    )
+    def test_check_live_state_all_pages_read(self, _mock_expired, mock_stop):
+        """The alerts of every page of logs are read, not only the first one."""
+        video = _running_live()
+        logs_client = LogsClientStandIn(
+            {
+                "/aws/lambda/dev-test-marsha-medialive": [
+                    _alert_event(
+                        "1", 1598358000001, "0", "SET", "2020-08-25T12:00:00Z"
+                    ),
+                    _alert_event(
+                        "2", 1598358000002, "0", "CLEARED", "2020-08-25T12:00:01Z"
+                    ),
+                    _alert_event(
+                        "3", 1598358000003, "1", "SET", "2020-08-25T12:00:02Z"
+                    ),
+                    _alert_event(
+                        "4", 1598358000004, "0", "SET", "2020-08-25T12:01:00Z"
+                    ),
+                    _alert_event(
+                        "5", 1598358000005, "1", "CLEARED", "2020-08-25T12:01:01Z"
+                    ),
+                    _alert_event(
+                        "6", 1598358000006, "1", "SET", "2020-08-25T12:02:00Z"
+                    ),
+                ]
+            },
+            page_size=2,
+        )
+
+        with mock.patch.object(
+            check_live_state, "get_logs_client", return_value=logs_client
+        ):
+            call_command("check_live_state", stdout=StringIO())
+
+        self.assertEqual(
+            [call["nextToken"] for call in logs_client.calls], [None, "2", "4"]
+        )
+        mock_stop.assert_called_once_with("/aws/lambda/dev-test-marsha-medialive")
+        video.refresh_from_db()
+        self.assertEqual(video.live_state, STOPPING)
+
+    @mock.patch.object(check_live_state, "stop_live_channel")
+    @mock.patch.object(
+        check_live_state,
+        "generate_expired_date",
+        return_value=datetime(2020, 8, 25, 12, 30, 0, tzinfo=timezone.utc),
+    )
+    def test_check_live_state_reads_new_events_only(self, _mock_expired, mock_stop):
+        """Each run reads the events logged since the last event read by the previous
+        run and carries on the pending alerts."""
+        log_group_name = "/aws/lambda/dev-test-marsha-medialive"
+        video = _running_live()
+        logs_client = LogsClientStandIn(
+            {
+                log_group_name: [
+                    _alert_event(
+                        "1", 1598358000001, "0", "SET", "2020-08-25T12:00:00Z"
+                    ),
+                    _alert_event(
+                        "2", 1598358000002, "1", "SET", "2020-08-25T12:00:01Z"
+                    ),
+                    _alert_event(
+                        "3", 1598358000002, "1", "CLEARED", "2020-08-25T12:00:01Z"
+                    ),
+                ]
+            },
+            page_size=10,
+        )
+
+        with mock.patch.object(
+            check_live_state, "get_logs_client", return_value=logs_client
+        ):
+            call_command("check_live_state", stdout=StringIO())
+            mock_stop.assert_not_called()
+
+            # An event logged at the same time as the last one read, then a new one
+            logs_client.log(
+                log_group_name,
+                _alert_event("4", 1598358000002, "1", "SET", "2020-08-25T12:00:02Z"),
+                _alert_event(
+                    "5", 1598358000009, "1", "CLEARED", "2020-08-25T12:00:03Z"
+                ),
+            )
+            call_command("check_live_state", stdout=StringIO())
+            mock_stop.assert_not_called()
+
+            logs_client.log(
+                log_group_name,
+                _alert_event("6", 1598358000010, "1", "SET", "2020-08-25T12:00:04Z"),
+            )
+            call_command("check_live_state", stdout=StringIO())
+
+        # the events logged during the lookback period are read again
+        self.assertEqual(
+            [call["startTime"] for call in logs_client.calls],
+            [1598313600000, 1598357700002, 1598357700009],
+        )
+        mock_stop.assert_called_once()
+        video.refresh_from_db()
+        self.assertEqual(video.live_state, STOPPING)
+
+    @mock.patch.object(check_live_state, "stop_live_channel")
+    @mock.patch.object(
+        check_live_state,
+        "generate_expired_date",
+        return_value=datetime(2020, 8, 25, 11, 30, 0, tzinfo=timezone.utc),
+    )
+    def test_check_live_state_late_events(self, _mock_expired, mock_stop):
+        """Events ingested late, before the last event read, are read once."""
+        log_group_name = "/aws/lambda/dev-test-marsha-medialive"
+        video = _running_live()
+        logs_client = LogsClientStandIn(
+            {
+                log_group_name: [
+                    _alert_event(
+                        "1", 1598358000001, "0", "SET", "2020-08-25T12:00:00Z"
+                    ),
+                    _alert_event(
+                        "2", 1598358060000, "1", "SET", "2020-08-25T12:01:00Z"
+                    ),
+                ]
+            },
+            page_size=10,
+        )
+
+        with mock.patch.object(
+            check_live_state, "get_logs_client", return_value=logs_client
+        ):
+            call_command("check_live_state", stdout=StringIO())
+
+            # the alert of the pipeline 0 was cleared before the last event read
+            logs_client.log(
+                log_group_name,
+                _alert_event(
+                    "3", 1598358030000, "0", "CLEARED", "2020-08-25T12:00:30Z"
+                ),
+            )
+            call_command("check_live_state", stdout=StringIO())
+            call_command("check_live_state", stdout=StringIO())
+
+        mock_stop.assert_not_called()
+        checkpoint = cache.get(check_live_state.get_checkpoint_key(video.live_info))
+        self.assertEqual(
+            checkpoint,
+            {
+                "timestamp": 1598358060000,
+                "events": {
+                    "1": 1598358000001,
+                    "2": 1598358060000,
+                    "3": 1598358030000,
+                },
+                "pipelines": {"0": [], "1": ["2020-08-25T12:01:00Z"]},
+            },
+        )
+
+    def test_check_live_state_restarted_live(self):
+        """A live started again is read from its new start."""
+        video = _running_live()
+        logs_client = LogsClientStandIn()
+
+        with mock.patch.object(
+            check_live_state, "get_logs_client", return_value=logs_client
+        ):
+            call_command("check_live_state", stdout=StringIO())
+            video.live_info = {**video.live_info, "started_at": "1598400000"}
+            video.save()
+            call_command("check_live_state", stdout=StringIO())
+
+        self.assertEqual(
+            [call["startTime"] for call in logs_client.calls],
+            [1598313600000, 1598400000000],
+        )
+
+    @override_settings(CHECK_LIVE_STATE_CONCURRENCY=3)
+    def test_check_live_state_concurrent_lives(self):
+        """Lives are scanned concurrently, by at most CHECK_LIVE_STATE_CONCURRENCY."""
+        videos = [_running_live(f"/aws/lambda/live-{index}") for index in range(6)]
+        logs_client = LogsClientStandIn(latency=0.05)
+        out = StringIO()
+
+        with mock.patch.object(
+            check_live_state, "get_logs_client", return_value=logs_client
+        ):
+            call_command("check_live_state", stdout=out)
+
+        self.assertEqual(logs_client.max_concurrent_calls, 3)
+        self.assertEqual(len(logs_client.calls), 6)
+        for video in videos:
+            self.assertIn(f"Checking video {video.id}", out.getvalue())
+
+    @mock.patch.object(check_live_state, "stop_live_channel")
+    @mock.patch.object(
+        check_live_state,
+        "generate_expired_date",
+        return_value=datetime(2020, 8, 25, 12, 30, 0, tzinfo=timezone.utc),
+    )
+    def test_check_live_state_failing_live(self, _mock_expired, mock_stop):
+        """A live whose logs can't be read doesn't prevent checking the other ones
+        and is read again by the next run."""
+        failing_video = _running_live("/aws/lambda/failing")
+        _running_live("/aws/lambda/idle")
+        logs_client = LogsClientStandIn(
+            {
+                "/aws/lambda/idle": [
+                    _alert_event(
+                        "1", 1598358000001, "0", "SET", "2020-08-25T12:00:00Z"
+                    ),
+                    _alert_event(
+                        "2", 1598358000002, "1", "SET", "2020-08-25T12:00:01Z"
+                    ),
+                ]
+            },
+            failing_groups=["/aws/lambda/failing"],
+        )
+        out, err = StringIO(), StringIO()
+
+        with mock.patch.object(
+            check_live_state, "get_logs_client", return_value=logs_client
+        ):
+            call_command("check_live_state", stdout=out, stderr=err)
+            logs_client.failing_groups.clear()
+            call_command("check_live_state", stdout=StringIO())
+
+        self.assertIn(f"Error checking video {failing_video.id}", err.getvalue())
+        mock_stop.assert_called_once_with("/aws/lambda/idle")
+        self.assertEqual(
+            [
+                call["startTime"]
+                for call in logs_client.calls
+                if call["logGroupName"] == "/aws/lambda/failing"
+            ],
+            [1598313600000, 1598313600000],
+        )
@@ -1,11 +1,15 @@
 """Test clean_aws_elemental_stack command."""
 from datetime import datetime, timezone
 from io import StringIO
+import threading
+import time
 from unittest import mock
 import uuid
 
 from django.core.management import call_command
-from django.test import TestCase
+from django.test import TestCase, override_settings
+
+from botocore.exceptions import WaiterError
 
 from marsha.core.defaults import DELETED, ENDED, IDLE, JITSI, RUNNING, STOPPED
 from marsha.core.factories import VideoFactory
@@ -252,8 +256,8 @@ class CleanAwsElementalStackCommandTest(TestCase):
             "generate_expired_date",
             return_value=datetime(2022, 11, 1, 15, 00, tzinfo=timezone.utc),
         ), mock.patch.object(
-            clean_aws_elemental_stack, "list_medialive_channels"
-        ) as list_medialive_channels_mock, mock.patch.object(
+            clean_aws_elemental_stack, "iter_medialive_channels"
+        ) as iter_medialive_channels_mock, mock.patch.object(
             clean_aws_elemental_stack, "delete_medialive_stack"
         ) as delete_medialive_stack_mock:
             # live 4
@@ -277,7 +281,7 @@ class CleanAwsElementalStackCommandTest(TestCase):
                 "Tags": {"environment": "test"},
                 "State": "IDLE",
             }
-            list_medialive_channels_mock.return_value = [
+            iter_medialive_channels_mock.return_value = [
                 # medialive channels not in the same AWS_BASE_NAME environment
                 {
                     "Id": "111111",
@@ -434,8 +438,8 @@ class CleanAwsElementalStackCommandTest(TestCase):
         # Run command
         out = StringIO()
         with mock.patch.object(
-            clean_aws_elemental_stack, "list_medialive_channels"
-        ) as list_medialive_channels_mock, mock.patch.object(
+            clean_aws_elemental_stack, "iter_medialive_channels"
+        ) as iter_medialive_channels_mock, mock.patch.object(
             clean_aws_elemental_stack, "delete_medialive_stack"
         ) as delete_medialive_stack_mock:
             live_to_delete = {
@@ -449,7 +453,7 @@ class CleanAwsElementalStackCommandTest(TestCase):
                     }
                 ],
             }
-            list_medialive_channels_mock.return_value = [
+            iter_medialive_channels_mock.return_value = [
                 live_to_delete,
             ]
 
@@ -476,8 +480,8 @@ class CleanAwsElementalStackCommandTest(TestCase):
         # Run command
         out = StringIO()
         with mock.patch.object(
-            clean_aws_elemental_stack, "list_medialive_channels"
-        ) as list_medialive_channels_mock, mock.patch.object(
+            clean_aws_elemental_stack, "iter_medialive_channels"
+        ) as iter_medialive_channels_mock, mock.patch.object(
             clean_aws_elemental_stack, "delete_medialive_stack"
         ) as delete_medialive_stack_mock:
             live_to_delete = {
@@ -491,7 +495,7 @@ class CleanAwsElementalStackCommandTest(TestCase):
                     }
                 ],
             }
-            list_medialive_channels_mock.return_value = [
+            iter_medialive_channels_mock.return_value = [
                 live_to_delete,
             ]
 
@@ -503,3 +507,102 @@ class CleanAwsElementalStackCommandTest(TestCase):
                 "to a video 99d60314-20f2-4847-84a4-d2f47bf7fe38 that does not exist\n",
                 out.getvalue(),
             )
+
+    def _create_expired_lives(self, count):
+        """Create stopped lives started long ago, with their medialive channel."""
+        lives, medialive_channels = [], []
+        for index in range(count):
+            live = VideoFactory(
+                live_state=STOPPED,
+                live_type=JITSI,
+                live_info={
+                    "medialive": {"channel": {"id": str(index)}},
+                    "mediapackage": {"channel": {"id": str(index)}},
+                    "started_at": time_utils.to_timestamp(
+                        datetime(2022, 10, 14, 13, 25, tzinfo=timezone.utc)
+                    ),
+                },
+            )
+            lives.append(live)
+            medialive_channels.append(
+                {
+                    "Id": str(index),
+                    "Name": f"test_{live.id}_1667490961",
+                    "Tags": {"environment": "test"},
+                    "State": "IDLE",
+                }
+            )
+        return lives, medialive_channels
+
+    @override_settings(AWS_MEDIALIVE_DELETE_CONCURRENCY=3)
+    def test_clean_aws_elemental_stack_concurrent_deletions(self):
+        """Stacks are deleted concurrently, by at most AWS_MEDIALIVE_DELETE_CONCURRENCY,
+        and videos are loaded with one query for all channels."""
+        lives, medialive_channels = self._create_expired_lives(6)
+        lock = threading.Lock()
+        running = {"current": 0, "max": 0}
+
+        def slow_delete(_medialive_channel, _stdout):
+            with lock:
+                running["current"] += 1
+                running["max"] = max(running["max"], running["current"])
+            time.sleep(0.05)
+            with lock:
+                running["current"] -= 1
+
+        with mock.patch.object(
+            clean_aws_elemental_stack,
+            "generate_expired_date",
+            return_value=datetime(2022, 11, 1, 15, 00, tzinfo=timezone.utc),
+        ), mock.patch.object(
+            clean_aws_elemental_stack,
+            "iter_medialive_channels",
+            return_value=medialive_channels,
+        ), mock.patch.object(
+            clean_aws_elemental_stack,
+            "delete_medialive_stack",
+            side_effect=slow_delete,
+        ) as delete_medialive_stack_mock:
+            # 1 query to load the videos, then the 6 saves in a single transaction
+            with self.assertNumQueries(15):
+                call_command("clean_aws_elemental_stack", stdout=StringIO())
+
+        self.assertEqual(delete_medialive_stack_mock.call_count, 6)
+        self.assertEqual(running["max"], 3)
+        for live in lives:
+            live.refresh_from_db()
+            self.assertEqual(live.live_state, ENDED)
+            self.assertEqual(live.upload_state, DELETED)
+
+    def test_clean_aws_elemental_stack_failing_deletion(self):
+        """A stack failing to be deleted is reported and its video left untouched,
+        the other stacks are deleted."""
+        lives, medialive_channels = self._create_expired_lives(2)
+        out, err = StringIO(), StringIO()
+
+        def delete(medialive_channel, _stdout):
+            if medialive_channel["Id"] == "0":
+                raise WaiterError("InputDetached", "Max attempts exceeded", {})
+
+        with mock.patch.object(
+            clean_aws_elemental_stack,
+            "generate_expired_date",
+            return_value=datetime(2022, 11, 1, 15, 00, tzinfo=timezone.utc),
+        ), mock.patch.object(
+            clean_aws_elemental_stack,
+            "iter_medialive_channels",
+            return_value=medialive_channels,
+        ), mock.patch.object(
+            clean_aws_elemental_stack, "delete_medialive_stack", side_effect=delete
+        ):
+            call_command("clean_aws_elemental_stack", stdout=out, stderr=err)
+
+        self.assertIn(
+            f"Error deleting stack {medialive_channels[0]['Name']}", err.getvalue()
+        )
+        lives[0].refresh_from_db()
+        self.assertEqual(lives[0].live_state, STOPPED)
+        self.assertIn("medialive", lives[0].live_info)
+        lives[1].refresh_from_db()
+        self.assertEqual(lives[1].live_state, ENDED)
+        self.assertEqual(lives[1].upload_state, DELETED)
@@ -78,15 +78,15 @@ class TestSyncMedialiveVideoCommandTest(TestCase):
             "django.utils.timezone.now",
             return_value=datetime(2022, 10, 14, 15, 25, tzinfo=timezone.utc),
         ), Stubber(
-            medialive_utils.medialive_client
+            medialive_utils.get_medialive_client()
         ) as mediapackage_client_stubber, mock.patch.object(
-            sync_medialive_video, "list_medialive_channels"
-        ) as list_medialive_channels_mock:
+            sync_medialive_video, "iter_medialive_channels"
+        ) as iter_medialive_channels_mock:
             mediapackage_client_stubber.add_response(
                 "batch_update_schedule",
                 service_response={},
             )
-            list_medialive_channels_mock.return_value = [
+            iter_medialive_channels_mock.return_value = [
                 {
                     "Name": f"test_{live1_id}_1667490961",
                     "Tags": {"environment": "test"},
@@ -145,15 +145,15 @@ class TestSyncMedialiveVideoCommandTest(TestCase):
             "django.utils.timezone.now",
             return_value=datetime(2022, 10, 14, 15, 25, tzinfo=timezone.utc),
         ), Stubber(
-            medialive_utils.medialive_client
+            medialive_utils.get_medialive_client()
         ) as mediapackage_client_stubber, mock.patch.object(
-            sync_medialive_video, "list_medialive_channels"
-        ) as list_medialive_channels_mock:
+            sync_medialive_video, "iter_medialive_channels"
+        ) as iter_medialive_channels_mock:
             mediapackage_client_stubber.add_response(
                 "batch_update_schedule",
                 service_response={},
             )
-            list_medialive_channels_mock.return_value = [
+            iter_medialive_channels_mock.return_value = [
                 {
                     "Name": f"test_{live1_id}_1667490961",
                     "Tags": {"environment": "test"},
@@ -191,9 +191,9 @@ class TestSyncMedialiveVideoCommandTest(TestCase):
             "django.utils.timezone.now",
             return_value=datetime(2022, 10, 14, 15, 25, tzinfo=timezone.utc),
         ), mock.patch.object(
-            sync_medialive_video, "list_medialive_channels"
-        ) as list_medialive_channels_mock:
-            list_medialive_channels_mock.return_value = [
+            sync_medialive_video, "iter_medialive_channels"
+        ) as iter_medialive_channels_mock:
+            iter_medialive_channels_mock.return_value = [
                 {
                     "Name": f"test_{live_id}_1667490961",
                     "Tags": {"environment": "test"},
@@ -236,15 +236,15 @@ class TestSyncMedialiveVideoCommandTest(TestCase):
             "django.utils.timezone.now",
             return_value=datetime(2022, 10, 14, 15, 25, tzinfo=timezone.utc),
         ), Stubber(
-            medialive_utils.medialive_client
+            medialive_utils.get_medialive_client()
         ) as mediapackage_client_stubber, mock.patch.object(
-            sync_medialive_video, "list_medialive_channels"
-        ) as list_medialive_channels_mock:
+            sync_medialive_video, "iter_medialive_channels"
+        ) as iter_medialive_channels_mock:
             mediapackage_client_stubber.add_response(
                 "batch_update_schedule",
                 service_response={},
             )
-            list_medialive_channels_mock.return_value = [
+            iter_medialive_channels_mock.return_value = [
                 {
                     "Name": f"test_{live_id}_1667490961",
                     "Tags": {"environment": "test"},
@@ -281,15 +281,15 @@ class TestSyncMedialiveVideoCommandTest(TestCase):
             "django.utils.timezone.now",
             return_value=datetime(2022, 10, 14, 15, 25, tzinfo=timezone.utc),
         ), Stubber(
-            medialive_utils.medialive_client
+            medialive_utils.get_medialive_client()
         ) as mediapackage_client_stubber, mock.patch.object(
-            sync_medialive_video, "list_medialive_channels"
-        ) as list_medialive_channels_mock:
+            sync_medialive_video, "iter_medialive_channels"
+        ) as iter_medialive_channels_mock:
             mediapackage_client_stubber.add_response(
                 "batch_update_schedule",
                 service_response={},
             )
-            list_medialive_channels_mock.return_value = [
+            iter_medialive_channels_mock.return_value = [
                 {
                     "Name": f"test_{live_id}_1667490961",
                     "Tags": {"environment": "test"},
@@ -320,15 +320,15 @@ class TestSyncMedialiveVideoCommandTest(TestCase):
             "django.utils.timezone.now",
             return_value=datetime(2022, 10, 14, 15, 25, tzinfo=timezone.utc),
         ), Stubber(
-            medialive_utils.medialive_client
+            medialive_utils.get_medialive_client()
         ) as mediapackage_client_stubber, mock.patch.object(
-            sync_medialive_video, "list_medialive_channels"
-        ) as list_medialive_channels_mock:
+            sync_medialive_video, "iter_medialive_channels"
+        ) as iter_medialive_channels_mock:
             mediapackage_client_stubber.add_response(
                 "batch_update_schedule",
                 service_response={},
             )
-            list_medialive_channels_mock.return_value = [
+            iter_medialive_channels_mock.return_value = [
                 {
                     "Name": f"test_{live_id}_1667490961",
                     "Tags": {"environment": "test"},
@@ -363,15 +363,15 @@ class TestSyncMedialiveVideoCommandTest(TestCase):
             "django.utils.timezone.now",
             return_value=datetime(2022, 10, 14, 15, 25, tzinfo=timezone.utc),
         ), Stubber(
-            medialive_utils.medialive_client
+            medialive_utils.get_medialive_client()
         ) as mediapackage_client_stubber, mock.patch.object(
-            sync_medialive_video, "list_medialive_channels"
-        ) as list_medialive_channels_mock:
+            sync_medialive_video, "iter_medialive_channels"
+        ) as iter_medialive_channels_mock:
             mediapackage_client_stubber.add_response(
                 "batch_update_schedule",
                 service_response={},
             )
-            list_medialive_channels_mock.return_value = [
+            iter_medialive_channels_mock.return_value = [
                 {
                     "Name": f"test_{live1_id}_1667490961",
                     "Tags": {"environment": "test"},
@@ -422,8 +422,8 @@ class TestSyncMedialiveVideoCommandTest(TestCase):
             "django.utils.timezone.now",
             return_value=datetime(2022, 10, 14, 15, 25, tzinfo=timezone.utc),
         ), mock.patch.object(
-            sync_medialive_video, "list_medialive_channels"
-        ) as list_medialive_channels_mock, mock.patch(
+            sync_medialive_video, "iter_medialive_channels"
+        ) as iter_medialive_channels_mock, mock.patch(
             "marsha.core.management.commands.sync_medialive_video.delete_medialive_stack"
         ) as delete_medialive_stack_mock:
             live_to_delete = {
@@ -437,7 +437,7 @@ class TestSyncMedialiveVideoCommandTest(TestCase):
                     }
                 ],
             }
-            list_medialive_channels_mock.return_value = [live_to_delete]
+            iter_medialive_channels_mock.return_value = [live_to_delete]
 
             call_command("sync_medialive_video", stdout=out)
 
@@ -0,0 +1,40 @@
+"""Test xapi_delivery_status command."""
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from marsha.core.services import xapi_delivery
+
+
+class XAPIDeliveryStatusTestCase(TestCase):
+    """Test case for the xapi_delivery_status command."""
+
+    def setUp(self):
+        """Start each test without metrics."""
+        cache.clear()
+
+    def test_xapi_delivery_status(self):
+        """The command reports the delivery metrics."""
+        destination = xapi_delivery.get_destination()
+        xapi_delivery.enqueue(destination, {"id": "1"})
+        out = StringIO()
+
+        call_command("xapi_delivery_status", stdout=out)
+
+        self.assertEqual(
+            out.getvalue(),
+            "enqueued: 1, delivered: 0, dead_lettered: 0, queue_depth: 1, "
+            "average_latency_ms: 0\n",
+        )
+        self.assertEqual(xapi_delivery.get_metrics()["enqueued"], 1)
+
+    def test_xapi_delivery_status_reset(self):
+        """The metrics are reset after being reported."""
+        destination = xapi_delivery.get_destination()
+        xapi_delivery.enqueue(destination, {"id": "1"})
+
+        call_command("xapi_delivery_status", "--reset", stdout=StringIO())
+
+        self.assertEqual(xapi_delivery.get_metrics()["enqueued"], 0)
@@ -0,0 +1,57 @@
+"""Tests for the BaseModel of the ``core`` app of the Marsha project."""
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from marsha.core.factories import PlaylistFactory, VideoFactory
+
+
+class BaseModelSaveTestCase(TestCase):
+    """Test the validation done when saving an instance."""
+
+    def test_models_base_model_save_validates(self):
+        """Saving an instance validates all its fields and relations."""
+        video = VideoFactory()
+        video.live_state = "invalid"
+
+        with self.assertRaises(ValidationError) as context:
+            video.save()
+
+        self.assertIn("live_state", context.exception.message_dict)
+
+    def test_models_base_model_save_without_validation_touched_fields(self):
+        """Saving without validation still cleans the fields being saved."""
+        video = VideoFactory()
+        video.live_state = "invalid"
+
+        with self.assertRaises(ValidationError) as context:
+            video.save(update_fields=["live_state"], validate=False)
+
+        self.assertEqual(list(context.exception.message_dict), ["live_state"])
+
+    def test_models_base_model_save_without_validation_untouched_fields(self):
+        """Fields not being saved are not cleaned when saving without validation."""
+        video = VideoFactory()
+        video.live_state = "invalid"
+        video.title = "new title"
+
+        video.save(update_fields=["title"], validate=False)
+
+        video.refresh_from_db()
+        self.assertEqual(video.title, "new title")
+        self.assertIsNone(video.live_state)
+
+    def test_models_base_model_save_without_validation_relations(self):
+        """Relations are not queried when saving without validation."""
+        video = VideoFactory()
+        video.playlist = PlaylistFactory()
+
+        with CaptureQueriesContext(connection) as queries:
+            video.save(update_fields=["playlist"], validate=False)
+
+        with CaptureQueriesContext(connection) as validated_queries:
+            video.save(update_fields=["playlist"])
+
+        # the existence of the playlist is checked when validating
+        self.assertEqual(len(validated_queries), len(queries) + 1)
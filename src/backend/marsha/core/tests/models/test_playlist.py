@@ -7,9 +7,13 @@ from safedelete.models import SOFT_DELETE_CASCADE
 
 from marsha.core.factories import (
     ConsumerSiteFactory,
+    OrganizationAccessFactory,
     OrganizationFactory,
+    PlaylistAccessFactory,
     PlaylistFactory,
+    UserFactory,
 )
+from marsha.core.models import ADMINISTRATOR, INSTRUCTOR, STUDENT, Playlist
 
 
 class PlaylistModelsTestCase(TestCase):
@@ -101,3 +105,67 @@ class PlaylistModelsTestCase(TestCase):
         PlaylistFactory.create_batch(
             4, organization=organization, consumer_site=None, lti_id=None
         )
+
+    def test_models_playlist_visible_to(self):
+        """Playlists are visible to their admins and instructors and to the
+        administrators of their organization, once, with subqueries."""
+        user = UserFactory()
+        organization = OrganizationFactory()
+        OrganizationAccessFactory(
+            user=user, organization=organization, role=ADMINISTRATOR
+        )
+        organization_playlist = PlaylistFactory(organization=organization)
+        instructor_playlist = PlaylistFactory()
+        PlaylistAccessFactory(user=user, playlist=instructor_playlist, role=INSTRUCTOR)
+        both_playlist = PlaylistFactory(organization=organization)
+        PlaylistAccessFactory(user=user, playlist=both_playlist, role=ADMINISTRATOR)
+        student_playlist = PlaylistFactory()
+        PlaylistAccessFactory(user=user, playlist=student_playlist, role=STUDENT)
+        OrganizationAccessFactory(user=user, role=INSTRUCTOR)
+        PlaylistFactory(
+            organization=OrganizationAccessFactory(role=ADMINISTRATOR).organization
+        )
+        PlaylistFactory()
+
+        queryset = Playlist.objects.all().visible_to(user.id).order_by("created_on")
+        self.assertEqual(
+            list(queryset), [organization_playlist, instructor_playlist, both_playlist]
+        )
+        sql = str(queryset.query)
+        self.assertIn("IN (SELECT", sql)
+        self.assertNotIn("DISTINCT", sql)
+
+        self.assertEqual(
+            list(
+                Playlist.objects.all()
+                .visible_to(user.id, [STUDENT])
+                .order_by("created_on")
+            ),
+            [organization_playlist, both_playlist, student_playlist],
+        )
+
+    def test_models_playlist_annotate_can_edit(self):
+        """Playlists can be edited by their admins and instructors and by the
+        administrators of their organization, checked with correlated subqueries."""
+        user = UserFactory()
+        organization = OrganizationFactory()
+        OrganizationAccessFactory(
+            user=user, organization=organization, role=ADMINISTRATOR
+        )
+        organization_playlist = PlaylistFactory(organization=organization)
+        instructor_playlist = PlaylistFactory()
+        PlaylistAccessFactory(user=user, playlist=instructor_playlist, role=INSTRUCTOR)
+        student_playlist = PlaylistFactory()
+        PlaylistAccessFactory(user=user, playlist=student_playlist, role=STUDENT)
+
+        queryset = Playlist.objects.all().annotate_can_edit(user.id)
+        self.assertIn("EXISTS(SELECT", str(queryset.query))
+        self.assertNotIn("IN (SELECT", str(queryset.query))
+        self.assertEqual(
+            dict(queryset.values_list("pk", "can_edit")),
+            {
+                organization_playlist.pk: True,
+                instructor_playlist.pk: True,
+                student_playlist.pk: False,
+            },
+        )
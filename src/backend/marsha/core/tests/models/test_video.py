@@ -22,7 +22,15 @@ from marsha.core.defaults import (
     STATE_CHOICES,
     STOPPING,
 )
-from marsha.core.factories import VideoFactory
+from marsha.core.factories import (
+    OrganizationAccessFactory,
+    OrganizationFactory,
+    PlaylistAccessFactory,
+    PlaylistFactory,
+    UserFactory,
+    VideoFactory,
+)
+from marsha.core.models import ADMINISTRATOR, INSTRUCTOR, STUDENT, Video
 from marsha.core.utils.time_utils import to_timestamp
 
 
@@ -726,3 +734,38 @@ class VideoModelsTestCase(TestCase):
             self.assertEqual(video.live_duration, 99)
             self.assertEqual(video.live_ended_at, started + 99)
             self.assertEqual(video.get_list_timestamps_attendances(), {})
+
+    def test_models_video_visible_to(self):
+        """Videos are visible to the admins and instructors of their playlist and to
+        the administrators of its organization, once, with subqueries."""
+        user = UserFactory()
+        organization = OrganizationFactory()
+        OrganizationAccessFactory(
+            user=user, organization=organization, role=ADMINISTRATOR
+        )
+        playlist = PlaylistFactory(organization=organization)
+        PlaylistAccessFactory(user=user, playlist=playlist, role=INSTRUCTOR)
+        videos = VideoFactory.create_batch(3, playlist=playlist)
+        videos.append(VideoFactory(playlist__organization=organization))
+        student_video = VideoFactory()
+        PlaylistAccessFactory(user=user, playlist=student_video.playlist, role=STUDENT)
+        other_video = VideoFactory()
+
+        queryset = Video.objects.all().visible_to(user.id).annotate_can_edit(user.id)
+        self.assertCountEqual(list(queryset), videos)
+        self.assertTrue(all(video.can_edit for video in queryset))
+        sql = str(queryset.query)
+        self.assertIn("IN (SELECT", sql)
+        self.assertNotIn("DISTINCT", sql)
+
+        queryset = Video.objects.all().annotate_can_edit(user.id)
+        self.assertIn("EXISTS(SELECT", str(queryset.query))
+        self.assertNotIn("IN (SELECT", str(queryset.query))
+        self.assertEqual(
+            dict(queryset.values_list("pk", "can_edit")),
+            {
+                **{video.pk: True for video in videos},
+                student_video.pk: False,
+                other_video.pk: False,
+            },
+        )
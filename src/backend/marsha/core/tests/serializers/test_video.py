@@ -153,3 +153,80 @@ class VideoBaseSerializerTest(TestCase):
             sentry_capture_message.assert_called_once_with(
                 f"VOD {video.pk} had no transcode_pipeline and was recovered to peertube",
             )
+
+    @override_settings(
+        MEDIA_URL="https://abc.cloudfront.net/",
+        TRANSCODE_PIPELINE_STORAGE_LOOKUP=False,
+    )
+    def test_video_serializer_urls_with_no_pipeline_backfill_not_completed(self):
+        """Without storage lookup, the pipeline is still looked up until the pipelines
+        of all the videos were backfilled."""
+        video = VideoFactory(
+            transcode_pipeline=None,
+            live_state=None,
+            resolutions=[1080],
+            uploaded_on=datetime(2022, 1, 1, tzinfo=baseTimezone.utc),
+        )
+
+        with mock.patch(
+            "marsha.core.serializers.video.capture_message"
+        ) as sentry_capture_message, mock.patch(
+            "marsha.core.serializers.video.video_storage"
+        ) as mock_video_storage, mock.patch(
+            "marsha.core.serializers.video.schedule_transcode_pipeline_backfill"
+        ) as mock_schedule, mock.patch(
+            "marsha.core.serializers.video.transcode_pipeline.is_backfill_completed",
+            return_value=False,
+        ):
+            mock_video_storage.url = video_storage.url
+            mock_video_storage.exists.return_value = True
+            serializer = VideoBaseSerializer(video)
+            self.assertEqual(
+                f"https://abc.cloudfront.net/vod/{video.pk}/video/1640995200/master.m3u8",
+                serializer.data["urls"]["manifests"]["hls"],
+            )
+
+        mock_video_storage.exists.assert_called_once_with(
+            f"scw/{video.pk}/video/1640995200/thumbnail.jpg"
+        )
+        sentry_capture_message.assert_called_once()
+        mock_schedule.assert_not_called()
+        video.refresh_from_db()
+        self.assertEqual(video.transcode_pipeline, PEERTUBE_PIPELINE)
+
+    @override_settings(TRANSCODE_PIPELINE_STORAGE_LOOKUP=False)
+    def test_video_serializer_urls_with_no_pipeline_no_storage_lookup(self):
+        """Without storage lookup, once the pipelines of all the videos were
+        backfilled, the pipeline is recovered in the background."""
+        date = datetime(2022, 1, 1, tzinfo=baseTimezone.utc)
+        video = VideoFactory(
+            transcode_pipeline=None,
+            live_state=None,
+            resolutions=[1080],
+            uploaded_on=date,
+        )
+
+        with mock.patch(
+            "marsha.core.serializers.video.capture_message"
+        ) as sentry_capture_message, mock.patch(
+            "marsha.core.serializers.video.video_storage"
+        ) as mock_video_storage, mock.patch(
+            "marsha.core.serializers.video.schedule_transcode_pipeline_backfill"
+        ) as mock_schedule, mock.patch(
+            "marsha.core.serializers.video.transcode_pipeline.increment_counter"
+        ) as mock_increment_counter, mock.patch(
+            "marsha.core.serializers.video.transcode_pipeline.is_backfill_completed",
+            return_value=True,
+        ):
+            serializer = VideoBaseSerializer(video)
+            self.assertEqual(
+                f"https://abc.cloudfront.net/{video.pk}/cmaf/1640995200.m3u8",
+                serializer.data["urls"]["manifests"]["hls"],
+            )
+
+        mock_video_storage.exists.assert_not_called()
+        sentry_capture_message.assert_not_called()
+        mock_schedule.assert_called_once_with(video.pk)
+        mock_increment_counter.assert_called_once_with("deferred")
+        video.refresh_from_db()
+        self.assertIsNone(video.transcode_pipeline)
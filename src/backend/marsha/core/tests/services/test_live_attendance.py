@@ -0,0 +1,90 @@
+"""Tests for the live_attendance service in the ``core`` app of the Marsha project."""
+from django.core.cache import cache
+from django.test import TestCase
+
+from marsha.core.factories import AnonymousLiveSessionFactory, VideoFactory
+from marsha.core.services import live_attendance
+
+
+class LiveAttendanceServicesTestCase(TestCase):
+    """Test the write-behind ingestion of attendance beats."""
+
+    def setUp(self):
+        """Start each test with an empty buffer."""
+        cache.clear()
+
+    def test_services_live_attendance_claim_flush(self):
+        """A flush can be claimed once until it is released."""
+        video = VideoFactory()
+
+        self.assertTrue(live_attendance.claim_flush(video.id))
+        self.assertFalse(live_attendance.claim_flush(video.id))
+
+        live_attendance.release_flush(video.id)
+        self.assertTrue(live_attendance.claim_flush(video.id))
+
+    def test_services_live_attendance_flush_folds_previous_generation(self):
+        """A generation is folded by the flush following the one that closed it."""
+        video = VideoFactory()
+        livesession = AnonymousLiveSessionFactory(
+            video=video, live_attendance={"1": {"muted": True}}
+        )
+        self.assertFalse(live_attendance.has_pending_beats(video.id))
+
+        live_attendance.push_beat(
+            video.id, livesession.id, {"1": {"muted": False}}, language="fr"
+        )
+        live_attendance.push_beat(video.id, livesession.id, {"2": {"muted": False}})
+        self.assertTrue(live_attendance.has_pending_beats(video.id))
+
+        # the generation holding the beats is closed but not folded yet
+        self.assertEqual(live_attendance.flush(video.id), 0)
+        self.assertTrue(live_attendance.has_pending_beats(video.id))
+
+        # a beat received now belongs to the next generation
+        live_attendance.push_beat(video.id, livesession.id, {"3": {"muted": False}})
+
+        self.assertEqual(live_attendance.flush(video.id), 1)
+        livesession.refresh_from_db()
+        self.assertEqual(
+            livesession.live_attendance,
+            {"1": {"muted": True}, "2": {"muted": False}},
+        )
+        self.assertEqual(livesession.language, "fr")
+        self.assertTrue(live_attendance.has_pending_beats(video.id))
+
+        self.assertEqual(live_attendance.flush(video.id), 1)
+        livesession.refresh_from_db()
+        self.assertEqual(
+            livesession.live_attendance,
+            {"1": {"muted": True}, "2": {"muted": False}, "3": {"muted": False}},
+        )
+        self.assertFalse(live_attendance.has_pending_beats(video.id))
+
+    def test_services_live_attendance_flush_unknown_livesession(self):
+        """Beats of a live session deleted meanwhile are dropped."""
+        video = VideoFactory()
+        livesession = AnonymousLiveSessionFactory(video=video)
+        live_attendance.push_beat(video.id, livesession.id, {"1": {}})
+        livesession.delete()
+
+        live_attendance.flush(video.id)
+        self.assertEqual(live_attendance.flush(video.id), 0)
+        self.assertFalse(live_attendance.has_pending_beats(video.id))
+
+    def test_services_live_attendance_snapshot_key(self):
+        """The key computed from a request matches the one of the live session."""
+        livesession = AnonymousLiveSessionFactory()
+
+        self.assertEqual(
+            live_attendance.get_livesession_snapshot_key(livesession),
+            live_attendance.get_snapshot_key(
+                livesession.video_id, anonymous_id=livesession.anonymous_id
+            ),
+        )
+        self.assertNotEqual(
+            live_attendance.get_livesession_snapshot_key(livesession),
+            live_attendance.get_snapshot_key(
+                VideoFactory().id, anonymous_id=livesession.anonymous_id
+            ),
+        )
@@ -0,0 +1,142 @@
+"""Tests for the live_attendance_timeline service of the ``core`` app of Marsha."""
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from marsha.core.factories import AnonymousLiveSessionFactory, VideoFactory
+from marsha.core.services import live_attendance_timeline
+
+
+VIDEO_TIMESTAMPS = {"100": {}, "200": {}, "300": {}, "400": {}}
+
+
+@override_settings(ATTENDANCE_PUSH_DELAY=60)
+class LiveAttendanceTimelineServicesTestCase(TestCase):
+    """Test the computation of attendance timelines."""
+
+    def setUp(self):
+        """Start each test with no precomputed row."""
+        cache.clear()
+
+    def test_services_live_attendance_timeline_no_timestamps(self):
+        """A video with no timeline gives an empty timeline."""
+        self.assertEqual(
+            live_attendance_timeline.get_attendance_timeline({}, {"1": {}}), {}
+        )
+
+    def test_services_live_attendance_timeline_no_attendance(self):
+        """A live session with no beat gives the timeline of the video."""
+        self.assertEqual(
+            live_attendance_timeline.get_attendance_timeline(VIDEO_TIMESTAMPS, {}),
+            VIDEO_TIMESTAMPS,
+        )
+
+    def test_services_live_attendance_timeline_same_keys(self):
+        """Beats matching the video timestamps are used as is."""
+        self.assertEqual(
+            live_attendance_timeline.get_attendance_timeline(
+                VIDEO_TIMESTAMPS, {"200": {"sound": "ON"}, "300": {}}
+            ),
+            {"100": {}, "200": {"sound": "ON"}, "300": {}, "400": {}},
+        )
+
+    def test_services_live_attendance_timeline_beats_in_between(self):
+        """Beats apply until the push delay is over, viewers seen in between are kept."""
+        self.assertEqual(
+            live_attendance_timeline.get_attendance_timeline(
+                VIDEO_TIMESTAMPS,
+                {"150": {"sound": "ON"}, "230": {}, "320": {"sound": "OFF"}},
+            ),
+            {
+                "100": {},
+                "200": {"sound": "ON"},
+                "300": {"connectedInBetween": True, "lastConnected": 230},
+                "400": {"connectedInBetween": True, "lastConnected": 320},
+            },
+        )
+
+    def test_services_live_attendance_timeline_invalid_keys(self):
+        """Attendance keys must be timestamps."""
+        with self.assertRaises(ValueError):
+            live_attendance_timeline.get_attendance_timeline(
+                VIDEO_TIMESTAMPS, {"wrong": {}}
+            )
+
+    def test_services_live_attendance_timeline_get_attendance_timelines(self):
+        """Rows are computed once and recomputed only for updated live sessions."""
+        video = VideoFactory()
+        livesession = AnonymousLiveSessionFactory(
+            video=video, live_attendance={"150": {"sound": "ON"}}
+        )
+        other_livesession = AnonymousLiveSessionFactory(
+            video=video, live_attendance={"300": {}}
+        )
+        invalid_livesession = AnonymousLiveSessionFactory(
+            video=video, live_attendance={"wrong": {}}
+        )
+        empty_livesession = AnonymousLiveSessionFactory(video=video)
+        livesessions = [
+            livesession,
+            other_livesession,
+            invalid_livesession,
+            empty_livesession,
+        ]
+
+        expected = {
+            livesession.pk: {
+                "100": {},
+                "200": {"sound": "ON"},
+                "300": {},
+                "400": {},
+            },
+            other_livesession.pk: {"100": {}, "200": {}, "300": {}, "400": {}},
+            empty_livesession.pk: VIDEO_TIMESTAMPS,
+        }
+        self.assertEqual(
+            live_attendance_timeline.get_attendance_timelines(
+                video.pk, VIDEO_TIMESTAMPS, livesessions
+            ),
+            expected,
+        )
+
+        livesession.live_attendance = livesession.live_attendance | {
+            "390": {"sound": "OFF"}
+        }
+        livesession.save()
+
+        with mock.patch.object(
+            live_attendance_timeline,
+            "compute_attendance_row",
+            wraps=live_attendance_timeline.compute_attendance_row,
+        ) as mock_compute:
+            timelines = live_attendance_timeline.get_attendance_timelines(
+                video.pk, VIDEO_TIMESTAMPS, livesessions
+            )
+
+        # only the updated live session and the invalid one are computed again
+        self.assertEqual(mock_compute.call_count, 2)
+        self.assertEqual(
+            timelines,
+            expected
+            | {
+                livesession.pk: {
+                    "100": {},
+                    "200": {"sound": "ON"},
+                    "300": {},
+                    "400": {"sound": "OFF"},
+                }
+            },
+        )
+
+        # a new timeline for the video invalidates all the rows
+        with mock.patch.object(
+            live_attendance_timeline,
+            "compute_attendance_row",
+            wraps=live_attendance_timeline.compute_attendance_row,
+        ) as mock_compute:
+            live_attendance_timeline.get_attendance_timelines(
+                video.pk, VIDEO_TIMESTAMPS | {"500": {}}, livesessions
+            )
+
+        self.assertEqual(mock_compute.call_count, 3)
@@ -0,0 +1,191 @@
+"""Tests for the transcode pipeline recovery service."""
+from datetime import datetime, timezone as baseTimezone
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import InMemoryStorage
+from django.test import TestCase, override_settings
+from django.utils.functional import LazyObject
+
+from marsha.core.defaults import AWS_PIPELINE, PEERTUBE_PIPELINE
+from marsha.core.factories import VideoFactory
+from marsha.core.services import transcode_pipeline
+
+
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+UPLOADED_ON = datetime(2022, 1, 1, tzinfo=baseTimezone.utc)
+
+
+@override_settings(CACHES=CACHES)
+class TranscodePipelineServiceTestCase(TestCase):
+    """Test the recovery of transcode pipelines."""
+
+    def setUp(self):
+        """Use an empty storage and reset the counters."""
+        super().setUp()
+        self.storage = InMemoryStorage()
+        transcode_pipeline.reset_counters()
+        cache.delete(transcode_pipeline.BACKFILL_COMPLETED_KEY)
+
+    def _patch_storage(self):
+        """Make the service list the test storage."""
+        return mock.patch.object(transcode_pipeline, "video_storage", self.storage)
+
+    def test_services_transcode_pipeline_counters(self):
+        """Counters start at 0 and are incremented."""
+        self.assertEqual(
+            transcode_pipeline.get_counters(),
+            {"storage_lookups": 0, "deferred": 0, "backfilled": 0},
+        )
+        transcode_pipeline.increment_counter(transcode_pipeline.DEFERRED)
+        transcode_pipeline.increment_counter(transcode_pipeline.DEFERRED, 2)
+
+        self.assertEqual(transcode_pipeline.get_counters()["deferred"], 3)
+
+    def test_services_transcode_pipeline_list_peertube_transcoded_videos(self):
+        """Only thumbnails of the scw/ prefix are considered."""
+        self.storage.save("scw/a/video/1/thumbnail.jpg", ContentFile(b"x"))
+        self.storage.save("scw/b/video/2/master.m3u8", ContentFile(b"x"))
+        self.storage.save("vod/c/video/3/thumbnail.jpg", ContentFile(b"x"))
+
+        self.assertEqual(
+            transcode_pipeline.list_peertube_transcoded_videos(self.storage),
+            {("a", "1")},
+        )
+
+    def test_services_transcode_pipeline_list_s3(self):
+        """An S3 storage is listed with paginated list_objects_v2 calls."""
+        storage = mock.MagicMock(
+            spec=transcode_pipeline.S3Boto3Storage, bucket_name="bucket"
+        )
+        paginator = storage.connection.meta.client.get_paginator.return_value
+        paginator.paginate.return_value = [
+            {"Contents": [{"Key": "scw/a/video/1/thumbnail.jpg"}]},
+            {"Contents": [{"Key": "scw/b/video/2/master.m3u8"}]},
+            {},
+        ]
+
+        self.assertEqual(
+            transcode_pipeline.list_peertube_transcoded_videos(storage),
+            {("a", "1")},
+        )
+        storage.connection.meta.client.get_paginator.assert_called_once_with(
+            "list_objects_v2"
+        )
+        paginator.paginate.assert_called_once_with(Bucket="bucket", Prefix="scw/")
+
+    def test_services_transcode_pipeline_list_s3_lazy_storage(self):
+        """A lazy storage not set up yet is set up before choosing how to list it."""
+        s3_storage = mock.MagicMock(
+            spec=transcode_pipeline.S3Boto3Storage, bucket_name="bucket"
+        )
+        paginator = s3_storage.connection.meta.client.get_paginator.return_value
+        paginator.paginate.return_value = [
+            {"Contents": [{"Key": "scw/a/video/1/thumbnail.jpg"}]},
+        ]
+
+        class LazyStorage(LazyObject):
+            """A lazy storage set up on first use, like the videos storage."""
+
+            def _setup(self):
+                self._wrapped = s3_storage
+
+        with mock.patch.object(transcode_pipeline, "video_storage", LazyStorage()):
+            self.assertEqual(
+                transcode_pipeline.list_peertube_transcoded_videos(), {("a", "1")}
+            )
+
+        s3_storage.exists.assert_not_called()
+        paginator.paginate.assert_called_once_with(Bucket="bucket", Prefix="scw/")
+
+    def test_services_transcode_pipeline_backfill(self):
+        """Uploaded videos without pipeline are saved in batches."""
+        peertube_video = VideoFactory(transcode_pipeline=None, uploaded_on=UPLOADED_ON)
+        aws_videos = VideoFactory.create_batch(
+            2, transcode_pipeline=None, uploaded_on=UPLOADED_ON
+        )
+        not_uploaded = VideoFactory(transcode_pipeline=None, uploaded_on=None)
+        self.storage.save(
+            f"scw/{peertube_video.pk}/video/1640995200/thumbnail.jpg",
+            ContentFile(b"x"),
+        )
+
+        with self._patch_storage(), self.assertNumQueries(4):
+            # exists, select and 2 batches of updates
+            recovered = transcode_pipeline.backfill_transcode_pipelines(batch_size=2)
+
+        self.assertEqual(recovered, {PEERTUBE_PIPELINE: 1, AWS_PIPELINE: 2})
+        peertube_video.refresh_from_db()
+        self.assertEqual(peertube_video.transcode_pipeline, PEERTUBE_PIPELINE)
+        for video in aws_videos:
+            video.refresh_from_db()
+            self.assertEqual(video.transcode_pipeline, AWS_PIPELINE)
+        not_uploaded.refresh_from_db()
+        self.assertIsNone(not_uploaded.transcode_pipeline)
+        self.assertEqual(transcode_pipeline.get_counters()["backfilled"], 3)
+        self.assertTrue(transcode_pipeline.is_backfill_completed())
+
+    def test_services_transcode_pipeline_backfill_video_ids_dry_run(self):
+        """The backfill can be restricted to some videos and run without saving."""
+        video = VideoFactory(transcode_pipeline=None, uploaded_on=UPLOADED_ON)
+        other_video = VideoFactory(transcode_pipeline=None, uploaded_on=UPLOADED_ON)
+
+        with self._patch_storage():
+            recovered = transcode_pipeline.backfill_transcode_pipelines(
+                video_ids=[str(video.pk)], dry_run=True
+            )
+
+        self.assertEqual(recovered, {PEERTUBE_PIPELINE: 0, AWS_PIPELINE: 1})
+        video.refresh_from_db()
+        self.assertIsNone(video.transcode_pipeline)
+        other_video.refresh_from_db()
+        self.assertIsNone(other_video.transcode_pipeline)
+        self.assertFalse(transcode_pipeline.is_backfill_completed())
+
+    def test_services_transcode_pipeline_backfill_video_ids_lookup(self):
+        """The thumbnail of the given videos is looked up without listing the prefix."""
+        peertube_video = VideoFactory(transcode_pipeline=None, uploaded_on=UPLOADED_ON)
+        aws_video = VideoFactory(transcode_pipeline=None, uploaded_on=UPLOADED_ON)
+        self.storage.save(
+            f"scw/{peertube_video.pk}/video/1640995200/thumbnail.jpg",
+            ContentFile(b"x"),
+        )
+
+        with self._patch_storage(), mock.patch.object(
+            transcode_pipeline, "list_peertube_transcoded_videos"
+        ) as mock_list:
+            recovered = transcode_pipeline.backfill_transcode_pipelines(
+                video_ids=[peertube_video.pk, aws_video.pk]
+            )
+
+        mock_list.assert_not_called()
+        self.assertEqual(recovered, {PEERTUBE_PIPELINE: 1, AWS_PIPELINE: 1})
+        peertube_video.refresh_from_db()
+        self.assertEqual(peertube_video.transcode_pipeline, PEERTUBE_PIPELINE)
+        aws_video.refresh_from_db()
+        self.assertEqual(aws_video.transcode_pipeline, AWS_PIPELINE)
+        # Only a backfill of all the videos is recorded
+        self.assertFalse(transcode_pipeline.is_backfill_completed())
+
+    def test_services_transcode_pipeline_backfill_nothing_to_do(self):
+        """The storage is not listed when no video misses its pipeline."""
+        VideoFactory(transcode_pipeline=AWS_PIPELINE, uploaded_on=UPLOADED_ON)
+
+        with mock.patch.object(
+            transcode_pipeline, "list_peertube_transcoded_videos"
+        ) as mock_list:
+            recovered = transcode_pipeline.backfill_transcode_pipelines()
+
+        mock_list.assert_not_called()
+        self.assertEqual(recovered, {PEERTUBE_PIPELINE: 0, AWS_PIPELINE: 0})
+        self.assertTrue(transcode_pipeline.is_backfill_completed())
+
+    def test_services_transcode_pipeline_backfill_completed_dry_run(self):
+        """A dry run of the backfill of all the videos is not recorded."""
+        VideoFactory(transcode_pipeline=None, uploaded_on=UPLOADED_ON)
+
+        with self._patch_storage():
+            transcode_pipeline.backfill_transcode_pipelines(dry_run=True)
+
+        self.assertFalse(transcode_pipeline.is_backfill_completed())
@@ -0,0 +1,190 @@
+"""Test the asynchronous delivery of xAPI statements."""
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+import requests
+
+from marsha.core.factories import ConsumerSiteFactory
+from marsha.core.models import XAPIDeadLetter
+from marsha.core.services import xapi_delivery
+
+
+LRS_URL = "https://lrs.example.com/xAPI/statements"
+
+
+class XAPIDeliveryTestCase(TestCase):
+    """Test the xAPI statements log and its delivery."""
+
+    maxDiff = None
+
+    def setUp(self):
+        """Start each test with an empty log."""
+        cache.clear()
+        self.destination = xapi_delivery.get_destination()
+        for _entries in xapi_delivery.consume_batches(self.destination, 100):
+            pass
+
+    def test_get_destination(self):
+        """Statements are delivered to the LRS of their consumer site or of the
+        settings."""
+        consumer_site = ConsumerSiteFactory()
+
+        self.assertEqual(self.destination, "site")
+        self.assertEqual(
+            xapi_delivery.get_destination(consumer_site.pk), str(consumer_site.pk)
+        )
+
+    @override_settings(
+        LRS_URL=LRS_URL, LRS_AUTH_TOKEN="token", LRS_XAPI_VERSION="1.0.3"
+    )
+    def test_get_lrs(self):
+        """The credentials of the LRS of a destination are looked up."""
+        consumer_site = ConsumerSiteFactory(
+            lrs_url="https://lrs.example.org",
+            lrs_auth_token="secret",
+            lrs_xapi_version="1.0.0",
+        )
+        unconfigured_site = ConsumerSiteFactory(lrs_url="")
+
+        self.assertEqual(
+            xapi_delivery.get_lrs(self.destination), (LRS_URL, "token", "1.0.3")
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                xapi_delivery.get_lrs(xapi_delivery.get_destination(consumer_site.pk)),
+                ("https://lrs.example.org", "secret", "1.0.0"),
+            )
+        self.assertIsNone(
+            xapi_delivery.get_lrs(xapi_delivery.get_destination(unconfigured_site.pk))
+        )
+        with override_settings(LRS_AUTH_TOKEN=None):
+            self.assertIsNone(xapi_delivery.get_lrs(self.destination))
+
+    def test_claim_delivery(self):
+        """A delivery is claimed once until it is released."""
+        self.assertTrue(xapi_delivery.claim_delivery(self.destination))
+        self.assertFalse(xapi_delivery.claim_delivery(self.destination))
+
+        xapi_delivery.release_delivery(self.destination)
+
+        self.assertTrue(xapi_delivery.claim_delivery(self.destination))
+
+    def test_consume_batches(self):
+        """Statements are consumed in order, in batches, once they are enqueued."""
+        self.assertFalse(xapi_delivery.has_pending_statements(self.destination))
+        for index in range(3):
+            xapi_delivery.enqueue(self.destination, {"id": str(index)})
+        self.assertTrue(xapi_delivery.has_pending_statements(self.destination))
+
+        batches = []
+        for entries in xapi_delivery.consume_batches(self.destination, 2):
+            batches.append([entry["statement"] for entry in entries])
+            # statements enqueued meanwhile are left to the next consumption
+            xapi_delivery.enqueue(self.destination, {"id": f"late{len(batches)}"})
+
+        self.assertEqual(batches, [[{"id": "0"}, {"id": "1"}], [{"id": "2"}]])
+        self.assertTrue(xapi_delivery.has_pending_statements(self.destination))
+        self.assertEqual(
+            [
+                [entry["statement"] for entry in entries]
+                for entries in xapi_delivery.consume_batches(self.destination, 2)
+            ],
+            [[{"id": "late1"}, {"id": "late2"}]],
+        )
+        self.assertFalse(xapi_delivery.has_pending_statements(self.destination))
+
+    def test_consume_batches_other_destination(self):
+        """The statements of each destination are queued apart."""
+        other_destination = xapi_delivery.get_destination(ConsumerSiteFactory().pk)
+        xapi_delivery.enqueue(other_destination, {"id": "1"})
+
+        self.assertEqual(list(xapi_delivery.consume_batches(self.destination, 2)), [])
+        self.assertEqual(
+            len(list(xapi_delivery.consume_batches(other_destination, 2))), 1
+        )
+
+    def test_deliver(self):
+        """The statements are sent at once and the metrics are updated."""
+        xapi_delivery.enqueue(self.destination, {"id": "1"})
+        xapi_delivery.enqueue(self.destination, {"id": "2"})
+        (entries,) = xapi_delivery.consume_batches(self.destination, 2)
+        self.assertEqual(xapi_delivery.get_metrics()["queue_depth"], 2)
+
+        with mock.patch.object(
+            xapi_delivery.XAPI, "send_many"
+        ) as mock_send_many, mock.patch.object(
+            xapi_delivery.time, "time", return_value=entries[-1]["enqueued_at"] + 0.5
+        ):
+            xapi_delivery.deliver(LRS_URL, "token", "1.0.3", entries)
+
+        mock_send_many.assert_called_once_with([{"id": "1"}, {"id": "2"}])
+        metrics = xapi_delivery.get_metrics()
+        self.assertEqual(metrics["enqueued"], 2)
+        self.assertEqual(metrics["delivered"], 2)
+        self.assertEqual(metrics["queue_depth"], 0)
+        self.assertGreaterEqual(metrics["average_latency_ms"], 500)
+
+    def test_deliver_error(self):
+        """Statements rejected by the LRS are not counted as delivered."""
+        entries = [{"statement": {"id": "1"}, "enqueued_at": 0}]
+
+        with mock.patch.object(
+            xapi_delivery.XAPI,
+            "send_many",
+            side_effect=requests.exceptions.ConnectionError(),
+        ), self.assertRaises(requests.exceptions.ConnectionError):
+            xapi_delivery.deliver(LRS_URL, "token", "1.0.3", entries)
+
+        self.assertEqual(xapi_delivery.get_metrics()["delivered"], 0)
+
+    def test_dead_letter(self):
+        """Statements that could not be delivered are kept in the database."""
+        xapi_delivery.enqueue(self.destination, {"id": "1"})
+        entries = [{"statement": {"id": "1"}, "enqueued_at": 0}]
+
+        xapi_delivery.dead_letter(
+            self.destination, LRS_URL, entries, attempts=6, error="Bad request"
+        )
+
+        dead_letter = XAPIDeadLetter.objects.get()
+        self.assertIsNone(dead_letter.consumer_site)
+        self.assertEqual(dead_letter.lrs_url, LRS_URL)
+        self.assertEqual(dead_letter.statements, [{"id": "1"}])
+        self.assertEqual(dead_letter.attempts, 6)
+        self.assertEqual(dead_letter.error, "Bad request")
+        self.assertEqual(
+            xapi_delivery.get_metrics(),
+            {
+                "enqueued": 1,
+                "delivered": 0,
+                "dead_lettered": 1,
+                "queue_depth": 0,
+                "average_latency_ms": 0,
+            },
+        )
+
+    def test_dead_letter_consumer_site(self):
+        """The dead letters of a consumer site refer to it, not to its credentials."""
+        consumer_site = ConsumerSiteFactory()
+
+        xapi_delivery.dead_letter(
+            xapi_delivery.get_destination(consumer_site.pk),
+            None,
+            [{"statement": {"id": "1"}, "enqueued_at": 0}],
+            attempts=1,
+            error="LRS not configured",
+        )
+
+        dead_letter = XAPIDeadLetter.objects.get()
+        self.assertEqual(dead_letter.consumer_site, consumer_site)
+        self.assertEqual(dead_letter.lrs_url, "")
+
+    def test_reset_metrics(self):
+        """Metrics can be reset."""
+        xapi_delivery.enqueue(self.destination, {"id": "1"})
+
+        xapi_delivery.reset_metrics()
+
+        self.assertEqual(xapi_delivery.get_metrics()["enqueued"], 0)
@@ -0,0 +1,58 @@
+"""Test for live session celery tasks"""
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from marsha.core.factories import AnonymousLiveSessionFactory
+from marsha.core.services import live_attendance
+from marsha.core.tasks.live_session import (
+    flush_live_attendances,
+    schedule_live_attendances_flush,
+)
+
+
+@mock.patch("marsha.core.tasks.live_session.flush_live_attendances.apply_async")
+class TestLiveSessionTask(TestCase):
+    """
+    Test for live session celery tasks
+    """
+
+    def setUp(self):
+        """Start each test with an empty buffer."""
+        cache.clear()
+
+    @override_settings(ATTENDANCE_WRITE_BEHIND_FLUSH_DELAY=10)
+    def test_schedule_live_attendances_flush(self, mock_apply_async):
+        """Only one flush is scheduled until it runs."""
+        video_pk = "a1a21411-bf2f-4926-b97f-3c48a124d528"
+
+        schedule_live_attendances_flush(video_pk)
+        schedule_live_attendances_flush(video_pk)
+
+        mock_apply_async.assert_called_once_with(args=[video_pk], countdown=10)
+
+    def test_flush_live_attendances(self, mock_apply_async):
+        """The task reschedules itself until every beat has been folded."""
+        livesession = AnonymousLiveSessionFactory()
+        video_pk = str(livesession.video_id)
+        schedule_live_attendances_flush(video_pk)
+        live_attendance.push_beat(video_pk, livesession.id, {"1": {}})
+        mock_apply_async.reset_mock()
+
+        flush_live_attendances(video_pk)
+        mock_apply_async.assert_called_once_with(args=[video_pk], countdown=60)
+        mock_apply_async.reset_mock()
+
+        flush_live_attendances(video_pk)
+        mock_apply_async.assert_not_called()
+        livesession.refresh_from_db()
+        self.assertEqual(livesession.live_attendance, {"1": {}})
+
+    def test_flush_live_attendances_nothing_pending(self, mock_apply_async):
+        """The task does not reschedule itself when no beat is pending."""
+        livesession = AnonymousLiveSessionFactory()
+
+        flush_live_attendances(str(livesession.video_id))
+
+        mock_apply_async.assert_not_called()
@@ -22,9 +22,11 @@ class TestS3Task(TestCase):
         video = VideoFactory()
 
         with mock.patch(
-            "marsha.core.tasks.s3.move_s3_directory"
+            "marsha.core.tasks.s3.move_s3_directory",
+            side_effect=[{"objects": 3, "bytes": 30}, {"objects": 2, "bytes": 20}],
         ) as mock_move_s3_directory:
-            delete_s3_video(str(video.pk))
+            moved = delete_s3_video(str(video.pk))
+            self.assertEqual(moved, {"objects": 5, "bytes": 50})
             mock_move_s3_directory.assert_has_calls(
                 [
                     mock.call(
@@ -32,12 +34,14 @@ class TestS3Task(TestCase):
                         "deleted",
                         "AWS",
                         "test-marsha-destination",
+                        dry_run=False,
                     ),
                     mock.call(
                         f"vod/{video.pk}",
                         "deleted",
                         "VIDEOS_S3",
                         "test-marsha",
+                        dry_run=False,
                     ),
                 ]
             )
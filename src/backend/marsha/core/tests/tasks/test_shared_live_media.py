@@ -5,18 +5,24 @@ from io import BytesIO
 from unittest import mock
 
 from django.core.files.base import ContentFile
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 import fitz  # PyMuPDF
 
 from marsha.core.defaults import (
     CELERY_PIPELINE,
     ERROR,
+    READY,
     TMP_VIDEOS_STORAGE_BASE_DIRECTORY,
 )
 from marsha.core.factories import SharedLiveMediaFactory
 from marsha.core.storage.storage_class import video_storage
-from marsha.core.tasks.shared_live_media import convert_shared_live_media
+from marsha.core.tasks import shared_live_media as shared_live_media_tasks
+from marsha.core.tasks.shared_live_media import (
+    convert_shared_live_media,
+    convert_shared_live_media_pages,
+)
+from marsha.core.utils.time_utils import to_datetime
 
 
 class TestSharedLiveMediaTask(TestCase):
@@ -108,3 +114,225 @@ class TestSharedLiveMediaTask(TestCase):
             shared_live_media.refresh_from_db()
             self.assertEqual(shared_live_media.upload_state, ERROR)
             mock_capture_exception.assert_called_once()
+
+    @staticmethod
+    def _save_pdf(shared_live_media, stamp, nb_pages):
+        """Upload a PDF of `nb_pages` pages with some text on each page."""
+        with BytesIO() as buffer:
+            doc = fitz.Document()
+            for page_number in range(1, nb_pages + 1):
+                doc.new_page().insert_text((72, 72), f"Page {page_number}")
+            doc.save(buffer)
+            video_storage.save(
+                shared_live_media.get_videos_storage_prefix(
+                    stamp, TMP_VIDEOS_STORAGE_BASE_DIRECTORY
+                ),
+                ContentFile(buffer.getvalue()),
+            )
+
+    @override_settings(SHARED_LIVE_MEDIA_CONVERSION_CHUNK_SIZE=2)
+    @mock.patch.object(shared_live_media_tasks, "channel_layers_utils")
+    @mock.patch.object(convert_shared_live_media_pages, "delay")
+    def test_shared_live_media_by_chunks(self, mock_delay, mock_channel_layers_utils):
+        """
+        The first chunk is converted right away and published, the other ones are
+        converted by other tasks and published once the pages before them are.
+        """
+        shared_live_media = SharedLiveMediaFactory(nb_pages=None)
+        stamp = "1640995200"
+        prefix = shared_live_media.get_videos_storage_prefix(stamp)
+        self._save_pdf(shared_live_media, stamp, 5)
+
+        convert_shared_live_media(str(shared_live_media.pk), stamp)
+
+        self.assertEqual(
+            mock_delay.call_args_list,
+            [
+                mock.call(str(shared_live_media.pk), stamp, 5, 2, 3),
+                mock.call(str(shared_live_media.pk), stamp, 5, 2, 5),
+            ],
+        )
+        self.assertTrue(video_storage.exists(f"{prefix}/{stamp}.pdf"))
+        for page_number in range(1, 6):
+            self.assertEqual(
+                video_storage.exists(f"{prefix}/{stamp}_{page_number}.svg"),
+                page_number <= 2,
+            )
+        shared_live_media.refresh_from_db()
+        self.assertEqual(shared_live_media.nb_pages, 2)
+        self.assertEqual(shared_live_media.upload_state, READY)
+        self.assertEqual(shared_live_media.uploaded_on, to_datetime(stamp))
+        self.assertEqual(shared_live_media.extension, "pdf")
+        self.assertEqual(shared_live_media.process_pipeline, CELERY_PIPELINE)
+        # The first pages are published
+        self.assertEqual(
+            mock_channel_layers_utils.dispatch_shared_live_media.call_count, 1
+        )
+
+        # The last chunk is converted first, it can not be published yet
+        convert_shared_live_media_pages(str(shared_live_media.pk), stamp, 5, 2, 5)
+        self.assertTrue(video_storage.exists(f"{prefix}/{stamp}_5.svg"))
+        shared_live_media.refresh_from_db()
+        self.assertEqual(shared_live_media.nb_pages, 2)
+        self.assertEqual(
+            mock_channel_layers_utils.dispatch_shared_live_media.call_count, 1
+        )
+
+        convert_shared_live_media_pages(str(shared_live_media.pk), stamp, 5, 2, 3)
+        for page_number in range(1, 6):
+            self.assertTrue(video_storage.exists(f"{prefix}/{stamp}_{page_number}.svg"))
+        shared_live_media.refresh_from_db()
+        self.assertEqual(shared_live_media.nb_pages, 5)
+        self.assertEqual(
+            mock_channel_layers_utils.dispatch_shared_live_media.call_count, 2
+        )
+        mock_channel_layers_utils.dispatch_video.assert_called_with(
+            shared_live_media.video, to_admin=True
+        )
+
+    @mock.patch.object(shared_live_media_tasks, "channel_layers_utils")
+    @mock.patch.object(convert_shared_live_media_pages, "delay")
+    def test_shared_live_media_without_pages(
+        self, mock_delay, mock_channel_layers_utils
+    ):
+        """A PDF without pages is published with no page instead of failing."""
+        shared_live_media = SharedLiveMediaFactory(nb_pages=None)
+        stamp = "1640995200"
+        # PyMuPDF can not save a document without pages
+        video_storage.save(
+            shared_live_media.get_videos_storage_prefix(
+                stamp, TMP_VIDEOS_STORAGE_BASE_DIRECTORY
+            ),
+            ContentFile(
+                b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+                b"2 0 obj<</Type/Pages/Kids[]/Count 0>>endobj\n"
+                b"trailer<</Root 1 0 R>>\n%%EOF\n"
+            ),
+        )
+
+        with mock.patch.object(
+            shared_live_media_tasks, "capture_exception"
+        ) as mock_capture_exception:
+            convert_shared_live_media(str(shared_live_media.pk), stamp)
+
+        mock_capture_exception.assert_not_called()
+        mock_delay.assert_not_called()
+        self.assertTrue(
+            video_storage.exists(
+                f"{shared_live_media.get_videos_storage_prefix(stamp)}/{stamp}.pdf"
+            )
+        )
+        shared_live_media.refresh_from_db()
+        self.assertEqual(shared_live_media.nb_pages, 0)
+        self.assertEqual(shared_live_media.upload_state, READY)
+        self.assertEqual(shared_live_media.uploaded_on, to_datetime(stamp))
+        mock_channel_layers_utils.dispatch_shared_live_media.assert_called_once()
+
+    @override_settings(SHARED_LIVE_MEDIA_CONVERSION_CHUNK_SIZE=2)
+    @mock.patch.object(shared_live_media_tasks, "channel_layers_utils")
+    @mock.patch.object(convert_shared_live_media_pages, "delay")
+    @mock.patch.object(shared_live_media_tasks, "capture_exception")
+    def test_shared_live_media_by_chunks_failed_after_publication(
+        self, _mock_capture_exception, _mock_delay, mock_channel_layers_utils
+    ):
+        """Pages are not published anymore once a chunk failed to be converted."""
+        shared_live_media = SharedLiveMediaFactory(nb_pages=None)
+        stamp = "1640995200"
+        self._save_pdf(shared_live_media, stamp, 5)
+        convert_shared_live_media(str(shared_live_media.pk), stamp)
+
+        with mock.patch.object(
+            shared_live_media_tasks, "convert_pages", side_effect=OSError
+        ):
+            convert_shared_live_media_pages(str(shared_live_media.pk), stamp, 5, 2, 5)
+        convert_shared_live_media_pages(str(shared_live_media.pk), stamp, 5, 2, 3)
+
+        shared_live_media.refresh_from_db()
+        self.assertEqual(shared_live_media.upload_state, ERROR)
+        self.assertEqual(shared_live_media.nb_pages, 2)
+        self.assertEqual(
+            mock_channel_layers_utils.dispatch_shared_live_media.call_count, 1
+        )
+
+    @override_settings(SHARED_LIVE_MEDIA_CONVERSION_CHUNK_SIZE=2)
+    @mock.patch.object(shared_live_media_tasks, "channel_layers_utils")
+    @mock.patch.object(shared_live_media_tasks, "capture_exception")
+    def test_shared_live_media_by_chunks_failed_before_publication(
+        self, _mock_capture_exception, mock_channel_layers_utils
+    ):
+        """The first pages are not published when a chunk failed before them."""
+        shared_live_media = SharedLiveMediaFactory(nb_pages=None, uploaded_on=None)
+        stamp = "1640995200"
+        self._save_pdf(shared_live_media, stamp, 5)
+        convert_pages = shared_live_media_tasks.convert_pages
+
+        def convert_failing_chunk(pdf, prefix_destination, stamp, first, last):
+            if first == 3:
+                raise OSError()
+            convert_pages(pdf, prefix_destination, stamp, first, last)
+
+        with mock.patch.object(
+            convert_shared_live_media_pages,
+            "delay",
+            side_effect=convert_shared_live_media_pages,
+        ), mock.patch.object(
+            shared_live_media_tasks, "convert_pages", side_effect=convert_failing_chunk
+        ):
+            convert_shared_live_media(str(shared_live_media.pk), stamp)
+
+        shared_live_media.refresh_from_db()
+        self.assertEqual(shared_live_media.upload_state, ERROR)
+        self.assertIsNone(shared_live_media.uploaded_on)
+        mock_channel_layers_utils.dispatch_shared_live_media.assert_not_called()
+
+    def test_shared_live_media_failed_older_upload(self):
+        """A chunk of an older upload failing does not set a newer upload in error."""
+        shared_live_media = SharedLiveMediaFactory(
+            upload_state=READY, uploaded_on=to_datetime("1640995300")
+        )
+
+        with mock.patch.object(shared_live_media_tasks, "capture_exception"):
+            convert_shared_live_media_pages(
+                str(shared_live_media.pk), "1640995200", 5, 2, 3
+            )
+
+        shared_live_media.refresh_from_db()
+        self.assertEqual(shared_live_media.upload_state, READY)
+
+    @override_settings(SHARED_LIVE_MEDIA_RASTER_THRESHOLD=1)
+    def test_shared_live_media_rasterized(self):
+        """Pages with a SVG larger than the threshold are rasterized in WebP."""
+        shared_live_media = SharedLiveMediaFactory()
+        stamp = "1640995200"
+        self._save_pdf(shared_live_media, stamp, 1)
+
+        convert_shared_live_media(str(shared_live_media.pk), stamp)
+
+        with video_storage.open(
+            f"{shared_live_media.get_videos_storage_prefix(stamp)}/{stamp}_1.svg", "rb"
+        ) as svg_file:
+            svg = svg_file.read().decode("utf-8")
+        self.assertTrue(
+            svg.startswith(
+                '<svg xmlns="http://www.w3.org/2000/svg" width="595" height="842" '
+                'viewBox="0 0 595 842"><image width="595" height="842" '
+                'href="data:image/webp;base64,'
+            )
+        )
+        shared_live_media.refresh_from_db()
+        self.assertEqual(shared_live_media.nb_pages, 1)
+
+    def test_shared_live_media_pages_with_error(self):
+        """A chunk failing to be converted sets the upload state to ERROR."""
+        shared_live_media = SharedLiveMediaFactory()
+        stamp = "1640995200"
+
+        with mock.patch(
+            "marsha.core.tasks.shared_live_media.capture_exception"
+        ) as mock_capture_exception:
+            # The PDF was not copied next to the pages
+            convert_shared_live_media_pages(str(shared_live_media.pk), stamp, 5, 2, 3)
+
+        mock_capture_exception.assert_called_once()
+        shared_live_media.refresh_from_db()
+        self.assertEqual(shared_live_media.upload_state, ERROR)
@@ -4,7 +4,7 @@ from io import BytesIO
 from unittest import mock
 
 from django.core.files.base import ContentFile
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from PIL import Image
 
@@ -15,6 +15,7 @@ from marsha.core.defaults import (
 )
 from marsha.core.factories import ThumbnailFactory
 from marsha.core.storage.storage_class import video_storage
+from marsha.core.tasks import thumbnail as thumbnail_tasks
 from marsha.core.tasks.thumbnail import resize_thumbnails
 
 
@@ -59,6 +60,85 @@ class TestThumbnailTask(TestCase):
         thumbnail.refresh_from_db()
         self.assertEqual(thumbnail.process_pipeline, CELERY_PIPELINE)
 
+    def _save_source(self, thumbnail, stamp, image, image_format):
+        """Save the uploaded source of a thumbnail in the videos storage."""
+        with BytesIO() as buffer:
+            image.save(buffer, image_format)
+            video_storage.save(
+                thumbnail.get_videos_storage_prefix(
+                    stamp, TMP_VIDEOS_STORAGE_BASE_DIRECTORY
+                ),
+                ContentFile(buffer.getvalue()),
+            )
+
+    def test_resize_thumbnails_task_decode_once(self):
+        """
+        The source is decoded once and each thumbnail keeps the ratio of the source
+        without being enlarged.
+        """
+        thumbnail = ThumbnailFactory()
+        stamp = "1640995200"
+        self._save_source(
+            thumbnail, stamp, Image.new("RGB", size=(2400, 1600), color="red"), "JPEG"
+        )
+
+        with mock.patch.object(
+            thumbnail_tasks.Image, "open", wraps=Image.open
+        ) as mock_open:
+            resize_thumbnails(str(thumbnail.pk), stamp)
+
+        mock_open.assert_called_once()
+        dimensions = {}
+        for size in [1080, 720, 480, 240, 144]:
+            with video_storage.open(
+                f"{thumbnail.get_videos_storage_prefix(stamp)}/{size}.jpg", "rb"
+            ) as img_file, Image.open(img_file) as img:
+                self.assertEqual(img.format, "JPEG")
+                dimensions[size] = img.size
+        self.assertEqual(
+            dimensions,
+            {
+                1080: (1080, 720),
+                720: (720, 480),
+                480: (480, 320),
+                240: (240, 160),
+                144: (144, 96),
+            },
+        )
+        self.assertFalse(
+            video_storage.exists(
+                f"{thumbnail.get_videos_storage_prefix(stamp)}/1080.webp"
+            )
+        )
+
+    @override_settings(THUMBNAIL_EXTRA_FORMATS=["webp", "unknown"])
+    def test_resize_thumbnails_task_extra_formats(self):
+        """Thumbnails are saved in the extra formats the installed Pillow supports."""
+        thumbnail = ThumbnailFactory()
+        stamp = "1640995200"
+        self._save_source(
+            thumbnail, stamp, Image.new("RGBA", size=(300, 200), color="red"), "PNG"
+        )
+
+        with self.assertLogs(thumbnail_tasks.logger, "WARNING") as logs:
+            resize_thumbnails(str(thumbnail.pk), stamp)
+
+        self.assertEqual(
+            logs.output,
+            [
+                "WARNING:marsha.core.tasks.thumbnail:"
+                "Thumbnails can not be saved in unknown format."
+            ],
+        )
+        for size, dimensions in [(1080, (300, 200)), (144, (144, 96))]:
+            with video_storage.open(
+                f"{thumbnail.get_videos_storage_prefix(stamp)}/{size}.webp", "rb"
+            ) as img_file, Image.open(img_file) as img:
+                self.assertEqual(img.format, "WEBP")
+                self.assertEqual(img.size, dimensions)
+        thumbnail.refresh_from_db()
+        self.assertEqual(thumbnail.process_pipeline, CELERY_PIPELINE)
+
     def test_resize_thumbnails_task_with_error(self):
         """
         Test the the test_resize_thumbnails function. It should fail, updated
@@ -1,11 +1,25 @@
 """Test for timed text track celery tasks"""
 
-from io import BytesIO
+from io import BytesIO, StringIO
 from unittest import mock
 
+from django.core.cache import cache
 from django.core.files.base import ContentFile
 from django.test import TestCase
 
+from pycaption import (
+    CaptionReadError,
+    DFXPReader,
+    DFXPWriter,
+    MicroDVDReader,
+    SAMIReader,
+    SCCReader,
+    SRTReader,
+    SRTWriter,
+    WebVTTReader,
+    detect_format,
+)
+
 from marsha.core.defaults import (
     CELERY_PIPELINE,
     ERROR,
@@ -14,6 +28,7 @@ from marsha.core.defaults import (
 )
 from marsha.core.factories import TimedTextTrackFactory
 from marsha.core.storage.storage_class import video_storage
+from marsha.core.tasks import timed_text_track as timed_text_track_tasks
 from marsha.core.tasks.timed_text_track import convert_timed_text_track
 
 
@@ -44,11 +59,36 @@ And this is the <font color="red">third</font> subtitle.
 """
 
 
+def _srt(nb_cues):
+    """Return an SRT with `nb_cues` cues, some of them with HTML and several lines."""
+    return "".join(
+        f"{index}\n"
+        f"00:{index // 60 % 60:02}:{index % 60:02},000 --> "
+        f"00:{index // 60 % 60:02}:{index % 60:02},500\n"
+        f"<b>Cue</b> number {index}.\n" + ("Second line.\n" if index % 3 else "") + "\n"
+        for index in range(1, nb_cues + 1)
+    )
+
+
+def _upload(timed_text_track, stamp, content):
+    """Upload the source of a timed text track."""
+    video_storage.save(
+        timed_text_track.get_videos_storage_prefix(
+            stamp, TMP_VIDEOS_STORAGE_BASE_DIRECTORY
+        ),
+        ContentFile(content),
+    )
+
+
 class TestTimedTextTrackTask(TestCase):
     """
     Test for timed text track celery tasks
     """
 
+    def setUp(self):
+        """Forget the conversions of previous tests."""
+        cache.clear()
+
     def test_timed_text_track_with_caption(self):
         """
         Test the the convert_timed_text_track function. It should create
@@ -208,3 +248,138 @@ class TestTimedTextTrackTask(TestCase):
             f"{timed_text_track.get_videos_storage_prefix(stamp)}/{stamp}.vtt"
         )
         self.assertFalse(video_storage.exists(new_vtt_file))
+
+    def test_timed_text_track_sniff_format(self):
+        """The format is detected from the beginning of the content, like pycaption
+        does from the whole content."""
+        captions = SRTReader().read(_srt(200))
+        samples = {
+            SRTReader: _srt(200),
+            WebVTTReader: "WEBVTT\n\n00:01.000 --> 00:04.000\nHello\n",
+            DFXPReader: DFXPWriter().write(captions),
+            SAMIReader: "<SAMI><BODY><SYNC Start=0><P>Hello</P></SYNC></BODY></SAMI>",
+            SCCReader: "Scenarist_SCC V1.0\n\n00:00:00:22\t9420 9420\n",
+            MicroDVDReader: "{1}{1}25.000\n{0}{25}Hello\n",
+        }
+        for reader, content in samples.items():
+            self.assertEqual(detect_format(content), reader)
+            self.assertEqual(
+                timed_text_track_tasks.sniff_format(
+                    content[: timed_text_track_tasks.SNIFF_SIZE]
+                ),
+                reader,
+            )
+        # The closing tag of the DFXP document is far beyond the sniffed prefix
+        self.assertGreater(
+            len(samples[DFXPReader]), 2 * timed_text_track_tasks.SNIFF_SIZE
+        )
+        self.assertIsNone(timed_text_track_tasks.sniff_format("INVALID SRT FILE"))
+
+    # pylint: disable=protected-access
+    def test_timed_text_track_convert_by_chunks(self):
+        """Converting SRT and WebVTT by chunks of cues gives the same vtt as
+        converting the whole content."""
+        srt = _srt(25)
+        vtt = timed_text_track_tasks._convert_timed_text_track_file(SRTReader, srt)
+        for reader, content in ((SRTReader, srt), (WebVTTReader, vtt)):
+            for transcript, convert in (
+                (False, timed_text_track_tasks._convert_timed_text_track_file),
+                (True, timed_text_track_tasks._convert_transcript),
+            ):
+                chunks = list(
+                    timed_text_track_tasks.iter_cue_chunks(
+                        StringIO(content), chunk_size=4
+                    )
+                )
+                self.assertEqual(len(chunks), 7)
+                self.assertEqual(
+                    timed_text_track_tasks.convert_by_chunks(
+                        reader, chunks, transcript=transcript
+                    ),
+                    convert(reader, content),
+                )
+
+    def test_timed_text_track_convert_by_chunks_unsorted_vtt(self):
+        """WebVTT cues must be sorted across chunks too."""
+        chunks = [
+            "WEBVTT\n\n00:05.000 --> 00:06.000\nSecond\n\n",
+            "00:01.000 --> 00:02.000\nFirst\n\n",
+        ]
+        with self.assertRaises(CaptionReadError):
+            timed_text_track_tasks.convert_by_chunks(WebVTTReader, chunks)
+
+    def test_timed_text_track_dfxp(self):
+        """DFXP sources are converted as whole documents."""
+        timed_text_track = TimedTextTrackFactory(language="fr", mode="st")
+        stamp = "1640995203"
+        captions = SRTReader().read(_srt(3))
+        _upload(timed_text_track, stamp, DFXPWriter().write(captions).encode())
+
+        convert_timed_text_track(str(timed_text_track.pk), stamp)
+
+        timed_text_track.refresh_from_db()
+        self.assertEqual(timed_text_track.upload_state, READY)
+        self.assertEqual(timed_text_track.extension, "xml")
+        prefix = timed_text_track.get_videos_storage_prefix(stamp)
+        self.assertTrue(video_storage.exists(f"{prefix}/source.xml"))
+        with video_storage.open(f"{prefix}/{stamp}.vtt", "rt") as vtt_file:
+            self.assertIn("number 3.", vtt_file.read())
+
+    def test_timed_text_track_already_converted(self):
+        """A source with the same content as one already converted in the same mode
+        is not converted again, its vtt is copied."""
+        content = SRTWriter().write(SRTReader().read(_srt(10))).encode()
+        first_track = TimedTextTrackFactory(language="fr", mode="st")
+        _upload(first_track, "1640995204", content)
+        convert_timed_text_track(str(first_track.pk), "1640995204")
+
+        second_track = TimedTextTrackFactory(language="fr", mode="st")
+        _upload(second_track, "1640995205", content)
+        transcript = TimedTextTrackFactory(language="fr", mode="ts")
+        _upload(transcript, "1640995206", content)
+        with mock.patch.object(
+            timed_text_track_tasks,
+            "convert",
+            wraps=timed_text_track_tasks.convert,
+        ) as convert_mock:
+            convert_timed_text_track(str(second_track.pk), "1640995205")
+            convert_mock.assert_not_called()
+            # A transcript is sanitized, it's converted again
+            convert_timed_text_track(str(transcript.pk), "1640995206")
+            convert_mock.assert_called_once()
+
+        second_track.refresh_from_db()
+        self.assertEqual(second_track.upload_state, READY)
+        first_prefix = first_track.get_videos_storage_prefix("1640995204")
+        second_prefix = second_track.get_videos_storage_prefix("1640995205")
+        self.assertTrue(video_storage.exists(f"{second_prefix}/source.srt"))
+        with video_storage.open(
+            f"{first_prefix}/1640995204.vtt", "rt"
+        ) as first_vtt, video_storage.open(
+            f"{second_prefix}/1640995205.vtt", "rt"
+        ) as second_vtt:
+            self.assertEqual(first_vtt.read(), second_vtt.read())
+
+    def test_timed_text_track_already_converted_deleted(self):
+        """The source is converted again when the vtt of its previous conversion
+        does not exist anymore."""
+        content = _srt(10).encode()
+        first_track = TimedTextTrackFactory(language="fr", mode="st")
+        _upload(first_track, "1640995204", content)
+        convert_timed_text_track(str(first_track.pk), "1640995204")
+        video_storage.delete(
+            f"{first_track.get_videos_storage_prefix('1640995204')}/1640995204.vtt"
+        )
+
+        second_track = TimedTextTrackFactory(language="fr", mode="st")
+        _upload(second_track, "1640995205", content)
+        with mock.patch.object(
+            timed_text_track_tasks,
+            "convert",
+            wraps=timed_text_track_tasks.convert,
+        ) as convert_mock:
+            convert_timed_text_track(str(second_track.pk), "1640995205")
+            convert_mock.assert_called_once()
+
+        second_track.refresh_from_db()
+        self.assertEqual(second_track.upload_state, READY)
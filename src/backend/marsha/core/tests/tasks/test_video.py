@@ -6,7 +6,11 @@ from django.test import TestCase
 
 from marsha.core.defaults import ERROR
 from marsha.core.factories import VideoFactory
-from marsha.core.tasks.video import launch_video_transcoding
+from marsha.core.tasks.video import (
+    backfill_transcode_pipelines,
+    launch_video_transcoding,
+    schedule_transcode_pipeline_backfill,
+)
 
 
 class TestVideoTask(TestCase):
@@ -52,3 +56,27 @@ class TestVideoTask(TestCase):
             )
             video.refresh_from_db()
             self.assertEqual(video.upload_state, ERROR)
+
+    def test_backfill_transcode_pipelines(self):
+        """The task backfills the pipeline of the given videos."""
+        video = VideoFactory(transcode_pipeline=None)
+        with mock.patch(
+            "marsha.core.tasks.video.transcode_pipeline.backfill_transcode_pipelines"
+        ) as mock_backfill:
+            backfill_transcode_pipelines([str(video.pk)])
+
+        mock_backfill.assert_called_once_with(video_ids=[str(video.pk)])
+
+    def test_schedule_transcode_pipeline_backfill(self):
+        """The backfill of a video is scheduled once until it runs."""
+        video = VideoFactory(transcode_pipeline=None)
+        with mock.patch(
+            "marsha.core.tasks.video.transcode_pipeline.claim_backfill",
+            side_effect=[True, False],
+        ), mock.patch.object(
+            backfill_transcode_pipelines, "apply_async"
+        ) as mock_apply_async:
+            schedule_transcode_pipeline_backfill(video.pk)
+            schedule_transcode_pipeline_backfill(video.pk)
+
+        mock_apply_async.assert_called_once_with(args=[[str(video.pk)]], countdown=300)
@@ -0,0 +1,249 @@
+"""Test for xAPI celery tasks"""
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+import requests
+
+from marsha.core.factories import ConsumerSiteFactory
+from marsha.core.models import XAPIDeadLetter
+from marsha.core.services import xapi_delivery
+from marsha.core.tasks.xapi import (
+    deliver_xapi_statements,
+    schedule_xapi_delivery,
+    send_xapi_statements,
+)
+
+
+LRS_SETTINGS = {
+    "LRS_URL": "https://lrs.example.com/xAPI/statements",
+    "LRS_AUTH_TOKEN": "token",
+    "LRS_XAPI_VERSION": "1.0.3",
+}
+DESTINATION = xapi_delivery.SITE_DESTINATION
+
+
+@override_settings(**LRS_SETTINGS)
+@mock.patch("marsha.core.tasks.xapi.deliver_xapi_statements.apply_async")
+class TestDeliverXAPIStatementsTask(TestCase):
+    """
+    Test for the task delivering xAPI statements
+    """
+
+    def setUp(self):
+        """Start each test with an empty log."""
+        cache.clear()
+        self.destination = DESTINATION
+        for _entries in xapi_delivery.consume_batches(self.destination, 100):
+            pass
+
+    @override_settings(XAPI_DELIVERY_DELAY=10)
+    def test_schedule_xapi_delivery(self, mock_apply_async):
+        """Only one delivery is scheduled until it runs."""
+        schedule_xapi_delivery(DESTINATION)
+        schedule_xapi_delivery(DESTINATION)
+
+        mock_apply_async.assert_called_once_with(args=[DESTINATION], countdown=10)
+
+    @override_settings(XAPI_DELIVERY_BATCH_SIZE=2)
+    def test_deliver_xapi_statements(self, mock_apply_async):
+        """The task sends the statements in batches until every one is delivered."""
+        schedule_xapi_delivery(DESTINATION)
+        for index in range(3):
+            xapi_delivery.enqueue(self.destination, {"id": str(index)})
+        mock_apply_async.reset_mock()
+
+        with mock.patch.object(xapi_delivery.XAPI, "send_many") as mock_send_many:
+            deliver_xapi_statements(DESTINATION)
+
+        self.assertEqual(
+            mock_send_many.call_args_list,
+            [
+                mock.call([{"id": "0"}, {"id": "1"}]),
+                mock.call([{"id": "2"}]),
+            ],
+        )
+        mock_apply_async.assert_not_called()
+        self.assertEqual(xapi_delivery.get_metrics()["queue_depth"], 0)
+
+    def test_deliver_xapi_statements_enqueued_meanwhile(self, mock_apply_async):
+        """Statements enqueued during a delivery are left to the next one."""
+        xapi_delivery.enqueue(self.destination, {"id": "0"})
+
+        def send_many(_statements):
+            xapi_delivery.enqueue(self.destination, {"id": "1"})
+
+        with mock.patch.object(
+            xapi_delivery.XAPI, "send_many", side_effect=send_many
+        ) as mock_send_many:
+            deliver_xapi_statements(DESTINATION)
+
+        mock_send_many.assert_called_once_with([{"id": "0"}])
+        mock_apply_async.assert_called_once_with(args=[DESTINATION], countdown=5)
+        self.assertTrue(xapi_delivery.has_pending_statements(self.destination))
+
+    def test_deliver_xapi_statements_interrupted(self, mock_apply_async):
+        """The statements of a batch are only acknowledged once it was sent."""
+        xapi_delivery.enqueue(self.destination, {"id": "0"})
+
+        with mock.patch(
+            "marsha.core.tasks.xapi.send_xapi_statements", side_effect=SystemExit
+        ), mock.patch("kombu.message.Message.ack") as mock_ack, self.assertRaises(
+            SystemExit
+        ):
+            deliver_xapi_statements(DESTINATION)
+
+        mock_ack.assert_not_called()
+        mock_apply_async.assert_not_called()
+
+    def test_deliver_xapi_statements_nothing_pending(self, mock_apply_async):
+        """The task does not reschedule itself when no statement is pending."""
+        with mock.patch.object(xapi_delivery.XAPI, "send_many") as mock_send_many:
+            deliver_xapi_statements(DESTINATION)
+
+        mock_send_many.assert_not_called()
+        mock_apply_async.assert_not_called()
+
+
+def http_error(status_code, content=b""):
+    """Return the error raised when the LRS answers with a status code."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content  # pylint: disable=protected-access
+    return requests.exceptions.HTTPError(response=response)
+
+
+@override_settings(**LRS_SETTINGS)
+@mock.patch("marsha.core.tasks.xapi.send_xapi_statements.apply_async")
+class TestSendXAPIStatementsTask(TestCase):
+    """
+    Test for the task sending a batch of xAPI statements
+    """
+
+    entries = [{"statement": {"id": "1"}, "enqueued_at": 0}]
+
+    def setUp(self):
+        """Start each test with empty metrics."""
+        cache.clear()
+
+    def test_send_xapi_statements(self, mock_apply_async):
+        """Delivered statements are not retried."""
+        with mock.patch.object(xapi_delivery, "XAPI") as mock_xapi:
+            send_xapi_statements(DESTINATION, self.entries)
+
+        mock_xapi.assert_called_once_with(
+            "https://lrs.example.com/xAPI/statements", "token", "1.0.3"
+        )
+        mock_xapi.return_value.send_many.assert_called_once_with([{"id": "1"}])
+        mock_apply_async.assert_not_called()
+
+    def test_send_xapi_statements_consumer_site(self, mock_apply_async):
+        """The credentials of the LRS of a consumer site are read when sending."""
+        consumer_site = ConsumerSiteFactory(
+            lrs_url="https://lrs.example.org", lrs_auth_token="secret"
+        )
+        destination = xapi_delivery.get_destination(consumer_site.pk)
+        consumer_site.lrs_auth_token = "rotated"
+        consumer_site.save()
+
+        with mock.patch.object(xapi_delivery, "XAPI") as mock_xapi:
+            send_xapi_statements(destination, self.entries)
+
+        mock_xapi.assert_called_once_with(
+            "https://lrs.example.org", "rotated", consumer_site.lrs_xapi_version
+        )
+        mock_apply_async.assert_not_called()
+
+    @override_settings(LRS_URL=None)
+    def test_send_xapi_statements_not_configured(self, mock_apply_async):
+        """Statements whose LRS is not configured anymore are dead-lettered."""
+        with mock.patch.object(xapi_delivery, "XAPI") as mock_xapi:
+            send_xapi_statements(DESTINATION, self.entries)
+
+        mock_xapi.assert_not_called()
+        mock_apply_async.assert_not_called()
+        dead_letter = XAPIDeadLetter.objects.get()
+        self.assertEqual(dead_letter.error, "LRS not configured")
+
+    @override_settings(XAPI_DELIVERY_RETRY_BACKOFF=30)
+    def test_send_xapi_statements_retry(self, mock_apply_async):
+        """Statements that could not reach the LRS or that it failed to process are
+        retried with an exponential backoff."""
+        for error in (
+            requests.exceptions.ConnectionError(),
+            requests.exceptions.Timeout(),
+            http_error(503),
+            http_error(429),
+        ):
+            mock_apply_async.reset_mock()
+            with mock.patch.object(xapi_delivery.XAPI, "send_many", side_effect=error):
+                send_xapi_statements(DESTINATION, self.entries, attempt=3)
+
+            mock_apply_async.assert_called_once_with(
+                args=[DESTINATION, self.entries, 4], countdown=120
+            )
+        self.assertFalse(XAPIDeadLetter.objects.exists())
+
+    @override_settings(XAPI_DELIVERY_MAX_RETRIES=2)
+    def test_send_xapi_statements_dead_letter(self, mock_apply_async):
+        """Statements are dead-lettered once all the retries failed."""
+        with mock.patch.object(
+            xapi_delivery.XAPI,
+            "send_many",
+            side_effect=http_error(502, b"Bad gateway"),
+        ):
+            send_xapi_statements(DESTINATION, self.entries, attempt=3)
+
+        mock_apply_async.assert_not_called()
+        dead_letter = XAPIDeadLetter.objects.get()
+        self.assertIsNone(dead_letter.consumer_site)
+        self.assertEqual(dead_letter.lrs_url, "https://lrs.example.com/xAPI/statements")
+        self.assertEqual(dead_letter.statements, [{"id": "1"}])
+        self.assertEqual(dead_letter.attempts, 3)
+        self.assertEqual(dead_letter.error, "Bad gateway")
+
+    def test_send_xapi_statements_client_error(self, mock_apply_async):
+        """Statements rejected by the LRS are dead-lettered without retries."""
+        with mock.patch.object(
+            xapi_delivery.XAPI,
+            "send_many",
+            side_effect=http_error(401, b"Unauthorized"),
+        ):
+            send_xapi_statements(DESTINATION, self.entries)
+
+        mock_apply_async.assert_not_called()
+        dead_letter = XAPIDeadLetter.objects.get()
+        self.assertEqual(dead_letter.attempts, 1)
+        self.assertEqual(dead_letter.error, "Unauthorized")
+
+    def test_send_xapi_statements_invalid_statement(self, mock_apply_async):
+        """A batch rejected as invalid is split to deliver its valid statements, the
+        invalid one is dead-lettered right away."""
+        entries = [
+            {"statement": {"id": str(index)}, "enqueued_at": 0} for index in range(5)
+        ]
+
+        def send_many(statements):
+            if {"id": "3"} in statements:
+                raise http_error(400, b"Invalid statement 3")
+
+        with mock.patch.object(
+            xapi_delivery.XAPI, "send_many", side_effect=send_many
+        ) as mock_send_many:
+            send_xapi_statements(DESTINATION, entries)
+
+        delivered = [
+            statements
+            for (statements,), _kwargs in mock_send_many.call_args_list
+            if {"id": "3"} not in statements
+        ]
+        self.assertEqual(
+            delivered, [[{"id": "0"}, {"id": "1"}], [{"id": "2"}], [{"id": "4"}]]
+        )
+        mock_apply_async.assert_not_called()
+        dead_letter = XAPIDeadLetter.objects.get()
+        self.assertEqual(dead_letter.statements, [{"id": "3"}])
+        self.assertEqual(dead_letter.attempts, 1)
+        self.assertEqual(dead_letter.error, "Invalid statement 3")
+        self.assertEqual(xapi_delivery.get_metrics()["delivered"], 4)
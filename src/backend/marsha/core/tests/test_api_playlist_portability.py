@@ -34,7 +34,7 @@ class PlaylistPortabilityAPITest(TestCase):
         """
         video = factories.VideoFactory()
 
-        with self.assertNumQueries(8):
+        with self.assertNumQueries(6):
             response = self._patch_video(video, {})
 
         self.assertEqual(response.status_code, 200)
@@ -49,7 +49,7 @@ class PlaylistPortabilityAPITest(TestCase):
         """
         video = factories.VideoFactory()
 
-        with self.assertNumQueries(9):
+        with self.assertNumQueries(7):
             response = self._patch_video(video, {"portable_to": []})
 
         self.assertEqual(response.status_code, 200)
@@ -65,7 +65,7 @@ class PlaylistPortabilityAPITest(TestCase):
         video = factories.VideoFactory()
         new_playlist = factories.PlaylistFactory()
 
-        with self.assertNumQueries(12):
+        with self.assertNumQueries(10):
             response = self._patch_video(video, {"portable_to": [str(new_playlist.id)]})
 
         self.assertEqual(response.status_code, 200)
@@ -252,7 +252,7 @@ class PlaylistPortabilityAPITest(TestCase):
         ported_to_playlist = factories.PlaylistFactory()
         video.playlist.portable_to.add(ported_to_playlist)
 
-        with self.assertNumQueries(8):
+        with self.assertNumQueries(6):
             response = self._patch_video(video, {})
 
         self.assertEqual(response.status_code, 200)
@@ -269,7 +269,7 @@ class PlaylistPortabilityAPITest(TestCase):
         ported_to_playlist = factories.PlaylistFactory()
         video.playlist.portable_to.add(ported_to_playlist)
 
-        with self.assertNumQueries(11):
+        with self.assertNumQueries(9):
             response = self._patch_video(video, {"portable_to": []})
 
         self.assertEqual(response.status_code, 200)
@@ -286,7 +286,7 @@ class PlaylistPortabilityAPITest(TestCase):
         ported_to_playlist = factories.PlaylistFactory()
         video.playlist.portable_to.add(ported_to_playlist)
 
-        with self.assertNumQueries(10):
+        with self.assertNumQueries(8):
             response = self._patch_video(
                 video, {"portable_to": [str(ported_to_playlist.id)]}
             )
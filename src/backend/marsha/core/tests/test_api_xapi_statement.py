@@ -3,11 +3,13 @@ import json
 from unittest import mock
 import uuid
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
 import requests
 
 from marsha.core.factories import DocumentFactory, VideoFactory
+from marsha.core.services import xapi_delivery
 from marsha.core.simple_jwt.factories import StudentLtiTokenFactory
 
 
@@ -171,6 +173,57 @@ class XAPIStatementApiTest(TestCase):
 
         self.assertEqual(response.status_code, 204)
 
+    @override_settings(XAPI_ASYNC_DELIVERY_ENABLED=True, XAPI_DELIVERY_DELAY=5)
+    def test_xapi_statement_with_async_delivery(self):
+        """The statement is enqueued and a 202 status code is returned right away."""
+        cache.clear()
+        video = VideoFactory(
+            playlist__consumer_site__lrs_url="http://lrs.com/data/xAPI",
+            playlist__consumer_site__lrs_auth_token="Basic ThisIsABasicAuth",
+            playlist__consumer_site__lrs_xapi_version="1.0.3",
+        )
+        jwt_token = StudentLtiTokenFactory(playlist=video.playlist)
+
+        data = {
+            "id": str(uuid.uuid4()),
+            "verb": {
+                "id": "http://adlnet.gov/expapi/verbs/initialized",
+                "display": {"en-US": "initialized"},
+            },
+            "context": {
+                "extensions": {"https://w3id.org/xapi/video/extensions/volume": 1}
+            },
+        }
+
+        with mock.patch("marsha.core.api.XAPI.send") as mock_send, mock.patch(
+            "marsha.core.tasks.xapi.deliver_xapi_statements.apply_async"
+        ) as mock_apply_async:
+            response = self.client.post(
+                f"/xapi/video/{video.id}/",
+                HTTP_AUTHORIZATION=f"Bearer {jwt_token}",
+                data=json.dumps(data),
+                content_type="application/json",
+            )
+            second_response = self.client.post(
+                f"/xapi/video/{video.id}/",
+                HTTP_AUTHORIZATION=f"Bearer {jwt_token}",
+                data=json.dumps(data),
+                content_type="application/json",
+            )
+
+        self.assertEqual(response.status_code, 202)
+        # the statement is not enqueued twice
+        self.assertEqual(second_response.status_code, 200)
+        mock_send.assert_not_called()
+        # the credentials of the LRS never travel through the broker
+        destination = str(video.playlist.consumer_site_id)
+        mock_apply_async.assert_called_once_with(args=[destination], countdown=5)
+
+        (entries,) = xapi_delivery.consume_batches(destination, 100)
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]["statement"]["id"], data["id"])
+        self.assertEqual(xapi_delivery.get_metrics()["queue_depth"], 1)
+
     def test_xapi_statement_with_missing_user(self):
         """Missing user parameter in JWT will fail request to LRS."""
         video = VideoFactory(
@@ -3,12 +3,18 @@
 import datetime
 from unittest import mock
 
+from django.core.cache import cache
 from django.core.cache.backends.dummy import DummyCache
 from django.test import TestCase, override_settings
 
 from django_redis.cache import RedisCache
 
-from marsha.core.cache import RedisCacheWithFallback
+from marsha.core.cache import (
+    RedisCacheWithFallback,
+    get_namespace_versions,
+    invalidate_namespace,
+    make_namespaced_key,
+)
 
 
 class RedisCacheWithFallbackTestCase(TestCase):
@@ -177,3 +183,49 @@ class RedisCacheWithFallbackTestCase(TestCase):
         clear_mock.assert_called_once()
         redis_cache_mock.reset_mock()
         clear_mock.reset_mock()
+
+
+class CacheNamespaceTestCase(TestCase):
+    """Test suite for the cache namespaces."""
+
+    def setUp(self):
+        """Start each test with no namespace."""
+        cache.clear()
+
+    def test_make_namespaced_key(self):
+        """Keys are stable until one of their namespaces is invalidated."""
+        key = make_namespaced_key("app_data", ("video", 1), ("playlist", 2))
+
+        self.assertTrue(key.startswith("app_data|v:"))
+        self.assertEqual(
+            make_namespaced_key("app_data", ("video", 1), ("playlist", 2)), key
+        )
+        cache.set(key, "cached")
+
+        invalidate_namespace(("playlist", 2))
+
+        new_key = make_namespaced_key("app_data", ("video", 1), ("playlist", 2))
+        self.assertNotEqual(new_key, key)
+        self.assertIsNone(cache.get(new_key))
+        # other namespaces are not affected
+        self.assertEqual(
+            make_namespaced_key("app_data", ("video", 1)),
+            make_namespaced_key("app_data", ("video", 1)),
+        )
+
+    def test_invalidate_namespace_unknown(self):
+        """Invalidating a namespace never used creates it."""
+        invalidate_namespace(("video", 1))
+
+        [version] = get_namespace_versions(("video", 1))
+        invalidate_namespace(("video", 1))
+
+        self.assertEqual(get_namespace_versions(("video", 1)), [version + 1])
+
+    def test_invalidate_namespace_evicted(self):
+        """A namespace whose version was evicted never reuses a previous version."""
+        key = make_namespaced_key("app_data", ("video", 1))
+
+        cache.clear()
+
+        self.assertNotEqual(make_namespaced_key("app_data", ("video", 1)), key)
@@ -0,0 +1,192 @@
+"""Query counts of the endpoints saving instances without validation.
+
+Each test counts the queries made by a hot path saving instances with
+``save(validate=False)``, and the queries it would make if instances were fully
+validated, to make sure the savings are not lost.
+"""
+import json
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from marsha.core import api
+from marsha.core.api.video import channel_layers_utils
+from marsha.core.defaults import IDLE, RAW
+from marsha.core.factories import LiveSessionFactory, VideoFactory, WebinarVideoFactory
+from marsha.core.models import BaseModel, LiveSession, Video
+from marsha.core.simple_jwt.factories import (
+    InstructorOrAdminLtiTokenFactory,
+    LTIPlaylistAccessTokenFactory,
+)
+from marsha.core.utils.api_utils import generate_hash
+from marsha.websocket.consumers.video import VideoConsumer
+
+
+BASE_MODEL_SAVE = BaseModel.save
+
+
+def _validated_save(self, *args, **kwargs):
+    """Save an instance validating it, whatever the caller asked."""
+    kwargs["validate"] = True
+    return BASE_MODEL_SAVE(self, *args, **kwargs)
+
+
+class FastSaveQueriesTestCase(TestCase):
+    """Count the queries of the hot paths saving instances without validation."""
+
+    maxDiff = None
+
+    def assertSavedQueries(self, expected, validated, call, validated_call=None):
+        """Assert the number of queries of a hot path, saving with and without validation.
+
+        Parameters
+        ----------
+        expected : int
+            The number of queries expected when saving without validation.
+        validated : int
+            The number of queries expected when validating the saved instances.
+        call : Callable
+            Runs the hot path once.
+        validated_call : Callable, optional
+            Runs the hot path again in the same conditions, defaults to `call`.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            call()
+        with CaptureQueriesContext(connection) as validated_queries, mock.patch.object(
+            BaseModel, "save", _validated_save
+        ):
+            (validated_call or call)()
+
+        self.assertEqual((len(queries), len(validated_queries)), (expected, validated))
+
+    @mock.patch.object(channel_layers_utils, "dispatch_video_to_groups")
+    def test_participants_asking_to_join(self, _mock_dispatch):
+        """Adding and removing a participant asking to join skip validation queries."""
+        video = WebinarVideoFactory()
+        jwt_token = InstructorOrAdminLtiTokenFactory(playlist=video.playlist)
+
+        def call(method):
+            response = getattr(self.client, method)(
+                f"/api/videos/{video.id}/participants-asking-to-join/",
+                {"id": "1", "name": "Student"},
+                content_type="application/json",
+                HTTP_AUTHORIZATION=f"Bearer {jwt_token}",
+            )
+            self.assertEqual(response.status_code, 200)
+
+        def add_then_remove():
+            call("post")
+            call("delete")
+
+        self.assertSavedQueries(20, 22, add_then_remove)
+
+    @mock.patch.object(channel_layers_utils, "dispatch_video_to_groups")
+    def test_participants_in_discussion(self, _mock_dispatch):
+        """Moving a participant to the discussion and out skip validation queries."""
+        video = WebinarVideoFactory(
+            participants_asking_to_join=[{"id": "1", "name": "Student"}]
+        )
+        jwt_token = InstructorOrAdminLtiTokenFactory(playlist=video.playlist)
+
+        def call(method):
+            response = getattr(self.client, method)(
+                f"/api/videos/{video.id}/participants-in-discussion/",
+                {"id": "1", "name": "Student"},
+                content_type="application/json",
+                HTTP_AUTHORIZATION=f"Bearer {jwt_token}",
+            )
+            self.assertEqual(response.status_code, 200)
+
+        def move_then_remove():
+            call("post")
+            call("delete")
+            Video.objects.filter(pk=video.pk).update(
+                participants_asking_to_join=[{"id": "1", "name": "Student"}]
+            )
+
+        self.assertSavedQueries(21, 23, move_then_remove)
+
+    @override_settings(UPDATE_STATE_SHARED_SECRETS=["shared secret"])
+    @mock.patch.object(api.video, "update_id3_tags")
+    @mock.patch.object(channel_layers_utils, "dispatch_video_to_groups")
+    def test_update_live_state(self, _mock_dispatch, _mock_update_id3_tags):
+        """Updating the live state from AWS skip validation queries."""
+        video = VideoFactory(
+            live_state=IDLE,
+            live_type=RAW,
+            live_info={"medialive": {"channel": {"id": "medialive_channel_1"}}},
+        )
+
+        def call(request_id):
+            data = {
+                "logGroupName": "/aws/lambda/dev-test-marsha-medialive",
+                "requestId": request_id,
+                "state": "running",
+            }
+            response = self.client.patch(
+                f"/api/videos/{video.id}/update-live-state/",
+                data,
+                content_type="application/json",
+                HTTP_X_MARSHA_SIGNATURE=generate_hash(
+                    "shared secret", json.dumps(data).encode("utf-8")
+                ),
+            )
+            self.assertEqual(response.status_code, 200)
+
+        self.assertSavedQueries(
+            7,
+            9,
+            lambda: call("7954d4d1-9dd3-47f4-9542-e7fd5f937fe6"),
+            validated_call=lambda: call("c8cf7e2c-0b39-4f4a-9f58-5b2f1a39d5f7"),
+        )
+
+    def test_push_attendance(self):
+        """Pushing an attendance skip validation queries."""
+        video = VideoFactory()
+        livesession = LiveSessionFactory(
+            consumer_site=video.playlist.consumer_site,
+            email=None,
+            lti_user_id="56255f3807599c377bf0e5bf072359fd",
+            lti_id="Maths",
+            video=video,
+        )
+        jwt_token = LTIPlaylistAccessTokenFactory(
+            playlist=video.playlist,
+            context_id=livesession.lti_id,
+            consumer_site=str(video.playlist.consumer_site.id),
+            user__email="sarah@test-fun-mooc.fr",
+            user__id=livesession.lti_user_id,
+            user__username="Sarah",
+        )
+
+        def call():
+            response = self.client.post(
+                f"/api/videos/{video.pk}/livesessions/push_attendance/",
+                {"live_attendance": {"1": {"sound": "ON"}}, "language": "fr"},
+                content_type="application/json",
+                HTTP_AUTHORIZATION=f"Bearer {jwt_token}",
+            )
+            self.assertEqual(response.status_code, 200)
+
+        self.assertSavedQueries(5, 7, call)
+
+    def test_websocket_channel_name(self):
+        """Saving the channel name of a websocket connection skip validation queries."""
+        livesession = LiveSessionFactory(
+            anonymous_id="a1a21411-bf2f-4926-b97f-3c48a124d528"
+        )
+        consumer = VideoConsumer()
+        consumer.channel_name = "specific.channel"
+
+        def connect_then_disconnect():
+            # Call the wrapped functions, the async wrappers close the connection
+            with mock.patch.object(
+                consumer, "_retrieve_live_session", return_value=livesession
+            ):
+                consumer.join_live_session.__wrapped__(consumer)
+            consumer.reset_live_session.__wrapped__(consumer, livesession)
+
+        self.assertSavedQueries(2, 4, connect_then_disconnect)
+        self.assertIsNone(LiveSession.objects.get(pk=livesession.pk).channel_name)
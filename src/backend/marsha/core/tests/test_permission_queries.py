@@ -0,0 +1,163 @@
+"""Query counts of the endpoints checking the roles of the user with several permissions.
+
+The roles of the user on the playlist of the requested object and on its organization
+are loaded once per request, whatever the number of permission classes checking them.
+"""
+from django.test import TestCase, override_settings
+
+from marsha.core.factories import (
+    OrganizationAccessFactory,
+    PlaylistAccessFactory,
+    PlaylistFactory,
+    TimedTextTrackFactory,
+    VideoFactory,
+    WebinarVideoFactory,
+)
+from marsha.core.models import ADMINISTRATOR, INSTRUCTOR, STUDENT
+from marsha.core.permissions.roles import RequestRoles
+from marsha.core.simple_jwt.factories import (
+    InstructorOrAdminLtiTokenFactory,
+    UserAccessTokenFactory,
+)
+from marsha.deposit.factories import FileDepositoryFactory
+from marsha.markdown.factories import MarkdownDocumentFactory
+
+
+class PermissionQueriesTestCase(TestCase):
+    """Count the queries of the endpoints composing role permissions."""
+
+    maxDiff = None
+
+    def setUp(self):
+        """Create a playlist administrated by an organization administrator."""
+        super().setUp()
+        organization_access = OrganizationAccessFactory(role=ADMINISTRATOR)
+        self.playlist = PlaylistFactory(organization=organization_access.organization)
+        self.jwt_token = UserAccessTokenFactory(user=organization_access.user)
+
+    def test_video_partial_update_organization_admin(self):
+        """Both the playlist and the organization roles are checked by one query."""
+        video = VideoFactory(playlist=self.playlist)
+
+        with self.assertNumQueries(15):
+            response = self.client.patch(
+                f"/api/videos/{video.pk}/",
+                {"title": "new title"},
+                content_type="application/json",
+                HTTP_AUTHORIZATION=f"Bearer {self.jwt_token}",
+            )
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_video_create_organization_admin(self):
+        """The roles on the playlist in the body are checked by one query."""
+        with self.assertNumQueries(9):
+            response = self.client.post(
+                "/api/videos/",
+                {"playlist": str(self.playlist.pk), "title": "video"},
+                content_type="application/json",
+                HTTP_AUTHORIZATION=f"Bearer {self.jwt_token}",
+            )
+
+        self.assertEqual(response.status_code, 201)
+
+    def test_live_session_list_attendances_playlist_instructor(self):
+        """The roles on the playlist of the video are checked by one query."""
+        video = WebinarVideoFactory(playlist=self.playlist)
+        playlist_access = PlaylistAccessFactory(playlist=self.playlist, role=INSTRUCTOR)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                f"/api/videos/{video.pk}/livesessions/list_attendances/",
+                HTTP_AUTHORIZATION=(
+                    f"Bearer {UserAccessTokenFactory(user=playlist_access.user)}"
+                ),
+            )
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_timed_text_track_retrieve_lti_instructor(self):
+        """The playlist of the track is checked without loading the track nor its video."""
+        track = TimedTextTrackFactory(video__playlist=self.playlist)
+        jwt_token = InstructorOrAdminLtiTokenFactory(playlist=self.playlist)
+
+        with self.assertNumQueries(4):
+            response = self.client.get(
+                f"/api/videos/{track.video.pk}/timedtexttracks/{track.pk}/",
+                HTTP_AUTHORIZATION=f"Bearer {jwt_token}",
+            )
+
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(DEPOSIT_ENABLED=True)
+    def test_file_depository_retrieve_organization_admin(self):
+        """Both the playlist and the organization roles are checked by one query."""
+        file_depository = FileDepositoryFactory(playlist=self.playlist)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                f"/api/filedepositories/{file_depository.pk}/",
+                HTTP_AUTHORIZATION=f"Bearer {self.jwt_token}",
+            )
+
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(MARKDOWN_ENABLED=True)
+    def test_markdown_document_retrieve_organization_admin(self):
+        """Both the playlist and the organization roles are checked by one query."""
+        markdown_document = MarkdownDocumentFactory(playlist=self.playlist)
+
+        with self.assertNumQueries(4):
+            response = self.client.get(
+                f"/api/markdown-documents/{markdown_document.pk}/",
+                HTTP_AUTHORIZATION=f"Bearer {self.jwt_token}",
+            )
+
+        self.assertEqual(response.status_code, 200)
+
+
+class RequestRolesTestCase(TestCase):
+    """Test the roles of the user of a request, loaded once."""
+
+    def test_request_roles(self):
+        """The roles on a playlist and its organization are loaded by one query."""
+        organization_access = OrganizationAccessFactory(role=INSTRUCTOR)
+        video = VideoFactory(playlist__organization=organization_access.organization)
+        PlaylistAccessFactory(
+            user=organization_access.user, playlist=video.playlist, role=STUDENT
+        )
+        request_roles = RequestRoles(str(organization_access.user.pk))
+
+        with self.assertNumQueries(1):
+            self.assertTrue(
+                request_roles.has_playlist_role(
+                    [STUDENT], video.pk, lookup="videos__id"
+                )
+            )
+            self.assertTrue(request_roles.has_playlist_role(None, video.playlist.pk))
+            self.assertFalse(
+                request_roles.has_playlist_role([ADMINISTRATOR], video.playlist.pk)
+            )
+            self.assertTrue(
+                request_roles.has_playlist_organization_role(
+                    [INSTRUCTOR], video.playlist.pk
+                )
+            )
+            self.assertFalse(
+                request_roles.has_organization_role(
+                    [ADMINISTRATOR], organization_access.organization.pk
+                )
+            )
+            self.assertTrue(request_roles.playlist_exists(video.playlist.pk))
+
+        with self.assertNumQueries(1):
+            self.assertFalse(request_roles.playlist_exists(PlaylistFactory.build().pk))
+
+    def test_request_roles_lti_user(self):
+        """LTI users, whose ID is not a UUID, have no role."""
+        playlist = PlaylistFactory()
+        request_roles = RequestRoles("56255f3807599c377bf0e5bf072359fd-lti")
+
+        with self.assertNumQueries(1):
+            self.assertFalse(request_roles.has_playlist_role(None, playlist.pk))
+            self.assertTrue(request_roles.playlist_exists(playlist.pk))
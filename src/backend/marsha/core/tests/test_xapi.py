@@ -10,6 +10,7 @@ from marsha.core.xapi import (
     XAPI,
     XAPIDocumentStatement,
     XAPIVideoStatement,
+    get_session,
     get_xapi_statement,
     requests,
 )
@@ -713,6 +714,37 @@ class XAPITest(TestCase):
         )
         self.assertEqual(kwargs["json"], statement)
 
+    def test_xapi_send_many_statements(self):
+        """Statements are posted as an array over a session shared per LRS host."""
+        xapi = XAPI("https://lrs.example.com/xAPI/statements", "auth_token")
+        statements = [{"id": "1"}, {"id": "2"}]
+
+        with mock.patch.object(requests.Session, "post") as mock_session_post:
+            xapi.send_many(statements)
+            XAPI("https://lrs.example.com/other", "auth_token").send_many(statements)
+
+        self.assertIs(
+            get_session("https://lrs.example.com/xAPI/statements"),
+            get_session("https://lrs.example.com/other"),
+        )
+        self.assertIsNot(
+            get_session("https://lrs.example.com/xAPI/statements"),
+            get_session("https://other.example.com/xAPI/statements"),
+        )
+        self.assertEqual(mock_session_post.call_count, 2)
+        args, kwargs = mock_session_post.call_args_list[0]
+        self.assertEqual(args[0], "https://lrs.example.com/xAPI/statements")
+        self.assertEqual(
+            kwargs["headers"],
+            {
+                "Authorization": "auth_token",
+                "Content-Type": "application/json",
+                "X-Experience-API-Version": "1.0.3",
+            },
+        )
+        self.assertEqual(kwargs["json"], statements)
+        mock_session_post.return_value.raise_for_status.assert_called()
+
 
 class GetXapiStatementTest(TestCase):
     """Test get_xapi_statement function."""
@@ -0,0 +1,76 @@
+"""An in memory cloudwatch logs client standing in for boto3 in tests.
+
+It implements the calls used to check live states, with the pagination of cloudwatch:
+events are returned by pages of at most `page_size` events. Calls are counted and the
+number of calls running at the same time is recorded.
+"""
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+
+# pylint: disable=too-many-instance-attributes
+class LogsClientStandIn:
+    """Hold the events of log groups, as a dict of lists of events by group name."""
+
+    def __init__(self, log_groups=None, page_size=2, latency=0, failing_groups=()):
+        """Fill the log groups, calls take `latency` seconds and fail for
+        `failing_groups`."""
+        self.log_groups = {
+            name: list(events) for name, events in (log_groups or {}).items()
+        }
+        self.page_size = page_size
+        self.latency = latency
+        self.failing_groups = set(failing_groups)
+        self.calls = []
+        self.max_concurrent_calls = 0
+        self._concurrent_calls = 0
+        self._lock = threading.Lock()
+
+    def log(self, log_group_name, *events):
+        """Add events to a log group."""
+        with self._lock:
+            self.log_groups.setdefault(log_group_name, []).extend(events)
+
+    # pylint: disable=invalid-name,unused-argument
+    def filter_log_events(
+        self, logGroupName, startTime=0, filterPattern="", nextToken=None
+    ):
+        """List the events of a log group from `startTime`, sorted by timestamp."""
+        with self._lock:
+            self.calls.append(
+                {
+                    "logGroupName": logGroupName,
+                    "startTime": startTime,
+                    "nextToken": nextToken,
+                }
+            )
+            self._concurrent_calls += 1
+            self.max_concurrent_calls = max(
+                self.max_concurrent_calls, self._concurrent_calls
+            )
+        try:
+            time.sleep(self.latency)
+            if logGroupName in self.failing_groups:
+                raise ClientError(
+                    {"Error": {"Code": "ServiceUnavailableException", "Message": ""}},
+                    "FilterLogEvents",
+                )
+            events = sorted(
+                (
+                    event
+                    for event in self.log_groups.get(logGroupName, [])
+                    if event["timestamp"] >= startTime
+                ),
+                key=lambda event: event["timestamp"],
+            )
+            offset = int(nextToken or 0)
+            end = offset + self.page_size
+            response = {"events": events[offset:end]}
+            if end < len(events):
+                response["nextToken"] = str(end)
+            return response
+        finally:
+            with self._lock:
+                self._concurrent_calls -= 1
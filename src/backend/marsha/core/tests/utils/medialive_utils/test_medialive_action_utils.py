@@ -48,7 +48,7 @@ class MediaLiveUtilsTestCase(TestCase):
 
         now = datetime(2018, 8, 8, tzinfo=baseTimezone.utc)
         with mock.patch("datetime.datetime") as mock_dt, Stubber(
-            medialive_utils.medialive_client
+            medialive_utils.get_medialive_client()
         ) as mediapackage_client_stubber:
             mock_dt.now = mock.Mock(return_value=now)
             mediapackage_client_stubber.add_response(
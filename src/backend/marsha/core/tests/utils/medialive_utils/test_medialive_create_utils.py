@@ -40,7 +40,7 @@ class MediaLiveUtilsTestCase(TestCase):
             }
         }
 
-        with Stubber(medialive_utils.medialive_client) as medialive_stubber:
+        with Stubber(medialive_utils.get_medialive_client()) as medialive_stubber:
             medialive_stubber.add_response(
                 "list_input_security_groups",
                 service_response=list_security_group_response,
@@ -87,7 +87,7 @@ class MediaLiveUtilsTestCase(TestCase):
             }
         }
 
-        with Stubber(medialive_utils.medialive_client) as medialive_stubber:
+        with Stubber(medialive_utils.get_medialive_client()) as medialive_stubber:
             medialive_stubber.add_response(
                 "list_input_security_groups",
                 service_response=list_security_group_response,
@@ -123,7 +123,7 @@ class MediaLiveUtilsTestCase(TestCase):
             ]
         }
 
-        with Stubber(medialive_utils.medialive_client) as medialive_stubber:
+        with Stubber(medialive_utils.get_medialive_client()) as medialive_stubber:
             medialive_stubber.add_response(
                 "list_input_security_groups",
                 service_response=list_security_group_response,
@@ -170,8 +170,10 @@ class MediaLiveUtilsTestCase(TestCase):
         }
 
         with Stubber(
-            medialive_utils.mediapackage_client
-        ) as mediapackage_stubber, Stubber(medialive_utils.ssm_client) as ssm_stubber:
+            medialive_utils.get_mediapackage_client()
+        ) as mediapackage_stubber, Stubber(
+            medialive_utils.get_ssm_client()
+        ) as ssm_stubber:
             mediapackage_stubber.add_response(
                 "create_channel",
                 service_response=mediapackage_create_channel_response,
@@ -256,7 +258,7 @@ class MediaLiveUtilsTestCase(TestCase):
         }
 
         with Stubber(
-            medialive_utils.medialive_client
+            medialive_utils.get_medialive_client()
         ) as medialive_stubber, mock.patch.object(
             medialive_utils.medialive_create_utils,
             "get_or_create_input_security_group",
@@ -315,7 +317,7 @@ class MediaLiveUtilsTestCase(TestCase):
         }
         medialive_channel_response = {"Channel": {"Id": "medialive_channel1"}}
 
-        with Stubber(medialive_utils.medialive_client) as medialive_stubber:
+        with Stubber(medialive_utils.get_medialive_client()) as medialive_stubber:
             medialive_stubber.add_response(
                 "create_channel",
                 service_response=medialive_channel_response,
@@ -768,7 +770,7 @@ class MediaLiveUtilsTestCase(TestCase):
         )
 
         with Stubber(
-            medialive_utils.mediapackage_client
+            medialive_utils.get_mediapackage_client()
         ) as mediapackage_client_stubber:
             medialive_utils.create_mediapackage_harvest_job(video)
             mediapackage_client_stubber.assert_no_pending_responses()
@@ -818,7 +820,7 @@ class MediaLiveUtilsTestCase(TestCase):
         )
 
         with mock.patch.object(timezone, "now", return_value=stop), Stubber(
-            medialive_utils.mediapackage_client
+            medialive_utils.get_mediapackage_client()
         ) as mediapackage_client_stubber:
             mediapackage_client_stubber.add_response(
                 "create_harvest_job",
@@ -929,7 +931,7 @@ class MediaLiveUtilsTestCase(TestCase):
         )
 
         with mock.patch.object(timezone, "now", return_value=now), Stubber(
-            medialive_utils.mediapackage_client
+            medialive_utils.get_mediapackage_client()
         ) as mediapackage_client_stubber:
             mediapackage_client_stubber.add_response(
                 "create_harvest_job",
@@ -1063,7 +1065,7 @@ class MediaLiveUtilsTestCase(TestCase):
 
     def test_wait_medialive_channel_is_created(self):
         """Should call describe_channel while state is not IDLE."""
-        with Stubber(medialive_utils.medialive_client) as medialive_stubber:
+        with Stubber(medialive_utils.get_medialive_client()) as medialive_stubber:
             medialive_stubber.add_response(
                 "describe_channel",
                 expected_params={"ChannelId": "medialive_channel1"},
@@ -40,7 +40,7 @@ class MediaLiveUtilsTestCase(TestCase):
             }
         )
 
-        with Stubber(medialive_utils.medialive_client) as medialive_stubber:
+        with Stubber(medialive_utils.get_medialive_client()) as medialive_stubber:
             medialive_stubber.add_response(
                 "delete_channel",
                 expected_params={"ChannelId": "medialive_channel1"},
@@ -81,7 +81,7 @@ class MediaLiveUtilsTestCase(TestCase):
         )
 
         with Stubber(
-            medialive_utils.medialive_client
+            medialive_utils.get_medialive_client()
         ) as medialive_stubber, mock.patch.object(
             medialive_utils.medialive_delete_utils, "capture_exception"
         ) as mock_capture_exception:
@@ -103,7 +103,7 @@ class MediaLiveUtilsTestCase(TestCase):
     def test_delete_mediapackage_channel(self):
         """Should delete a mediapackage channel and related enpoints."""
         with Stubber(
-            medialive_utils.mediapackage_client
+            medialive_utils.get_mediapackage_client()
         ) as mediapackage_client_stubber:
             mediapackage_client_stubber.add_response(
                 "list_origin_endpoints",
@@ -148,7 +148,7 @@ class MediaLiveUtilsTestCase(TestCase):
             "django.utils.timezone.now",
             return_value=datetime(2021, 8, 26, 13, 25, tzinfo=timezone.utc),
         ), Stubber(
-            medialive_utils.medialive_client
+            medialive_utils.get_medialive_client()
         ) as mediapackage_client_stubber, mock.patch.object(
             medialive_utils.medialive_delete_utils, "delete_mediapackage_channel"
         ) as delete_mediapackage_channel_mock:
@@ -214,7 +214,7 @@ class MediaLiveUtilsTestCase(TestCase):
             "django.utils.timezone.now",
             return_value=datetime(2021, 8, 26, 13, 25, tzinfo=timezone.utc),
         ), Stubber(
-            medialive_utils.medialive_client
+            medialive_utils.get_medialive_client()
         ) as mediapackage_client_stubber, mock.patch.object(
             medialive_utils.medialive_delete_utils, "delete_mediapackage_channel"
         ) as delete_mediapackage_channel_mock:
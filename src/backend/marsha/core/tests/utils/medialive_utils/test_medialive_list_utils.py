@@ -1,8 +1,12 @@
 """Test medialive utils functions."""
+from unittest import mock
+import uuid
+
 from django.test import TestCase
 
 from botocore.stub import Stubber
 
+from marsha.core.factories import VideoFactory
 from marsha.core.utils import medialive_utils
 
 
@@ -20,7 +24,7 @@ class MediaLiveUtilsTestCase(TestCase):
     def test_list_mediapackage_channels(self):
         """Should recursively get all mediapackage channels."""
         with Stubber(
-            medialive_utils.mediapackage_client
+            medialive_utils.get_mediapackage_client()
         ) as mediapackage_client_stubber:
             mediapackage_client_stubber.add_response(
                 "list_channels",
@@ -39,7 +43,7 @@ class MediaLiveUtilsTestCase(TestCase):
     def test_list_mediapackage_channel_harvest_jobs(self):
         """Should recursively get all harvest job related to a mediapackage channel."""
         with Stubber(
-            medialive_utils.mediapackage_client
+            medialive_utils.get_mediapackage_client()
         ) as mediapackage_client_stubber:
             mediapackage_client_stubber.add_response(
                 "list_harvest_jobs",
@@ -61,7 +65,7 @@ class MediaLiveUtilsTestCase(TestCase):
     def test_list_mediapackage_channel_origin_endpoints(self):
         """Should recursively get all origin endpoints related to a mediapackage channel."""
         with Stubber(
-            medialive_utils.mediapackage_client
+            medialive_utils.get_mediapackage_client()
         ) as mediapackage_client_stubber:
             mediapackage_client_stubber.add_response(
                 "list_origin_endpoints",
@@ -84,7 +88,9 @@ class MediaLiveUtilsTestCase(TestCase):
 
     def test_list_medialive_channels(self):
         """Should recursively get all medialive channels."""
-        with Stubber(medialive_utils.medialive_client) as medialive_client_stubber:
+        with Stubber(
+            medialive_utils.get_medialive_client()
+        ) as medialive_client_stubber:
             medialive_client_stubber.add_response(
                 "list_channels",
                 service_response={"Channels": [{"Id": "1"}], "NextToken": "next_token"},
@@ -101,7 +107,9 @@ class MediaLiveUtilsTestCase(TestCase):
 
     def test_list_indexed_medialive_channels(self):
         """Should recursively get all medialive channels and index them by their name."""
-        with Stubber(medialive_utils.medialive_client) as medialive_client_stubber:
+        with Stubber(
+            medialive_utils.get_medialive_client()
+        ) as medialive_client_stubber:
             medialive_client_stubber.add_response(
                 "list_channels",
                 service_response={
@@ -120,3 +128,75 @@ class MediaLiveUtilsTestCase(TestCase):
         self.assertEqual(
             channels, {"A": {"Id": "1", "Name": "A"}, "B": {"Id": "2", "Name": "B"}}
         )
+
+    def test_iter_medialive_channels_lazily(self):
+        """Pages are only requested when the previous one is consumed."""
+        with Stubber(
+            medialive_utils.get_medialive_client()
+        ) as medialive_client_stubber:
+            medialive_client_stubber.add_response(
+                "list_channels",
+                service_response={
+                    "Channels": [{"Id": "1"}, {"Id": "2"}],
+                    "NextToken": "next_token",
+                },
+                expected_params={},
+            )
+            channels = medialive_utils.iter_medialive_channels()
+            self.assertEqual(next(channels), {"Id": "1"})
+            self.assertEqual(next(channels), {"Id": "2"})
+            medialive_client_stubber.assert_no_pending_responses()
+
+            medialive_client_stubber.add_response(
+                "list_channels",
+                service_response={"Channels": [{"Id": "3"}]},
+                expected_params={"NextToken": "next_token"},
+            )
+            self.assertEqual(list(channels), [{"Id": "3"}])
+            medialive_client_stubber.assert_no_pending_responses()
+
+    def test_iter_medialive_channels_videos(self):
+        """Channels of the current environment are yielded by batches, with their
+        video loaded by a single query for each batch."""
+        videos = VideoFactory.create_batch(3)
+        missing_pk = uuid.uuid4()
+        medialive_channels = [
+            {"Name": f"test_{video.id}_1667490961", "Tags": {"environment": "test"}}
+            for video in videos
+        ]
+        medialive_channels.insert(
+            1,
+            {"Name": f"foo_{videos[0].id}_1667490961", "Tags": {"environment": "foo"}},
+        )
+        medialive_channels.append(
+            {"Name": f"test_{missing_pk}_1667490961", "Tags": {"environment": "test"}}
+        )
+
+        with self.assertNumQueries(2):
+            batches = list(
+                medialive_utils.iter_medialive_channels_videos(
+                    iter(medialive_channels), batch_size=2
+                )
+            )
+
+        self.assertEqual(
+            batches,
+            [
+                [
+                    (medialive_channels[0], str(videos[0].id), videos[0]),
+                    (medialive_channels[2], str(videos[1].id), videos[1]),
+                ],
+                [
+                    (medialive_channels[3], str(videos[2].id), videos[2]),
+                    (medialive_channels[4], str(missing_pk), None),
+                ],
+            ],
+        )
+
+    @mock.patch.object(medialive_utils.medialive_list_utils, "CHANNELS_BATCH_SIZE", 2)
+    def test_iter_medialive_channels_videos_empty(self):
+        """No query is made when there is no channel."""
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                list(medialive_utils.iter_medialive_channels_videos(iter([]))), []
+            )
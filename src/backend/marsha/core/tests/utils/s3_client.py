@@ -0,0 +1,85 @@
+"""An in memory S3 client standing in for boto3 in tests.
+
+It implements the calls used to move directories, with the limits of S3: objects are
+listed and deleted by at most 1000 keys. Calls are counted and the number of copies
+running at the same time is recorded.
+"""
+from collections import Counter
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+
+class S3ClientStandIn:
+    """Hold the objects of a bucket, as a dict of their size by key."""
+
+    def __init__(self, objects=None, latency=0, failing_keys=()):
+        """Fill the bucket, copies take `latency` seconds and fail for `failing_keys`."""
+        self.objects = dict(objects or {})
+        self.latency = latency
+        self.failing_keys = set(failing_keys)
+        self.calls = Counter()
+        self.max_concurrent_copies = 0
+        self._concurrent_copies = 0
+        self._lock = threading.Lock()
+
+    def _count(self, operation):
+        with self._lock:
+            self.calls[operation] += 1
+
+    # pylint: disable=invalid-name,too-many-arguments,unused-argument
+    def list_objects_v2(
+        self, Bucket, Prefix, StartAfter="", ContinuationToken="", MaxKeys=1000
+    ):
+        """List the objects with a prefix, sorted by key, by pages of `MaxKeys`."""
+        self._count("list_objects_v2")
+        start_after = ContinuationToken or StartAfter
+        keys = sorted(
+            key for key in self.objects if key.startswith(Prefix) and key > start_after
+        )
+        page = keys[:MaxKeys]
+        response = {"IsTruncated": len(keys) > MaxKeys, "KeyCount": len(page)}
+        if page:
+            response["Contents"] = [
+                {"Key": key, "Size": self.objects[key]} for key in page
+            ]
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = page[-1]
+        return response
+
+    # pylint: disable=invalid-name,unused-argument
+    def copy_object(self, CopySource, Bucket, Key):
+        """Copy an object, taking `latency` seconds."""
+        self._count("copy_object")
+        with self._lock:
+            self._concurrent_copies += 1
+            self.max_concurrent_copies = max(
+                self.max_concurrent_copies, self._concurrent_copies
+            )
+        try:
+            time.sleep(self.latency)
+            if CopySource["Key"] in self.failing_keys:
+                raise ClientError(
+                    {"Error": {"Code": "InternalError", "Message": "Failure"}},
+                    "CopyObject",
+                )
+            with self._lock:
+                self.objects[Key] = self.objects[CopySource["Key"]]
+        finally:
+            with self._lock:
+                self._concurrent_copies -= 1
+
+    # pylint: disable=invalid-name,unused-argument
+    def delete_objects(self, Bucket, Delete):
+        """Delete at most 1000 objects."""
+        self._count("delete_objects")
+        if len(Delete["Objects"]) > 1000:
+            raise ClientError(
+                {"Error": {"Code": "MalformedXML", "Message": "Too many keys"}},
+                "DeleteObjects",
+            )
+        with self._lock:
+            for obj in Delete["Objects"]:
+                self.objects.pop(obj["Key"], None)
+        return {}
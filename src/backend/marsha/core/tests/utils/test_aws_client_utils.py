@@ -0,0 +1,77 @@
+"""Tests for the `core.utils.aws_client_utils` module."""
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from marsha.core.utils.aws_client_utils import clear_clients, get_aws_client, get_client
+
+
+class AwsClientUtilsTestCase(TestCase):
+    """Test the registry of boto3 clients."""
+
+    def setUp(self):
+        """Start without any client."""
+        clear_clients()
+        self.addCleanup(clear_clients)
+
+    def test_get_client_created_once(self):
+        """A client is created on first use and reused for the same arguments."""
+        with mock.patch("boto3.client", side_effect=mock.Mock) as mock_boto3_client:
+            client = get_client("s3", {"signature_version": "s3v4"}, endpoint_url="a")
+            self.assertIs(
+                get_client("s3", {"signature_version": "s3v4"}, endpoint_url="a"),
+                client,
+            )
+            self.assertIsNot(get_client("s3", endpoint_url="a"), client)
+            self.assertIsNot(
+                get_client("s3", {"signature_version": "s3v4"}, endpoint_url="b"),
+                client,
+            )
+            self.assertIsNot(
+                get_client("ssm", {"signature_version": "s3v4"}, endpoint_url="a"),
+                client,
+            )
+
+        self.assertEqual(mock_boto3_client.call_count, 4)
+
+    def test_get_client_concurrently(self):
+        """Threads asking for the same client at the same time share it."""
+        barrier = threading.Barrier(8)
+
+        def create_client(*args, **kwargs):
+            return mock.Mock()
+
+        def get_medialive_client(_index):
+            barrier.wait()
+            return get_aws_client("medialive")
+
+        with mock.patch(
+            "boto3.client", side_effect=create_client
+        ) as mock_boto3_client, ThreadPoolExecutor(max_workers=8) as executor:
+            clients = set(executor.map(get_medialive_client, range(8)))
+
+        self.assertEqual(len(clients), 1)
+        mock_boto3_client.assert_called_once()
+
+    def test_get_aws_client(self):
+        """AWS clients use the AWS credentials and region of the settings."""
+        with mock.patch("boto3.client", side_effect=mock.Mock) as mock_boto3_client:
+            client = get_aws_client("lambda", signature_version="s3v4")
+            with override_settings(AWS_S3_REGION_NAME="us-east-1"):
+                self.assertIsNot(
+                    get_aws_client("lambda", signature_version="s3v4"), client
+                )
+
+        mock_boto3_client.assert_any_call(
+            "lambda",
+            config=mock.ANY,
+            aws_access_key_id="aws-access-key-id",
+            aws_secret_access_key="aws-secret-access-key",
+        )
+        configs = [call.kwargs["config"] for call in mock_boto3_client.call_args_list]
+        self.assertEqual(
+            [(config.region_name, config.signature_version) for config in configs],
+            [("eu-west-1", "s3v4"), ("us-east-1", "s3v4")],
+        )
@@ -0,0 +1,51 @@
+"""Test the cloudfront utils."""
+import os
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from marsha.core.tests.testing_utils import RSA_KEY_MOCK
+from marsha.core.utils import cloudfront_utils
+
+
+@override_settings(CLOUDFRONT_SIGNED_PUBLIC_KEY_ID="YourCloudfrontPublicKeyId")
+class CloudfrontUtilsTestCase(TestCase):
+    """Test the cloudfront signer cache."""
+
+    def setUp(self):
+        """Write the private key in a temporary file and forget cached signers."""
+        super().setUp()
+        cloudfront_utils._signers.clear()  # pylint: disable=protected-access
+        with tempfile.NamedTemporaryFile(delete=False) as key_file:
+            key_file.write(RSA_KEY_MOCK)
+        self.key_path = key_file.name
+        self.addCleanup(os.remove, self.key_path)
+
+    def test_cloudfront_utils_get_cloudfront_signer_cached(self):
+        """The private key is read and parsed once."""
+        with override_settings(CLOUDFRONT_PRIVATE_KEY_PATH=self.key_path), mock.patch(
+            "marsha.core.utils.cloudfront_utils.get_cloudfront_private_key",
+            wraps=cloudfront_utils.get_cloudfront_private_key,
+        ) as mock_get_key:
+            signer = cloudfront_utils.get_cloudfront_signer()
+            self.assertIs(cloudfront_utils.get_cloudfront_signer(), signer)
+            cloudfront_utils.rsa_signer(b"message")
+
+        mock_get_key.assert_called_once()
+        self.assertEqual(signer.key_id, "YourCloudfrontPublicKeyId")
+
+    def test_cloudfront_utils_get_cloudfront_signer_key_changed(self):
+        """The private key is reloaded when its file changes."""
+        with override_settings(CLOUDFRONT_PRIVATE_KEY_PATH=self.key_path):
+            signer = cloudfront_utils.get_cloudfront_signer()
+            stat = os.stat(self.key_path)
+            os.utime(self.key_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+            self.assertIsNot(cloudfront_utils.get_cloudfront_signer(), signer)
+
+    def test_cloudfront_utils_get_cloudfront_signer_missing_key(self):
+        """A missing private key raises an exception."""
+        with override_settings(CLOUDFRONT_PRIVATE_KEY_PATH=f"{self.key_path}.missing"):
+            with self.assertRaises(cloudfront_utils.MissingRSAKey):
+                cloudfront_utils.get_cloudfront_signer()
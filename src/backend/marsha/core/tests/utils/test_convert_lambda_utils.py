@@ -38,7 +38,7 @@ class ConvertLambdaUtilsTestCase(TestCase):
             "Payload": b"",
         }
 
-        with Stubber(convert_lambda_utils.lambda_client) as lambda_stubber:
+        with Stubber(convert_lambda_utils.get_lambda_client()) as lambda_stubber:
             lambda_stubber.add_response(
                 "invoke",
                 service_response=invoke_lambda_response,
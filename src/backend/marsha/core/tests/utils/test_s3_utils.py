@@ -1,8 +1,13 @@
 """Tests for the `core.s3_utils` module."""
 from unittest import mock
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
+from botocore.exceptions import ClientError
+
+from marsha.core.tests.utils.s3_client import S3ClientStandIn
+from marsha.core.utils.aws_client_utils import clear_clients
 from marsha.core.utils.s3_utils import (
     get_aws_s3_client,
     get_s3_client,
@@ -23,44 +28,41 @@ class S3UtilsTestCase(TestCase):
             "Rules": []
         }
         self.mock_s3_client.put_bucket_lifecycle_configuration.return_value = {}
+        cache.clear()
+        # Do not share the clients mocked by these tests
+        clear_clients()
+        self.addCleanup(clear_clients)
 
     def test_get_aws_s3_client(self):
         """
-        Should instantiate a s3 client with AWS config
+        Should instantiate a s3 client with AWS config, once
         """
-
-        mocked_config = mock.Mock()
         with mock.patch(
             "boto3.client", return_value=self.mock_s3_client
-        ) as mock_boto3_client, mock.patch(
-            "marsha.core.utils.s3_utils.Config", return_value=mocked_config
-        ) as mock_config:
+        ) as mock_boto3_client:
             client = get_aws_s3_client()
+            self.assertEqual(get_aws_s3_client(), client)
 
         self.assertEqual(client, self.mock_s3_client)
         mock_boto3_client.assert_called_once_with(
             "s3",
             aws_access_key_id="aws-access-key-id",
             aws_secret_access_key="aws-secret-access-key",
-            config=mocked_config,
-        )
-        mock_config.assert_called_once_with(
-            region_name="eu-west-1",
-            signature_version="s3v4",
+            config=mock.ANY,
         )
+        config = mock_boto3_client.call_args.kwargs["config"]
+        self.assertEqual(config.region_name, "eu-west-1")
+        self.assertEqual(config.signature_version, "s3v4")
 
     def test_get_videos_s3_client(self):
         """
-        Should instantiate a s3 client with a Scaleway config
+        Should instantiate a s3 client with a Scaleway config, once
         """
-
-        mocked_config = mock.Mock()
         with mock.patch(
             "boto3.client", return_value=self.mock_s3_client
-        ) as mock_boto3_client, mock.patch(
-            "marsha.core.utils.s3_utils.Config", return_value=mocked_config
-        ) as mock_config:
+        ) as mock_boto3_client:
             client = get_videos_s3_client()
+            self.assertEqual(get_videos_s3_client(), client)
 
         self.assertEqual(client, self.mock_s3_client)
         mock_boto3_client.assert_called_once_with(
@@ -68,12 +70,11 @@ class S3UtilsTestCase(TestCase):
             aws_access_key_id="scw-access-key",
             aws_secret_access_key="scw-secret-key",
             endpoint_url="https://s3.fr-par.scw.cloud",
-            config=mocked_config,
-        )
-        mock_config.assert_called_once_with(
-            region_name="fr-par",
-            signature_version="s3v4",
+            config=mock.ANY,
         )
+        config = mock_boto3_client.call_args.kwargs["config"]
+        self.assertEqual(config.region_name, "fr-par")
+        self.assertEqual(config.signature_version, "s3v4")
 
     def test_get_s3_client_with_aws_parameter(self):
         """
@@ -117,119 +118,130 @@ class S3UtilsTestCase(TestCase):
         Test the move_s3_directory with existing files. It should list,
         copy, and delete files.
         """
-        mock_s3_client = mock.Mock()
-
-        mock_s3_client.list_objects_v2.return_value = {
-            "IsTruncated": False,
-            "Contents": [
-                {
-                    "Key": "example1.txt",
-                    "LastModified": "2015-01-01 00:00:00",
-                    "ETag": '"example1etag"',
-                    "Size": 100,
-                    "StorageClass": "STANDARD",
-                },
-                {
-                    "Key": "example2.txt",
-                    "LastModified": "2015-01-01 00:00:00",
-                    "ETag": '"example2etag"',
-                    "Size": 200,
-                    "StorageClass": "STANDARD",
-                },
-            ],
-            "Name": "mybucket",
-            "Prefix": "",
-            "MaxKeys": 1000,
-            "CommonPrefixes": [],
-            "KeyCount": 2,
-            "ResponseMetadata": {
-                "RequestId": "example3id",
-                "HostId": "example4id",
-                "HTTPStatusCode": 200,
-                "HTTPHeaders": {
-                    "x-amz-id-2": "example5id",
-                    "x-amz-request-id": "example6id",
-                    "date": "Wed, 21 Oct 2015 20:33:07 GMT",
-                    "x-amz-bucket-region": "us-west-2",
-                    "content-type": "application/xml",
-                    "transfer-encoding": "chunked",
-                    "server": "AmazonS3",
-                },
-                "RetryAttempts": 0,
-            },
-        }
+        s3_client = S3ClientStandIn(
+            {"test_key/example1.txt": 100, "test_key/example2.txt": 200, "other": 1}
+        )
 
         with mock.patch(
-            "marsha.core.utils.s3_utils.get_s3_client", return_value=mock_s3_client
-        ):
-            move_s3_directory("test_key", "destination", "AWS", "test-bucket")
-            mock_s3_client.list_objects_v2.assert_called_once_with(
-                Bucket="test-bucket", Prefix="test_key"
-            )
-
-            mock_s3_client.copy.assert_has_calls(
-                [
-                    mock.call(
-                        {"Bucket": "test-bucket", "Key": "example1.txt"},
-                        "test-bucket",
-                        "destination/example1.txt",
-                    ),
-                    mock.call(
-                        {"Bucket": "test-bucket", "Key": "example2.txt"},
-                        "test-bucket",
-                        "destination/example2.txt",
-                    ),
-                ]
-            )
-
-            mock_s3_client.delete_objects.assert_called_once_with(
-                Bucket="test-bucket",
-                Delete={
-                    "Objects": [
-                        {"Key": "example1.txt"},
-                        {"Key": "example2.txt"},
-                    ]
-                },
-            )
+            "marsha.core.utils.s3_utils.get_s3_client", return_value=s3_client
+        ) as mock_get_s3_client:
+            moved = move_s3_directory("test_key", "destination", "AWS", "test-bucket")
+
+        mock_get_s3_client.assert_called_once_with("AWS", max_pool_connections=10)
+        self.assertEqual(moved, {"objects": 2, "bytes": 300})
+        self.assertEqual(
+            s3_client.objects,
+            {
+                "destination/test_key/example1.txt": 100,
+                "destination/test_key/example2.txt": 200,
+                "other": 1,
+            },
+        )
+        self.assertEqual(
+            s3_client.calls,
+            {"list_objects_v2": 1, "copy_object": 2, "delete_objects": 1},
+        )
 
     def test_s3_move_directory_with_no_content(self):
         """
         Test the move_s3_directory with no content. It should list,
         and do nothing.
         """
-        mock_s3_client = mock.Mock()
-
-        mock_s3_client.list_objects_v2.return_value = {
-            "IsTruncated": False,
-            "Name": "mybucket",
-            "Prefix": "",
-            "MaxKeys": 1000,
-            "CommonPrefixes": [],
-            "KeyCount": 0,
-            "ResponseMetadata": {
-                "RequestId": "example3id",
-                "HostId": "example4id",
-                "HTTPStatusCode": 200,
-                "HTTPHeaders": {
-                    "x-amz-id-2": "example5id",
-                    "x-amz-request-id": "example6id",
-                    "date": "Wed, 21 Oct 2015 20:33:07 GMT",
-                    "x-amz-bucket-region": "us-west-2",
-                    "content-type": "application/xml",
-                    "transfer-encoding": "chunked",
-                    "server": "AmazonS3",
-                },
-                "RetryAttempts": 0,
-            },
-        }
+        s3_client = S3ClientStandIn({"other": 1})
 
         with mock.patch(
-            "marsha.core.utils.s3_utils.get_s3_client", return_value=mock_s3_client
+            "marsha.core.utils.s3_utils.get_s3_client", return_value=s3_client
         ):
+            moved = move_s3_directory("test_key", "destination", "AWS", "test-bucket")
+
+        self.assertEqual(moved, {"objects": 0, "bytes": 0})
+        self.assertEqual(s3_client.objects, {"other": 1})
+        self.assertEqual(s3_client.calls, {"list_objects_v2": 1})
+
+    @override_settings(S3_MOVE_CONCURRENCY=4)
+    def test_s3_move_directory_paginated(self):
+        """
+        All the objects of a directory with more than 1000 objects are copied
+        concurrently and deleted by batches of 1000 keys.
+        """
+        s3_client = S3ClientStandIn(
+            {f"test_key/{index:04d}.ts": 10 for index in range(2500)}, latency=0.001
+        )
+
+        with mock.patch(
+            "marsha.core.utils.s3_utils.get_s3_client", return_value=s3_client
+        ) as mock_get_s3_client:
+            moved = move_s3_directory("test_key", "destination", "AWS", "test-bucket")
+
+        mock_get_s3_client.assert_called_once_with("AWS", max_pool_connections=4)
+        self.assertEqual(moved, {"objects": 2500, "bytes": 25000})
+        self.assertEqual(
+            s3_client.objects,
+            {f"destination/test_key/{index:04d}.ts": 10 for index in range(2500)},
+        )
+        self.assertEqual(
+            s3_client.calls,
+            {"list_objects_v2": 3, "copy_object": 2500, "delete_objects": 3},
+        )
+        self.assertEqual(s3_client.max_concurrent_copies, 4)
+
+    def test_s3_move_directory_resumed(self):
+        """
+        A move interrupted by an error resumes after the last page of objects moved,
+        and reports the objects moved by both calls.
+        """
+        s3_client = S3ClientStandIn(
+            {f"test_key/{index:04d}.ts": 10 for index in range(2500)},
+            failing_keys=["test_key/2100.ts"],
+        )
+
+        with mock.patch(
+            "marsha.core.utils.s3_utils.get_s3_client", return_value=s3_client
+        ), self.assertRaises(ClientError):
             move_s3_directory("test_key", "destination", "AWS", "test-bucket")
-            mock_s3_client.list_objects_v2.assert_called_once_with(
-                Bucket="test-bucket", Prefix="test_key"
+
+        # The first two pages were moved
+        self.assertEqual(
+            len([key for key in s3_client.objects if key.startswith("test_key/")]),
+            500,
+        )
+        self.assertEqual(
+            cache.get("s3:move:test-bucket:test_key:destination"),
+            {"start_after": "test_key/1999.ts", "objects": 2000, "bytes": 20000},
+        )
+
+        s3_client.failing_keys.clear()
+        s3_client.calls.clear()
+        with mock.patch(
+            "marsha.core.utils.s3_utils.get_s3_client", return_value=s3_client
+        ), mock.patch.object(
+            s3_client, "list_objects_v2", wraps=s3_client.list_objects_v2
+        ) as mock_list_objects:
+            moved = move_s3_directory("test_key", "destination", "AWS", "test-bucket")
+
+        mock_list_objects.assert_called_once_with(
+            Bucket="test-bucket", Prefix="test_key", StartAfter="test_key/1999.ts"
+        )
+        self.assertEqual(moved, {"objects": 2500, "bytes": 25000})
+        self.assertEqual(
+            s3_client.objects,
+            {f"destination/test_key/{index:04d}.ts": 10 for index in range(2500)},
+        )
+        self.assertIsNone(cache.get("s3:move:test-bucket:test_key:destination"))
+
+    def test_s3_move_directory_dry_run(self):
+        """A dry run counts the objects and bytes to move without moving them."""
+        objects = {f"test_key/{index:04d}.ts": index for index in range(1500)}
+        s3_client = S3ClientStandIn(objects)
+
+        with mock.patch(
+            "marsha.core.utils.s3_utils.get_s3_client", return_value=s3_client
+        ):
+            moved = move_s3_directory(
+                "test_key", "destination", "AWS", "test-bucket", dry_run=True
             )
 
-            mock_s3_client.copy.assert_not_called()
-            mock_s3_client.delete_objects.assert_not_called()
+        self.assertEqual(moved, {"objects": 1500, "bytes": sum(range(1500))})
+        self.assertEqual(s3_client.objects, objects)
+        self.assertEqual(s3_client.calls, {"list_objects_v2": 2})
+        self.assertIsNone(cache.get("s3:move:test-bucket:test_key:destination"))
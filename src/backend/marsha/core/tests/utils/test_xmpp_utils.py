@@ -3,6 +3,7 @@ from unittest import mock
 
 from django.test import TestCase, override_settings
 
+from marsha.core.tests.utils.xmpp_server import XMPPServerStandIn
 from marsha.core.utils import xmpp_utils
 
 
@@ -40,3 +41,167 @@ class XmppUtilsTestCase(TestCase):
             xmpp_utils.add_jwt_token_to_url("https://xmpp-server.com", "my-token"),
             "https://xmpp-server.com?token=my-token",
         )
+
+
+# pylint: disable=protected-access
+class XmppClientPoolTestCase(TestCase):
+    """Test the pooled admin clients against a local XMPP server."""
+
+    def setUp(self):
+        """Start a stand-in XMPP server and use a new pool of clients."""
+        super().setUp()
+        self.server = XMPPServerStandIn()
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+        settings_override = override_settings(
+            XMPP_PRIVATE_ADMIN_JID="admin@localhost/marsha",
+            XMPP_PRIVATE_SERVER_PORT=self.server.port,
+            XMPP_PRIVATE_SERVER_PASSWORD="password",
+            XMPP_CONFERENCE_DOMAIN="conference.localhost",
+            XMPP_CLIENT_POOL_SIZE=1,
+            XMPP_CLIENT_POOL_TIMEOUT=1,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        xmpp_utils._pools.clear()
+        self.addCleanup(self._close_pools)
+
+    @staticmethod
+    def _close_pools():
+        for pool in xmpp_utils._pools.values():
+            pool.close()
+        xmpp_utils._pools.clear()
+
+    def test_operations_reuse_the_connection(self):
+        """Successive operations are made with a single authenticated connection."""
+        xmpp_utils.create_room("room1")
+        xmpp_utils.close_room("room1")
+        xmpp_utils.reopen_room_for_vod("room1")
+        xmpp_utils.broadcast_message("room1", "event", "message")
+        self.server.wait_until(self.server.messages)
+
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.server.authentications, 1)
+        room_config = self.server.room_configs["room1"]
+        self.assertEqual(
+            sorted(room_config),
+            [
+                "FORM_TYPE",
+                "muc#roomconfig_allowinvites",
+                "muc#roomconfig_allowpm",
+                "muc#roomconfig_changesubject",
+                "muc#roomconfig_membersonly",
+                "muc#roomconfig_moderatedroom",
+                "muc#roomconfig_persistentroom",
+                "muc#roomconfig_publicroom",
+                "muc#roomconfig_roomname",
+            ],
+        )
+        self.assertEqual(room_config["muc#roomconfig_persistentroom"], "1")
+        self.assertEqual(room_config["muc#roomconfig_allowpm"], "none")
+        self.assertEqual(room_config["muc#roomconfig_moderatedroom"], "1")
+        [message] = self.server.messages()
+        self.assertEqual(message.get("to"), "room1@conference.localhost")
+        self.assertEqual(message.get("event"), "event")
+        self.assertEqual(message.findtext("{jabber:client}body"), "message")
+
+    def test_configure_rooms(self):
+        """Several rooms are configured in a single session."""
+        xmpp_utils.configure_rooms(
+            [
+                ("room1", xmpp_utils.CREATE_ROOM_CONFIG),
+                ("room2", xmpp_utils.CLOSE_ROOM_CONFIG),
+            ]
+        )
+        self.server.wait_until(lambda: "room2" in self.server.room_configs)
+
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(
+            self.server.room_configs["room1"]["muc#roomconfig_persistentroom"], "1"
+        )
+        self.assertEqual(
+            self.server.room_configs["room2"]["muc#roomconfig_membersonly"], "1"
+        )
+        self.assertNotIn(
+            "muc#roomconfig_persistentroom", self.server.room_configs["room2"]
+        )
+
+    def test_configure_rooms_leave_rooms(self):
+        """The pooled client leaves each room once it is configured."""
+        xmpp_utils.configure_rooms(
+            [
+                ("room1", xmpp_utils.CREATE_ROOM_CONFIG),
+                ("room2", xmpp_utils.CLOSE_ROOM_CONFIG),
+            ]
+        )
+        self.server.wait_until(lambda: len(self.server.presences()) == 4)
+
+        self.assertEqual(
+            self.server.presences(),
+            [
+                ("room1", "available"),
+                ("room1", "unavailable"),
+                ("room2", "available"),
+                ("room2", "unavailable"),
+            ],
+        )
+
+    def test_reconnect_after_connection_lost(self):
+        """A new connection is opened once the pooled one was lost."""
+        xmpp_utils.create_room("room1")
+        self.server.drop_connections()
+
+        xmpp_utils.close_room("room1")
+        self.server.wait_until(
+            lambda: self.server.room_configs.get("room1", {}).get(
+                "muc#roomconfig_membersonly"
+            )
+            == "1"
+        )
+
+        self.assertEqual(self.server.connections, 2)
+        self.assertEqual(self.server.authentications, 2)
+
+    def test_broadcast_message_after_connection_lost(self):
+        """A message is sent once with a new connection if the pooled one was lost."""
+        xmpp_utils.create_room("room1")
+        self.server.drop_connections()
+
+        xmpp_utils.broadcast_message("room1", "event", "message")
+        self.server.wait_until(self.server.messages)
+
+        self.assertEqual(len(self.server.messages()), 1)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_broadcast_message_not_sent_again(self):
+        """A message is not sent again if the connection is lost while sending it."""
+        pool = xmpp_utils.get_client_pool()
+        client = pool.acquire()
+        client.send = mock.Mock(side_effect=OSError("Disconnected from server."))
+        pool.release(client)
+
+        with self.assertRaises(OSError):
+            xmpp_utils.broadcast_message("room1", "event", "message")
+
+        client.send.assert_called_once()
+        self.assertEqual(self.server.connections, 1)
+
+    def test_pool_timeout(self):
+        """Callers wait a bounded time for a client to be released."""
+        pool = xmpp_utils.get_client_pool()
+
+        with pool.client():
+            with self.assertRaises(xmpp_utils.XMPPClientPoolTimeout):
+                xmpp_utils.create_room("room1")
+
+        xmpp_utils.create_room("room1")
+        self.assertEqual(self.server.connections, 1)
+
+    def test_connection_refused(self):
+        """An OSError is raised when the XMPP server can not be reached."""
+        self.server.stop()
+
+        with self.assertRaises(OSError):
+            xmpp_utils.create_room("room1")
@@ -0,0 +1,205 @@
+"""A minimal XMPP server standing in for the real one in tests.
+
+It speaks just enough of the protocol for the admin client of ``xmpp_utils``: SASL
+PLAIN authentication, resource binding, MUC owner configuration and group chat
+messages. Connections, authentications and the stanzas received are recorded.
+"""
+import socket
+import socketserver
+import threading
+import time
+from xml.etree import ElementTree
+
+
+NS_CLIENT = "jabber:client"
+NS_MUC_OWNER = "http://jabber.org/protocol/muc#owner"
+NS_DATA = "jabber:x:data"
+
+STREAM_HEADER = (
+    "<?xml version='1.0'?><stream:stream xmlns='jabber:client' "
+    "xmlns:stream='http://etherx.jabber.org/streams' id='{stream_id}' "
+    "from='localhost' version='1.0'>"
+)
+SASL_FEATURES = (
+    "<stream:features><mechanisms xmlns='urn:ietf:params:xml:ns:xmpp-sasl'>"
+    "<mechanism>PLAIN</mechanism></mechanisms></stream:features>"
+)
+BIND_FEATURES = (
+    "<stream:features><bind xmlns='urn:ietf:params:xml:ns:xmpp-bind'/>"
+    "<session xmlns='urn:ietf:params:xml:ns:xmpp-session'/></stream:features>"
+)
+ROOM_CONFIG_FORM = (
+    "<query xmlns='http://jabber.org/protocol/muc#owner'>"
+    "<x xmlns='jabber:x:data' type='form'>"
+    "<field var='FORM_TYPE' type='hidden'>"
+    "<value>http://jabber.org/protocol/muc#roomconfig</value></field>"
+    "<field var='muc#roomconfig_roomname' type='text-single'><value/></field>"
+    "<field var='muc#roomconfig_membersonly' type='boolean'><value>0</value></field>"
+    "</x></query>"
+)
+
+
+class _XMPPHandler(socketserver.BaseRequestHandler):
+    """Handle the stream of one client connection."""
+
+    def __init__(self, request, client_address, server):
+        """Start unauthenticated, the base class handles the request right away."""
+        self.authenticated = False
+        self.parser = None
+        super().__init__(request, client_address, server)
+
+    def setup(self):
+        """Record the new connection."""
+        self.server.stand_in.connections += 1
+        self.server.stand_in.requests.append(self.request)
+
+    def _write(self, data):
+        self.request.sendall(data.encode("utf-8"))
+
+    def _restart_stream(self):
+        """Wait for a new stream header."""
+        self.parser = ElementTree.XMLPullParser(events=("start", "end"))
+
+    def handle(self):
+        """Answer the client stanzas until the stream or the connection is closed."""
+        self._restart_stream()
+        depth = 0
+        while True:
+            try:
+                data = self.request.recv(4096)
+            except OSError:
+                return
+            if not data:
+                return
+            self.parser.feed(data)
+            for event, element in self.parser.read_events():
+                if event == "start":
+                    depth += 1
+                    if depth == 1:
+                        self._open_stream()
+                    continue
+                depth -= 1
+                if depth == 0:
+                    # the client closed the stream
+                    return
+                if depth == 1 and self._handle_stanza(element):
+                    depth = 0
+                    self._restart_stream()
+                    break
+
+    def _open_stream(self):
+        """Answer the stream header of the client with the features of the step."""
+        self._write(STREAM_HEADER.format(stream_id=self.server.stand_in.connections))
+        self._write(BIND_FEATURES if self.authenticated else SASL_FEATURES)
+
+    def _handle_stanza(self, element):
+        """Answer a stanza, return True if the client must restart the stream."""
+        stand_in = self.server.stand_in
+        tag = element.tag.split("}")[-1]
+        if tag == "auth":
+            stand_in.authentications += 1
+            self.authenticated = True
+            self._write("<success xmlns='urn:ietf:params:xml:ns:xmpp-sasl'/>")
+            return True
+
+        stand_in.stanzas.append(element)
+        if tag != "iq" or element.get("type") not in ("get", "set"):
+            return False
+
+        stanza_id = element.get("id")
+        payload = ""
+        if element.find("{urn:ietf:params:xml:ns:xmpp-bind}bind") is not None:
+            payload = (
+                "<bind xmlns='urn:ietf:params:xml:ns:xmpp-bind'>"
+                "<jid>admin@localhost/marsha</jid></bind>"
+            )
+        elif element.find(f"{{{NS_MUC_OWNER}}}query") is not None:
+            if element.get("type") == "get":
+                payload = ROOM_CONFIG_FORM
+            else:
+                stand_in.record_config(element)
+        self._write(f"<iq type='result' id='{stanza_id}'>{payload}</iq>")
+        return False
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+# pylint: disable=too-many-instance-attributes
+class XMPPServerStandIn:
+    """Run the stand-in XMPP server in a thread, on a free local port."""
+
+    def __init__(self):
+        """Start listening."""
+        self.connections = 0
+        self.authentications = 0
+        self.requests = []
+        self.stanzas = []
+        self.room_configs = {}
+        self._lock = threading.Lock()
+        self._server = _ThreadingServer(("127.0.0.1", 0), _XMPPHandler)
+        self._server.stand_in = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def start(self):
+        """Serve the clients in a thread."""
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving and close the connections."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def drop_connections(self):
+        """Close the connection of every client, as a restarting server would."""
+        requests, self.requests = self.requests, []
+        for request in requests:
+            try:
+                request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                # already closed by the client
+                pass
+
+    def record_config(self, element):
+        """Keep the configuration submitted for a room."""
+        room_name = element.get("to").split("@")[0]
+        fields = {
+            field.get("var"): field.findtext(f"{{{NS_DATA}}}value")
+            for field in element.iter(f"{{{NS_DATA}}}field")
+        }
+        with self._lock:
+            self.room_configs.setdefault(room_name, {}).update(fields)
+
+    def wait_until(self, predicate, timeout=2):
+        """Wait for the stanzas the clients sent without waiting for an answer.
+
+        Raises
+        ------
+        AssertionError
+            If the predicate is still false after `timeout` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() > deadline:
+                raise AssertionError("The XMPP server did not receive the stanzas.")
+            time.sleep(0.01)
+
+    def messages(self):
+        """Return the group chat messages received."""
+        return [
+            stanza
+            for stanza in self.stanzas
+            if stanza.tag == f"{{{NS_CLIENT}}}message"
+            and stanza.get("type") == "groupchat"
+        ]
+
+    def presences(self):
+        """Return the (room, type) of the presences received, in order."""
+        return [
+            (stanza.get("to").split("@")[0], stanza.get("type", "available"))
+            for stanza in self.stanzas
+            if stanza.tag == f"{{{NS_CLIENT}}}presence" and stanza.get("to")
+        ]
@@ -7,11 +7,12 @@ import time
 from unittest import mock
 import uuid
 
+from django.core.cache import cache
 from django.test import TestCase
 
 from waffle.testutils import override_switch
 
-from marsha.core.defaults import AWS_PIPELINE, SENTRY, STATE_CHOICES
+from marsha.core.defaults import AWS_PIPELINE, READY, SENTRY, STATE_CHOICES
 from marsha.core.factories import ConsumerSiteFactory, LiveSessionFactory, VideoFactory
 from marsha.core.lti import LTI
 
@@ -119,6 +120,13 @@ class CacheLTIViewTestCase(TestCase):
         self.assertEqual(resource, resource_video2)
         self.assertLess(elapsed, 0.01)
 
+        # The cache should not be hit anymore once the resource is updated
+        video2.title = "updated title"
+        video2.save()
+        with self.assertNumQueries(4):
+            elapsed, resource = self._fetch_lti_request(url, data)
+        self.assertEqual(resource["title"], "updated title")
+
     @mock.patch.object(LTI, "verify")
     @mock.patch.object(LTI, "get_consumer_site")
     @override_switch(SENTRY, active=True)
@@ -154,6 +162,124 @@ class CacheLTIViewTestCase(TestCase):
         self.assertEqual(resource, resource_origin)
         self.assertLess(elapsed, 0.1)
 
+    @mock.patch.object(LTI, "verify")
+    @mock.patch.object(LTI, "get_consumer_site")
+    @override_switch(SENTRY, active=True)
+    def test_views_lti_cache_resource_id(self, mock_get_consumer_site, mock_verify):
+        """The resource of an LTI link is looked up again only once it changed."""
+        cache.clear()
+        video = VideoFactory(
+            upload_state=READY,
+            uploaded_on="2019-09-24 07:24:40+00",
+            resolutions=[144, 240],
+            transcode_pipeline=AWS_PIPELINE,
+        )
+        mock_get_consumer_site.return_value = video.playlist.consumer_site
+        data = {
+            "resource_link_id": video.lti_id,
+            "context_id": video.playlist.lti_id,
+            "roles": "student",
+            "user_id": "111",
+            "lis_person_sourcedid": "jane_doe",
+        }
+        referer = f"https://{video.playlist.consumer_site.domain}/course"
+
+        with self.assertNumQueries(6):
+            response = self.client.post("/lti/videos/", data, HTTP_REFERER=referer)
+        self.assertContains(response, str(video.id))
+
+        # The resource id and the app data are both cached
+        with self.assertNumQueries(0):
+            response = self.client.post("/lti/videos/", data, HTTP_REFERER=referer)
+        self.assertContains(response, str(video.id))
+
+        # Another link is looked up
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                "/lti/videos/",
+                {**data, "resource_link_id": "other_link"},
+                HTTP_REFERER=referer,
+            )
+        self.assertEqual(response.status_code, 200)
+
+        # Saving the resource invalidates its cached id
+        video.title = "updated title"
+        video.save()
+        with self.assertNumQueries(5):
+            response = self.client.post("/lti/videos/", data, HTTP_REFERER=referer)
+        self.assertContains(response, "updated title")
+
+        # Deleting the resource invalidates its cached id
+        video.delete()
+        with self.assertNumQueries(1):
+            response = self.client.post("/lti/videos/", data, HTTP_REFERER=referer)
+        self.assertNotContains(response, str(video.id))
+
+    @mock.patch.object(LTI, "verify")
+    @mock.patch.object(LTI, "get_consumer_site")
+    @override_switch(SENTRY, active=True)
+    def test_views_lti_cache_resource_id_playlist_changed(
+        self, mock_get_consumer_site, mock_verify
+    ):
+        """The cached resource id is invalidated when its playlist is moved."""
+        cache.clear()
+        video = VideoFactory(
+            upload_state=READY,
+            uploaded_on="2019-09-24 07:24:40+00",
+            resolutions=[144, 240],
+            transcode_pipeline=AWS_PIPELINE,
+        )
+        playlist = video.playlist
+        mock_get_consumer_site.return_value = playlist.consumer_site
+        data = {
+            "resource_link_id": video.lti_id,
+            "context_id": playlist.lti_id,
+            "roles": "student",
+            "user_id": "111",
+            "lis_person_sourcedid": "jane_doe",
+        }
+        referer = f"https://{playlist.consumer_site.domain}/course"
+        response = self.client.post("/lti/videos/", data, HTTP_REFERER=referer)
+        self.assertContains(response, str(video.id))
+
+        # Changing the lti id of the playlist invalidates the cached resource id
+        playlist.lti_id = "other_context"
+        playlist.save()
+        response = self.client.post("/lti/videos/", data, HTTP_REFERER=referer)
+        self.assertNotContains(response, str(video.id))
+        response = self.client.post(
+            "/lti/videos/",
+            {**data, "context_id": "other_context"},
+            HTTP_REFERER=referer,
+        )
+        self.assertContains(response, str(video.id))
+
+        # Moving the playlist to another consumer site invalidates it as well
+        playlist.consumer_site = ConsumerSiteFactory(domain="other.example.com")
+        playlist.save()
+        response = self.client.post(
+            "/lti/videos/",
+            {**data, "context_id": "other_context"},
+            HTTP_REFERER=referer,
+        )
+        self.assertNotContains(response, str(video.id))
+
+        # Changing the domain of the consumer site invalidates it as well
+        response = self.client.post(
+            "/lti/videos/",
+            {**data, "context_id": "other_context"},
+            HTTP_REFERER="https://other.example.com/course",
+        )
+        self.assertContains(response, str(video.id))
+        playlist.consumer_site.domain = "renamed.example.com"
+        playlist.consumer_site.save()
+        response = self.client.post(
+            "/lti/videos/",
+            {**data, "context_id": "other_context"},
+            HTTP_REFERER="https://other.example.com/course",
+        )
+        self.assertNotContains(response, str(video.id))
+
     @override_switch(SENTRY, active=True)
     def test_views_public_resource(self):
         """Validate that response for public resources are cached."""
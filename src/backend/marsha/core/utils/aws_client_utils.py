@@ -0,0 +1,72 @@
+"""Registry of the boto3 clients shared by the threads of a process.
+
+Creating a client loads the models of its service, which takes time and memory. Clients
+are created the first time they are used instead of when their module is imported, then
+reused: a botocore client is thread-safe once created. boto3 itself is only imported
+when the first client is created.
+"""
+import threading
+
+from django.conf import settings
+
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def get_client(service_name, config=None, **client_kwargs):
+    """Return the boto3 client of a service, created on first use.
+
+    Parameters
+    ----------
+    service_name : str
+        The name of the AWS service, e.g. "s3" or "medialive".
+    config : dict, optional
+        The options of the botocore client config.
+    client_kwargs : dict
+        The other arguments of the client: credentials, endpoint url...
+
+    Returns
+    -------
+    botocore.client.BaseClient
+        The same client for the same arguments.
+    """
+    config = config or {}
+    key = (
+        service_name,
+        tuple(sorted(config.items())),
+        tuple(sorted(client_kwargs.items())),
+    )
+    client = _clients.get(key)
+    if client is None:
+        # boto3 default session is not thread-safe
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                # pylint: disable=import-outside-toplevel
+                import boto3
+                from botocore.client import Config
+
+                client = _clients[key] = boto3.client(
+                    service_name, config=Config(**config), **client_kwargs
+                )
+    return client
+
+
+def get_aws_client(service_name, **config):
+    """Return the boto3 client of an AWS service, with the AWS credentials.
+
+    Extra keyword arguments are passed to the botocore client config.
+    """
+    return get_client(
+        service_name,
+        config={"region_name": settings.AWS_S3_REGION_NAME, **config},
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+    )
+
+
+def clear_clients():
+    """Forget the clients created, for tests replacing boto3 clients."""
+    with _lock:
+        _clients.clear()
@@ -5,6 +5,7 @@ Following boto3's documentation to sign CloudFront urls
 https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/cloudfront.html
 """
 import base64
+import os
 
 from django.conf import settings
 
@@ -18,6 +19,11 @@ class MissingRSAKey(Exception):
     """Exception raised when an RSA key is missing."""
 
 
+# Signers built from the private key, indexed by key path and public key id, along
+# with the modification time and size of the key file they were built from.
+_signers = {}
+
+
 def get_cloudfront_private_key():
     """Get the private key for CloudFront signed urls."""
     try:
@@ -27,6 +33,61 @@ def get_cloudfront_private_key():
         raise MissingRSAKey() from exc
 
 
+def _get_private_key_version(path):
+    """Identify the content of the private key file without reading it."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _build_rsa_signer(private_key):
+    """Build the function signing messages with a parsed RSA private key."""
+
+    def _rsa_signer(message):
+        # The following line is excluded from bandit security check because cloudfront
+        # supports only sha1 hash for signed URLs.
+        return private_key.sign(message, padding.PKCS1v15(), hashes.SHA1())  # nosec
+
+    return _rsa_signer
+
+
+def get_cloudfront_signer():
+    """Return a CloudFront signer using the private key found on the file system.
+
+    The key is read and parsed once per process and reloaded when its file changes.
+
+    Returns
+    -------
+    botocore.signers.CloudFrontSigner
+        The signer for the `CLOUDFRONT_SIGNED_PUBLIC_KEY_ID` key pair.
+
+    Raises
+    ------
+    MissingRSAKey
+        If the private key file does not exist.
+    """
+    path = settings.CLOUDFRONT_PRIVATE_KEY_PATH
+    cache_key = (path, settings.CLOUDFRONT_SIGNED_PUBLIC_KEY_ID)
+    version = _get_private_key_version(path)
+    if version is not None and (cached := _signers.get(cache_key)) is not None:
+        cached_version, signer = cached
+        if cached_version == version:
+            return signer
+
+    pem_private_key = serialization.load_pem_private_key(
+        get_cloudfront_private_key(), password=None, backend=default_backend()
+    )
+    signer = CloudFrontSigner(
+        settings.CLOUDFRONT_SIGNED_PUBLIC_KEY_ID, _build_rsa_signer(pem_private_key)
+    )
+    # a key file that can not be stat'ed can not be watched, it is read again next time
+    if version is not None:
+        _signers[cache_key] = (version, signer)
+    return signer
+
+
 def rsa_signer(message):
     """Sign a message with an RSA key pair found on the file system for CloudFront signed urls.
 
@@ -41,13 +102,7 @@ def rsa_signer(message):
         The rsa signature
 
     """
-    private_key = get_cloudfront_private_key()
-    pem_private_key = serialization.load_pem_private_key(
-        private_key, password=None, backend=default_backend()
-    )
-    # The following line is excluded from bandit security check because cloudfront supports
-    # only sha1 hash for signed URLs.
-    return pem_private_key.sign(message, padding.PKCS1v15(), hashes.SHA1())  # nosec
+    return get_cloudfront_signer().rsa_signer(message)
 
 
 def generate_cloudfront_urls_signed_parameters(resource, date_less_than):
@@ -55,10 +110,7 @@ def generate_cloudfront_urls_signed_parameters(resource, date_less_than):
     Generate all parameters use by a cloudfront signed url.
     Mainly extracted from CloudFrontSigner class.
     """
-    cloudfront_signer = CloudFrontSigner(
-        settings.CLOUDFRONT_SIGNED_PUBLIC_KEY_ID,
-        rsa_signer,
-    )
+    cloudfront_signer = get_cloudfront_signer()
     policy = cloudfront_signer.build_policy(
         resource=resource, date_less_than=date_less_than
     ).encode("utf8")
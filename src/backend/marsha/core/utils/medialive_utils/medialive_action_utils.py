@@ -3,17 +3,19 @@ import datetime
 import json
 
 from marsha.core.serializers import VideoId3TagsSerializer
-from marsha.core.utils.medialive_utils.medialive_client_utils import medialive_client
+from marsha.core.utils.medialive_utils.medialive_client_utils import (
+    get_medialive_client,
+)
 
 
 def start_live_channel(channel_id):
     """Start an existing medialive channel."""
-    medialive_client.start_channel(ChannelId=channel_id)
+    get_medialive_client().start_channel(ChannelId=channel_id)
 
 
 def stop_live_channel(channel_id):
     """Stop an existing medialive channel."""
-    medialive_client.stop_channel(ChannelId=channel_id)
+    get_medialive_client().stop_channel(ChannelId=channel_id)
 
 
 def update_id3_tags(video):
@@ -28,7 +30,7 @@ def update_id3_tags(video):
 
     channel_id = video.get_medialive_channel().get("id")
     serialized_id3_video = VideoId3TagsSerializer(video)
-    medialive_client.batch_update_schedule(
+    get_medialive_client().batch_update_schedule(
         ChannelId=channel_id,
         Creates={
             "ScheduleActions": [
@@ -1,20 +1,17 @@
 """Utils to create MediaLive configuration."""
-from django.conf import settings
+from marsha.core.utils.aws_client_utils import get_aws_client
 
-import boto3
 
+def get_medialive_client():
+    """Return the medialive client."""
+    return get_aws_client("medialive")
 
-aws_credentials = {
-    "aws_access_key_id": settings.AWS_ACCESS_KEY_ID,
-    "aws_secret_access_key": settings.AWS_SECRET_ACCESS_KEY,
-    "region_name": settings.AWS_S3_REGION_NAME,
-}
 
-# Configure medialive client
-medialive_client = boto3.client("medialive", **aws_credentials)
+def get_mediapackage_client():
+    """Return the mediapackage client."""
+    return get_aws_client("mediapackage")
 
-# Configure mediapackage client
-mediapackage_client = boto3.client("mediapackage", **aws_credentials)
 
-# Configure SSM client
-ssm_client = boto3.client("ssm", **aws_credentials)
+def get_ssm_client():
+    """Return the SSM client."""
+    return get_aws_client("ssm")
@@ -8,9 +8,9 @@ import requests
 
 from marsha.core.defaults import PROCESSING
 from marsha.core.utils.medialive_utils.medialive_client_utils import (
-    medialive_client,
-    mediapackage_client,
-    ssm_client,
+    get_medialive_client,
+    get_mediapackage_client,
+    get_ssm_client,
 )
 
 
@@ -36,13 +36,13 @@ def create_mediapackage_channel(key):
 
     """
     # Create mediapackage channel
-    channel = mediapackage_client.create_channel(
+    channel = get_mediapackage_client().create_channel(
         Id=f"{settings.AWS_BASE_NAME}_{key}",
         Tags={"environment": settings.AWS_BASE_NAME, "app": "marsha"},
     )
 
     # Add primary U/P to SSM parameter store
-    ssm_client.put_parameter(
+    get_ssm_client().put_parameter(
         Name=f"{settings.AWS_BASE_NAME}_{channel['HlsIngest']['IngestEndpoints'][0]['Username']}",
         Description=f"{key} MediaPackage Primary Ingest Username",
         Value=channel["HlsIngest"]["IngestEndpoints"][0]["Password"],
@@ -54,7 +54,7 @@ def create_mediapackage_channel(key):
     )
 
     # Add Secondary U/P to SSM Parameter store
-    ssm_client.put_parameter(
+    get_ssm_client().put_parameter(
         Name=f"{settings.AWS_BASE_NAME}_{channel['HlsIngest']['IngestEndpoints'][1]['Username']}",
         Description=f"{key} MediaPackage Secondary Ingest Username",
         Value=channel["HlsIngest"]["IngestEndpoints"][1]["Password"],
@@ -66,7 +66,7 @@ def create_mediapackage_channel(key):
     )
 
     # Create a HLS endpoint. This endpoint will be used to watch the stream.
-    hls_endpoint = mediapackage_client.create_origin_endpoint(
+    hls_endpoint = get_mediapackage_client().create_origin_endpoint(
         ChannelId=channel["Id"],
         Id=f"{channel['Id']}_hls",
         ManifestName=f"{channel['Id']}_hls",
@@ -97,13 +97,13 @@ def get_or_create_input_security_group():
     string
         The input security group to use
     """
-    input_security_groups = medialive_client.list_input_security_groups()
+    input_security_groups = get_medialive_client().list_input_security_groups()
 
     for input_security_group in input_security_groups["InputSecurityGroups"]:
         if input_security_group["Tags"].get("marsha_live"):
             return input_security_group["Id"]
 
-    security_group = medialive_client.create_input_security_group(
+    security_group = get_medialive_client().create_input_security_group(
         WhitelistRules=[{"Cidr": "0.0.0.0/0"}], Tags={"marsha_live": "1"}
     )
 
@@ -126,7 +126,7 @@ def create_medialive_input(key):
     dictionary
         Dictionary returned by the AWS API once a medialive input is created
     """
-    medialive_input = medialive_client.create_input(
+    medialive_input = get_medialive_client().create_input(
         InputSecurityGroups=[get_or_create_input_security_group()],
         Name=f"{settings.AWS_BASE_NAME}_{key}",
         Type="RTMP_PUSH",
@@ -180,7 +180,7 @@ def create_medialive_channel(key, medialive_input, mediapackage_channel):
             }
         )
 
-    medialive_channel = medialive_client.create_channel(
+    medialive_channel = get_medialive_client().create_channel(
         InputSpecification={
             "Codec": "AVC",
             "Resolution": "HD",
@@ -279,7 +279,7 @@ def create_live_stream(key):
 
 def wait_medialive_channel_is_created(channel_id):
     """Wait until medialive channel is created."""
-    input_waiter = medialive_client.get_waiter("channel_created")
+    input_waiter = get_medialive_client().get_waiter("channel_created")
     input_waiter.wait(
         ChannelId=channel_id, WaiterConfig={"Delay": 1, "MaxAttempts": 20}
     )
@@ -302,7 +302,7 @@ def create_mediapackage_harvest_job(video):
 
     processing_slices = []
     for num, recording_slice in enumerate(video.recording_slices, start=1):
-        harvest_result = mediapackage_client.create_harvest_job(
+        harvest_result = get_mediapackage_client().create_harvest_job(
             Id=f"{channel_id}_{num}",
             StartTime=recording_slice.get("start"),
             EndTime=recording_slice.get("stop"),
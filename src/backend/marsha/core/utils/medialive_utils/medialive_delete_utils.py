@@ -5,8 +5,8 @@ from botocore.exceptions import WaiterError
 from sentry_sdk import capture_exception
 
 from marsha.core.utils.medialive_utils.medialive_client_utils import (
-    medialive_client,
-    mediapackage_client,
+    get_medialive_client,
+    get_mediapackage_client,
 )
 from marsha.core.utils.medialive_utils.medialive_list_utils import (
     list_mediapackage_channel_origin_endpoints,
@@ -21,10 +21,12 @@ def delete_aws_element_stack(video):
     """
     # Medialive
     # First delete the channel
-    medialive_client.delete_channel(ChannelId=video.get_medialive_channel().get("id"))
+    get_medialive_client().delete_channel(
+        ChannelId=video.get_medialive_channel().get("id")
+    )
 
     # Once channel deleted we have to wait until input is detached
-    input_waiter = medialive_client.get_waiter("input_detached")
+    input_waiter = get_medialive_client().get_waiter("input_detached")
     medialive_input_id = video.get_medialive_input().get("id")
     try:
         input_waiter.wait(
@@ -34,7 +36,7 @@ def delete_aws_element_stack(video):
                 "MaxAttempts": settings.AWS_MEDIALIVE_INPUT_WAITER_MAX_ATTEMPTS,
             },
         )
-        medialive_client.delete_input(InputId=medialive_input_id)
+        get_medialive_client().delete_input(InputId=medialive_input_id)
     except WaiterError as exception:
         capture_exception(exception)
 
@@ -44,9 +46,9 @@ def delete_mediapackage_channel(channel_id):
     origin_endpoints = list_mediapackage_channel_origin_endpoints(channel_id=channel_id)
     deleted_endpoints = []
     for origin_endpoint in origin_endpoints:
-        mediapackage_client.delete_origin_endpoint(Id=origin_endpoint.get("Id"))
+        get_mediapackage_client().delete_origin_endpoint(Id=origin_endpoint.get("Id"))
         deleted_endpoints.append(origin_endpoint.get("Id"))
-    mediapackage_client.delete_channel(Id=channel_id)
+    get_mediapackage_client().delete_channel(Id=channel_id)
     return deleted_endpoints
 
 
@@ -56,21 +58,21 @@ def delete_medialive_stack(medialive_channel, stdout):
 
     if medialive_channel["State"].casefold() == "running":
         stdout.write("Medialive channel is running, we must stop it first.")
-        channel_waiter = medialive_client.get_waiter("channel_stopped")
-        medialive_client.stop_channel(ChannelId=medialive_channel["Id"])
+        channel_waiter = get_medialive_client().get_waiter("channel_stopped")
+        get_medialive_client().stop_channel(ChannelId=medialive_channel["Id"])
         channel_waiter.wait(ChannelId=medialive_channel["Id"])
 
-    medialive_client.delete_channel(ChannelId=medialive_channel["Id"])
-    input_waiter = medialive_client.get_waiter("input_detached")
+    get_medialive_client().delete_channel(ChannelId=medialive_channel["Id"])
+    input_waiter = get_medialive_client().get_waiter("input_detached")
     for medialive_input in medialive_channel["InputAttachments"]:
         input_waiter.wait(InputId=medialive_input["InputId"])
-        medialive_client.delete_input(InputId=medialive_input["InputId"])
+        get_medialive_client().delete_input(InputId=medialive_input["InputId"])
 
     try:
         # the mediapackage channel can already be deleted when the dev stack
         # have ngrok up and running.
         delete_mediapackage_channel(medialive_channel["Name"])
-    except mediapackage_client.exceptions.NotFoundException:
+    except get_mediapackage_client().exceptions.NotFoundException:
         pass
 
     stdout.write(f"Stack with name {medialive_channel['Name']} deleted")
@@ -1,18 +1,26 @@
 """Utils to create MediaLive configuration."""
+from itertools import islice
+import uuid
+
+from django.conf import settings
+
+from marsha.core.models import Video
 from marsha.core.utils.medialive_utils.medialive_client_utils import (
-    medialive_client,
-    mediapackage_client,
+    get_medialive_client,
+    get_mediapackage_client,
 )
 
 
-def _get_items(  # nosec
-    get_items, items_key, params=None, next_token=None, next_token_key="NextToken"
-):
+# Number of medialive channels whose videos are loaded with a single query
+CHANNELS_BATCH_SIZE = 500
+
+
+def _iter_items(get_items, items_key, params=None, next_token_key="NextToken"):  # nosec
     """
-    Recursive generic function call which concatenates results.
+    Generic generator yielding items one page after the other.
 
-    Returns a list of items from the same items_key in response.
-    If response contains a next token, get_items is called again, and items are concatenated.
+    Yields the items from the same items_key in each response. While a response
+    contains a next token, get_items is called again to get the next page.
 
     Parameters
     ----------
@@ -22,64 +30,108 @@ def _get_items(  # nosec
         key containing items
     params : dict
         params passed to get_items function
-    next_token : string
-        token returned by first get_items call
     next_token_key : string
         key from get_items response that may contain a next_token
 
-    Returns
-    -------
-    list
-        list of items returned by recursive get_items calls
+    Yields
+    ------
+    dict
+        items returned by successive get_items calls
     """
-    if not params:
-        params = {}
-
-    if next_token:
-        params[next_token_key] = next_token
+    params = params or {}
+    while True:
+        response = get_items(**params)
+        yield from response.get(items_key, [])
+        next_token = response.get(next_token_key)
+        if not next_token:
+            return
+        params = {**params, next_token_key: next_token}
 
-    response = get_items(**params)
-    items = response.get(items_key)
-    next_token = response.get(next_token_key)
 
-    if next_token:
-        items.extend(
-            _get_items(get_items, items_key, params, next_token, next_token_key)
-        )
-    return items
+def iter_mediapackage_channels():
+    """Iterate over all mediapackage channels."""
+    return _iter_items(get_mediapackage_client().list_channels, items_key="Channels")
 
 
 def list_mediapackage_channels():
     """List all mediapackage channels."""
-    return _get_items(mediapackage_client.list_channels, items_key="Channels")
+    return list(iter_mediapackage_channels())
 
 
 def list_mediapackage_channel_harvest_jobs(channel_id):
     """List all harvest jobs for a mediapackage channel."""
-    return _get_items(
-        mediapackage_client.list_harvest_jobs,
-        items_key="HarvestJobs",
-        params={"IncludeChannelId": channel_id},
+    return list(
+        _iter_items(
+            get_mediapackage_client().list_harvest_jobs,
+            items_key="HarvestJobs",
+            params={"IncludeChannelId": channel_id},
+        )
     )
 
 
 def list_mediapackage_channel_origin_endpoints(channel_id):
     """List all origin endpoints for a mediapackage channel."""
-    return _get_items(
-        mediapackage_client.list_origin_endpoints,
-        items_key="OriginEndpoints",
-        params={"ChannelId": channel_id},
+    return list(
+        _iter_items(
+            get_mediapackage_client().list_origin_endpoints,
+            items_key="OriginEndpoints",
+            params={"ChannelId": channel_id},
+        )
     )
 
 
+def iter_medialive_channels():
+    """Iterate over all medialive channels."""
+    return _iter_items(get_medialive_client().list_channels, items_key="Channels")
+
+
 def list_medialive_channels():
     """List all medialive channels."""
-    return _get_items(medialive_client.list_channels, items_key="Channels")
+    return list(iter_medialive_channels())
 
 
 def list_indexed_medialive_channels():
     """List and index all medialive channels by their name."""
     return {
         medialive_channel.get("Name"): medialive_channel
-        for medialive_channel in list_medialive_channels()
+        for medialive_channel in iter_medialive_channels()
     }
+
+
+def iter_medialive_channels_videos(medialive_channels, batch_size=CHANNELS_BATCH_SIZE):
+    """
+    Yield the medialive channels of the current environment with their video.
+
+    The channel name contains the environment, the primary key of the video and the
+    created_at stamp. Videos are loaded by batches of channels, with a single query for
+    each batch.
+
+    Parameters
+    ----------
+    medialive_channels : Iterable[dict]
+        the medialive channels, as listed by `iter_medialive_channels`
+    batch_size : int
+        the number of channels whose videos are loaded together
+
+    Yields
+    ------
+    List[Tuple[dict, str, Video]]
+        a batch of channels, each one with the primary key of its video and the video,
+        None if it does not exist in our DB
+    """
+    medialive_channels = (
+        medialive_channel
+        for medialive_channel in medialive_channels
+        # Don't work with stack not belonging to the current environment
+        if medialive_channel.get("Tags", {}).get("environment")
+        == settings.AWS_BASE_NAME
+    )
+    while batch := list(islice(medialive_channels, batch_size)):
+        live_pks = [
+            medialive_channel["Name"].split("_")[1] for medialive_channel in batch
+        ]
+        lives = Video.objects.in_bulk(live_pks)
+        yield [
+            (medialive_channel, live_pk, lives.get(uuid.UUID(live_pk)))
+            for medialive_channel, live_pk in zip(batch, live_pks)
+        ]
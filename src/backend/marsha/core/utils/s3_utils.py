@@ -1,45 +1,60 @@
 """Utils for direct upload to AWS S3."""
+from concurrent.futures import ThreadPoolExecutor
+import logging
 from typing import Literal
 
 from django.conf import settings
+from django.core.cache import cache
 
-import boto3
-from botocore.client import Config
+from marsha.core.defaults import S3_MOVE_CHECKPOINT_KEY_CACHE
+from marsha.core.utils.aws_client_utils import get_aws_client, get_client
 
 
-def get_aws_s3_client():
-    """Return a boto3 s3 client connected to AWS."""
+logger = logging.getLogger(__name__)
 
+# Maximum number of keys S3 lists or deletes in a single call
+S3_MAX_KEYS = 1000
+# Objects larger than this size (5GB) can not be copied in a single call
+S3_MAX_COPY_OBJECT_SIZE = 5 * 2**30
+# Time (in seconds) the progress of an interrupted directory move is kept
+S3_MOVE_CHECKPOINT_TIMEOUT = 86400  # 1 day
+
+
+class S3MoveError(Exception):
+    """Exception raised when objects of a moved directory could not be deleted."""
+
+
+def get_aws_s3_client(**config):
+    """Return a boto3 s3 client connected to AWS.
+
+    Extra keyword arguments are passed to the botocore client config.
+    """
     # Configure S3 client using signature V4
-    return boto3.client(
-        "s3",
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        config=Config(
-            region_name=settings.AWS_S3_REGION_NAME,
-            signature_version="s3v4",
-        ),
-    )
+    return get_aws_client("s3", signature_version="s3v4", **config)
+
 
+def get_videos_s3_client(**config):
+    """Return a boto3 s3 client connected to Videos S3.
 
-def get_videos_s3_client():
-    """Return a boto3 s3 client connected to Videos S3."""
-    return boto3.client(
+    Extra keyword arguments are passed to the botocore client config.
+    """
+    return get_client(
         "s3",
+        config={
+            "region_name": settings.VIDEOS_STORAGE_S3_REGION_NAME,
+            "signature_version": "s3v4",
+            **config,
+        },
         aws_access_key_id=settings.VIDEOS_STORAGE_S3_ACCESS_KEY,
         aws_secret_access_key=settings.VIDEOS_STORAGE_S3_SECRET_KEY,
         endpoint_url=settings.VIDEOS_STORAGE_S3_ENDPOINT_URL,
-        config=Config(
-            region_name=settings.VIDEOS_STORAGE_S3_REGION_NAME,
-            signature_version="s3v4",
-        ),
     )
 
 
 ClientType = Literal["AWS", "VIDEOS_S3"]
 
 
-def get_s3_client(client_type: ClientType):
+def get_s3_client(client_type: ClientType, **config):
     """Return a boto3 s3 client depending on the client type.
 
      Parameters
@@ -47,16 +62,19 @@ def get_s3_client(client_type: ClientType):
     client_type: Type[ClientType]
         The type of client to return. Can be AWS or VIDEO_S3.
 
+    config: Type[Dict]
+        Extra options of the botocore client config, e.g. `max_pool_connections`.
+
     Returns
     -------
     boto3.client
-        A boto3 s3 client connected to the right service.
+        A boto3 s3 client connected to the right service, shared by the process.
 
     """
     if client_type == "AWS":
-        return get_aws_s3_client()
+        return get_aws_s3_client(**config)
     if client_type == "VIDEOS_S3":
-        return get_videos_s3_client()
+        return get_videos_s3_client(**config)
     raise ValueError(f"Unknown s3 client type: {client_type}")
 
 
@@ -129,36 +147,130 @@ def create_presigned_post(
     )
 
 
+def _checkpoint_key(bucket_name, key, destination):
+    """Cache key of the progress of a directory move."""
+    return f"{S3_MOVE_CHECKPOINT_KEY_CACHE}{bucket_name}:{key}:{destination}"
+
+
+def _copy_object(s3_client, bucket_name, obj, destination):
+    """Copy an object to the destination folder of its bucket."""
+    copy_source = {"Bucket": bucket_name, "Key": obj["Key"]}
+    destination_key = f"{destination}/{obj['Key']}"
+    if obj["Size"] > S3_MAX_COPY_OBJECT_SIZE:
+        # Managed multipart copy
+        s3_client.copy(copy_source, bucket_name, destination_key)
+    else:
+        s3_client.copy_object(
+            CopySource=copy_source, Bucket=bucket_name, Key=destination_key
+        )
+
+
+def _delete_objects(s3_client, bucket_name, objects):
+    """Delete objects by batches of S3_MAX_KEYS keys.
+
+    Raises
+    ------
+    S3MoveError
+        If some objects could not be deleted.
+    """
+    for start in range(0, len(objects), S3_MAX_KEYS):
+        batch = objects[start : start + S3_MAX_KEYS]  # noqa: E203
+        response = s3_client.delete_objects(
+            Bucket=bucket_name,
+            Delete={"Objects": [{"Key": obj["Key"]} for obj in batch], "Quiet": True},
+        )
+        if response.get("Errors"):
+            raise S3MoveError(
+                f"{len(response['Errors'])} objects of bucket {bucket_name} could not "
+                f"be deleted, first error: {response['Errors'][0]}"
+            )
+
+
+def iter_s3_objects(s3_client, bucket_name: str, key: str, start_after: str = None):
+    """Yield the pages of objects with `key` prefix in an S3 bucket.
+
+    Each page holds at most S3_MAX_KEYS objects, sorted by key.
+    """
+    params = {"Bucket": bucket_name, "Prefix": key}
+    if start_after:
+        params["StartAfter"] = start_after
+    while True:
+        response = s3_client.list_objects_v2(**params)
+        if response.get("Contents"):
+            yield response["Contents"]
+        if not response.get("IsTruncated"):
+            return
+        params["ContinuationToken"] = response["NextContinuationToken"]
+
+
+# pylint: disable=too-many-arguments
 def move_s3_directory(
-    key: str, destination: str, client_type: ClientType, bucket_name: str
+    key: str,
+    destination: str,
+    client_type: ClientType,
+    bucket_name: str,
+    dry_run: bool = False,
 ):
     """
     Move the content of a directory with `key` prefix to a "destination" folder
     in an S3 bucket.
 
+    Objects are listed by pages of 1000 keys. The objects of each page are copied
+    concurrently, by S3_MOVE_CONCURRENCY threads sharing as many connections, then
+    deleted. The last key moved is kept in the cache: a move interrupted by an error
+    resumes after it when called again.
+
     Parameters:
         key (str): The key of folder in the S3 bucket.
         destination (str): The destination folder in the S3 bucket without a
         `/` at the end.
         s3_client (boto3.client): The type of client to use.
         bucket_name (str): The name of the bucket.
-    """
-    s3_client = get_s3_client(client_type)
+        dry_run (bool): Only count the objects to move, without moving them.
 
-    # First, we ned to get the list of objects in the folder
-    objects = s3_client.list_objects_v2(Bucket=bucket_name, Prefix=key)
-
-    if "Contents" not in objects:
-        # No need to copy or delete anything
-        return
-
-    # Second, we need to copy each object to the "to_delete" folder
-    for obj in objects["Contents"]:
-        copy_source = {"Bucket": bucket_name, "Key": obj["Key"]}
-        s3_client.copy(copy_source, bucket_name, f"{destination}/{obj['Key']}")
+    Returns:
+        dict: The number of `objects` and `bytes` moved, or to move if `dry_run`.
+    """
+    concurrency = settings.S3_MOVE_CONCURRENCY
+    s3_client = get_s3_client(client_type, max_pool_connections=concurrency)
+    checkpoint_key = _checkpoint_key(bucket_name, key, destination)
+    checkpoint = (
+        {"start_after": None, "objects": 0, "bytes": 0}
+        if dry_run
+        else cache.get(checkpoint_key, {"start_after": None, "objects": 0, "bytes": 0})
+    )
 
-    # Finally, we need to bulk delete each files in the folder
-    s3_client.delete_objects(
-        Bucket=bucket_name,
-        Delete={"Objects": [{"Key": obj["Key"]} for obj in objects["Contents"]]},
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for objects in iter_s3_objects(
+            s3_client, bucket_name, key, start_after=checkpoint["start_after"]
+        ):
+            if not dry_run:
+                # Consume the results to raise copy errors
+                list(
+                    executor.map(
+                        lambda obj: _copy_object(
+                            s3_client, bucket_name, obj, destination
+                        ),
+                        objects,
+                    )
+                )
+                _delete_objects(s3_client, bucket_name, objects)
+
+            checkpoint["start_after"] = objects[-1]["Key"]
+            checkpoint["objects"] += len(objects)
+            checkpoint["bytes"] += sum(obj["Size"] for obj in objects)
+            if not dry_run:
+                cache.set(checkpoint_key, checkpoint, S3_MOVE_CHECKPOINT_TIMEOUT)
+
+    if not dry_run:
+        cache.delete(checkpoint_key)
+    logger.info(
+        "%s %d objects (%d bytes) from %s/%s to %s.",
+        "Would move" if dry_run else "Moved",
+        checkpoint["objects"],
+        checkpoint["bytes"],
+        bucket_name,
+        key,
+        destination,
     )
+    return {"objects": checkpoint["objects"], "bytes": checkpoint["bytes"]}
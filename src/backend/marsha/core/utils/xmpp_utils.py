@@ -3,7 +3,13 @@ Utils for XMPP server.
 
 The XEP used to manage a Multi User Chat is XEP-0045 aka MUC.
 Spec are available at https://xmpp.org/extensions/xep-0045.html
+
+The admin clients are kept connected in a pool, per process, instead of connecting and
+authenticating to the XMPP server for each operation.
 """
+from contextlib import contextmanager
+import os
+import threading
 from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
 
 from django.conf import settings
@@ -12,6 +18,29 @@ import jwt
 import xmpp
 
 
+# Configurations applied to rooms, as (type, name, value) data form fields
+CREATE_ROOM_CONFIG = (
+    # Room is persistent
+    ("boolean", "muc#roomconfig_persistentroom", 1),
+    # Room is not publicly searchable
+    ("boolean", "muc#roomconfig_publicroom", 0),
+    # Nobody can send private message
+    ("list-single", "muc#roomconfig_allowpm", "none"),
+    # Room invitations are disabled
+    ("boolean", "muc#roomconfig_allowinvites", 0),
+    # Nobody can change the subject
+    ("boolean", "muc#roomconfig_changesubject", 0),
+    ("boolean", "muc#roomconfig_membersonly", 0),
+)
+CLOSE_ROOM_CONFIG = (("boolean", "muc#roomconfig_membersonly", 1),)
+REOPEN_ROOM_FOR_VOD_CONFIG = (
+    # Reopen room
+    ("boolean", "muc#roomconfig_membersonly", 0),
+    # Switch to a moderated room
+    ("boolean", "muc#roomconfig_moderatedroom", 1),
+)
+
+
 def _connect():
     """Connect to an XMPP server and return the connection.
 
@@ -19,116 +48,175 @@ def _connect():
     -------
     xmpp.Client
         A xmpp client authenticated to an XMPP server.
+
+    Raises
+    ------
+    OSError
+        If the client could not connect or authenticate to the XMPP server.
     """
     jid = xmpp.protocol.JID(settings.XMPP_PRIVATE_ADMIN_JID)
 
     client = xmpp.Client(server=jid.getDomain(), port=settings.XMPP_PRIVATE_SERVER_PORT)
-    client.connect()
-    client.auth(
+    if not client.connect():
+        raise OSError("Impossible to connect to the XMPP server.")
+    if not client.auth(
         user=jid.getNode(),
         password=settings.XMPP_PRIVATE_SERVER_PASSWORD,
         resource=jid.getResource(),
-    )
+    ):
+        _disconnect(client)
+        raise OSError("Impossible to authenticate to the XMPP server.")
 
     return client
 
 
-def create_room(room_name):
-    """Create and configure a room.
+def _disconnect(client):
+    """Close the connection of a client, ignoring a connection already lost."""
+    try:
+        client.disconnect()
+    except (AttributeError, OSError):
+        # xmpp clients always raise an IOError once disconnected
+        pass
 
-    Documentation to create and configure a room:
-    https://xmpp.org/extensions/xep-0045.html#createroom-reserved
 
-    Parameters
-    ----------
-    room_name: string
-        The name of the room you want to create.
+def _is_alive(client):
+    """Return True if the server did not close the connection of an idle client.
+
+    The data received while the client was idle is read until none is pending, a
+    connection closed by the server is detected before any stanza is written to it.
     """
-    client = _connect()
+    try:
+        # Process returns "0" once no data is pending on a live connection
+        while client.isConnected() and client.Process(0) != "0":
+            pass
+    except OSError:
+        return False
+    return bool(client.isConnected())
 
-    client.send(
-        xmpp.Presence(
-            to=f"{room_name}@{settings.XMPP_CONFERENCE_DOMAIN}/admin",
-            payload=[xmpp.Node(tag="x", attrs={"xmlns": xmpp.NS_MUC})],
-        )
-    )
 
-    # request the default config when a room is created
-    default_config_iq = client.SendAndWaitForResponse(
-        xmpp.Iq(
-            to=f"{room_name}@{settings.XMPP_CONFERENCE_DOMAIN}",
-            frm=settings.XMPP_PRIVATE_ADMIN_JID,
-            typ="get",
-            queryNS=xmpp.NS_MUC_OWNER,
-        )
-    )
+class XMPPClientPoolTimeout(Exception):
+    """Exception raised when no client of the pool was released in time."""
 
-    data = []
-    fields_to_exclude = [
-        "muc#roomconfig_persistentroom",
-        "muc#roomconfig_publicroom",
-        "muc#roomconfig_allowpm",
-        "muc#roomconfig_allowinvites",
-        "muc#roomconfig_changesubject",
-        "muc#roomconfig_membersonly",
-    ]
 
-    # Remove config we want to modify
-    for children in default_config_iq.getQueryPayload()[0].getChildren():
-        if (
-            children.getName() == "field"
-            and children.getAttr("var") not in fields_to_exclude
-        ):
-            data.append(children)
+class XMPPClientPool:
+    """Pool of clients kept authenticated to the XMPP server.
 
-    # Add our own config
-    data = data + [
-        # Room is persistent
-        xmpp.DataField(typ="boolean", name="muc#roomconfig_persistentroom", value=1),
-        # Room is not publicly searchable
-        xmpp.DataField(typ="boolean", name="muc#roomconfig_publicroom", value=0),
-        # Nobody can send private message
-        xmpp.DataField(
-            typ="list-single",
-            name="muc#roomconfig_allowpm",
-            value="none",
-        ),
-        # Room invitations are disabled
-        xmpp.DataField(typ="boolean", name="muc#roomconfig_allowinvites", value=0),
-        # Nobody can change the subject
-        xmpp.DataField(typ="boolean", name="muc#roomconfig_changesubject", value=0),
-        xmpp.DataField(typ="boolean", name="muc#roomconfig_membersonly", value=0),
-    ]
+    A client is used by one caller at a time. The pool never opens more than `size`
+    connections, callers wait up to `timeout` seconds for a client to be released.
+    """
 
-    client.send(
-        xmpp.Iq(
-            to=f"{room_name}@{settings.XMPP_CONFERENCE_DOMAIN}",
-            frm=settings.XMPP_PRIVATE_ADMIN_JID,
-            typ="set",
-            queryNS=xmpp.NS_MUC_OWNER,
-            payload=[
-                xmpp.DataForm(
-                    typ="submit",
-                    data=data,
-                )
-            ],
+    def __init__(self, size, timeout):
+        """Initialize an empty pool."""
+        self.timeout = timeout
+        self._idle_clients = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def acquire(self):
+        """Return an authenticated client, connecting a new one if none is idle.
+
+        Raises
+        ------
+        XMPPClientPoolTimeout
+            If all the clients are still used after `timeout` seconds.
+        """
+        # pylint: disable=consider-using-with
+        if not self._slots.acquire(timeout=self.timeout):
+            raise XMPPClientPoolTimeout("No XMPP client was released in time.")
+
+        with self._lock:
+            client = self._idle_clients.pop() if self._idle_clients else None
+        try:
+            if client is not None and not _is_alive(client):
+                _disconnect(client)
+                client = None
+            if client is None:
+                client = _connect()
+        except Exception:
+            self._slots.release()
+            raise
+        return client
+
+    def release(self, client, discard=False):
+        """Give a client back to the pool, closing it if it must be discarded."""
+        if discard or not client.isConnected():
+            _disconnect(client)
+        else:
+            with self._lock:
+                self._idle_clients.append(client)
+        self._slots.release()
+
+    @contextmanager
+    def client(self):
+        """Borrow a client, it is discarded if its connection was lost."""
+        client = self.acquire()
+        try:
+            yield client
+        except OSError:
+            self.release(client, discard=True)
+            raise
+        except Exception:
+            self.release(client)
+            raise
+        self.release(client)
+
+    def close(self):
+        """Close the idle clients."""
+        with self._lock:
+            clients, self._idle_clients = self._idle_clients, []
+        for client in clients:
+            _disconnect(client)
+
+
+# One pool per process, connections must not be shared with forked processes
+_pools = {}
+
+
+def get_client_pool():
+    """Return the pool of XMPP clients of the current process."""
+    pid = os.getpid()
+    if pid not in _pools:
+        # Drop the pool inherited from the parent process without closing its clients
+        _pools.clear()
+        _pools[pid] = XMPPClientPool(
+            settings.XMPP_CLIENT_POOL_SIZE, settings.XMPP_CLIENT_POOL_TIMEOUT
         )
-    )
+    return _pools[pid]
 
 
-def close_room(room_name):
-    """Close a room to anonymous users.
+def _run(operation, retry=True):
+    """Run an operation with a pooled client.
 
-    members only documentation:
-    https://xmpp.org/extensions/xep-0045.html#enter-members
+    A pooled client whose connection was closed while it was idle is replaced before
+    the operation is run. If the connection is lost during the operation, it is retried
+    once with a new connection, unless `retry` is False: the stanzas sent before the
+    connection was lost may have been delivered already.
+    """
+    try:
+        with get_client_pool().client() as client:
+            return operation(client)
+    except OSError:
+        if not retry:
+            raise
+        with get_client_pool().client() as client:
+            return operation(client)
+
+
+def _configure_room(client, room_name, config):
+    """Join a room as admin, change its configuration and leave it.
+
+    Documentation to configure a room:
+    https://xmpp.org/extensions/xep-0045.html#roomconfig
 
     Parameters
     ----------
+    client: xmpp.Client
+        An authenticated client.
     room_name: string
-        The name of the room you want to destroy.
+        The name of the room to configure.
+    config: Iterable[Tuple]
+        The (type, name, value) of the data form fields to change.
     """
-    client = _connect()
-
     client.send(
         xmpp.Presence(
             to=f"{room_name}@{settings.XMPP_CONFERENCE_DOMAIN}/admin",
@@ -137,7 +225,7 @@ def close_room(room_name):
     )
 
     # request the current room config
-    default_config_iq = client.SendAndWaitForResponse(
+    current_config_iq = client.SendAndWaitForResponse(
         xmpp.Iq(
             to=f"{room_name}@{settings.XMPP_CONFERENCE_DOMAIN}",
             frm=settings.XMPP_PRIVATE_ADMIN_JID,
@@ -145,23 +233,22 @@ def close_room(room_name):
             queryNS=xmpp.NS_MUC_OWNER,
         )
     )
+    if current_config_iq is None:
+        raise OSError(f"The XMPP server did not send the config of room {room_name}.")
 
-    data = []
-    fields_to_exclude = [
-        "muc#roomconfig_membersonly",
-    ]
+    fields_to_exclude = [name for _typ, name, _value in config]
 
     # Remove config we want to modify
-    for children in default_config_iq.getQueryPayload()[0].getChildren():
-        if (
-            children.getName() == "field"
-            and children.getAttr("var") not in fields_to_exclude
-        ):
-            data.append(children)
+    data = [
+        children
+        for children in current_config_iq.getQueryPayload()[0].getChildren()
+        if children.getName() == "field"
+        and children.getAttr("var") not in fields_to_exclude
+    ]
 
     # Add our own config
     data = data + [
-        xmpp.DataField(typ="boolean", name="muc#roomconfig_membersonly", value=1),
+        xmpp.DataField(typ=typ, name=name, value=value) for typ, name, value in config
     ]
 
     client.send(
@@ -179,6 +266,61 @@ def close_room(room_name):
         )
     )
 
+    # Leave the room: the pooled client must not stay an occupant of every room it
+    # configured until its connection is closed.
+    client.send(
+        xmpp.Presence(
+            to=f"{room_name}@{settings.XMPP_CONFERENCE_DOMAIN}/admin",
+            typ="unavailable",
+        )
+    )
+
+
+def configure_rooms(configurations):
+    """Apply several room configuration changes with a single client.
+
+    Parameters
+    ----------
+    configurations: Iterable[Tuple]
+        The (room name, config) of each change, config being one of
+        `CREATE_ROOM_CONFIG`, `CLOSE_ROOM_CONFIG` or `REOPEN_ROOM_FOR_VOD_CONFIG`.
+    """
+    configurations = list(configurations)
+
+    def configure(client):
+        for room_name, config in configurations:
+            _configure_room(client, room_name, config)
+
+    _run(configure)
+
+
+def create_room(room_name):
+    """Create and configure a room.
+
+    Documentation to create and configure a room:
+    https://xmpp.org/extensions/xep-0045.html#createroom-reserved
+
+    Parameters
+    ----------
+    room_name: string
+        The name of the room you want to create.
+    """
+    configure_rooms([(room_name, CREATE_ROOM_CONFIG)])
+
+
+def close_room(room_name):
+    """Close a room to anonymous users.
+
+    members only documentation:
+    https://xmpp.org/extensions/xep-0045.html#enter-members
+
+    Parameters
+    ----------
+    room_name: string
+        The name of the room you want to destroy.
+    """
+    configure_rooms([(room_name, CLOSE_ROOM_CONFIG)])
+
 
 def reopen_room_for_vod(room_name):
     """Converts a closed room to a moderated one for vod use.
@@ -197,62 +339,7 @@ def reopen_room_for_vod(room_name):
     room_name: string
         The name of the room you want to convert to VOD use.
     """
-
-    client = _connect()
-
-    client.send(
-        xmpp.Presence(
-            to=f"{room_name}@{settings.XMPP_CONFERENCE_DOMAIN}/admin",
-            payload=[xmpp.Node(tag="x", attrs={"xmlns": xmpp.NS_MUC})],
-        )
-    )
-
-    # request the current room config
-    default_config_iq = client.SendAndWaitForResponse(
-        xmpp.Iq(
-            to=f"{room_name}@{settings.XMPP_CONFERENCE_DOMAIN}",
-            frm=settings.XMPP_PRIVATE_ADMIN_JID,
-            typ="get",
-            queryNS=xmpp.NS_MUC_OWNER,
-        )
-    )
-
-    data = []
-    fields_to_exclude = [
-        "muc#roomconfig_membersonly",
-        "muc#roomconfig_moderatedroom",
-    ]
-
-    # Remove config we want to modify
-    for children in default_config_iq.getQueryPayload()[0].getChildren():
-        if (
-            children.getName() == "field"
-            and children.getAttr("var") not in fields_to_exclude
-        ):
-            data.append(children)
-
-    # Add our own config
-    data = data + [
-        # Reopen room
-        xmpp.DataField(typ="boolean", name="muc#roomconfig_membersonly", value=0),
-        # Switch to a moderated room
-        xmpp.DataField(typ="boolean", name="muc#roomconfig_moderatedroom", value=1),
-    ]
-
-    client.send(
-        xmpp.Iq(
-            to=f"{room_name}@{settings.XMPP_CONFERENCE_DOMAIN}",
-            frm=settings.XMPP_PRIVATE_ADMIN_JID,
-            typ="set",
-            queryNS=xmpp.NS_MUC_OWNER,
-            payload=[
-                xmpp.DataForm(
-                    typ="submit",
-                    data=data,
-                )
-            ],
-        )
-    )
+    configure_rooms([(room_name, REOPEN_ROOM_FOR_VOD_CONFIG)])
 
 
 def generate_jwt(room_name, affiliation, expires_at):
@@ -312,14 +399,26 @@ def broadcast_message(room_name, event, message):
 
     message: string
         The message to broadcast
+
+    Raises
+    ------
+    OSError
+        If the connection was lost while sending the message. It is not sent again, it
+        may have been delivered to the room already.
     """
-    client = _connect()
 
-    client.send(
-        xmpp.Message(
-            to=f"{room_name}@{settings.XMPP_CONFERENCE_DOMAIN}",
-            body=message,
-            typ="groupchat",
-            attrs={"event": event},
+    def send(client):
+        client.send(
+            xmpp.Message(
+                to=f"{room_name}@{settings.XMPP_CONFERENCE_DOMAIN}",
+                body=message,
+                typ="groupchat",
+                attrs={"event": event},
+            )
         )
-    )
+        # xmpp clients do not raise when a stanza can not be sent, the connection is
+        # only flagged as lost
+        if not client.isConnected():
+            raise OSError("The connection to the XMPP server was lost.")
+
+    _run(send, retry=False)
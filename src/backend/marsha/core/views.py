@@ -34,6 +34,7 @@ from rest_framework.views import exception_handler as drf_exception_handler
 from rest_framework_simplejwt.exceptions import TokenError
 from waffle import mixins, switch_is_active
 
+from marsha.core.cache import get_namespace_versions, make_namespaced_key
 from marsha.core.defaults import (
     APP_DATA_STATE_ERROR,
     APP_DATA_STATE_PORTABILITY,
@@ -43,6 +44,7 @@ from marsha.core.defaults import (
     DEPOSIT,
     DOCUMENT,
     LIVE_RAW,
+    LTI_RESOURCE_ID_KEY_CACHE,
     MARKDOWN,
     SENTRY,
     VIDEO,
@@ -312,6 +314,14 @@ class BaseModelResourceView(ABC, BaseResourceView):
         """Generates the cache key from parameters."""
         return "|".join(str(key) for key in keys)
 
+    def build_resource_cache_key(self, resource_id, *keys):
+        """Generates a cache key from parameters, invalidated when the resource changes."""
+        return make_namespaced_key(
+            self.build_cache_key(*keys),
+            # pylint: disable=protected-access
+            (self.model._meta.model_name, resource_id),
+        )
+
     @property
     @abstractmethod
     def cache_key(self):
@@ -398,7 +408,8 @@ class BaseLTIView(BaseModelResourceView, ABC):
     def cache_key(self):
         """Cache key from view context."""
 
-        return self.build_cache_key(
+        return self.build_resource_cache_key(
+            self.lti.resource_id,
             "app_data",
             self.model.__name__,
             self.lti.get_consumer_site().domain,
@@ -423,21 +434,73 @@ class BaseLTIView(BaseModelResourceView, ABC):
         except PortabilityError as error:
             raise ResourceException(str(error)) from error
 
+    def _get_lti_resource_id(self):
+        """Find the resource targeted by the LTI link of the request.
+
+        The resource is looked up by the domain of the consumer site, the context id and
+        the resource link id of the request. Its id is cached along with the versions of
+        the namespaces of the resource, of its playlist and of its consumer site: it is
+        looked up again once one of them is invalidated, e.g. when a video is saved or
+        deleted or when the lti id or the consumer site of its playlist changes, and at
+        the latest after `LTI_RESOURCE_ID_CACHE_DURATION` seconds.
+
+        Returns
+        -------
+        uuid.UUID
+            The id of the resource, None if the resource must be created.
+        """
+        # pylint: disable=protected-access
+        model_name = self.model._meta.model_name
+        lookup = {
+            "lti_id": self.request.POST.get("resource_link_id"),
+            "playlist__lti_id": self.request.POST.get("context_id"),
+            "playlist__consumer_site__domain": urlparse(
+                self.request.META.get("HTTP_REFERER")
+            ).hostname,
+        }
+        cache_key = self.build_cache_key(
+            LTI_RESOURCE_ID_KEY_CACHE,
+            model_name,
+            lookup["playlist__consumer_site__domain"],
+            lookup["playlist__lti_id"],
+            lookup["lti_id"],
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            resource_id, playlist_id, consumer_site_id, versions = cached
+            if (
+                get_namespace_versions(
+                    (model_name, resource_id),
+                    ("playlist", playlist_id),
+                    ("consumersite", consumer_site_id),
+                )
+                == versions
+            ):
+                return resource_id
+
+        try:
+            resource_id, playlist_id, consumer_site_id = self.model.objects.values_list(
+                "id", "playlist_id", "playlist__consumer_site_id"
+            ).get(**lookup)
+        except self.model.DoesNotExist:
+            # resource_id is null, the resource will be created
+            return None
+
+        versions = get_namespace_versions(
+            (model_name, resource_id),
+            ("playlist", playlist_id),
+            ("consumersite", consumer_site_id),
+        )
+        cache.set(
+            cache_key,
+            (resource_id, playlist_id, consumer_site_id, versions),
+            settings.LTI_RESOURCE_ID_CACHE_DURATION,
+        )
+        return resource_id
+
     def _init_context(self):
         """Extract LTI information (and verifies the request) before data process."""
-        resource_id = self.kwargs.get("uuid")
-        if not resource_id:
-            try:
-                resource_id = self.model.objects.values_list("id", flat=True).get(
-                    lti_id=self.request.POST.get("resource_link_id"),
-                    playlist__lti_id=self.request.POST.get("context_id"),
-                    playlist__consumer_site__domain=urlparse(
-                        self.request.META.get("HTTP_REFERER")
-                    ).hostname,
-                )
-            except self.model.DoesNotExist:
-                # resource_id is null, the resource will be created
-                pass
+        resource_id = self.kwargs.get("uuid") or self._get_lti_resource_id()
         self.lti = LTI(  # pylint:disable=attribute-defined-outside-init
             self.request,
             resource_id=resource_id,
@@ -464,7 +527,8 @@ class BaseLTIView(BaseModelResourceView, ABC):
         """
         app_data = None
         if self.lti.is_student:
-            app_data = cache.get(self.cache_key)
+            cache_key = self.cache_key
+            app_data = cache.get(cache_key)
 
         permissions = {"can_access_dashboard": False, "can_update": False}
         session_id = str(uuid.uuid4())
@@ -548,7 +612,7 @@ class BaseLTIView(BaseModelResourceView, ABC):
             )
 
             if self.lti.is_student:
-                cache.set(self.cache_key, app_data, settings.APP_DATA_CACHE_DURATION)
+                cache.set(cache_key, app_data, settings.APP_DATA_CACHE_DURATION)
 
         if app_data["resource"] is not None:
             refresh_token = PlaylistRefreshToken.for_lti(
@@ -600,7 +664,8 @@ class BaseView(BaseModelResourceView, ABC):
     @property
     def cache_key(self):
         """Cache key from view context."""
-        return self.build_cache_key(
+        return self.build_resource_cache_key(
+            self.kwargs["uuid"],
             "app_data",
             "public",
             self.model.__name__,
@@ -619,7 +684,8 @@ class BaseView(BaseModelResourceView, ABC):
             - resource: representation of the targeted resource including urls for the resource
                 file (e.g. for a video: all resolutions, thumbnails and timed text tracks).
         """
-        app_data = cache.get(self.cache_key)
+        cache_key = self.cache_key
+        app_data = cache.get(cache_key)
 
         session_id = str(uuid.uuid4())
 
@@ -632,7 +698,7 @@ class BaseView(BaseModelResourceView, ABC):
                 session_id,
             )
 
-            cache.set(self.cache_key, app_data, settings.APP_DATA_CACHE_DURATION)
+            cache.set(cache_key, app_data, settings.APP_DATA_CACHE_DURATION)
             # if a consumer exists, we save the domain in a dedicated cache in order to use it
             # on every request made to determine if the response headers should be changed in the
             # get method.
@@ -749,7 +815,8 @@ class VideoView(BaseView):
             raise Http404
 
         session_id = str(uuid.uuid4())
-        cache_key = self.build_cache_key(
+        cache_key = self.build_resource_cache_key(
+            video_pk,
             "app_data",
             "direct_access",
             self.model.__name__,
@@ -1,5 +1,6 @@
 """XAPI module."""
 import re
+from urllib.parse import urlsplit
 import uuid
 
 from django.conf import settings
@@ -9,6 +10,18 @@ from django.utils.translation import to_locale
 import requests
 
 
+# Sessions keep the connections to the LRS alive between deliveries, one per process
+_sessions = {}
+
+
+def get_session(url):
+    """Return the requests session shared by all the deliveries to the host of `url`."""
+    host = urlsplit(url).netloc
+    if host not in _sessions:
+        _sessions[host] = requests.Session()
+    return _sessions[host]
+
+
 def get_xapi_statement(resource):
     """Return the xapi object statement based on the required resource type."""
     if resource == "video":
@@ -327,6 +340,14 @@ class XAPI:
         self.auth_token = auth_token
         self.xapi_version = xapi_version
 
+    def get_headers(self):
+        """Return the headers of the requests sent to the LRS."""
+        return {
+            "Authorization": self.auth_token,
+            "Content-Type": "application/json",
+            "X-Experience-API-Version": self.xapi_version,
+        }
+
     def send(self, xapi_statement):
         """Send the statement to a LRS.
 
@@ -335,16 +356,31 @@ class XAPI:
         statement : Type[.XAPIStatement]
 
         """
-        headers = {
-            "Authorization": self.auth_token,
-            "Content-Type": "application/json",
-            "X-Experience-API-Version": self.xapi_version,
-        }
-
         response = requests.post(
             self.url,
             json=xapi_statement.get_statement(),
-            headers=headers,
+            headers=self.get_headers(),
+            timeout=settings.STAT_BACKEND_TIMEOUT,
+        )
+
+        response.raise_for_status()
+
+    def send_many(self, statements):
+        """Send several statements to a LRS in a single request.
+
+        The statements are posted as an array, over a connection kept alive for the
+        next deliveries to the same LRS.
+
+        Parameters
+        ----------
+        statements : List[dict]
+            The complete xAPI statements to send.
+
+        """
+        response = get_session(self.url).post(
+            self.url,
+            json=statements,
+            headers=self.get_headers(),
             timeout=settings.STAT_BACKEND_TIMEOUT,
         )
 
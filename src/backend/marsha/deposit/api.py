@@ -1,6 +1,5 @@
 """Declare API endpoints with Django RestFramework viewsets."""
 from django.conf import settings
-from django.db.models import Q
 from django.utils import timezone
 
 import django_filters
@@ -10,7 +9,7 @@ from rest_framework.response import Response
 
 from marsha.core import defaults, permissions as core_permissions
 from marsha.core.api import APIViewMixin, ObjectPkMixin, ObjectRelatedMixin
-from marsha.core.models import ADMINISTRATOR, LTI_ROLES, STUDENT
+from marsha.core.models import ADMINISTRATOR, LTI_ROLES, STUDENT, has_playlist_role
 from marsha.core.utils.s3_utils import create_presigned_post
 from marsha.core.utils.time_utils import to_timestamp
 from marsha.deposit import permissions, serializers
@@ -132,17 +131,7 @@ class FileDepositoryViewSet(
         queryset = (
             super()
             .get_queryset()
-            .filter(
-                Q(
-                    playlist__organization__user_accesses__user_id=self.request.user.id,
-                    playlist__organization__user_accesses__role=ADMINISTRATOR,
-                )
-                | Q(
-                    playlist__user_accesses__user_id=self.request.user.id,
-                    playlist__user_accesses__role=ADMINISTRATOR,
-                )
-            )
-            .distinct()
+            .filter(has_playlist_role(self.request.user.id, [ADMINISTRATOR]))
         )
 
         return queryset
@@ -2,33 +2,25 @@
 from rest_framework import permissions
 
 from marsha.core import models
+from marsha.core.permissions.roles import get_request_roles
 from marsha.deposit.models import FileDepository
 
 
-def _is_organization_admin(user_id, file_depository_id):
-    """Check if user is an admin of the organization containing a file depository."""
-
-    if not user_id or not file_depository_id:
-        return False
-
-    return models.OrganizationAccess.objects.filter(
-        role=models.ADMINISTRATOR,
-        organization__playlists__filedepositories__id=file_depository_id,
-        user__id=user_id,
-    ).exists()
-
-
-def _is_playlist_admin(user_id, file_depository_id):
-    """Check if user is an admin of the playlist containing a file depository."""
+def _is_playlist_or_organization_admin(request, file_depository_id):
+    """
+    Check if the user of the request is an admin of the playlist containing
+    a file depository or of its organization.
+    """
 
-    if not user_id or not file_depository_id:
+    if not request.user.id or not file_depository_id:
         return False
 
-    return models.PlaylistAccess.objects.filter(
-        role=models.ADMINISTRATOR,
-        playlist__filedepositories__id=file_depository_id,
-        user__id=user_id,
-    ).exists()
+    request_roles = get_request_roles(request)
+    return request_roles.has_playlist_role(
+        [models.ADMINISTRATOR], file_depository_id, lookup="filedepositories__id"
+    ) or request_roles.has_playlist_organization_role(
+        [models.ADMINISTRATOR], file_depository_id, lookup="filedepositories__id"
+    )
 
 
 class IsTokenResourceRouteObjectRelatedFileDepository(permissions.BasePermission):
@@ -80,12 +72,8 @@ class IsFileDepositoryPlaylistOrOrganizationAdmin(permissions.BasePermission):
         which exists, and if the current user is an admin for the playlist this file depository
         is a part of or admin of the linked organization.
         """
-        return _is_playlist_admin(
-            user_id=request.user.id,
-            file_depository_id=view.get_object_pk(),
-        ) or _is_organization_admin(
-            user_id=request.user.id,
-            file_depository_id=view.get_object_pk(),
+        return _is_playlist_or_organization_admin(
+            request, file_depository_id=view.get_object_pk()
         )
 
 
@@ -110,10 +98,6 @@ class IsRelatedFileDepositoryPlaylistOrOrganizationAdmin(permissions.BasePermiss
         if not file_depository_id:
             return False
 
-        return _is_playlist_admin(
-            user_id=request.user.id,
-            file_depository_id=file_depository_id,
-        ) or _is_organization_admin(
-            user_id=request.user.id,
-            file_depository_id=file_depository_id,
+        return _is_playlist_or_organization_admin(
+            request, file_depository_id=file_depository_id
         )
@@ -1,6 +1,5 @@
 """Declare API endpoints with Django RestFramework viewsets."""
 from django.conf import settings
-from django.db.models import Q
 from django.utils import timezone
 
 import django_filters
@@ -11,7 +10,7 @@ from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
 
 from marsha.core import defaults, permissions as core_permissions
 from marsha.core.api import APIViewMixin, ObjectPkMixin, ObjectRelatedMixin
-from marsha.core.models import ADMINISTRATOR
+from marsha.core.models import ADMINISTRATOR, has_playlist_role
 from marsha.core.utils.s3_utils import create_presigned_post
 from marsha.core.utils.time_utils import to_timestamp
 from marsha.markdown import permissions as markdown_permissions, serializers
@@ -126,17 +125,7 @@ class MarkdownDocumentViewSet(
         queryset = (
             super()
             .get_queryset()
-            .filter(
-                Q(
-                    playlist__organization__user_accesses__user_id=self.request.user.id,
-                    playlist__organization__user_accesses__role=ADMINISTRATOR,
-                )
-                | Q(
-                    playlist__user_accesses__user_id=self.request.user.id,
-                    playlist__user_accesses__role=ADMINISTRATOR,
-                )
-            )
-            .distinct()
+            .filter(has_playlist_role(self.request.user.id, [ADMINISTRATOR]))
         )
 
         return queryset
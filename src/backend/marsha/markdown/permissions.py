@@ -4,33 +4,25 @@ from django.core.exceptions import ObjectDoesNotExist
 from rest_framework import permissions
 
 from marsha.core import models
+from marsha.core.permissions.roles import get_request_roles
 from marsha.markdown.models import MarkdownDocument
 
 
-def _is_organization_admin(user_id, markdown_document_id):
-    """Check if user is an admin of the organization containing a markdown document."""
-
-    if not user_id or not markdown_document_id:
-        return False
-
-    return models.OrganizationAccess.objects.filter(
-        role=models.ADMINISTRATOR,
-        organization__playlists__markdowndocuments__id=markdown_document_id,
-        user__id=user_id,
-    ).exists()
-
-
-def _is_playlist_admin(user_id, markdown_document_id):
-    """Check if user is an admin of the playlist containing a markdown document."""
+def _is_playlist_or_organization_admin(request, markdown_document_id):
+    """
+    Check if the user of the request is an admin of the playlist containing
+    a markdown document or of its organization.
+    """
 
-    if not user_id or not markdown_document_id:
+    if not request.user.id or not markdown_document_id:
         return False
 
-    return models.PlaylistAccess.objects.filter(
-        role=models.ADMINISTRATOR,
-        playlist__markdowndocuments__id=markdown_document_id,
-        user__id=user_id,
-    ).exists()
+    request_roles = get_request_roles(request)
+    return request_roles.has_playlist_role(
+        [models.ADMINISTRATOR], markdown_document_id, lookup="markdowndocuments__id"
+    ) or request_roles.has_playlist_organization_role(
+        [models.ADMINISTRATOR], markdown_document_id, lookup="markdowndocuments__id"
+    )
 
 
 class IsTokenResourceRouteObjectRelatedMarkdownDocument(permissions.BasePermission):
@@ -83,12 +75,8 @@ class IsMarkdownDocumentPlaylistOrOrganizationAdmin(permissions.BasePermission):
         which exists, and if the current user is an admin for the playlist this markdown document
         is a part of or admin of the linked organization.
         """
-        return _is_playlist_admin(
-            user_id=request.user.id,
-            markdown_document_id=view.get_object_pk(),
-        ) or _is_organization_admin(
-            user_id=request.user.id,
-            markdown_document_id=view.get_object_pk(),
+        return _is_playlist_or_organization_admin(
+            request, markdown_document_id=view.get_object_pk()
         )
 
 
@@ -109,17 +97,13 @@ class IsRelatedMarkdownDocumentPlaylistOrOrganizationAdmin(permissions.BasePermi
         is a part of or admin of the linked organization.
         """
         try:
-            markdown_document_id = view.get_related_object().markdown_document.id
+            markdown_document_id = view.get_related_object_value("markdown_document_id")
         except (AttributeError, ObjectDoesNotExist):
             markdown_document_id = request.data.get("markdown_document")
 
         if not markdown_document_id:
             return False
 
-        return _is_playlist_admin(
-            user_id=request.user.id,
-            markdown_document_id=markdown_document_id,
-        ) or _is_organization_admin(
-            user_id=request.user.id,
-            markdown_document_id=markdown_document_id,
+        return _is_playlist_or_organization_admin(
+            request, markdown_document_id=markdown_document_id
         )
@@ -204,6 +204,11 @@ class Base(Configuration):
                 "hosts": values.ListValue(
                     [("redis", 6379)], environ_name="REDIS_HOST", environ_prefix=None
                 ),
+                # See marsha.websocket.layers
+                "codec": values.Value("json", environ_name="CHANNEL_LAYERS_CODEC"),
+                "compression_threshold": values.PositiveIntegerValue(
+                    0, environ_name="CHANNEL_LAYERS_COMPRESSION_THRESHOLD"
+                ),
             },
         },
     }
@@ -365,11 +370,15 @@ class Base(Configuration):
     AWS_BASE_NAME = values.Value()
     UPDATE_STATE_SHARED_SECRETS = values.ListValue()
     AWS_UPLOAD_EXPIRATION_DELAY = values.Value(24 * 60 * 60)  # 24h
+    # Number of objects copied at the same time when moving an S3 directory
+    S3_MOVE_CONCURRENCY = values.PositiveIntegerValue(10)
     AWS_MEDIALIVE_ROLE_ARN = values.SecretValue()
     AWS_MEDIAPACKAGE_HARVEST_JOB_ARN = values.SecretValue()
     AWS_MEDIAPACKAGE_HARVEST_JOB_TIMEOUT = values.PositiveIntegerValue(10)
     AWS_MEDIALIVE_INPUT_WAITER_DELAY = values.PositiveIntegerValue(5)
     AWS_MEDIALIVE_INPUT_WAITER_MAX_ATTEMPTS = values.PositiveIntegerValue(84)
+    # Number of medialive stacks deleted at the same time by maintenance commands
+    AWS_MEDIALIVE_DELETE_CONCURRENCY = values.PositiveIntegerValue(5)
     AWS_S3_EXPIRATION_DURATION = values.PositiveIntegerValue(30)  # 30 days
 
     # VIDEOS_STORAGE_S3
@@ -407,6 +416,9 @@ class Base(Configuration):
     LTI_CONFIG_CONTACT_EMAIL = values.Value()
     LTI_REPLAY_PROTECTION_CACHE_DURATION = values.PositiveIntegerValue(3600)  # 1 hour
     LTI_REPLAY_PROTECTION_ENABLED = values.BooleanValue(True)
+    LTI_PASSPORT_CACHE_DURATION = values.PositiveIntegerValue(300)  # 5 minutes
+    LTI_PASSPORT_NEGATIVE_CACHE_DURATION = values.PositiveIntegerValue(30)  # 30 seconds
+    LTI_RESOURCE_ID_CACHE_DURATION = values.PositiveIntegerValue(300)  # 5 minutes
 
     # BBB
     BBB_ENABLED = values.BooleanValue(False)
@@ -414,6 +426,8 @@ class Base(Configuration):
     BBB_API_SECRET = values.Value(None)
     BBB_API_CALLBACK_SECRET = values.Value(None)
     BBB_API_TIMEOUT = values.PositiveIntegerValue(10)
+    # Number of connections to a BBB server kept alive per process
+    BBB_API_POOL_SIZE = values.PositiveIntegerValue(10)
     ALLOWED_CLASSROOM_DOCUMENT_MIME_TYPES = values.ListValue(["application/pdf"])
     BBB_INVITE_JWT_DEFAULT_DAYS_DURATION = values.PositiveIntegerValue(30)
     BBB_INVITE_JWT_INSTRUCTOR_DAYS_DURATION = values.PositiveIntegerValue(30)
@@ -455,6 +469,10 @@ class Base(Configuration):
     APP_DATA_CACHE_DURATION = values.Value(60)  # 60 seconds
     PUBLIC_RESOURCE_DOMAIN_CACHE_DURATION = values.Value(90)  # 90 seconds
     VIDEO_ATTENDANCES_CACHE_DURATION = values.Value(300)  # 5 minutes
+    VIDEO_ATTENDANCES_STOPPED_CACHE_DURATION = values.PositiveIntegerValue(
+        86400
+    )  # 1 day
+    VIDEO_ATTENDANCE_TIMELINE_CACHE_DURATION = values.Value(86400)  # 1 day
     XAPI_STATEMENT_ID_CACHE_TIMEOUT = values.Value(120)  # 2 minutes
 
     SENTRY_DSN = values.Value(None)
@@ -492,6 +510,10 @@ class Base(Configuration):
     XMPP_PRIVATE_ADMIN_JID = values.Value(None)
     XMPP_PRIVATE_SERVER_PORT = values.Value(5222)
     XMPP_PRIVATE_SERVER_PASSWORD = values.Value(None)
+    # Number of admin connections to the XMPP server kept open per process, and the time
+    # to wait (in seconds) for one of them to be free
+    XMPP_CLIENT_POOL_SIZE = values.PositiveIntegerValue(4)
+    XMPP_CLIENT_POOL_TIMEOUT = values.PositiveIntegerValue(10)
     XMPP_JWT_SHARED_SECRET = values.Value(None)
     XMPP_JWT_ISSUER = values.Value("marsha")
     XMPP_JWT_AUDIENCE = values.Value("marsha")
@@ -507,6 +529,8 @@ class Base(Configuration):
     LIVE_FRAMERATE_NUMERATOR = values.PositiveIntegerValue(24000)
     LIVE_FRAMERATE_DENOMINATOR = values.PositiveIntegerValue(1000)
     LIVE_GOP_SIZE = values.FloatValue(4)
+    # Number of running lives whose cloudwatch logs are scanned at the same time
+    CHECK_LIVE_STATE_CONCURRENCY = values.PositiveIntegerValue(10)
 
     # P2P SETTINGS
     P2P_ENABLED = values.BooleanValue(False)
@@ -527,6 +551,13 @@ class Base(Configuration):
 
     # SHARED LIVE MEDIA SETTINGS
     ALLOWED_SHARED_LIVE_MEDIA_MIME_TYPES = values.ListValue(["application/pdf"])
+    # Number of pages converted by each celery task, published as soon as they are
+    # converted, and number of pages uploaded at the same time
+    SHARED_LIVE_MEDIA_CONVERSION_CHUNK_SIZE = values.PositiveIntegerValue(20)
+    SHARED_LIVE_MEDIA_UPLOAD_CONCURRENCY = values.PositiveIntegerValue(5)
+    # Pages whose SVG is larger than this size (in bytes) are rasterized, 0 to disable
+    SHARED_LIVE_MEDIA_RASTER_THRESHOLD = values.PositiveIntegerValue(0)
+    SHARED_LIVE_MEDIA_RASTER_DPI = values.PositiveIntegerValue(150)
 
     # Cors
     CORS_ALLOW_ALL_ORIGINS = values.BooleanValue(False)
@@ -618,6 +649,41 @@ class Base(Configuration):
     STAT_BACKEND_TIMEOUT = values.PositiveIntegerValue(10)
     ATTENDANCE_POINTS = values.Value(20)
     ATTENDANCE_PUSH_DELAY = values.Value(60)
+    # Write-behind ingestion of attendance beats, see marsha.core.services.live_attendance
+    ATTENDANCE_WRITE_BEHIND_ENABLED = values.BooleanValue(False)
+    ATTENDANCE_WRITE_BEHIND_FLUSH_DELAY = values.PositiveIntegerValue(60)  # 1 minute
+    ATTENDANCE_WRITE_BEHIND_BATCH_SIZE = values.PositiveIntegerValue(500)
+    ATTENDANCE_WRITE_BEHIND_SNAPSHOT_DURATION = values.PositiveIntegerValue(300)
+    # Asynchronous delivery of xAPI statements, see marsha.core.services.xapi_delivery
+    XAPI_ASYNC_DELIVERY_ENABLED = values.BooleanValue(False)
+    XAPI_DELIVERY_DELAY = values.PositiveIntegerValue(5)  # 5 seconds
+    XAPI_DELIVERY_BATCH_SIZE = values.PositiveIntegerValue(100)
+    XAPI_DELIVERY_MAX_RETRIES = values.PositiveIntegerValue(5)
+    XAPI_DELIVERY_RETRY_BACKOFF = values.PositiveIntegerValue(30)  # 30 seconds
+
+    # Delay (in seconds) during which updates of a video are sent at once to websockets,
+    # see marsha.websocket.utils.channel_layers_utils
+    WEBSOCKET_VIDEO_DISPATCH_COALESCE_DELAY = values.FloatValue(0)
+    # Send patches from the previous version of a video through the channel layer,
+    # all the consumers must support them before enabling it.
+    WEBSOCKET_VIDEO_PATCH_EVENTS_ENABLED = values.BooleanValue(False)
+    WEBSOCKET_VIDEO_SNAPSHOT_CACHE_DURATION = values.PositiveIntegerValue(
+        3600
+    )  # 1 hour
+    # Duration (in seconds) a JWT validated by the websocket middleware is remembered,
+    # see marsha.websocket.middlewares.jwt
+    WEBSOCKET_JWT_CACHE_TTL = values.PositiveIntegerValue(30)
+
+    # Recovery of the transcode pipeline of old videos, see
+    # marsha.core.services.transcode_pipeline
+    TRANSCODE_PIPELINE_STORAGE_LOOKUP = values.BooleanValue(True)
+    TRANSCODE_PIPELINE_BACKFILL_BATCH_SIZE = values.PositiveIntegerValue(500)
+    TRANSCODE_PIPELINE_BACKFILL_DELAY = values.PositiveIntegerValue(300)  # 5 minutes
+
+    # Thumbnails, see marsha.core.tasks.thumbnail
+    # Formats thumbnails are saved in alongside JPEG, e.g. "webp"
+    THUMBNAIL_EXTRA_FORMATS = values.ListValue([])
+    THUMBNAIL_UPLOAD_CONCURRENCY = values.PositiveIntegerValue(5)
 
     # Python social auth
     SOCIAL_AUTH_JSONFIELD_ENABLED = True
@@ -1,7 +1,7 @@
 """Video consumer module"""
 from urllib.parse import parse_qs
 
-from django.db.models import Q
+from django.db.models import Exists, OuterRef
 
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
@@ -9,32 +9,60 @@ from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from marsha.core.models import (
     ADMINISTRATOR,
     INSTRUCTOR,
+    OrganizationAccess,
+    PlaylistAccess,
     SharedLiveMedia,
     Thumbnail,
     TimedTextTrack,
     Video,
 )
 from marsha.core.permissions import IsTokenAdmin, IsTokenInstructor
+from marsha.core.serializers import VideoSerializer
 from marsha.core.services import live_session as LiveSessionServices
 from marsha.core.simple_jwt.tokens import PlaylistAccessToken, UserAccessToken
 from marsha.websocket import defaults
+from marsha.websocket.utils.channel_layers_utils import aget_room_snapshot
+from marsha.websocket.utils.json_patch import apply_patch, make_patch
 
 
+# pylint: disable=too-many-instance-attributes
 class VideoConsumer(AsyncJsonWebsocketConsumer):
-    """Video consumer."""
+    """Video consumer.
+
+    The access of the user to the video and their role are resolved by a single query
+    on connection, then kept with their live session for the lifetime of the websocket.
+
+    Clients connecting with the `protocol=delta` query string flag receive the changes
+    of the video as JSON patches from the version they received last. They can ask for
+    a snapshot of the video by sending a `resync` message, when they miss a version.
+    Other clients receive the whole video on each event.
+    """
 
     room_group_name = None
     is_connected = False
+    # Resolved once on connection, for the lifetime of the websocket
+    is_admin = False
+    live_session = None
+    delta_protocol = False
+    video = None
+    video_epoch = None
+    video_version = None
 
     def __get_video_id(self):
         return self.scope["url_route"]["kwargs"]["video_id"]
 
-    async def _check_permissions(self):
+    @database_sync_to_async
+    def _resolve_access(self):
         """
-        Check if the user has the required permissions.
+        Check in a single query the video exists, the user can access it and if they
+        are an admin of it.
+
+        Returns:
+            bool: if the connected user has admin permissions.
 
         Raises:
-            ConnectionRefusedError: if the user does not have the required permissions.
+            ConnectionRefusedError: if the video does not exist or the user does not
+            have the required permissions.
         """
         token = self.scope["token"]
         if token is None:
@@ -42,28 +70,47 @@ class VideoConsumer(AsyncJsonWebsocketConsumer):
 
         # Check permissions, MUST be the same as in the `retrieve` method
         # of the Video API view set.
+        videos = Video.objects.filter(pk=self.__get_video_id())
 
         if isinstance(token, PlaylistAccessToken):
             # With LTI: anyone with a valid token for the video can access
-            if not await self._has_access_to_video(token):
+            video = videos.values("playlist_id").first()
+            if video is None or str(video["playlist_id"]) != str(
+                token.payload.get("playlist_id")
+            ):
                 raise ConnectionRefusedError()
+            return IsTokenInstructor().check_role(token) or IsTokenAdmin().check_role(
+                token
+            )
 
-        elif isinstance(token, UserAccessToken):
+        if isinstance(token, UserAccessToken):
             # With standalone site, only playlist admin or organization admin can access
-            if not await self._user_has_playlist_or_organization_admin_role(
-                token.payload.get("user_id")
-            ):
+            user_id = token.payload.get("user_id")
+            video = (
+                videos.annotate(
+                    is_admin=Exists(
+                        PlaylistAccess.objects.filter(
+                            playlist_id=OuterRef("playlist_id"),
+                            user_id=user_id,
+                            role__in=[ADMINISTRATOR, INSTRUCTOR],
+                        )
+                    )
+                    | Exists(
+                        OrganizationAccess.objects.filter(
+                            organization_id=OuterRef("playlist__organization_id"),
+                            user_id=user_id,
+                            role=ADMINISTRATOR,
+                        )
+                    )
+                )
+                .values("is_admin")
+                .first()
+            )
+            if video is None or not video["is_admin"]:
                 raise ConnectionRefusedError()
+            return True
 
-        else:
-            raise RuntimeError("This should not happen")
-
-    @database_sync_to_async
-    def _has_access_to_video(self, token):
-        """Return if the user has access to the video."""
-        return Video.objects.filter(
-            pk=self.__get_video_id(), playlist_id=token.payload.get("playlist_id")
-        ).exists()
+        raise RuntimeError("This should not happen")
 
     async def connect(self):
         """
@@ -73,53 +120,25 @@ class VideoConsumer(AsyncJsonWebsocketConsumer):
         want
         """
         try:
-            await self._check_permissions()
-            await self._check_video_exists()
-            if not await self._is_admin():
-                live_session = await self.retrieve_live_session()
-                await self.update_live_session_with_channel_name(
-                    live_session=live_session
-                )
+            self.is_admin = await self._resolve_access()
+            if not self.is_admin:
+                self.live_session = await self.join_live_session()
         except ConnectionRefusedError:
             await self.accept()
             return await self.close(code=4003)
 
-        self.room_group_name = await self._get_room_name()
+        self.room_group_name = self._get_room_name()
         # Join room group
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
 
         await self.accept()
         self.is_connected = True
+        query_string = parse_qs(self.scope["query_string"])
+        self.delta_protocol = query_string.get(b"protocol") == [
+            defaults.DELTA_PROTOCOL.encode("utf-8")
+        ]
 
-    async def _check_video_exists(self):
-        """Close the room if the video does not exists."""
-        if not await self._video_exists():
-            raise ConnectionRefusedError()
-
-    @database_sync_to_async
-    def _video_exists(self):
-        """Return if a video exists in database or not."""
-        return Video.objects.filter(pk=self.__get_video_id()).exists()
-
-    @database_sync_to_async
-    def _user_has_playlist_or_organization_admin_role(self, user_id):
-        """Return if the user belongs to the video playlist admin or organization admin."""
-        return Video.objects.filter(
-            Q(pk=self.__get_video_id())
-            & (
-                Q(
-                    playlist__user_accesses__user_id=user_id,
-                    playlist__user_accesses__role__in=[ADMINISTRATOR, INSTRUCTOR],
-                )
-                | Q(
-                    playlist__organization__user_accesses__user_id=user_id,
-                    playlist__organization__user_accesses__role=ADMINISTRATOR,
-                )
-            )
-        ).exists()
-
-    @database_sync_to_async
-    def retrieve_live_session(self):
+    def _retrieve_live_session(self):
         """Guess a live_session from the token and create it id not present."""
         token = self.scope["token"]
         if LiveSessionServices.is_lti_token(token):
@@ -138,38 +157,22 @@ class VideoConsumer(AsyncJsonWebsocketConsumer):
         return live_session
 
     @database_sync_to_async
-    def update_live_session_with_channel_name(self, live_session):
-        """Update the live_session with the current channel_name."""
+    def join_live_session(self):
+        """Retrieve the live_session and update it with the current channel_name."""
+        live_session = self._retrieve_live_session()
         live_session.channel_name = self.channel_name
-        live_session.save()
+        live_session.save(update_fields=["channel_name", "updated_on"], validate=False)
+        return live_session
 
     @database_sync_to_async
     def reset_live_session(self, live_session):
         """Reset to None the live_session channel_name."""
         live_session.channel_name = None
-        live_session.save()
+        live_session.save(update_fields=["channel_name", "updated_on"], validate=False)
 
-    async def _is_admin(self):
-        """Check if the connected user has admin permissions."""
-        token = self.scope["token"]
-        if not token:
-            return False
-
-        if isinstance(token, PlaylistAccessToken):
-            return IsTokenInstructor().check_role(token) or IsTokenAdmin().check_role(
-                token
-            )
-
-        if isinstance(token, UserAccessToken):
-            return await self._user_has_playlist_or_organization_admin_role(
-                token.payload.get("user_id"),
-            )
-
-        raise RuntimeError("Should not be called please check the code.", type(token))
-
-    async def _get_room_name(self):
+    def _get_room_name(self):
         """Generate the room name the user is connected on depending its permissions."""
-        if await self._is_admin():
+        if self.is_admin:
             return defaults.VIDEO_ADMIN_ROOM_NAME.format(video_id=self.__get_video_id())
 
         return defaults.VIDEO_ROOM_NAME.format(video_id=self.__get_video_id())
@@ -183,18 +186,110 @@ class VideoConsumer(AsyncJsonWebsocketConsumer):
 
         # Leave room group
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
-        if not await self._is_admin():
-            try:
-                live_session = await self.retrieve_live_session()
-                await self.reset_live_session(live_session)
-            except ConnectionRefusedError:
-                # No live session found, nothing to do
-                pass
+        if self.live_session is not None:
+            await self.reset_live_session(self.live_session)
+
+    @database_sync_to_async
+    def _serialize_video(self):
+        """Serialize the video for the room the user is connected on."""
+        video = Video.objects.get(pk=self.__get_video_id())
+        return VideoSerializer(video, context={"is_admin": self.is_admin}).data
+
+    async def _get_video_snapshot(self, epoch=None, version=None):
+        """Return the (epoch, version, representation) of the video sent to the room.
+
+        The video at the requested version, or else at the last version, is read from
+        the cache, where the dispatch stored it before sending its event. The database
+        is only read when the cache does not know the video anymore.
+        """
+        snapshot = None
+        if version is not None:
+            snapshot = await aget_room_snapshot(self.room_group_name, epoch, version)
+        if snapshot is None:
+            snapshot = await aget_room_snapshot(self.room_group_name)
+        if snapshot is None:
+            snapshot = (epoch, version, await self._serialize_video())
+        return snapshot
+
+    async def _send_video_snapshot(self):
+        """Send the whole video with its version to a client using deltas."""
+        await self.send_json(
+            {
+                "type": Video.RESOURCE_NAME,
+                "resource": self.video,
+                "version": self.video_version,
+            }
+        )
+
+    async def receive_json(self, content, **kwargs):
+        """Send a snapshot of the video to a client reporting a missed version."""
+        if not self.delta_protocol or content.get("type") != "resync":
+            return
+        if self.video is None:
+            snapshot = await self._get_video_snapshot()
+            self.video_epoch, self.video_version, self.video = snapshot
+        await self._send_video_snapshot()
 
     async def video_updated(self, event):
-        """Listener for the video_updated event."""
-        message = {"type": Video.RESOURCE_NAME, "resource": event["video"]}
-        await self.send_json(message)
+        """Listener for the video_updated event.
+
+        Versions are only compared within an epoch: the counter of the versions starts
+        again in a new epoch when the cache loses it, or on each event when the cache
+        is not shared by the processes.
+        """
+        epoch, version = event.get("epoch"), event.get("version")
+        same_epoch = self.video_version is not None and epoch == self.video_epoch
+        if (
+            self.delta_protocol
+            and same_epoch
+            and version is not None
+            and version <= self.video_version
+        ):
+            # Sent before the version the client already has, by a concurrent
+            # dispatch or as a snapshot read from the cache.
+            return
+
+        previous_video = self.video if same_epoch else None
+        previous_epoch, previous_version = self.video_epoch, self.video_version
+        video = None
+        if "patch" not in event:
+            video = event["video"]
+        elif previous_video is not None and previous_version == event["base_version"]:
+            try:
+                # The consumer owns its copy of the video and does not need the
+                # previous one anymore: the patch of the event is sent as is.
+                video = apply_patch(self.video, event["patch"], in_place=True)
+            except ValueError:
+                previous_video = None
+        if video is None:
+            epoch, version, video = await self._get_video_snapshot(epoch, version)
+        self.video_epoch, self.video_version = epoch, version
+        # The video is only kept to apply or compute the next patch
+        self.video = video if self.delta_protocol or "patch" in event else None
+
+        if not self.delta_protocol:
+            message = {"type": Video.RESOURCE_NAME, "resource": video}
+            await self.send_json(message)
+        elif (
+            previous_video is None
+            or epoch != previous_epoch
+            or version is None
+            or version <= previous_version
+        ):
+            await self._send_video_snapshot()
+        else:
+            await self.send_json(
+                {
+                    "type": Video.RESOURCE_NAME,
+                    "patch": (
+                        event["patch"]
+                        if event.get("base_version") == previous_version
+                        else make_patch(previous_video, video)
+                    ),
+                    "version": version,
+                    "base_version": previous_version,
+                }
+            )
 
     async def thumbnail_updated(self, event):
         """Listener for the thumbnail updated event."""
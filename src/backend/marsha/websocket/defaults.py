@@ -1,3 +1,7 @@
 """Default settings for the ``websocket`` app of the Marsha project."""
 VIDEO_ROOM_NAME = "video_{video_id:s}"
 VIDEO_ADMIN_ROOM_NAME = "video_admin_{video_id:s}"
+VIDEO_DISPATCH_KEY_CACHE = "websocket:video_dispatch:"
+VIDEO_VERSION_KEY_CACHE = "websocket:video_version:"
+VIDEO_SNAPSHOT_KEY_CACHE = "websocket:video_snapshot:"
+DELTA_PROTOCOL = "delta"
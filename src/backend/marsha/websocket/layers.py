@@ -2,35 +2,144 @@
 import json
 import random
 
+from django.core.exceptions import ImproperlyConfigured
 from django.core.serializers.json import DjangoJSONEncoder
 
+import brotli
 from channels_redis.core import RedisChannelLayer
+import msgpack
+import orjson
+
+
+# Messages are prefixed by a header describing their encoding. 0xff is not a valid
+# first byte of an UTF-8 text, so messages encoded without header, as json, can be
+# read by the same workers: the json codec without compression still sends them
+# without header, for workers not knowing this header during a rollout.
+HEADER_MAGIC = b"\xffML"
+HEADER_VERSION = 1
+HEADER_LENGTH = len(HEADER_MAGIC) + 3
+RANDOM_PREFIX_LENGTH = 12
+
+NO_COMPRESSION = b"-"
+BROTLI_COMPRESSION = b"b"
+# Brotli is much faster with its lowest quality, its compression ratio still
+# better than zlib's on serialized videos
+BROTLI_QUALITY = 1
+
+
+def _django_default(value):
+    """Encode the types json does not handle as DjangoJSONEncoder does."""
+    return DjangoJSONEncoder().default(value)
+
+
+def _dumps_json(message):
+    return bytes(json.dumps(message, cls=DjangoJSONEncoder), encoding="utf-8")
+
+
+def _dumps_orjson(message):
+    # Datetimes are encoded by DjangoJSONEncoder, which rounds them to milliseconds
+    return orjson.dumps(
+        message,
+        default=_django_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+    )
+
+
+def _dumps_msgpack(message):
+    return msgpack.packb(message, default=_django_default, use_bin_type=True)
+
+
+def _loads_msgpack(value):
+    return msgpack.unpackb(value, raw=False, strict_map_key=False)
+
+
+# The codecs, by name, with their identifier in the header and their functions
+CODECS = {
+    "json": (b"j", _dumps_json, json.loads),
+    "orjson": (b"o", _dumps_orjson, orjson.loads),
+    "msgpack": (b"m", _dumps_msgpack, _loads_msgpack),
+}
+DECODERS = {codec_id: loads for codec_id, _dumps, loads in CODECS.values()}
 
 
 class JsonRedisChannelLayer(RedisChannelLayer):
-    """Use json to serialize and deserialize messages."""
+    """Use json, or a faster codec, to serialize and deserialize messages.
+
+    The codec of the messages sent is chosen with the `codec` option of the layer:
+    "json", "orjson" or "msgpack". Messages larger than `compression_threshold`
+    bytes, if set, are compressed with brotli. Messages are read whatever the
+    codec and the compression they were sent with.
+    """
+
+    def __init__(self, *args, codec="json", compression_threshold=0, **kwargs):
+        """Choose the codec and the compression of the messages sent."""
+        super().__init__(*args, **kwargs)
+        if codec not in CODECS:
+            raise ImproperlyConfigured(
+                f"Unknown channel layer codec {codec}, choose one of "
+                f"{', '.join(CODECS)}."
+            )
+        self.codec_id, self.dumps, _loads = CODECS[codec]
+        self.compression_threshold = compression_threshold
+        # Messages sent in json without compression are sent without header
+        self.legacy_format = codec == "json" and not compression_threshold
 
     def serialize(self, message):
         """
-        Serializes message in json.
+        Serializes message with the codec of the layer.
         """
-        value = bytes(json.dumps(message, cls=DjangoJSONEncoder), encoding="utf-8")
+        value = self.dumps(message)
+        compression = NO_COMPRESSION
+        if self.compression_threshold and len(value) > self.compression_threshold:
+            value = brotli.compress(value, quality=BROTLI_QUALITY)
+            compression = BROTLI_COMPRESSION
         if self.crypter:
             value = self.crypter.encrypt(value)
 
         # As we use an sorted set to expire messages we need to guarantee uniqueness,
         # with 12 bytes.
-        random_prefix = random.getrandbits(8 * 12).to_bytes(12, "big")
-        return random_prefix + value
+        random_prefix = random.getrandbits(8 * RANDOM_PREFIX_LENGTH).to_bytes(
+            RANDOM_PREFIX_LENGTH, "big"
+        )
+        if self.legacy_format:
+            return random_prefix + value
+        return b"".join(
+            (
+                random_prefix,
+                HEADER_MAGIC,
+                bytes((HEADER_VERSION,)),
+                self.codec_id,
+                compression,
+                value,
+            )
+        )
 
     def deserialize(self, message):
         """
-        Deserializes from a byte string.
+        Deserializes from a byte string, with or without header.
         """
         # Removes the random prefix
-        message = message[12:]
-        message = message.decode("utf-8")
+        message = message[RANDOM_PREFIX_LENGTH:]
+        if not message.startswith(HEADER_MAGIC):
+            message = message.decode("utf-8")
+            if self.crypter:
+                message = self.crypter.decrypt(message, self.expiry + 10)
+            return json.loads(message)
 
+        header = message[:HEADER_LENGTH]
+        version, codec_id, compression = header[-3], header[-2:-1], header[-1:]
+        if version != HEADER_VERSION or codec_id not in DECODERS:
+            raise ValueError(
+                f"Unsupported channel layer message version {version} "
+                f"or codec {codec_id!r}"
+            )
+        value = message[HEADER_LENGTH:]
         if self.crypter:
-            message = self.crypter.decrypt(message, self.expiry + 10)
-        return json.loads(message)
+            value = self.crypter.decrypt(value, self.expiry + 10)
+        if compression == BROTLI_COMPRESSION:
+            value = brotli.decompress(value)
+        elif compression != NO_COMPRESSION:
+            raise ValueError(
+                f"Unsupported channel layer message compression {compression!r}"
+            )
+        return DECODERS[codec_id](value)
@@ -1,7 +1,13 @@
 """Middleware checking if the JWT is valid."""
+from collections import OrderedDict
+import hashlib
 import logging
+import threading
+import time
 from urllib.parse import parse_qs
 
+from django.conf import settings
+
 from channels.generic.websocket import AsyncWebsocketConsumer
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken
@@ -25,6 +31,53 @@ class WebsocketDenier(AsyncWebsocketConsumer):
         await self.close(code=4003)
 
 
+class ValidatedTokenCache:
+    """Remember the tokens validated recently, by the hash of their raw value.
+
+    Clients reconnecting at once after a network failure send the same token again,
+    its signature is only checked once during `WEBSOCKET_JWT_CACHE_TTL` seconds. A
+    token is never remembered after its expiration.
+    """
+
+    def __init__(self, max_size=10000):
+        """Remember at most `max_size` tokens, forgetting the oldest ones first."""
+        self.max_size = max_size
+        self._tokens = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(raw_token):
+        return hashlib.sha256(raw_token).hexdigest()
+
+    def get(self, raw_token):
+        """Return the validated token of a raw token if it is remembered and valid."""
+        key = self._key(raw_token)
+        with self._lock:
+            token, expires_at = self._tokens.get(key, (None, 0))
+            if token is not None and expires_at <= time.time():
+                del self._tokens[key]
+                return None
+        return token
+
+    def set(self, raw_token, token, ttl):
+        """Remember a validated token for `ttl` seconds, at most until it expires."""
+        key = self._key(raw_token)
+        expires_at = min(time.time() + ttl, token.payload.get("exp", 0))
+        with self._lock:
+            self._tokens[key] = (token, expires_at)
+            self._tokens.move_to_end(key)
+            while len(self._tokens) > self.max_size:
+                self._tokens.popitem(last=False)
+
+    def clear(self):
+        """Forget all the tokens."""
+        with self._lock:
+            self._tokens.clear()
+
+
+validated_tokens = ValidatedTokenCache()
+
+
 class JWTMiddleware:
     """Middleware checking if the JWT is valid."""
 
@@ -62,10 +115,18 @@ class JWTMiddleware:
         if len(raw_token) != 1:
             raise ValueError("jwt query string is missing")
 
+        ttl = settings.WEBSOCKET_JWT_CACHE_TTL
+        if ttl and (token := validated_tokens.get(raw_token[0])) is not None:
+            return token
+
         try:
             # Try to validate token against all accepted token types defined in
             # `api_settings.AUTH_TOKEN_CLASSES`.
-            return JWTAuthentication().get_validated_token(raw_token[0])
+            token = JWTAuthentication().get_validated_token(raw_token[0])
         except InvalidToken as err:
             logger.debug("Invalid jwt token")
             raise err
+
+        if ttl:
+            validated_tokens.set(raw_token[0], token, ttl)
+        return token
@@ -0,0 +1,24 @@
+"""Celery tasks for the websocket app."""
+from marsha.celery_app import app
+from marsha.core.models import Video
+from marsha.websocket.utils import channel_layers_utils
+
+
+@app.task
+def dispatch_video_to_groups(video_pk: str):
+    """Send the current state of a video to both simple and admin users.
+
+    Args:
+        video_pk (UUID): The video to send.
+    """
+    # Updates made from now on must schedule a new dispatch
+    channel_layers_utils.release_video_dispatch(video_pk)
+    try:
+        video = (
+            Video.objects.select_related("active_shared_live_media", "playlist")
+            .prefetch_related("thumbnail", "timedtexttracks", "shared_live_medias")
+            .get(pk=video_pk)
+        )
+    except Video.DoesNotExist:
+        return
+    channel_layers_utils.dispatch_video_to_groups(video, coalesce=False)
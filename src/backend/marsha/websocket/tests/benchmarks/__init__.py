@@ -0,0 +1 @@
+"""Benchmarks for the ``websocket`` app of the Marsha project."""
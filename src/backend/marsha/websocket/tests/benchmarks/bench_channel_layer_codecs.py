@@ -0,0 +1,114 @@
+"""Benchmark the codecs of the channel layer sending messages to the websockets.
+
+Run it with ``bin/pytest marsha/websocket/tests/benchmarks/bench_channel_layer_codecs.py -s``.
+"""
+from datetime import datetime, timezone as baseTimezone
+import os
+import tempfile
+from time import perf_counter
+
+from django.test import TestCase, override_settings
+
+from marsha.core.defaults import JITSI, RUNNING
+from marsha.core.factories import (
+    SharedLiveMediaFactory,
+    ThumbnailFactory,
+    TimedTextTrackFactory,
+    VideoFactory,
+)
+from marsha.core.models import Video
+from marsha.core.serializers import ThumbnailSerializer
+from marsha.core.tests.testing_utils import RSA_KEY_MOCK
+from marsha.core.utils import cloudfront_utils
+from marsha.websocket.layers import JsonRedisChannelLayer
+from marsha.websocket.utils import channel_layers_utils
+
+
+MESSAGES = 500
+UPLOADED_ON = datetime(2022, 1, 1, tzinfo=baseTimezone.utc)
+LAYERS = {
+    "json": {},
+    "orjson": {"codec": "orjson"},
+    "msgpack": {"codec": "msgpack"},
+    "orjson, brotli above 1KB": {"codec": "orjson", "compression_threshold": 1024},
+    "msgpack, brotli above 1KB": {"codec": "msgpack", "compression_threshold": 1024},
+}
+
+
+@override_settings(
+    CLOUDFRONT_SIGNED_URLS_ACTIVE=True,
+    CLOUDFRONT_SIGNED_PUBLIC_KEY_ID="key-id",
+    LIVE_CHAT_ENABLED=True,
+    XMPP_BOSH_URL="https://xmpp-server.com/http-bind",
+    XMPP_JWT_SHARED_SECRET="xmpp_shared_secret",
+)
+class ChannelLayerCodecsBenchmark(TestCase):
+    """Compare the codecs on the messages sent to the websockets of a running live."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create running jitsi lives with their medias and tracks."""
+        super().setUpTestData()
+        cls.video_ids = []
+        for nb_medias, nb_pages in ((4, 20), (10, 100)):
+            video = VideoFactory(
+                live_state=RUNNING,
+                live_type=JITSI,
+                live_info={"started_at": "1640995200"},
+                uploaded_on=UPLOADED_ON,
+                resolutions=[240, 480, 720, 1080],
+            )
+            ThumbnailFactory(video=video, uploaded_on=UPLOADED_ON)
+            for language in ("en", "fr", "de"):
+                TimedTextTrackFactory(
+                    video=video,
+                    language=language,
+                    uploaded_on=UPLOADED_ON,
+                    extension="srt",
+                )
+            for _ in range(nb_medias):
+                SharedLiveMediaFactory(
+                    video=video, nb_pages=nb_pages, uploaded_on=UPLOADED_ON
+                )
+            cls.video_ids.append(video.pk)
+
+    def setUp(self):
+        """Write the private key signing cloudfront urls and build the messages."""
+        super().setUp()
+        with tempfile.NamedTemporaryFile(delete=False) as key_file:
+            key_file.write(RSA_KEY_MOCK)
+        self.addCleanup(os.remove, key_file.name)
+        settings_override = override_settings(CLOUDFRONT_PRIVATE_KEY_PATH=key_file.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cloudfront_utils._signers.clear()  # pylint: disable=protected-access
+
+        videos = [Video.objects.get(pk=video_id) for video_id in self.video_ids]
+        self.messages = {
+            "thumbnail": {
+                "type": "thumbnail_updated",
+                "thumbnail": ThumbnailSerializer(videos[0].thumbnail.get()).data,
+            },
+            "video": channel_layers_utils.build_video_messages(videos[0])[1][1],
+            "large video": channel_layers_utils.build_video_messages(videos[1])[1][1],
+        }
+
+    def test_bench_channel_layer_codecs(self):
+        """Messages serialized and deserialized per second, and their size."""
+        for payload, message in self.messages.items():
+            print()
+            for label, config in LAYERS.items():
+                channel_layer = JsonRedisChannelLayer(**config)
+                start = perf_counter()
+                for _ in range(MESSAGES):
+                    serialized = channel_layer.serialize(message)
+                serialization = perf_counter() - start
+                start = perf_counter()
+                for _ in range(MESSAGES):
+                    channel_layer.deserialize(serialized)
+                deserialization = perf_counter() - start
+                print(
+                    f"{payload}, {label}: {len(serialized)} bytes, "
+                    f"{MESSAGES / serialization:.0f} serialized and "
+                    f"{MESSAGES / deserialization:.0f} deserialized per second"
+                )
@@ -0,0 +1,111 @@
+"""Benchmark a storm of connections to the websocket of a running live.
+
+Run it with ``bin/pytest marsha/websocket/tests/benchmarks/bench_connect_video.py -s``.
+"""
+import asyncio
+from datetime import timedelta
+from time import perf_counter
+from unittest import mock
+
+from django.db.backends.utils import CursorWrapper
+from django.test import TransactionTestCase, override_settings
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+
+from marsha.core.defaults import JITSI, RUNNING
+from marsha.core.factories import (
+    LiveSessionFactory,
+    PlaylistAccessFactory,
+    VideoFactory,
+)
+from marsha.core.models import ADMINISTRATOR
+from marsha.core.simple_jwt.factories import (
+    LiveSessionPlaylistAccessTokenFactory,
+    UserAccessTokenFactory,
+)
+from marsha.websocket.application import base_application
+from marsha.websocket.middlewares.jwt import validated_tokens
+
+
+STUDENTS = 300
+ADMINS = 20
+# Clients reconnecting at once after a network failure
+RECONNECTIONS = 3
+# Clients are connected by a single database thread, they wait for each other
+TIMEOUT = 60
+
+
+class ConnectVideoBenchmark(TransactionTestCase):
+    """Report the connections per second and the queries run by a connection storm."""
+
+    def setUp(self):
+        """Create a running live, its students' live sessions and its admins."""
+        super().setUp()
+        video = VideoFactory(
+            live_state=RUNNING,
+            live_type=JITSI,
+            live_info={"started_at": "1640995200"},
+        )
+        self.path = f"ws/video/{video.id}/"
+        tokens = [
+            LiveSessionPlaylistAccessTokenFactory(
+                live_session=LiveSessionFactory(
+                    video=video, is_from_lti_connection=True
+                )
+            )
+            for _ in range(STUDENTS)
+        ] + [
+            UserAccessTokenFactory(
+                user=PlaylistAccessFactory(
+                    playlist=video.playlist, role=ADMINISTRATOR
+                ).user
+            )
+            for _ in range(ADMINS)
+        ]
+        for token in tokens:
+            token.set_exp(lifetime=timedelta(hours=1))
+        self.tokens = [str(token) for token in tokens]
+        validated_tokens.clear()
+        self.addCleanup(validated_tokens.clear)
+        self.addCleanup(async_to_sync(get_channel_layer().flush))
+
+    async def _storm(self):
+        """Connect all the clients at once, then disconnect them all."""
+        communicators = [
+            WebsocketCommunicator(base_application, f"{self.path}?jwt={token}")
+            for token in self.tokens
+        ]
+        results = await asyncio.gather(
+            *(communicator.connect(timeout=TIMEOUT) for communicator in communicators)
+        )
+        assert all(connected for connected, _subprotocol in results)
+        await asyncio.gather(
+            *(
+                communicator.disconnect(timeout=TIMEOUT)
+                for communicator in communicators
+            )
+        )
+
+    def _run(self, label):
+        """Run the reconnection storms and print the results."""
+        with mock.patch.object(
+            CursorWrapper, "execute", autospec=True, side_effect=CursorWrapper.execute
+        ) as execute:
+            start = perf_counter()
+            for _ in range(RECONNECTIONS):
+                async_to_sync(self._storm)()
+            elapsed = perf_counter() - start
+
+        connections = RECONNECTIONS * len(self.tokens)
+        print(
+            f"\n{label}: {connections / elapsed:.0f} connections per second, "
+            f"{execute.call_count / connections:.1f} queries per connection"
+        )
+
+    def test_bench_connect_video(self):
+        """Connections per second and queries per connection."""
+        with override_settings(WEBSOCKET_JWT_CACHE_TTL=0):
+            self._run("validating each token")
+        self._run("validated tokens cached")
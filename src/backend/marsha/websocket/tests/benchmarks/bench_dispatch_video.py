@@ -0,0 +1,138 @@
+"""Benchmark the dispatch of a video to the users connected to its websocket.
+
+Run it with ``bin/pytest marsha/websocket/tests/benchmarks/bench_dispatch_video.py -s``.
+"""
+from datetime import datetime, timezone as baseTimezone
+import os
+import tempfile
+from time import perf_counter
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from marsha.core.defaults import JITSI, RUNNING
+from marsha.core.factories import (
+    SharedLiveMediaFactory,
+    ThumbnailFactory,
+    TimedTextTrackFactory,
+    VideoFactory,
+)
+from marsha.core.models import Video
+from marsha.core.serializers import VideoSerializer
+from marsha.core.tests.testing_utils import RSA_KEY_MOCK
+from marsha.core.utils import cloudfront_utils
+from marsha.websocket import tasks
+from marsha.websocket.utils import channel_layers_utils
+
+
+DISPATCHES = 100
+UPLOADED_ON = datetime(2022, 1, 1, tzinfo=baseTimezone.utc)
+
+
+@override_settings(
+    CLOUDFRONT_SIGNED_URLS_ACTIVE=True,
+    CLOUDFRONT_SIGNED_PUBLIC_KEY_ID="key-id",
+    LIVE_CHAT_ENABLED=True,
+    XMPP_BOSH_URL="https://xmpp-server.com/http-bind",
+    XMPP_JWT_SHARED_SECRET="xmpp_shared_secret",
+)
+class DispatchVideoBenchmark(TestCase):
+    """Compare dispatching a video serialized per room and serialized once."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a running jitsi live with its medias and tracks."""
+        super().setUpTestData()
+        video = VideoFactory(
+            live_state=RUNNING,
+            live_type=JITSI,
+            live_info={"started_at": "1640995200"},
+            uploaded_on=UPLOADED_ON,
+            resolutions=[240, 480, 720, 1080],
+        )
+        ThumbnailFactory(video=video, uploaded_on=UPLOADED_ON)
+        for language in ("en", "fr", "de"):
+            TimedTextTrackFactory(
+                video=video, language=language, uploaded_on=UPLOADED_ON, extension="srt"
+            )
+        shared_live_medias = [
+            SharedLiveMediaFactory(
+                video=video,
+                nb_pages=20,
+                show_download=index % 2 == 0,
+                uploaded_on=UPLOADED_ON,
+            )
+            for index in range(4)
+        ]
+        video.active_shared_live_media = shared_live_medias[1]
+        video.save()
+        cls.video_id = video.pk
+
+    def setUp(self):
+        """Write the private key signing cloudfront urls."""
+        super().setUp()
+        with tempfile.NamedTemporaryFile(delete=False) as key_file:
+            key_file.write(RSA_KEY_MOCK)
+        self.addCleanup(os.remove, key_file.name)
+        settings_override = override_settings(CLOUDFRONT_PRIVATE_KEY_PATH=key_file.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cloudfront_utils._signers.clear()  # pylint: disable=protected-access
+        self.video = (
+            Video.objects.select_related("active_shared_live_media", "playlist")
+            .prefetch_related("thumbnail", "timedtexttracks", "shared_live_medias")
+            .get(pk=self.video_id)
+        )
+        self.addCleanup(async_to_sync(get_channel_layer().flush))
+
+    def _report(self, label, serialization, elapsed, messages):
+        """Print the benchmark results."""
+        print(
+            f"\n{label}: serialization {serialization * 1000 / DISPATCHES:.1f} ms "
+            f"per dispatch, {messages / elapsed:.0f} messages per second"
+        )
+
+    def test_bench_dispatch_video(self):
+        """Serialization time and messages per second before and after."""
+        # serialized for each room, sent with one hop per room
+        start = perf_counter()
+        for _ in range(DISPATCHES):
+            channel_layers_utils.dispatch_video(self.video, to_admin=False)
+            channel_layers_utils.dispatch_video(self.video, to_admin=True)
+        elapsed = perf_counter() - start
+        start = perf_counter()
+        for _ in range(DISPATCHES):
+            for is_admin in (False, True):
+                VideoSerializer(
+                    self.video, context={"is_admin": is_admin}
+                ).to_representation(self.video)
+        self._report("per room", perf_counter() - start, elapsed, 2 * DISPATCHES)
+
+        # serialized once, the admin variant is derived, sent in a single hop
+        start = perf_counter()
+        for _ in range(DISPATCHES):
+            channel_layers_utils.dispatch_video_to_groups(self.video)
+        elapsed = perf_counter() - start
+        start = perf_counter()
+        for _ in range(DISPATCHES):
+            channel_layers_utils.build_video_messages(self.video)
+        self._report("serialized once", perf_counter() - start, elapsed, 2 * DISPATCHES)
+
+        # a burst of updates coalesced in a single dispatch
+        with override_settings(
+            WEBSOCKET_VIDEO_DISPATCH_COALESCE_DELAY=1
+        ), mock.patch.object(
+            tasks.dispatch_video_to_groups, "apply_async"
+        ) as mock_apply_async:
+            start = perf_counter()
+            for _ in range(DISPATCHES):
+                channel_layers_utils.dispatch_video_to_groups(self.video)
+            tasks.dispatch_video_to_groups(str(self.video_id))
+            elapsed = perf_counter() - start
+        print(
+            f"coalesced: {DISPATCHES} updates sent as "
+            f"{2 * mock_apply_async.call_count} messages in {elapsed * 1000:.0f} ms"
+        )
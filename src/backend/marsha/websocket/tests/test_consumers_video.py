@@ -1,7 +1,10 @@
 """Test for video consumers."""
+from contextlib import contextmanager
 import json
+from unittest import mock
 from uuid import uuid4
 
+from django.db.backends.utils import CursorWrapper
 from django.test import TransactionTestCase
 
 from asgiref.sync import sync_to_async
@@ -36,9 +39,10 @@ from marsha.core.simple_jwt.factories import (
 )
 from marsha.websocket.application import base_application
 from marsha.websocket.defaults import VIDEO_ADMIN_ROOM_NAME, VIDEO_ROOM_NAME
+from marsha.websocket.utils import channel_layers_utils
 
 
-# pylint: disable=too-many-public-methods
+# pylint: disable=too-many-lines,too-many-public-methods
 
 
 class VideoConsumerTest(TransactionTestCase):
@@ -110,6 +114,19 @@ class VideoConsumerTest(TransactionTestCase):
         """Create a user access token using UserAccessTokenFactory."""
         return UserAccessTokenFactory(**kwargs)
 
+    @contextmanager
+    def assertNumQueriesAnyThread(self, num):  # pylint: disable=invalid-name
+        """Assert the number of queries run, by the consumers in the sync threads too."""
+        with mock.patch.object(
+            CursorWrapper, "execute", autospec=True, side_effect=CursorWrapper.execute
+        ) as execute:
+            yield
+        self.assertEqual(
+            execute.call_count,
+            num,
+            [call.args[1] for call in execute.call_args_list],
+        )
+
     def setUp(self):
         """
         Create commonly used data, should be in a setupClass
@@ -355,6 +372,50 @@ class VideoConsumerTest(TransactionTestCase):
         await sync_to_async(live_session.refresh_from_db)()
         self.assertIsNone(live_session.channel_name)
 
+    async def test_connect_resolves_access_once(self):
+        """A user connecting and disconnecting has their access checked by one query."""
+        playlist_access = await self._get_playlist_access(
+            playlist=self.some_video.playlist,
+            role=ADMINISTRATOR,
+        )
+        jwt_token = await self._get_user_access_token(user=playlist_access.user)
+
+        communicator = WebsocketCommunicator(
+            base_application,
+            f"ws/video/{self.some_video.id}/?jwt={jwt_token}",
+        )
+
+        with self.assertNumQueriesAnyThread(1):
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            await communicator.disconnect()
+
+    async def test_connect_student_live_session_retrieved_once(self):
+        """The live session of a student is retrieved on connection only."""
+        video = await self._get_video()
+        live_session = await self._get_live_session(
+            video=video,
+            is_from_lti_connection=True,
+        )
+        jwt_token = LiveSessionPlaylistAccessTokenFactory(live_session=live_session)
+
+        communicator = WebsocketCommunicator(
+            base_application,
+            f"ws/video/{video.id}/?jwt={jwt_token}",
+        )
+
+        # Access, video, consumer site, live session and its update
+        with self.assertNumQueriesAnyThread(5):
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+
+        # Update of the live session
+        with self.assertNumQueriesAnyThread(1):
+            await communicator.disconnect()
+
+        await sync_to_async(live_session.refresh_from_db)()
+        self.assertIsNone(live_session.channel_name)
+
     async def test_connect_no_matching_video(self):
         """Connection with a video not matching the one in the token should be refused."""
         video = await self._get_video()
@@ -771,3 +832,230 @@ class VideoConsumerTest(TransactionTestCase):
                 },
             },
         )
+
+    async def _connect_instructor(self, video, query_string=""):
+        """Connect an instructor to the websocket of a video."""
+        jwt_token = InstructorOrAdminLtiTokenFactory(
+            playlist=video.playlist,
+            consumer_site=str(video.consumer_site.id),
+        )
+        communicator = WebsocketCommunicator(
+            base_application,
+            f"ws/video/{video.id}/?jwt={jwt_token}{query_string}",
+        )
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def _send_video_event(self, video, resource):
+        """Send a versioned video event to the admin room of a video."""
+        room_name = VIDEO_ADMIN_ROOM_NAME.format(video_id=str(video.id))
+        event = await sync_to_async(channel_layers_utils.build_video_event)(
+            room_name, resource
+        )
+        await get_channel_layer().group_send(room_name, event)
+
+    async def test_video_update_delta_protocol(self):
+        """Clients using the delta protocol receive patches from the previous version."""
+        video = await self._get_video()
+        communicator = await self._connect_instructor(video, "&protocol=delta")
+
+        with self.settings(WEBSOCKET_VIDEO_PATCH_EVENTS_ENABLED=True):
+            await self._send_video_event(video, {"title": "a", "participants": []})
+            response = await communicator.receive_json_from()
+            self.assertEqual(
+                response,
+                {
+                    "type": "videos",
+                    "resource": {"title": "a", "participants": []},
+                    "version": 1,
+                },
+            )
+
+            await self._send_video_event(video, {"title": "a", "participants": [1]})
+            response = await communicator.receive_json_from()
+            self.assertEqual(
+                response,
+                {
+                    "type": "videos",
+                    "patch": [{"op": "replace", "path": "/participants", "value": [1]}],
+                    "version": 2,
+                    "base_version": 1,
+                },
+            )
+
+        # full events are turned into patches as well
+        await self._send_video_event(video, {"title": "b", "participants": [1]})
+        response = await communicator.receive_json_from()
+        self.assertEqual(
+            response,
+            {
+                "type": "videos",
+                "patch": [{"op": "replace", "path": "/title", "value": "b"}],
+                "version": 3,
+                "base_version": 2,
+            },
+        )
+
+        # a client missing a version asks for a snapshot
+        await communicator.send_json_to({"type": "resync"})
+        response = await communicator.receive_json_from()
+        self.assertEqual(
+            response,
+            {
+                "type": "videos",
+                "resource": {"title": "b", "participants": [1]},
+                "version": 3,
+            },
+        )
+
+        await communicator.disconnect()
+
+    async def test_video_update_delta_protocol_missed_event(self):
+        """Consumers not knowing the base version of a patch use the cached snapshot."""
+        video = await self._get_video()
+
+        with self.settings(WEBSOCKET_VIDEO_PATCH_EVENTS_ENABLED=True):
+            # sent before the client connects
+            await self._send_video_event(video, {"title": "a"})
+            communicator = await self._connect_instructor(video, "&protocol=delta")
+            await self._send_video_event(video, {"title": "b"})
+            # the video at version 2 is replaced by a newer one in the meantime
+            await sync_to_async(channel_layers_utils.build_video_event)(
+                VIDEO_ADMIN_ROOM_NAME.format(video_id=str(video.id)), {"title": "c"}
+            )
+
+            with self.assertNumQueriesAnyThread(0):
+                response = await communicator.receive_json_from()
+        self.assertEqual(
+            response, {"type": "videos", "resource": {"title": "b"}, "version": 2}
+        )
+
+        await communicator.disconnect()
+
+    async def test_video_update_older_version(self):
+        """Events older than the version a delta client has are ignored."""
+        video = await self._get_video()
+        room_name = VIDEO_ADMIN_ROOM_NAME.format(video_id=str(video.id))
+        communicator = await self._connect_instructor(video, "&protocol=delta")
+
+        await get_channel_layer().group_send(
+            room_name,
+            {
+                "type": "video_updated",
+                "epoch": "a",
+                "version": 2,
+                "video": {"title": "b"},
+            },
+        )
+        response = await communicator.receive_json_from()
+        self.assertEqual(
+            response, {"type": "videos", "resource": {"title": "b"}, "version": 2}
+        )
+
+        # sent late by a concurrent dispatch
+        await get_channel_layer().group_send(
+            room_name,
+            {
+                "type": "video_updated",
+                "epoch": "a",
+                "version": 1,
+                "video": {"title": "a"},
+            },
+        )
+        self.assertTrue(await communicator.receive_nothing())
+
+        # the counter started again in a new epoch
+        await get_channel_layer().group_send(
+            room_name,
+            {
+                "type": "video_updated",
+                "epoch": "b",
+                "version": 1,
+                "video": {"title": "c"},
+            },
+        )
+        response = await communicator.receive_json_from()
+        self.assertEqual(
+            response, {"type": "videos", "resource": {"title": "c"}, "version": 1}
+        )
+
+        await communicator.disconnect()
+
+    async def test_video_update_older_version_legacy_client(self):
+        """Clients not using the delta protocol receive every video, whatever its
+        version."""
+        video = await self._get_video()
+        room_name = VIDEO_ADMIN_ROOM_NAME.format(video_id=str(video.id))
+        communicator = await self._connect_instructor(video)
+
+        for version, title in ((2, "b"), (1, "a")):
+            await get_channel_layer().group_send(
+                room_name,
+                {
+                    "type": "video_updated",
+                    "epoch": "a",
+                    "version": version,
+                    "video": {"title": title},
+                },
+            )
+            response = await communicator.receive_json_from()
+            self.assertEqual(response, {"type": "videos", "resource": {"title": title}})
+
+        await communicator.disconnect()
+
+    async def test_video_update_cache_not_shared(self):
+        """Clients receive every update when the cache does not keep the versions, as
+        when it is not shared by the processes."""
+        video = await self._get_video()
+        with self.settings(
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+            },
+            WEBSOCKET_VIDEO_PATCH_EVENTS_ENABLED=True,
+        ):
+            legacy_communicator = await self._connect_instructor(video)
+            delta_communicator = await self._connect_instructor(
+                video, "&protocol=delta"
+            )
+
+            for title in ("a", "b", "c"):
+                await self._send_video_event(video, {"title": title})
+                response = await legacy_communicator.receive_json_from()
+                self.assertEqual(
+                    response, {"type": "videos", "resource": {"title": title}}
+                )
+                response = await delta_communicator.receive_json_from()
+                self.assertEqual(
+                    response,
+                    {"type": "videos", "resource": {"title": title}, "version": 1},
+                )
+
+            await legacy_communicator.disconnect()
+            await delta_communicator.disconnect()
+
+    async def test_video_update_patch_events_legacy_client(self):
+        """Clients not using the delta protocol still receive the whole video."""
+        video = await self._get_video()
+        communicator = await self._connect_instructor(video)
+
+        with self.settings(WEBSOCKET_VIDEO_PATCH_EVENTS_ENABLED=True):
+            await self._send_video_event(video, {"title": "a", "participants": []})
+            await self._send_video_event(video, {"title": "a", "participants": [1]})
+
+        response = await communicator.receive_json_from()
+        self.assertEqual(
+            response,
+            {"type": "videos", "resource": {"title": "a", "participants": []}},
+        )
+        response = await communicator.receive_json_from()
+        self.assertEqual(
+            response,
+            {"type": "videos", "resource": {"title": "a", "participants": [1]}},
+        )
+
+        # resync messages are ignored
+        await communicator.send_json_to({"type": "resync"})
+        self.assertTrue(await communicator.receive_nothing())
+
+        await communicator.disconnect()
@@ -1,4 +1,9 @@
 """Test marsha layers use by django channels."""
+from datetime import datetime, timezone
+from decimal import Decimal
+import uuid
+
+from django.core.exceptions import ImproperlyConfigured
 from django.test import TestCase
 
 from marsha.websocket.layers import JsonRedisChannelLayer
@@ -29,3 +34,93 @@ class JsonRedisChannelLayerTest(TestCase):
 
         self.assertIsInstance(deserialized, dict)
         self.assertEqual(deserialized, {"a": True, "b": None, "c": {"d": []}})
+
+    def test_serialize_codecs(self):
+        """Messages are read back whatever the codec, with Django types encoded as json."""
+        message = {
+            "a": True,
+            "b": None,
+            "c": {"d": [1, 2.5, "é"]},
+            "uuid": uuid.UUID("ad3c7d3b-4c43-4f6d-9a43-d8a44f2f1a66"),
+            "date": datetime(2022, 1, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+            "decimal": Decimal("1.50"),
+        }
+        expected = {
+            "a": True,
+            "b": None,
+            "c": {"d": [1, 2.5, "é"]},
+            "uuid": "ad3c7d3b-4c43-4f6d-9a43-d8a44f2f1a66",
+            "date": "2022-01-01T12:30:15.123Z",
+            "decimal": "1.50",
+        }
+        reader = JsonRedisChannelLayer()
+        for codec, codec_id in (("json", b"j"), ("orjson", b"o"), ("msgpack", b"m")):
+            with self.subTest(codec=codec):
+                channel_layer = JsonRedisChannelLayer(
+                    codec=codec, compression_threshold=1000
+                )
+                serialized = channel_layer.serialize(message)
+                self.assertEqual(serialized[12:18], b"\xffML\x01" + codec_id + b"-")
+                self.assertEqual(channel_layer.deserialize(serialized), expected)
+                self.assertEqual(reader.deserialize(serialized), expected)
+
+    def test_serialize_legacy_format(self):
+        """Messages in json without compression are sent without header, and messages
+        without header are read by layers using any codec."""
+        message = {"a": True, "b": None, "c": {"d": []}}
+        serialized = JsonRedisChannelLayer().serialize(message)
+        self.assertEqual(serialized[12:], b'{"a": true, "b": null, "c": {"d": []}}')
+
+        for codec in ("json", "orjson", "msgpack"):
+            with self.subTest(codec=codec):
+                channel_layer = JsonRedisChannelLayer(
+                    codec=codec, compression_threshold=10
+                )
+                self.assertEqual(channel_layer.deserialize(serialized), message)
+
+    def test_serialize_compression(self):
+        """Messages larger than the compression threshold are compressed."""
+        channel_layer = JsonRedisChannelLayer(codec="orjson", compression_threshold=100)
+
+        small_message = {"text": "a" * 50}
+        serialized = channel_layer.serialize(small_message)
+        self.assertEqual(serialized[12:18], b"\xffML\x01o-")
+        self.assertEqual(channel_layer.deserialize(serialized), small_message)
+
+        large_message = {"text": "a" * 10000}
+        serialized = channel_layer.serialize(large_message)
+        self.assertEqual(serialized[12:18], b"\xffML\x01ob")
+        self.assertLess(len(serialized), 100)
+        self.assertEqual(channel_layer.deserialize(serialized), large_message)
+
+    def test_serialize_encryption(self):
+        """Messages are encrypted after being compressed."""
+        message = {"text": "a" * 10000}
+        for codec in ("json", "orjson", "msgpack"):
+            with self.subTest(codec=codec):
+                channel_layer = JsonRedisChannelLayer(
+                    codec=codec,
+                    compression_threshold=100,
+                    symmetric_encryption_keys=["secret"],
+                )
+                serialized = channel_layer.serialize(message)
+                self.assertNotIn(b"aaaa", serialized)
+                self.assertLess(len(serialized), 500)
+                self.assertEqual(channel_layer.deserialize(serialized), message)
+
+        channel_layer = JsonRedisChannelLayer(symmetric_encryption_keys=["secret"])
+        serialized = channel_layer.serialize(message)
+        self.assertEqual(channel_layer.deserialize(serialized), message)
+
+    def test_unknown_codec(self):
+        """Only the supported codecs can be configured."""
+        with self.assertRaises(ImproperlyConfigured):
+            JsonRedisChannelLayer(codec="pickle")
+
+    def test_deserialize_unsupported_header(self):
+        """Messages sent with a version or a codec not supported are rejected."""
+        channel_layer = JsonRedisChannelLayer()
+        for header in (b"\xffML\x02o-", b"\xffML\x01x-", b"\xffML\x01ox"):
+            with self.subTest(header=header):
+                with self.assertRaises(ValueError):
+                    channel_layer.deserialize(b"0" * 12 + header + b"{}")
@@ -1,14 +1,16 @@
 """Test for the jwt middleware."""
 from datetime import timedelta
+from unittest import mock
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.testing import WebsocketCommunicator
 
 from marsha.core.simple_jwt.factories import PlaylistAccessTokenFactory
-from marsha.websocket.middlewares import JWTMiddleware
+from marsha.websocket.middlewares import JWTMiddleware, ValidatedTokenCache
+from marsha.websocket.middlewares.jwt import JWTAuthentication, validated_tokens
 
 
 class JWTMiddlewareTest(TestCase):
@@ -16,6 +18,19 @@ class JWTMiddlewareTest(TestCase):
 
     maxDiff = None
 
+    def setUp(self):
+        """Forget the tokens validated by the previous tests."""
+        super().setUp()
+        validated_tokens.clear()
+
+    async def _connect(self, token):
+        """Connect to a consumer behind the middleware and disconnect."""
+        application = JWTMiddleware(AsyncWebsocketConsumer())
+        communicator = WebsocketCommunicator(application, f"/?jwt={token}")
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        await communicator.disconnect()
+
     async def test_missing_token(self):
         """Without token the connection is refused."""
         application = JWTMiddleware(AsyncWebsocketConsumer())
@@ -64,3 +79,71 @@ class JWTMiddlewareTest(TestCase):
         middleware = JWTMiddleware(AsyncWebsocketConsumer())
         with self.assertRaises(ValueError):
             await middleware({"type": "wrong-type"}, None, None)
+
+    async def test_valid_token_cached(self):
+        """A token is validated once when connecting several times."""
+        token = PlaylistAccessTokenFactory()
+        token.set_exp(lifetime=timedelta(minutes=20))
+
+        with mock.patch.object(
+            JWTAuthentication,
+            "get_validated_token",
+            autospec=True,
+            side_effect=JWTAuthentication.get_validated_token,
+        ) as get_validated_token:
+            await self._connect(token)
+            await self._connect(token)
+            await self._connect(PlaylistAccessTokenFactory())
+
+        self.assertEqual(get_validated_token.call_count, 2)
+
+    @override_settings(WEBSOCKET_JWT_CACHE_TTL=0)
+    async def test_valid_token_cache_disabled(self):
+        """A token is validated on each connection when the cache is disabled."""
+        token = PlaylistAccessTokenFactory()
+
+        with mock.patch.object(
+            JWTAuthentication,
+            "get_validated_token",
+            autospec=True,
+            side_effect=JWTAuthentication.get_validated_token,
+        ) as get_validated_token:
+            await self._connect(token)
+            await self._connect(token)
+
+        self.assertEqual(get_validated_token.call_count, 2)
+
+
+class ValidatedTokenCacheTest(TestCase):
+    """Test for the cache of validated tokens."""
+
+    def test_expiration(self):
+        """A token is remembered during the ttl, at most until it expires."""
+        cache = ValidatedTokenCache()
+        token = PlaylistAccessTokenFactory()
+        token.set_exp(lifetime=timedelta(minutes=20))
+        expired_token = PlaylistAccessTokenFactory()
+        expired_token.set_exp(
+            from_time=timezone.now() - timedelta(minutes=30),
+            lifetime=timedelta(minutes=1),
+        )
+
+        cache.set(b"token", token, 30)
+        cache.set(b"expired", expired_token, 30)
+        self.assertIs(cache.get(b"token"), token)
+        self.assertIsNone(cache.get(b"expired"))
+        self.assertIsNone(cache.get(b"unknown"))
+
+        with mock.patch("time.time", return_value=timezone.now().timestamp() + 31):
+            self.assertIsNone(cache.get(b"token"))
+
+    def test_max_size(self):
+        """The oldest tokens are forgotten first."""
+        cache = ValidatedTokenCache(max_size=2)
+        tokens = [PlaylistAccessTokenFactory() for _ in range(3)]
+        for index, token in enumerate(tokens):
+            cache.set(str(index).encode(), token, 30)
+
+        self.assertIsNone(cache.get(b"0"))
+        self.assertIs(cache.get(b"1"), tokens[1])
+        self.assertIs(cache.get(b"2"), tokens[2])
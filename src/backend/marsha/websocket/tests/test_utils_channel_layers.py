@@ -1,9 +1,14 @@
 """Module testing utils channel_layers"""
-from django.test import TestCase
+from datetime import datetime, timezone as baseTimezone
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
 
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 
+from marsha.core.defaults import HARVESTED, JITSI, RUNNING
 from marsha.core.factories import (
     SharedLiveMediaFactory,
     ThumbnailFactory,
@@ -16,20 +21,49 @@ from marsha.core.serializers import (
     TimedTextTrackSerializer,
     VideoSerializer,
 )
+from marsha.websocket import tasks
 from marsha.websocket.defaults import VIDEO_ADMIN_ROOM_NAME, VIDEO_ROOM_NAME
 from marsha.websocket.utils import channel_layers_utils
 
 
-class ChannelLayersUtilsTest(TestCase):
-    """Test channel layers utils."""
+class ChannelLayersUtilsMixin:
+    """Flush the channel layer and check dispatched videos."""
 
     maxDiff = None
 
     def tearDown(self):
+        """Flush the channel layer."""
         super().tearDown()
         channel_layer = get_channel_layer()
         async_to_sync(channel_layer.flush)()
 
+    def _assert_video_dispatched_to_groups(self, video, dispatch):
+        """Both groups receive the video serialized for their role."""
+        channel_layer = get_channel_layer()
+        async_to_sync(channel_layer.group_add)(
+            VIDEO_ROOM_NAME.format(video_id=str(video.id)), "test_channel"
+        )
+        async_to_sync(channel_layer.group_add)(
+            VIDEO_ADMIN_ROOM_NAME.format(video_id=str(video.id)), "admin_channel"
+        )
+        now = datetime(2022, 1, 1, tzinfo=baseTimezone.utc)
+
+        with mock.patch.object(timezone, "now", return_value=now):
+            dispatch(video)
+            expected = VideoSerializer(video, context={"is_admin": False}).data
+            expected_admin = VideoSerializer(video, context={"is_admin": True}).data
+
+        message = async_to_sync(channel_layer.receive)("test_channel")
+        self.assertEqual(message["type"], "video_updated")
+        self.assertEqual(message["video"], expected)
+        message = async_to_sync(channel_layer.receive)("admin_channel")
+        self.assertEqual(message["type"], "video_updated")
+        self.assertEqual(message["video"], expected_admin)
+
+
+class ChannelLayersUtilsTest(ChannelLayersUtilsMixin, TestCase):
+    """Test channel layers utils."""
+
     def test_send_video_to_simple_user(self):
         """A message containing serialized video is dispatched to the regular group."""
         video = VideoFactory()
@@ -113,3 +147,256 @@ class ChannelLayersUtilsTest(TestCase):
             message["shared_live_media"],
             SharedLiveMediaSerializer(shared_live_media).data,
         )
+
+    def test_dispatch_video_to_groups(self):
+        """The video is dispatched to the regular and admin groups."""
+        self._assert_video_dispatched_to_groups(
+            VideoFactory(), channel_layers_utils.dispatch_video_to_groups
+        )
+
+    @override_settings(
+        LIVE_CHAT_ENABLED=True,
+        XMPP_BOSH_URL="https://xmpp-server.com/http-bind",
+        XMPP_JWT_SHARED_SECRET="xmpp_shared_secret",
+    )
+    def test_dispatch_video_to_groups_running_jitsi(self):
+        """Chat and jitsi information of admin users are derived for them."""
+        video = VideoFactory(
+            live_state=RUNNING,
+            live_type=JITSI,
+            live_info={"started_at": "1533686400"},
+        )
+        self._assert_video_dispatched_to_groups(
+            video, channel_layers_utils.dispatch_video_to_groups
+        )
+
+    def test_dispatch_video_to_groups_harvested_shared_live_medias(self):
+        """Urls and shared live medias hidden to regular users are derived for admins."""
+        video = VideoFactory(
+            live_state=HARVESTED,
+            live_type=JITSI,
+            uploaded_on=datetime(2022, 1, 1, tzinfo=baseTimezone.utc),
+            resolutions=[720],
+        )
+        shared_live_media = SharedLiveMediaFactory(
+            video=video,
+            show_download=False,
+            nb_pages=2,
+            uploaded_on=datetime(2022, 1, 1, tzinfo=baseTimezone.utc),
+        )
+        SharedLiveMediaFactory(video=video, show_download=True)
+        video.active_shared_live_media = shared_live_media
+        video.save()
+
+        self._assert_video_dispatched_to_groups(
+            video, channel_layers_utils.dispatch_video_to_groups
+        )
+
+    @override_settings(WEBSOCKET_VIDEO_DISPATCH_COALESCE_DELAY=0.5)
+    def test_dispatch_video_to_groups_coalesced(self):
+        """A burst of updates of a video schedules a single dispatch."""
+        video = VideoFactory()
+        other_video = VideoFactory()
+
+        with mock.patch.object(
+            tasks.dispatch_video_to_groups, "apply_async"
+        ) as mock_apply_async, mock.patch.object(
+            channel_layers_utils, "build_video_messages"
+        ) as mock_build_messages:
+            channel_layers_utils.dispatch_video_to_groups(video)
+            channel_layers_utils.dispatch_video_to_groups(video)
+            channel_layers_utils.dispatch_video_to_groups(other_video)
+
+        mock_build_messages.assert_not_called()
+        self.assertEqual(
+            mock_apply_async.call_args_list,
+            [
+                mock.call(args=[str(video.id)], countdown=0.5),
+                mock.call(args=[str(other_video.id)], countdown=0.5),
+            ],
+        )
+
+    @override_settings(WEBSOCKET_VIDEO_DISPATCH_COALESCE_DELAY=0.5)
+    def test_dispatch_video_to_groups_coalesced_task(self):
+        """The task sends the saved video and allows a new dispatch to be scheduled."""
+        video = VideoFactory()
+        channel_layers_utils.claim_video_dispatch(video.id)
+
+        self._assert_video_dispatched_to_groups(
+            video, lambda video: tasks.dispatch_video_to_groups(str(video.id))
+        )
+        self.assertTrue(channel_layers_utils.claim_video_dispatch(video.id))
+
+    @override_settings(WEBSOCKET_VIDEO_DISPATCH_COALESCE_DELAY=0.5)
+    def test_dispatch_video_to_groups_not_coalesced(self):
+        """A video that is not saved can be sent right away."""
+        self._assert_video_dispatched_to_groups(
+            VideoFactory(),
+            lambda video: channel_layers_utils.dispatch_video_to_groups(
+                video, coalesce=False
+            ),
+        )
+
+    def test_build_video_event_versions(self):
+        """Events sent to a room are versioned and the last one is kept in cache."""
+        room_name = VIDEO_ROOM_NAME.format(video_id=str(VideoFactory().id))
+
+        event = channel_layers_utils.build_video_event(room_name, {"title": "a"})
+        epoch = event["epoch"]
+        self.assertEqual(
+            event,
+            {
+                "type": "video_updated",
+                "epoch": epoch,
+                "version": 1,
+                "video": {"title": "a"},
+            },
+        )
+        self.assertEqual(
+            channel_layers_utils.build_video_event(room_name, {"title": "b"}),
+            {
+                "type": "video_updated",
+                "epoch": epoch,
+                "version": 2,
+                "video": {"title": "b"},
+            },
+        )
+        self.assertEqual(
+            channel_layers_utils.get_room_snapshot(room_name),
+            (epoch, 2, {"title": "b"}),
+        )
+        self.assertEqual(
+            channel_layers_utils.get_room_snapshot(room_name, epoch, 1),
+            (epoch, 1, {"title": "a"}),
+        )
+        self.assertIsNone(channel_layers_utils.get_room_snapshot(room_name, epoch, 3))
+
+    def test_build_video_event_counter_lost(self):
+        """The versions start again in a new epoch when the cache loses the counter."""
+        room_name = VIDEO_ROOM_NAME.format(video_id=str(VideoFactory().id))
+        first = channel_layers_utils.build_video_event(room_name, {"title": "a"})
+        channel_layers_utils.build_video_event(room_name, {"title": "b"})
+
+        channel_layers_utils.cache.delete(f"websocket:video_version:{room_name}")
+        event = channel_layers_utils.build_video_event(room_name, {"title": "c"})
+
+        self.assertEqual(event["version"], 1)
+        self.assertNotEqual(event["epoch"], first["epoch"])
+        self.assertEqual(
+            channel_layers_utils.get_room_snapshot(room_name),
+            (event["epoch"], 1, {"title": "c"}),
+        )
+        # the video sent at the first version of the previous epoch is kept apart
+        self.assertEqual(
+            channel_layers_utils.get_room_snapshot(room_name, first["epoch"], 1),
+            (first["epoch"], 1, {"title": "a"}),
+        )
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+        WEBSOCKET_VIDEO_PATCH_EVENTS_ENABLED=True,
+    )
+    def test_build_video_event_cache_not_kept(self):
+        """Without a cache keeping the counter, each event is a whole video sent in a
+        new epoch."""
+        room_name = VIDEO_ROOM_NAME.format(video_id=str(VideoFactory().id))
+
+        events = [
+            channel_layers_utils.build_video_event(room_name, {"title": title})
+            for title in ("a", "b", "c")
+        ]
+
+        self.assertEqual(
+            [(event["version"], event["video"]) for event in events],
+            [(1, {"title": "a"}), (1, {"title": "b"}), (1, {"title": "c"})],
+        )
+        self.assertEqual(len({event["epoch"] for event in events}), 3)
+
+    def test_build_video_event_concurrent(self):
+        """A video sent late by a concurrent dispatch never replaces a newer one."""
+        room_name = VIDEO_ROOM_NAME.format(video_id=str(VideoFactory().id))
+
+        with mock.patch.object(
+            channel_layers_utils,
+            "_next_room_version",
+            side_effect=[("epoch", 2), ("epoch", 1)],
+        ):
+            channel_layers_utils.build_video_event(room_name, {"title": "new"})
+            channel_layers_utils.build_video_event(room_name, {"title": "old"})
+
+        self.assertEqual(
+            channel_layers_utils.get_room_snapshot(room_name, "epoch", 2),
+            ("epoch", 2, {"title": "new"}),
+        )
+        self.assertEqual(
+            channel_layers_utils.get_room_snapshot(room_name, "epoch", 1),
+            ("epoch", 1, {"title": "old"}),
+        )
+
+    @override_settings(WEBSOCKET_VIDEO_PATCH_EVENTS_ENABLED=True)
+    def test_build_video_event_patch(self):
+        """With patch events, only the changes from the previous version are sent."""
+        room_name = VIDEO_ROOM_NAME.format(video_id=str(VideoFactory().id))
+
+        epoch = channel_layers_utils.build_video_event(
+            room_name, {"title": "a", "participants_asking_to_join": []}
+        )["epoch"]
+        self.assertEqual(
+            channel_layers_utils.build_video_event(
+                room_name, {"title": "a", "participants_asking_to_join": [{"id": 1}]}
+            ),
+            {
+                "type": "video_updated",
+                "epoch": epoch,
+                "version": 2,
+                "base_version": 1,
+                "patch": [
+                    {
+                        "op": "replace",
+                        "path": "/participants_asking_to_join",
+                        "value": [{"id": 1}],
+                    }
+                ],
+            },
+        )
+
+        # the previous version is not known anymore
+        channel_layers_utils.cache.delete(
+            f"websocket:video_snapshot:{room_name}:{epoch}:2"
+        )
+        self.assertEqual(
+            channel_layers_utils.build_video_event(room_name, {"title": "b"}),
+            {
+                "type": "video_updated",
+                "epoch": epoch,
+                "version": 3,
+                "video": {"title": "b"},
+            },
+        )
+
+
+class ChannelLayersUtilsAsyncTest(ChannelLayersUtilsMixin, TransactionTestCase):
+    """Test channel layers utils used from an asynchronous context."""
+
+    def test_adispatch_video_to_groups(self):
+        """The video is dispatched to both groups from an asynchronous context."""
+        self._assert_video_dispatched_to_groups(
+            VideoFactory(),
+            async_to_sync(channel_layers_utils.adispatch_video_to_groups),
+        )
+
+    @override_settings(WEBSOCKET_VIDEO_DISPATCH_COALESCE_DELAY=0.5)
+    def test_adispatch_video_to_groups_coalesced(self):
+        """A burst of updates from an asynchronous context schedules one dispatch."""
+        video = VideoFactory()
+
+        with mock.patch.object(
+            tasks.dispatch_video_to_groups, "apply_async"
+        ) as mock_apply_async, mock.patch.object(
+            channel_layers_utils, "build_video_messages"
+        ) as mock_build_messages:
+            async_to_sync(channel_layers_utils.adispatch_video_to_groups)(video)
+            async_to_sync(channel_layers_utils.adispatch_video_to_groups)(video)
+
+        mock_build_messages.assert_not_called()
+        mock_apply_async.assert_called_once_with(args=[str(video.id)], countdown=0.5)
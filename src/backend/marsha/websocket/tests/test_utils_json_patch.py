@@ -0,0 +1,68 @@
+"""Test the json patch utils."""
+from django.test import SimpleTestCase
+
+from marsha.websocket.utils.json_patch import apply_patch, make_patch
+
+
+class JsonPatchTest(SimpleTestCase):
+    """Test making and applying json patches."""
+
+    def test_make_patch(self):
+        """Changed keys are replaced, objects are compared key by key."""
+        source = {
+            "title": "video",
+            "participants": [],
+            "urls": {"mp4": {720: "a", 1080: "b"}, "a/b~c": 1},
+            "removed": True,
+        }
+        target = {
+            "title": "video",
+            "participants": [{"id": 1}],
+            "urls": {"mp4": {720: "a", 1080: "c"}, "a/b~c": 2},
+            "added": None,
+        }
+
+        patch = make_patch(source, target)
+
+        self.assertEqual(
+            patch,
+            [
+                {"op": "remove", "path": "/removed"},
+                {"op": "replace", "path": "/participants", "value": [{"id": 1}]},
+                {"op": "replace", "path": "/urls/mp4/1080", "value": "c"},
+                {"op": "replace", "path": "/urls/a~1b~0c", "value": 2},
+                {"op": "add", "path": "/added", "value": None},
+            ],
+        )
+        self.assertEqual(apply_patch(source, patch), target)
+        # the source is left untouched
+        self.assertTrue(source["removed"])
+
+    def test_make_patch_same_document(self):
+        """No operation is needed between equal documents."""
+        self.assertEqual(make_patch({"a": [1]}, {"a": [1]}), [])
+
+    def test_apply_patch_json_keys(self):
+        """Patches apply to documents whose keys went through a json encoding."""
+        self.assertEqual(
+            apply_patch(
+                {"mp4": {"1080": "b"}},
+                [{"op": "replace", "path": "/mp4/1080", "value": "c"}],
+            ),
+            {"mp4": {"1080": "c"}},
+        )
+
+    def test_apply_patch_invalid(self):
+        """A patch not applying to a document raises a ValueError."""
+        with self.assertRaises(ValueError):
+            apply_patch({"a": 1}, [{"op": "replace", "path": "/b/c", "value": 2}])
+
+    def test_apply_patch_in_place(self):
+        """Patches can be applied to the document itself instead of a copy."""
+        document = {"a": {"b": 1}}
+        patched = apply_patch(
+            document, [{"op": "replace", "path": "/a/b", "value": 2}], in_place=True
+        )
+
+        self.assertIs(patched, document)
+        self.assertEqual(document, {"a": {"b": 2}})
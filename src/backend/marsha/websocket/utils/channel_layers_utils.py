@@ -1,5 +1,14 @@
 """Marsha module working with django channels layers."""
-from asgiref.sync import async_to_sync
+import asyncio
+import math
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.db import database_sync_to_async
 from channels.layers import get_channel_layer
 
 from marsha.core.serializers import (
@@ -8,23 +17,228 @@ from marsha.core.serializers import (
     TimedTextTrackSerializer,
     VideoSerializer,
 )
-from marsha.websocket.defaults import VIDEO_ADMIN_ROOM_NAME, VIDEO_ROOM_NAME
+from marsha.websocket.defaults import (
+    VIDEO_ADMIN_ROOM_NAME,
+    VIDEO_DISPATCH_KEY_CACHE,
+    VIDEO_ROOM_NAME,
+    VIDEO_SNAPSHOT_KEY_CACHE,
+    VIDEO_VERSION_KEY_CACHE,
+)
+from marsha.websocket.utils.json_patch import make_patch
+
+
+def _get_version_keys(room_name):
+    """Return the cache keys of the version counter of a room and of its epoch."""
+    key = f"{VIDEO_VERSION_KEY_CACHE}{room_name}"
+    return key, f"{key}:epoch"
+
+
+def _next_room_version(room_name):
+    """Return the (epoch, version) of the next video sent to a room.
+
+    The counter lives in the cache, which may not be shared by all the processes or
+    may lose it. A new epoch is drawn each time the counter starts again, so that
+    consumers never take a counter starting again for videos sent out of order.
+    """
+    key, epoch_key = _get_version_keys(room_name)
+    epoch = None
+    if cache.add(key, 0, timeout=None):
+        epoch = uuid.uuid4().hex
+        cache.set(epoch_key, epoch, timeout=None)
+    try:
+        version = cache.incr(key)
+    except ValueError:
+        # the counter expired between add and incr, or the cache does not keep it
+        cache.set(key, 1, timeout=None)
+        version = 1
+        epoch = uuid.uuid4().hex
+        cache.set(epoch_key, epoch, timeout=None)
+    if epoch is None:
+        epoch = uuid.uuid4().hex
+        # the epoch was lost alone, the counter goes on in a new one
+        if not cache.add(epoch_key, epoch, timeout=None):
+            epoch = cache.get(epoch_key, epoch)
+    return epoch, version
+
+
+def _get_snapshot_key(room_name, epoch, version):
+    """Return the cache key of the video sent to a room at a version."""
+    return f"{VIDEO_SNAPSHOT_KEY_CACHE}{room_name}:{epoch}:{version}"
+
+
+def get_room_snapshot(room_name, epoch=None, version=None):
+    """Return the (epoch, version, representation) of the video sent to a room.
+
+    The video at the last version sent to the room is returned by default, None if
+    the cache does not know it.
+    """
+    if version is None:
+        key, epoch_key = _get_version_keys(room_name)
+        stamp = cache.get_many([key, epoch_key])
+        epoch, version = stamp.get(epoch_key), stamp.get(key)
+        if epoch is None or version is None:
+            return None
+    representation = cache.get(_get_snapshot_key(room_name, epoch, version))
+    return None if representation is None else (epoch, version, representation)
+
+
+async def aget_room_snapshot(room_name, epoch=None, version=None):
+    """Return the (epoch, version, representation) of the video sent to a room.
+
+    The video at the last version sent to the room is returned by default, None if
+    the cache does not know it.
+    """
+    if version is None:
+        key, epoch_key = _get_version_keys(room_name)
+        stamp = await cache.aget_many([key, epoch_key])
+        epoch, version = stamp.get(epoch_key), stamp.get(key)
+        if epoch is None or version is None:
+            return None
+    representation = await cache.aget(_get_snapshot_key(room_name, epoch, version))
+    return None if representation is None else (epoch, version, representation)
+
+
+def build_video_event(room_name, representation):
+    """Build the `video_updated` event sending a representation of the video to a room.
+
+    Each event sent to a room is stamped with an increasing version in an epoch. When
+    `WEBSOCKET_VIDEO_PATCH_EVENTS_ENABLED` is set and the previous version sent to the
+    room is known, the event only contains the patch from this version.
+    """
+    epoch, version = _next_room_version(room_name)
+    # Each version is kept under its own key, written once: the video sent by a
+    # concurrent dispatch can never replace a newer one.
+    cache.add(
+        _get_snapshot_key(room_name, epoch, version),
+        representation,
+        timeout=settings.WEBSOCKET_VIDEO_SNAPSHOT_CACHE_DURATION,
+    )
+
+    event = {"type": "video_updated", "epoch": epoch, "version": version}
+    previous = (
+        get_room_snapshot(room_name, epoch, version - 1)
+        if settings.WEBSOCKET_VIDEO_PATCH_EVENTS_ENABLED and version > 1
+        else None
+    )
+    if previous is not None:
+        event["base_version"] = previous[1]
+        event["patch"] = make_patch(previous[2], representation)
+    else:
+        event["video"] = representation
+    return event
+
 
+def build_video_messages(video):
+    """Build the messages sending the video to both simple and admin users.
 
-def dispatch_video_to_groups(video):
-    """Send the video to both simple and admin user."""
-    dispatch_video(video, to_admin=False)
-    dispatch_video(video, to_admin=True)
+    The video is serialized once for simple users, the representation for admin users
+    is derived from it.
+
+    Returns
+    -------
+    list
+        (group name, message) tuples, one per room of the video.
+    """
+    representation = VideoSerializer(video, context={"is_admin": False}).data
+    admin_representation = VideoSerializer(
+        context={"is_admin": True}
+    ).derive_admin_representation(video, representation)
+    video_id = str(video.id)
+    room_name = VIDEO_ROOM_NAME.format(video_id=video_id)
+    admin_room_name = VIDEO_ADMIN_ROOM_NAME.format(video_id=video_id)
+    return [
+        (room_name, build_video_event(room_name, representation)),
+        (admin_room_name, build_video_event(admin_room_name, admin_representation)),
+    ]
+
+
+async def _group_send_all(messages):
+    """Send messages to their group concurrently."""
+    channel_layer = get_channel_layer()
+    await asyncio.gather(
+        *(channel_layer.group_send(group, message) for group, message in messages)
+    )
+
+
+def claim_video_dispatch(video_id):
+    """Return True if no dispatch is scheduled yet for the video, the caller must do it."""
+    return cache.add(
+        f"{VIDEO_DISPATCH_KEY_CACHE}{video_id}",
+        True,
+        timeout=math.ceil(settings.WEBSOCKET_VIDEO_DISPATCH_COALESCE_DELAY) + 1,
+    )
+
+
+def release_video_dispatch(video_id):
+    """Allow the next call to `claim_video_dispatch` to schedule a dispatch."""
+    cache.delete(f"{VIDEO_DISPATCH_KEY_CACHE}{video_id}")
+
+
+def dispatch_video_to_groups(video, coalesce=True):
+    """Send the video to both simple and admin user.
+
+    When `WEBSOCKET_VIDEO_DISPATCH_COALESCE_DELAY` is set, the video is sent later by
+    a celery task reading it from the database, all the updates of the video made in
+    the meantime are sent at once.
+
+    Parameters
+    ----------
+    video : Type[models.Video]
+        The video to send
+    coalesce : bool
+        Set to False to send the video right away, mandatory if the video sent
+        is not saved.
+    """
+    if coalesce and settings.WEBSOCKET_VIDEO_DISPATCH_COALESCE_DELAY:
+        _schedule_video_dispatch(video.id)
+        return
+
+    async_to_sync(_group_send_all)(build_video_messages(video))
+
+
+async def adispatch_video_to_groups(video, coalesce=True):
+    """Send the video to both simple and admin user from an asynchronous context.
+
+    The equivalent of `dispatch_video_to_groups` for callers already running in an
+    event loop, where `async_to_sync` cannot be used: only the serialization of the
+    video runs in a thread, its messages are sent from the running loop.
+
+    Parameters
+    ----------
+    video : Type[models.Video]
+        The video to send
+    coalesce : bool
+        Set to False to send the video right away, mandatory if the video sent
+        is not saved.
+    """
+    if coalesce and settings.WEBSOCKET_VIDEO_DISPATCH_COALESCE_DELAY:
+        await sync_to_async(_schedule_video_dispatch)(video.id)
+        return
+
+    messages = await database_sync_to_async(build_video_messages)(video)
+    await _group_send_all(messages)
+
+
+def _schedule_video_dispatch(video_id):
+    """Schedule the celery task sending the saved video, unless it is already."""
+    if claim_video_dispatch(video_id):
+        # This task is imported using import_string to avoid circular import error.
+        dispatch_task = import_string("marsha.websocket.tasks.dispatch_video_to_groups")
+        dispatch_task.apply_async(
+            args=[str(video_id)],
+            countdown=settings.WEBSOCKET_VIDEO_DISPATCH_COALESCE_DELAY,
+        )
 
 
 def dispatch_video(video, to_admin=False):
     """Send the video to users connected to the video consumer."""
-    room_name = VIDEO_ADMIN_ROOM_NAME if to_admin else VIDEO_ROOM_NAME
+    room_name = (VIDEO_ADMIN_ROOM_NAME if to_admin else VIDEO_ROOM_NAME).format(
+        video_id=str(video.id)
+    )
     channel_layer = get_channel_layer()
     serialized_video = VideoSerializer(video, context={"is_admin": to_admin})
     async_to_sync(channel_layer.group_send)(
-        room_name.format(video_id=str(video.id)),
-        {"type": "video_updated", "video": serialized_video.data},
+        room_name, build_video_event(room_name, serialized_video.data)
     )
 
 
@@ -0,0 +1,84 @@
+"""Minimal JSON patch (RFC 6902) support to send changes of a resource.
+
+Only the ``add``, ``remove`` and ``replace`` operations are generated. Objects are
+compared key by key, any other value, lists included, is replaced as a whole.
+"""
+import copy
+
+
+def _escape(key):
+    """Escape a key to be used in a JSON pointer (RFC 6901)."""
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token):
+    """Unescape a JSON pointer token."""
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def make_patch(source, target, path=""):
+    """Return the operations turning the `source` document into the `target` one."""
+    if not isinstance(source, dict) or not isinstance(target, dict):
+        return (
+            []
+            if source == target
+            else [{"op": "replace", "path": path, "value": target}]
+        )
+
+    source_keys = {str(key): key for key in source}
+    target_keys = {str(key): key for key in target}
+    patch = []
+    for name in source_keys:
+        if name not in target_keys:
+            patch.append({"op": "remove", "path": f"{path}/{_escape(name)}"})
+    for name, key in target_keys.items():
+        key_path = f"{path}/{_escape(name)}"
+        if name not in source_keys:
+            patch.append({"op": "add", "path": key_path, "value": target[key]})
+        else:
+            patch.extend(make_patch(source[source_keys[name]], target[key], key_path))
+    return patch
+
+
+def _find_key(document, token):
+    """Return the key of a document matching a JSON pointer token."""
+    name = _unescape(token)
+    for key in document:
+        if str(key) == name:
+            return key
+    return name
+
+
+def apply_patch(document, patch, in_place=False):
+    """Return a copy of the `document` with the `patch` operations applied.
+
+    With `in_place`, the document itself is modified instead of a copy of it, it
+    must not be used anymore if the patch does not apply.
+
+    Raises
+    ------
+    ValueError
+        If an operation does not apply to the document.
+    """
+    if not in_place:
+        document = copy.deepcopy(document)
+    for operation in patch:
+        tokens = operation["path"].split("/")[1:]
+        if not tokens:
+            document = copy.deepcopy(operation["value"])
+            continue
+
+        parent = document
+        try:
+            for token in tokens[:-1]:
+                parent = parent[_find_key(parent, token)]
+            key = _find_key(parent, tokens[-1])
+            if operation["op"] == "remove":
+                del parent[key]
+            elif operation["op"] in ("add", "replace"):
+                parent[key] = copy.deepcopy(operation["value"])
+            else:
+                raise ValueError(f"Unsupported operation {operation['op']}")
+        except (KeyError, TypeError) as error:
+            raise ValueError(f"Operation {operation} does not apply") from error
+    return document